@@ -4,11 +4,12 @@ Conversation Toolkit CLI with automatic plugin discovery
 """
 
 import argparse
+import itertools
 import json
 import logging
 import sys
 from pathlib import Path
-from typing import Optional
+from typing import IO, Any, Iterable, Iterator, List, Optional
 
 import ctk
 from ctk.core.config import get_config
@@ -20,6 +21,7 @@ from ctk.core.input_validation import (
     validate_file_path,
     validate_path_selection,
 )
+from ctk.core.models import ConversationTree
 from ctk.core.plugin import registry
 
 
@@ -36,6 +38,62 @@ def _err(message):
     print(message, file=sys.stderr)
 
 
+def _is_safe_zip_member(name: str) -> bool:
+    """Reject traversal-unsafe archive members (absolute paths or '..')."""
+    from pathlib import PurePosixPath
+
+    p = PurePosixPath(name)
+    return not p.is_absolute() and ".." not in p.parts
+
+
+def _locate_zip_export(zf, zip_path) -> "tuple[str, str, list]":
+    """Find the conversations.json member of an open export archive.
+
+    Returns ``(member, root_prefix, names)`` where ``names`` lists the safe,
+    non-directory members. Prefers the shallowest match (root, else single
+    top-level directory).
+    """
+    from pathlib import PurePosixPath
+
+    names = [n for n in zf.namelist() if _is_safe_zip_member(n) and not n.endswith("/")]
+    json_members = [n for n in names if PurePosixPath(n).name == "conversations.json"]
+    if not json_members:
+        raise ValueError(f"Archive {zip_path} does not contain a conversations.json")
+    member = min(json_members, key=lambda n: len(PurePosixPath(n).parts))
+    root_prefix = str(PurePosixPath(member).parent)
+    return member, root_prefix, names
+
+
+def _extract_zip_media(zf, names, root_prefix) -> Optional[str]:
+    """Extract non-JSON members into a temp directory; None if there are none.
+
+    The caller owns cleanup of the returned directory.
+    """
+    import shutil
+    import tempfile
+    from pathlib import PurePosixPath
+
+    media_members = [n for n in names if not n.lower().endswith(".json")]
+    if not media_members:
+        return None
+    media_dir = tempfile.mkdtemp(prefix="ctk-zip-")
+    base = Path(media_dir).resolve()
+    for n in media_members:
+        rel = PurePosixPath(n)
+        if root_prefix not in (".", ""):
+            try:
+                rel = rel.relative_to(root_prefix)
+            except ValueError:
+                pass
+        target = (base / Path(*rel.parts)).resolve()
+        if base not in target.parents and target != base:
+            continue  # belt and suspenders against traversal
+        target.parent.mkdir(parents=True, exist_ok=True)
+        with zf.open(n) as src, open(target, "wb") as dst:
+            shutil.copyfileobj(src, dst)
+    return media_dir
+
+
 def _read_zip_export(zip_path) -> "tuple[str, Optional[str]]":
     """Read a provider export archive without fully extracting it.
 
@@ -45,50 +103,58 @@ def _read_zip_export(zip_path) -> "tuple[str, Optional[str]]":
     (ChatGPT zips), else None. The caller owns cleanup of media_dir.
     Traversal-unsafe members (absolute paths or '..') are skipped.
     """
-    import shutil
-    import tempfile
     import zipfile
-    from pathlib import PurePosixPath
-
-    def _is_safe(name: str) -> bool:
-        p = PurePosixPath(name)
-        return not p.is_absolute() and ".." not in p.parts
 
     with zipfile.ZipFile(zip_path) as zf:
-        names = [n for n in zf.namelist() if _is_safe(n) and not n.endswith("/")]
-        json_members = [
-            n for n in names if PurePosixPath(n).name == "conversations.json"
-        ]
-        if not json_members:
-            raise ValueError(
-                f"Archive {zip_path} does not contain a conversations.json"
-            )
-        # Prefer the shallowest match (root, else single top-level directory).
-        member = min(json_members, key=lambda n: len(PurePosixPath(n).parts))
-        root_prefix = str(PurePosixPath(member).parent)
+        member, root_prefix, names = _locate_zip_export(zf, zip_path)
         data = zf.read(member).decode("utf-8")
-
-        media_members = [n for n in names if not n.lower().endswith(".json")]
-        media_dir = None
-        if media_members:
-            media_dir = tempfile.mkdtemp(prefix="ctk-zip-")
-            base = Path(media_dir).resolve()
-            for n in media_members:
-                rel = PurePosixPath(n)
-                if root_prefix not in (".", ""):
-                    try:
-                        rel = rel.relative_to(root_prefix)
-                    except ValueError:
-                        pass
-                target = (base / Path(*rel.parts)).resolve()
-                if base not in target.parents and target != base:
-                    continue  # belt and suspenders against traversal
-                target.parent.mkdir(parents=True, exist_ok=True)
-                with zf.open(n) as src, open(target, "wb") as dst:
-                    shutil.copyfileobj(src, dst)
+        media_dir = _extract_zip_media(zf, names, root_prefix)
         return data, media_dir
 
 
+_DATA_FILE_NAMES = ["conversations.json", "data.json", "export.json"]
+
+
+def _find_data_file(input_dir: Path) -> Optional[Path]:
+    """Return the first standard export data file inside ``input_dir``."""
+    for filename in _DATA_FILE_NAMES:
+        candidate = input_dir / filename
+        if candidate.exists():
+            return candidate
+    return None
+
+
+def _build_import_kwargs(args, importer, input_path, zip_media_dir) -> dict:
+    """Importer kwargs shared by the buffered and streaming import paths.
+
+    Raises ValueError/PermissionError/OSError if ``--db`` cannot be opened.
+    """
+    import_kwargs = {}
+
+    # Detect if this is an OpenAI format importer
+    is_openai_format = (
+        args.format and args.format in ["openai", "chatgpt", "gpt"]
+    ) or (importer.name in ["openai", "chatgpt", "gpt"])
+
+    # If importing OpenAI format, pass source_dir for image resolution
+    if is_openai_format:
+        if zip_media_dir:
+            import_kwargs["source_dir"] = zip_media_dir
+        elif input_path.is_dir():
+            import_kwargs["source_dir"] = str(input_path)
+        else:
+            # Input is a file, use parent directory as source_dir
+            import_kwargs["source_dir"] = str(input_path.parent)
+
+    # If saving to database, pass media_dir for image storage
+    if args.db:
+        db_temp = ConversationDB(args.db)
+        if hasattr(db_temp, "media_dir"):
+            import_kwargs["media_dir"] = str(db_temp.media_dir)
+
+    return import_kwargs
+
+
 def _finish_import(conversations, args) -> int:
     """Shared tail: print count, save to DB, optionally export, return exit code.
 
@@ -119,8 +185,9 @@ def _finish_import(conversations, args) -> int:
                 if args.tags:
                     conv.metadata.tags.extend(args.tags.split(","))
 
-                conv_id = db.save_conversation(conv)
-                print(f"  Saved: {conv.title or 'Untitled'} ({conv_id})")
+            db.save_conversations(conversations)
+            for conv in conversations:
+                print(f"  Saved: {conv.title or 'Untitled'} ({conv.id})")
 
     # Export to file if requested
     if args.output:
@@ -141,6 +208,149 @@ def _finish_import(conversations, args) -> int:
     return 0
 
 
+def _save_streamed_import(trees, args) -> int:
+    """Save trees to ``args.db`` as they are produced; return exit code.
+
+    Streaming counterpart of _finish_import: nothing is accumulated, so
+    memory stays flat however many conversations the export holds.
+    """
+    from ctk.core.constants import SAVE_BATCH_SIZE
+
+    try:
+        db = ConversationDB(args.db)
+    except Exception as e:
+        _err(f"Error: Cannot open database: {e}")
+        return 1
+
+    extra_tags = args.tags.split(",") if args.tags else []
+    trees = iter(trees)
+    count = 0
+
+    # One batch of trees in memory at a time, reported once it is committed
+    with db:
+        while True:
+            batch = list(itertools.islice(trees, SAVE_BATCH_SIZE))
+            if not batch:
+                break
+            if extra_tags:
+                for conv in batch:
+                    conv.metadata.tags.extend(extra_tags)
+            count += len(db.save_conversations(batch))
+            for conv in batch:
+                print(f"  Saved: {conv.title or 'Untitled'} ({conv.id})")
+
+    print(f"Imported {count} conversation(s)")
+    if not count:
+        print("Warning: No valid conversations found in the input file")
+    return 0
+
+
+def _cmd_import_stream(args, input_path: Path) -> int:
+    """Incremental import: parse one conversation at a time and save it.
+
+    The export's top-level JSON array is decoded element by element
+    (straight out of the zip member for archives), each element is turned
+    into a tree by the importer's ``iter_import`` and handed to the DB
+    before the next one is read.
+    """
+    import io
+    import itertools
+    import zipfile
+
+    from ctk.core.utils import iter_json_array
+
+    if not args.db:
+        _err("Error: --stream requires --db")
+        return 1
+    if args.output:
+        _err("Error: --stream writes to --db only; drop --output")
+        return 1
+    if args.format in ["jsonl", "local", "llama", "mistral", "alpaca"]:
+        _err("Error: --stream supports JSON array exports, not JSONL")
+        return 1
+
+    zf = None
+    fh: Optional[IO[str]] = None
+    zip_media_dir = None
+    try:
+        if input_path.suffix.lower() == ".zip":
+            try:
+                zf = zipfile.ZipFile(input_path)
+                member, root_prefix, names = _locate_zip_export(zf, input_path)
+                zip_media_dir = _extract_zip_media(zf, names, root_prefix)
+            except (ValueError, OSError, zipfile.BadZipFile) as e:
+                _err(f"Error: Cannot read archive: {e}")
+                return 1
+            fh = io.TextIOWrapper(zf.open(member), encoding="utf-8")
+        else:
+            data_file: Optional[Path] = input_path
+            if input_path.is_dir():
+                data_file = _find_data_file(input_path)
+            if not data_file:
+                _err(
+                    f"Error: Directory '{input_path}' does not contain"
+                    " a recognizable data file"
+                )
+                return 1
+            fh = open(data_file, "r", encoding="utf-8")
+
+        stream = iter_json_array(fh)
+        first = next(stream, None)
+        if first is None:
+            print("Imported 0 conversation(s)")
+            print("Warning: No valid conversations found in the input file")
+            return 0
+        elements: Iterable[Any] = itertools.chain([first], stream)
+
+        if args.format:
+            importer = registry.get_importer(args.format)
+            if not importer:
+                _err(f"Error: Unknown format: {args.format}")
+                print(f"Available formats: {', '.join(registry.list_importers())}")
+                return 1
+        else:
+            # Detect from the first conversation only; validators sample [0].
+            importer = registry.auto_detect_importer([first])
+            if not importer:
+                _err("Error: Could not auto-detect format")
+                return 1
+
+        if not getattr(importer, "streaming", False):
+            _err(
+                f"Warning: {importer.name} importer cannot stream;"
+                " loading the whole export"
+            )
+            elements = list(elements)
+
+        try:
+            import_kwargs = _build_import_kwargs(
+                args, importer, input_path, zip_media_dir
+            )
+        except (ValueError, PermissionError, OSError) as e:
+            _err(f"Error: Cannot open database: {e}")
+            return 1
+
+        return _save_streamed_import(
+            importer.iter_import(elements, **import_kwargs), args
+        )
+    except Exception as e:
+        print(f"Error importing file: {e}")
+        if args.verbose:
+            import traceback
+
+            traceback.print_exc()
+        return 1
+    finally:
+        if fh is not None:
+            fh.close()
+        if zf is not None:
+            zf.close()
+        if zip_media_dir:
+            import shutil
+
+            shutil.rmtree(zip_media_dir, ignore_errors=True)
+
+
 def cmd_import(args):
     """Import conversations from file or auto-search"""
     registry.discover_plugins()
@@ -203,6 +413,9 @@ def cmd_import(args):
             _err(f"Error: Invalid input path: {e}")
             return 1
 
+        if getattr(args, "stream", False):
+            return _cmd_import_stream(args, input_path)
+
         # Handle zip archives, directory imports, or plain files
         zip_media_dir = None
         if input_path.suffix.lower() == ".zip":
@@ -215,19 +428,12 @@ def cmd_import(args):
                 return 1
         elif input_path.is_dir():
             # Look for standard data files in the directory
-            possible_files = ["conversations.json", "data.json", "export.json"]
-            data_file = None
-            for filename in possible_files:
-                candidate = input_path / filename
-                if candidate.exists():
-                    data_file = candidate
-                    break
-
+            data_file = _find_data_file(input_path)
             if not data_file:
                 print(
                     f"Error: Directory '{input_path}' does not contain a recognizable data file"
                 )
-                print(f"  Looked for: {', '.join(possible_files)}")
+                print(f"  Looked for: {', '.join(_DATA_FILE_NAMES)}")
                 return 1
 
             # Read from the found file
@@ -267,32 +473,13 @@ def cmd_import(args):
                 data = data_parsed
 
             # Prepare import kwargs (for both explicit and auto-detected formats)
-            import_kwargs = {}
-
-            # Detect if this is an OpenAI format importer
-            is_openai_format = (
-                args.format and args.format in ["openai", "chatgpt", "gpt"]
-            ) or (importer.name in ["openai", "chatgpt", "gpt"])
-
-            # If importing OpenAI format, pass source_dir for image resolution
-            if is_openai_format:
-                if zip_media_dir:
-                    import_kwargs["source_dir"] = zip_media_dir
-                elif input_path.is_dir():
-                    import_kwargs["source_dir"] = str(input_path)
-                else:
-                    # Input is a file, use parent directory as source_dir
-                    import_kwargs["source_dir"] = str(input_path.parent)
-
-            # If saving to database, pass media_dir for image storage
-            if args.db:
-                try:
-                    db_temp = ConversationDB(args.db)
-                    if hasattr(db_temp, "media_dir"):
-                        import_kwargs["media_dir"] = str(db_temp.media_dir)
-                except (ValueError, PermissionError, OSError) as e:
-                    _err(f"Error: Cannot open database: {e}")
-                    return 1
+            try:
+                import_kwargs = _build_import_kwargs(
+                    args, importer, input_path, zip_media_dir
+                )
+            except (ValueError, PermissionError, OSError) as e:
+                _err(f"Error: Cannot open database: {e}")
+                return 1
 
             # Import with kwargs
             conversations = importer.import_data(data, **import_kwargs)
@@ -328,8 +515,7 @@ def cmd_export(args):
         return 1
 
     with db:
-        # Load conversations
-        conversations = []
+        conversations: Iterable[ConversationTree]
         # CLI convention: --limit 0 means "no limit"
         export_limit = None if getattr(args, "limit", None) in (None, 0) else args.limit
 
@@ -338,53 +524,57 @@ def cmd_export(args):
         # Tags + the sidebar filter tabs cover the same use case.
         if args.ids:
             # Export specific conversations - validate IDs
+            validated_ids = []
             for conv_id in args.ids:
                 try:
-                    validated_id = validate_conversation_id(conv_id, allow_partial=True)
+                    validated_ids.append(
+                        validate_conversation_id(conv_id, allow_partial=True)
+                    )
                 except ValidationError as e:
                     _err(f"Error: Invalid conversation ID '{conv_id}': {e}")
                     return 1
 
-                conv = db.load_conversation(validated_id)
+            loaded = db.load_conversations(validated_ids)
+            conversations = []
+            for validated_id in validated_ids:
+                conv = loaded.get(validated_id)
                 if conv:
                     conversations.append(conv)
                 else:
                     print(f"Warning: Conversation {validated_id} not found")
         else:
-            # Export all or filtered conversations
-            conv_list = db.list_conversations(limit=export_limit)
-            for conv_info in conv_list:
-                conv = db.load_conversation(conv_info.id)
-                if conv:
-                    # Apply filters
-                    if (
-                        args.filter_source
-                        and conv.metadata.source != args.filter_source
-                    ):
-                        continue
-                    if args.filter_model and args.filter_model not in (
-                        conv.metadata.model or ""
-                    ):
-                        continue
-                    if args.filter_tags:
-                        required_tags = set(args.filter_tags.split(","))
-                        if not required_tags.issubset(set(conv.metadata.tags)):
-                            continue
-                    # Organization filters
-                    if hasattr(args, "starred") and args.starred:
-                        if not conv.metadata.starred_at:
-                            continue
-                    if hasattr(args, "pinned") and args.pinned:
-                        if not conv.metadata.pinned_at:
-                            continue
-
-                    conversations.append(conv)
+            # Export all or filtered conversations, newest first. Every filter
+            # runs in SQL, so trees are loaded a batch at a time as the
+            # exporter consumes them. --filter-model is a substring match and
+            # --filter-tags requires all of the listed tags.
+            from sqlalchemy import func
+
+            from ctk.core.db_models import ConversationModel, TagModel
+
+            where: List[Any] = []
+            if args.filter_model:
+                where.append(func.instr(ConversationModel.model, args.filter_model) > 0)
+            if args.filter_tags:
+                for tag_name in args.filter_tags.split(","):
+                    where.append(ConversationModel.tags.any(TagModel.name == tag_name))
+            conversations = db.iter_trees(
+                source=args.filter_source or None,
+                starred=True if getattr(args, "starred", False) else None,
+                pinned=True if getattr(args, "pinned", False) else None,
+                include_archived=False,
+                where=where,
+                order="updated",
+                limit=export_limit,
+            )
 
-        if not conversations:
+        # Peek at the first tree so an empty selection is reported before
+        # the output file is created
+        trees = iter(conversations)
+        first = next(trees, None)
+        if first is None:
             print("No conversations found matching criteria")
             return 1
-
-        print(f"Exporting {len(conversations)} conversation(s)")
+        conversations = itertools.chain([first], trees)
 
         # Export
         format_name = args.format or "jsonl"
@@ -394,6 +584,24 @@ def cmd_export(args):
             print(f"Available formats: {', '.join(registry.list_exporters())}")
             return 1
 
+        exported = 0
+        if exporter.streaming:
+            # Constant memory: trees are counted as the exporter pulls them
+            def _counted(
+                trees: Iterable[ConversationTree],
+            ) -> Iterator[ConversationTree]:
+                nonlocal exported
+                for conv in trees:
+                    exported += 1
+                    yield conv
+
+            conversations = _counted(conversations)
+            print("Exporting conversations")
+        else:
+            conversations = list(conversations)
+            exported = len(conversations)
+            print(f"Exporting {exported} conversation(s)")
+
         # Validate path_selection and export format
         try:
             path_selection = validate_path_selection(args.path_selection)
@@ -407,6 +615,13 @@ def cmd_export(args):
             "include_metadata": args.include_metadata,
         }
 
+        # Rendering processes (0 = one per CPU); exporters write in order
+        if hasattr(args, "jobs"):
+            export_kwargs["jobs"] = args.jobs
+        # Directory exporters skip conversations unchanged since the last run
+        if hasattr(args, "full"):
+            export_kwargs["incremental"] = not args.full
+
         # Add HTML-specific options if present
         if hasattr(args, "theme"):
             export_kwargs["theme"] = args.theme
@@ -418,6 +633,10 @@ def cmd_export(args):
             export_kwargs["embed"] = args.embed
         if hasattr(args, "media_dir") and args.media_dir:
             export_kwargs["media_dir"] = args.media_dir
+        if hasattr(args, "sharded") and args.sharded:
+            export_kwargs["sharded"] = True
+        if hasattr(args, "link_media") and args.link_media:
+            export_kwargs["link_media"] = True
 
         # Add Hugo-specific options if present
         if hasattr(args, "draft"):
@@ -456,11 +675,18 @@ def cmd_export(args):
             return 1
 
         try:
-            exporter.export_to_file(conversations, str(output_path), **export_kwargs)
-            print(f"Exported to {output_path}")
+            stats = exporter.export_to_file(
+                conversations, str(output_path), **export_kwargs
+            )
+            print(f"Exported {exported} conversation(s) to {output_path}")
+            if stats is not None:
+                print(f"Incremental export: {stats}")
         except (PermissionError, OSError) as e:
             _err(f"Error: Cannot write to output file: {e}")
             return 1
+        except ValueError as e:
+            _err(f"Error: {e}")
+            return 1
 
         return 0
 
@@ -682,6 +908,7 @@ def cmd_stats(args):
 
 def cmd_auto_tag(args):
     """Auto-tag conversations using LLM"""
+    from ctk.core.constants import LOAD_BATCH_SIZE
     from ctk.llm.base import Message, MessageRole
     from ctk.llm.factory import build_provider
 
@@ -747,9 +974,14 @@ def cmd_auto_tag(args):
         print(f"Found {len(conversations)} conversation(s) to tag\n")
 
         tagged_count = 0
+        batch: dict = {}
         for i, conv_summary in enumerate(conversations, 1):
-            # Load full conversation
-            tree = db.load_conversation(conv_summary.id)
+            # Load full conversations a batch at a time
+            if (i - 1) % LOAD_BATCH_SIZE == 0:
+                batch = db.load_conversations(
+                    c.id for c in conversations[i - 1 : i - 1 + LOAD_BATCH_SIZE]
+                )
+            tree = batch.get(conv_summary.id)
             if not tree:
                 continue
 
@@ -1879,6 +2111,14 @@ def build_parser():
         choices=["longest", "first", "last"],
         help="For branching conversations: which path to export (default: longest)",
     )
+    import_parser.add_argument(
+        "--stream",
+        action="store_true",
+        help=(
+            "Parse the export one conversation at a time and save each to --db"
+            " as soon as it is built (constant memory for multi-GB exports)"
+        ),
+    )
 
     # Export command
     export_parser = subparsers.add_parser("export", help="Export conversations")
@@ -1920,6 +2160,21 @@ def build_parser():
     export_parser.add_argument(
         "--include-metadata", action="store_true", help="Include metadata in export"
     )
+    export_parser.add_argument(
+        "--jobs",
+        "-j",
+        type=int,
+        default=1,
+        help="Processes rendering conversations (0 = one per CPU, default: 1)",
+    )
+    export_parser.add_argument(
+        "--full",
+        action="store_true",
+        help=(
+            "Directory exports (hugo, echo, markdown): rewrite every conversation"
+            " instead of only those changed since the last export"
+        ),
+    )
     # HTML-specific options
     export_parser.add_argument(
         "--theme",
@@ -1956,6 +2211,23 @@ def build_parser():
             " Path relative to output file (default: embed in HTML)"
         ),
     )
+    export_parser.add_argument(
+        "--sharded",
+        action="store_true",
+        help=(
+            "HTML: write summaries, conversation shards loaded on demand and a"
+            " prebuilt search index under data/ (for large archives;"
+            " requires web server)"
+        ),
+    )
+    export_parser.add_argument(
+        "--link-media",
+        action="store_true",
+        help=(
+            "HTML/Hugo: hardlink referenced media files from the database"
+            " instead of copying them (same filesystem only)"
+        ),
+    )
     # Organization filters
     export_parser.add_argument(
         "--starred", action="store_true", help="Export only starred conversations"
@@ -2099,8 +2371,9 @@ def build_parser():
     query_parser.add_argument("--limit", "-n", type=int, help="Max results")
     query_parser.add_argument(
         "--order-by",
-        choices=["created_at", "updated_at", "title"],
+        choices=["created_at", "updated_at", "title", "relevance"],
         default="updated_at",
+        help="Sort field; 'relevance' ranks text matches best-first",
     )
     query_parser.add_argument("--asc", action="store_true", help="Sort ascending")
     # Cursor pagination
@@ -2201,10 +2474,12 @@ def main():
             cmd_dedupe,
             cmd_diff,
             cmd_filter,
+            cmd_fts_rebuild,
             cmd_info,
             cmd_init,
             cmd_intersect,
             cmd_merge,
+            cmd_restore,
             cmd_split,
         )
         from ctk.cli_db import cmd_stats as cmd_db_stats
@@ -2214,7 +2489,9 @@ def main():
             "init": cmd_init,
             "info": cmd_info,
             "vacuum": cmd_vacuum,
+            "fts-rebuild": cmd_fts_rebuild,
             "backup": cmd_backup,
+            "restore": cmd_restore,
             "merge": cmd_merge,
             "diff": cmd_diff,
             "intersect": cmd_intersect,
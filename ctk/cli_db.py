@@ -7,6 +7,7 @@ Implements Unix-philosophy database manipulation tools
 import json
 import logging
 import sys
+import time
 from datetime import datetime
 from glob import glob
 from pathlib import Path
@@ -14,6 +15,7 @@ from typing import List, Optional
 
 from sqlalchemy import text
 
+from ctk.core.constants import FTS_REBUILD_BATCH_SIZE
 from ctk.core.database import ConversationDB
 from ctk.core.db_operations import (
     DatabaseOperations,
@@ -85,21 +87,81 @@ def add_db_commands(subparsers):
     )
     vacuum_parser.set_defaults(func=cmd_vacuum)
 
+    # FTS-REBUILD command
+    fts_parser = db_subparsers.add_parser(
+        "fts-rebuild", help="Build the full-text search index in batches"
+    )
+    fts_parser.add_argument(
+        "path", nargs="?", help="Database path (default: uses configured path)"
+    )
+    fts_parser.add_argument(
+        "--batch-size",
+        type=int,
+        default=FTS_REBUILD_BATCH_SIZE,
+        help=f"Rows indexed per transaction (default: {FTS_REBUILD_BATCH_SIZE})",
+    )
+    fts_parser.add_argument(
+        "--restart",
+        action="store_true",
+        help="Discard the index and rebuild from scratch instead of resuming",
+    )
+    fts_parser.set_defaults(func=cmd_fts_rebuild)
+
+    # MEDIA-GC command
+    media_gc_parser = db_subparsers.add_parser(
+        "media-gc", help="Delete media files no message references"
+    )
+    media_gc_parser.add_argument(
+        "path", nargs="?", help="Database path (default: uses configured path)"
+    )
+    media_gc_parser.add_argument(
+        "--dry-run",
+        action="store_true",
+        help="List unreferenced files without deleting them",
+    )
+    media_gc_parser.set_defaults(func=cmd_media_gc)
+
     # BACKUP command
     backup_parser = db_subparsers.add_parser(
         "backup", help="Create a backup of the database"
     )
     backup_parser.add_argument(
-        "output", nargs="?", help="Backup destination (default: timestamped file)"
+        "output",
+        nargs="?",
+        help="Backup root directory (default: backups/ in the database directory)",
     )
     backup_parser.add_argument(
         "--source", help="Source database (default: uses configured path)"
     )
     backup_parser.add_argument(
-        "--compress", action="store_true", help="Compress backup with gzip"
+        "--compress",
+        action="store_true",
+        help="Compress the database (zstd if installed, else gzip)",
+    )
+    backup_parser.add_argument(
+        "--codec",
+        choices=["gzip", "zstd"],
+        help="Compression codec (implies --compress)",
+    )
+    backup_parser.add_argument("--name", help="Snapshot name (default: timestamp)")
+    backup_parser.add_argument(
+        "--no-media", action="store_true", help="Skip the media/ directory"
     )
     backup_parser.set_defaults(func=cmd_backup)
 
+    # RESTORE command
+    restore_parser = db_subparsers.add_parser(
+        "restore", help="Restore a backup snapshot, verifying checksums"
+    )
+    restore_parser.add_argument("snapshot", help="Snapshot directory to restore")
+    restore_parser.add_argument(
+        "target", nargs="?", help="Database to restore to (default: configured path)"
+    )
+    restore_parser.add_argument(
+        "--force", action="store_true", help="Replace an existing database"
+    )
+    restore_parser.set_defaults(func=cmd_restore)
+
     # MERGE command
     merge_parser = db_subparsers.add_parser(
         "merge", help="Merge multiple databases into one"
@@ -125,6 +187,11 @@ def add_db_commands(subparsers):
     merge_parser.add_argument(
         "--progress", action="store_true", help="Show progress during merge"
     )
+    merge_parser.add_argument(
+        "--workers",
+        type=int,
+        help="Processes used to scan input databases (default: CPU count)",
+    )
     merge_parser.set_defaults(func=cmd_merge)
 
     # DIFF command
@@ -347,6 +414,7 @@ def cmd_merge(args):
             strategy=strategy,
             dedupe=dedupe,
             progress_callback=callback,
+            workers=getattr(args, "workers", None),
         )
 
         if args.progress:
@@ -357,6 +425,14 @@ def cmd_merge(args):
         print(f"  Total output conversations: {stats['total_output']}")
         print(f"  Duplicates found: {stats['duplicates_found']}")
         print(f"  Conflicts resolved: {stats['conflicts_resolved']}")
+        for db_stats in stats.get("databases", []):
+            print(
+                f"  {db_stats['path']}: {db_stats['copied']}/"
+                f"{db_stats['conversations']} copied, "
+                f"{db_stats['conversations_per_second']:.0f} conv/s "
+                f"(scan {db_stats['scan_seconds']:.2f}s, "
+                f"copy {db_stats['copy_seconds']:.2f}s)"
+            )
         print(f"  Output saved to: {args.output}")
 
         return 0
@@ -749,6 +825,9 @@ def cmd_info(args):
                 # Get freelist count (unused pages)
                 freelist = session.execute(text("PRAGMA freelist_count")).fetchone()[0]
 
+            # Active tuning profile and the PRAGMAs it produced
+            connection = db.get_connection_settings()
+
         if args.json:
             info = {
                 "path": str(db_file),
@@ -758,6 +837,8 @@ def cmd_info(args):
                 "page_size": page_size,
                 "page_count": page_count,
                 "freelist_pages": freelist,
+                "profile": connection["profile"],
+                "pragmas": connection["pragmas"],
                 "tables": [t[0] for t in table_info],
                 **stats,
             }
@@ -788,6 +869,11 @@ def cmd_info(args):
         console.print(f"  Free pages: {freelist} ({format_size(page_size * freelist)})")
         console.print()
 
+        console.print(f"[bold]Connection Profile:[/bold] {connection['profile']}")
+        for name, value in connection["pragmas"].items():
+            console.print(f"  {name}: {value}")
+        console.print()
+
         console.print("[bold]Tables:[/bold]")
         for table in table_info:
             console.print(f"  • {table[0]}")
@@ -827,6 +913,10 @@ def cmd_vacuum(args):
                     console.print("Running ANALYZE...")
                     session.execute(text("ANALYZE"))
 
+            # VACUUM may renumber the rowids the search index points at
+            console.print("Rebuilding search index...")
+            db.rebuild_search_index(restart=True)
+
         size_after = get_db_size(str(db_file))
         saved = size_before - size_after
 
@@ -849,13 +939,92 @@ def cmd_vacuum(args):
         return 1
 
 
-def cmd_backup(args):
-    """Create database backup"""
-    import gzip
-    import shutil
+def cmd_fts_rebuild(args):
+    """Build (or resume building) the full-text search index"""
+    from rich.console import Console
+
+    console = Console()
+
+    db_dir, db_file = resolve_db_path(args.path)
+
+    if not db_file.exists():
+        console.print(f"[red]Database not found:[/red] {db_file}")
+        return 1
+
+    def progress(table: str, done: int, total: int) -> None:
+        sys.stderr.write(f"\r{table}: {done}/{total} rows")
+        sys.stderr.flush()
+
+    try:
+        with ConversationDB(str(db_dir)) as db:
+            start = time.perf_counter()
+            indexed = db.rebuild_search_index(
+                batch_size=args.batch_size, restart=args.restart, progress=progress
+            )
+            elapsed = time.perf_counter() - start
+    except Exception as e:
+        console.print(f"[red]Error rebuilding search index:[/red] {e}")
+        logger.exception("FTS rebuild failed")
+        return 1
+
+    if any(indexed.values()):
+        sys.stderr.write("\n")
+    console.print("\n[green]✓ Search index complete[/green]")
+    for table, rows in indexed.items():
+        console.print(f"  {table}: {rows} rows indexed")
+    console.print(f"  Time: {elapsed:.1f}s")
+    return 0
+
 
+def cmd_media_gc(args):
+    """Delete media files that no stored message references"""
     from rich.console import Console
 
+    from ctk.core.media_store import MediaStore
+
+    console = Console()
+
+    db_dir, db_file = resolve_db_path(args.path)
+
+    if not db_file.exists():
+        console.print(f"[red]Database not found:[/red] {db_file}")
+        return 1
+
+    try:
+        with ConversationDB(str(db_dir)) as db:
+            referenced = db.get_referenced_media()
+        victims = MediaStore(db_dir / "media").unreferenced(referenced)
+        freed = sum(path.stat().st_size for path in victims)
+        if not args.dry_run:
+            for path in victims:
+                path.unlink(missing_ok=True)
+    except Exception as e:
+        console.print(f"[red]Error collecting media:[/red] {e}")
+        logger.exception("Media GC failed")
+        return 1
+
+    if args.dry_run:
+        for path in victims:
+            console.print(f"  {path.name}")
+        console.print(
+            f"\n{len(victims)} unreferenced file(s) would be deleted "
+            f"({len(referenced)} referenced)"
+        )
+        console.print(f"  Reclaimable: {format_size(freed)}")
+        return 0
+
+    console.print("\n[green]✓ Media garbage collected[/green]")
+    console.print(f"  Deleted: {len(victims)} file(s), {format_size(freed)}")
+    console.print(f"  Kept:    {len(referenced)} referenced file(s)")
+    return 0
+
+
+def cmd_backup(args):
+    """Create an online database backup"""
+    from rich.console import Console
+
+    from ctk.core.backup import BackupError, create_backup
+
     console = Console()
 
     # Get source database path
@@ -865,52 +1034,73 @@ def cmd_backup(args):
         console.print(f"[red]Source database not found:[/red] {source_file}")
         return 1
 
-    # Determine output path
-    if args.output:
-        output_path = Path(args.output).expanduser()
-        # If output looks like a directory, append filename
-        if not output_path.suffix:
-            output_path = output_path / source_file.name
-        if args.compress and not output_path.suffix.endswith(".gz"):
-            output_path = Path(str(output_path) + ".gz")
-        output_file = output_path
-    else:
-        # Generate timestamped backup name
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        backup_name = f"{source_file.stem}_backup_{timestamp}{source_file.suffix}"
-        if args.compress:
-            backup_name += ".gz"
-        output_file = source_file.parent / backup_name
-
-    # Ensure output directory exists
-    output_file.parent.mkdir(parents=True, exist_ok=True)
+    root = Path(args.output).expanduser() if args.output else source_dir / "backups"
+    if root.is_file():
+        console.print(f"[red]Backup destination is a file:[/red] {root}")
+        return 1
 
     try:
         console.print(f"Backing up {source_file}...")
-
-        if args.compress:
-            # Compressed backup
-            with open(source_file, "rb") as f_in:
-                with gzip.open(output_file, "wb") as f_out:
-                    shutil.copyfileobj(f_in, f_out)
-        else:
-            # Simple copy
-            shutil.copy2(source_file, output_file)
+        result = create_backup(
+            source_file,
+            root,
+            compression=args.codec or ("auto" if args.compress else "none"),
+            name=args.name,
+            include_media=not args.no_media,
+        )
 
         source_size = get_db_size(str(source_file))
-        output_size = get_db_size(str(output_file))
 
         console.print("\n[green]✓ Backup created[/green]")
         console.print(f"  Source: {source_file} ({format_size(source_size)})")
-        console.print(f"  Backup: {output_file} ({format_size(output_size)})")
+        console.print(
+            f"  Backup: {result.snapshot} ({format_size(result.stored_size)})"
+        )
 
-        if args.compress and output_size < source_size:
-            ratio = 100 * (1 - output_size / source_size)
+        if result.stored_size < result.database_size:
+            ratio = 100 * (1 - result.stored_size / result.database_size)
             console.print(f"  Compression: {ratio:.1f}% reduction")
+        if result.media_files:
+            console.print(
+                f"  Media: {result.media_files} files, {result.media_copied} new "
+                f"({format_size(result.media_bytes_copied)})"
+            )
 
         return 0
 
+    except BackupError as e:
+        console.print(f"[red]Error creating backup:[/red] {e}")
+        return 1
     except Exception as e:
         console.print(f"[red]Error creating backup:[/red] {e}")
         logger.exception("Backup failed")
         return 1
+
+
+def cmd_restore(args):
+    """Restore a backup snapshot"""
+    from rich.console import Console
+
+    from ctk.core.backup import restore_backup
+
+    console = Console()
+
+    _, target_file = resolve_db_path(args.target)
+
+    try:
+        console.print(f"Restoring {args.snapshot}...")
+        result = restore_backup(
+            Path(args.snapshot).expanduser(), target_file, force=args.force
+        )
+    except Exception as e:
+        console.print(f"[red]Error restoring backup:[/red] {e}")
+        logger.exception("Restore failed")
+        return 1
+
+    console.print("\n[green]✓ Backup restored and verified[/green]")
+    console.print(
+        f"  Database: {result.database} ({format_size(result.database_size)})"
+    )
+    if result.media_files:
+        console.print(f"  Media: {result.media_files} files")
+    return 0
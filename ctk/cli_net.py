@@ -15,6 +15,9 @@ Run them once after import, again whenever the corpus changes.
 
 import logging
 
+from ctk.core.constants import (ANN_MIN_VECTORS, EMBED_BATCH_ITEMS,
+                                EMBED_BATCH_TOKENS, EMBED_CHECKPOINT_FILE,
+                                EMBED_CONCURRENCY, SIMILARITY_BLOCK_SIZE)
 from ctk.core.database import ConversationDB
 
 logger = logging.getLogger(__name__)
@@ -41,7 +44,13 @@ def add_net_commands(subparsers):
     embeddings_parser.add_argument(
         "--force",
         action="store_true",
-        help="Re-embed all conversations, ignoring cache",
+        help="Re-embed all conversations, even unchanged ones",
+    )
+    embeddings_parser.add_argument(
+        "--no-chunk-cache",
+        action="store_true",
+        help="Send every message to the provider instead of reusing cached "
+        "message embeddings",
     )
     embeddings_parser.add_argument(
         "--limit", type=int, help="Limit number of conversations to embed"
@@ -63,6 +72,30 @@ def add_net_commands(subparsers):
         "--source", help="Filter by source (e.g., openai, anthropic)"
     )
     embeddings_parser.add_argument("--model", help="Filter by model name")
+    embeddings_parser.add_argument(
+        "--concurrency",
+        type=int,
+        default=EMBED_CONCURRENCY,
+        help=f"Embedding requests kept in flight (default: {EMBED_CONCURRENCY})",
+    )
+    embeddings_parser.add_argument(
+        "--batch-tokens",
+        type=int,
+        default=EMBED_BATCH_TOKENS,
+        help="Estimated tokens packed into one request "
+        f"(default: {EMBED_BATCH_TOKENS})",
+    )
+    embeddings_parser.add_argument(
+        "--batch-items",
+        type=int,
+        default=EMBED_BATCH_ITEMS,
+        help=f"Max message chunks per request (default: {EMBED_BATCH_ITEMS})",
+    )
+    embeddings_parser.add_argument(
+        "--no-resume",
+        action="store_true",
+        help="Ignore the checkpoint left by an interrupted run",
+    )
 
     links_parser = net_subparsers.add_parser(
         "links", help="Build a similarity graph from existing embeddings"
@@ -81,12 +114,27 @@ def add_net_commands(subparsers):
     links_parser.add_argument(
         "--rebuild", action="store_true", help="Force rebuild even if a graph exists"
     )
+    links_parser.add_argument(
+        "--exact",
+        action="store_true",
+        help="Always compare every pair, even for large collections "
+        f"(by default an ANN index is used from {ANN_MIN_VECTORS:,} conversations)",
+    )
+    links_parser.add_argument(
+        "--block-size",
+        type=int,
+        default=SIMILARITY_BLOCK_SIZE,
+        help="Rows scored per matrix product; lower it to cap memory "
+        f"(default: {SIMILARITY_BLOCK_SIZE})",
+    )
 
 
 def cmd_embeddings(args):
     """Generate embeddings for conversations and persist them."""
     from rich.console import Console
 
+    from ctk.core.embedding_pipeline import (EmbeddingCheckpoint,
+                                             EmbeddingPipeline)
     from ctk.core.similarity import (AggregationStrategy, ChunkingStrategy,
                                      ConversationEmbedder,
                                      ConversationEmbeddingConfig)
@@ -116,11 +164,7 @@ def cmd_embeddings(args):
         if args.tags:
             tag_list = [t.strip() for t in args.tags.split(",")]
             conversations = [
-                c
-                for c in conversations
-                if c.metadata
-                and c.metadata.tags
-                and any(tag in c.metadata.tags for tag in tag_list)
+                c for c in conversations if any(tag in c.tags for tag in tag_list)
             ]
 
         console.print(f"Generating embeddings using {args.provider}...")
@@ -130,6 +174,13 @@ def cmd_embeddings(args):
             console.print("[yellow]No conversations to embed[/yellow]")
             return 0
 
+        for name in ("concurrency", "batch_tokens", "batch_items"):
+            if getattr(args, name, 1) < 1:
+                console.print(
+                    f"[red]Error: --{name.replace('_', '-')} must be at least 1[/red]"
+                )
+                return 1
+
         config = ConversationEmbeddingConfig(
             provider=args.provider,
             chunking=ChunkingStrategy.MESSAGE,
@@ -151,34 +202,71 @@ def cmd_embeddings(args):
                 f"{embedder.provider.vectorizer.max_features} features"
             )
 
-        console.print("Embedding conversations...")
-        embedded_count = 0
         model_name = config.model or config.provider
 
-        for conv in conversations:
-            if not args.force:
-                cached = db.get_embedding(
-                    conv.id, provider=config.provider, model=model_name
-                )
-                if cached is not None:
-                    continue
-
-            try:
-                emb = embedder.embed_conversation(conv)
-                db.save_embedding(
-                    conversation_id=conv.id,
-                    embedding=emb,
-                    provider=config.provider,
-                    model=model_name,
-                    chunking_strategy=config.chunking.value,
-                    aggregation_strategy=config.aggregation.value,
-                    aggregation_weights=config.role_weights,
+        # A checkpoint lets an interrupted run (even with --force) resume
+        checkpoint = None
+        if db.db_dir is not None:
+            checkpoint = EmbeddingCheckpoint(
+                db.db_dir / EMBED_CHECKPOINT_FILE, config.to_hash()
+            )
+        skip = set()
+        if checkpoint is not None and not getattr(args, "no_resume", False):
+            skip = checkpoint.load()
+            if skip:
+                console.print(
+                    f"Resuming: {len(skip)} conversations done by an earlier run"
                 )
-                embedded_count += 1
-            except Exception as e:
-                console.print(f"[red]Error embedding {conv.id[:8]}: {e}[/red]")
+        # Unchanged conversations are skipped by content hash; embeddings
+        # saved before hashes were recorded count as up to date
+        stored_hashes = {}
+        if not args.force:
+            stored_hashes = db.get_embedding_content_hashes(
+                model=model_name,
+                provider=config.provider,
+                chunking_strategy=config.chunking.value,
+                aggregation_strategy=config.aggregation.value,
+            )
+            skip |= {cid for cid, digest in stored_hashes.items() if digest is None}
+
+        pipeline = EmbeddingPipeline(
+            embedder,
+            db,
+            batch_tokens=getattr(args, "batch_tokens", EMBED_BATCH_TOKENS),
+            batch_items=getattr(args, "batch_items", EMBED_BATCH_ITEMS),
+            concurrency=getattr(args, "concurrency", EMBED_CONCURRENCY),
+            checkpoint=checkpoint,
+            use_chunk_cache=not getattr(args, "no_chunk_cache", False),
+        )
+
+        console.print("Embedding conversations...")
+        todo = [c.id for c in conversations if c.id not in skip]
+        stats = pipeline.run(
+            (db.load_conversation(cid) for cid in todo),
+            progress=_progress_printer(console, len(todo)),
+            stored_hashes=stored_hashes,
+        )
+        embedded_count = stats.embedded
+
+        for conv_id, error in list(stats.failed.items())[:10]:
+            console.print(f"[red]Error embedding {conv_id[:8]}: {error}[/red]")
+        if stats.failed:
+            console.print(
+                f"[yellow]{len(stats.failed)} conversations failed; "
+                "run again to retry them[/yellow]"
+            )
+        elif checkpoint is not None:
+            checkpoint.clear()
 
-        console.print(f"[green]✓[/green] Embedded {embedded_count} conversations")
+        console.print(
+            f"[green]✓[/green] Embedded {embedded_count} conversations "
+            f"({stats.requests} requests, {stats.conversations_per_sec:.1f} conv/s)"
+        )
+        if stats.unchanged or stats.cached_chunks:
+            console.print(
+                f"  {stats.unchanged} unchanged conversations skipped, "
+                f"{stats.cached_chunks} messages reused from cache"
+            )
 
         filters_dict = {
             k: v
@@ -210,6 +298,20 @@ def cmd_embeddings(args):
     return 0
 
 
+def _progress_printer(console, total: int):
+    """Progress callback for EmbeddingPipeline.run printing every ~10%."""
+    state = {"done": 0, "shown": 0}
+    step = max(1, total // 10)
+
+    def report(count: int) -> None:
+        state["done"] += count
+        if state["done"] - state["shown"] >= step or state["done"] >= total:
+            state["shown"] = state["done"]
+            console.print(f"  {state['done']}/{total} embedded")
+
+    return report
+
+
 def cmd_links(args):
     """Build a similarity graph from existing embeddings."""
     from rich.console import Console
@@ -222,6 +324,11 @@ def cmd_links(args):
 
     console = Console()
 
+    block_size = getattr(args, "block_size", SIMILARITY_BLOCK_SIZE)
+    if block_size < 1:
+        console.print("[red]Error: --block-size must be at least 1[/red]")
+        return 1
+
     with ConversationDB(args.db) as db:
         existing_graph = db.get_current_graph()
         if existing_graph and not args.rebuild:
@@ -296,18 +403,31 @@ def cmd_links(args):
         graph_builder = ConversationGraphBuilder(sim_computer)
 
         conversation_ids = [c.id for c in conversations]
+        index = None
+        if len(conversation_ids) >= ANN_MIN_VECTORS and not getattr(
+            args, "exact", False
+        ):
+            index = db.get_ann_index(session["id"])
+            if index is not None:
+                console.print(f"Using approximate {index.backend} index")
+
         graph = graph_builder.build_graph(
             conversations=conversation_ids,
             threshold=args.threshold,
             max_links_per_node=args.max_links,
             use_cache=True,
             show_progress=True,
+            block_size=block_size,
+            index=index,
         )
 
         console.print(
             f"[green]✓[/green] Built graph with {len(graph.nodes)} nodes "
             f"and {len(graph.links)} edges"
         )
+        pairs_per_sec = graph.metadata.get("pairs_per_sec")
+        if pairs_per_sec:
+            console.print(f"  Throughput: {pairs_per_sec:,.0f} pairs/sec")
 
         import json
         import os
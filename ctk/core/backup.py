@@ -0,0 +1,371 @@
+"""
+Online, verifiable backups of a CTK database directory.
+
+A backup root holds any number of snapshots plus a content-addressed store
+of media files shared between them::
+
+    <root>/objects/ab/ab12...          media blobs, named by SHA-256
+    <root>/<snapshot>/manifest.json    checksums and media index
+    <root>/<snapshot>/conversations.db[.gz|.zst]
+
+The database is copied with SQLite's online backup API a few pages at a
+time, so the live database only holds a read lock per step and other
+readers and writers keep going. The copy is then streamed through the
+compressor while its checksum is taken. Media files already in the store
+are not copied again, and unchanged files (same size and mtime as in the
+previous snapshot) are not even re-hashed.
+"""
+
+import gzip
+import hashlib
+import json
+import logging
+import os
+import shutil
+import sqlite3
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import IO, Any, Callable, Dict, Optional, Tuple, Union
+
+from .constants import BACKUP_PAGES_PER_STEP
+
+logger = logging.getLogger(__name__)
+
+MANIFEST_NAME = "manifest.json"
+MANIFEST_FORMAT = 1
+DB_FILE_NAME = "conversations.db"
+
+_COPY_CHUNK = 1 << 20
+_SUFFIXES = {"none": "", "gzip": ".gz", "zstd": ".zst"}
+
+# Plain files, gzip streams and (untyped) zstandard streams
+_Stream = Union[IO[bytes], gzip.GzipFile]
+
+
+class BackupError(RuntimeError):
+    """Raised when a backup cannot be written or fails verification."""
+
+
+@dataclass
+class BackupResult:
+    """Outcome of :func:`create_backup`"""
+
+    snapshot: Path
+    database_size: int
+    stored_size: int
+    media_files: int
+    media_copied: int
+    media_bytes_copied: int
+
+
+@dataclass
+class RestoreResult:
+    """Outcome of :func:`restore_backup`"""
+
+    database: Path
+    database_size: int
+    media_files: int
+
+
+def zstd_available() -> bool:
+    try:
+        import zstandard  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def resolve_compression(compression: str) -> str:
+    """Map 'auto' to zstd when the ``zstandard`` package is installed, else gzip"""
+    if compression == "auto":
+        return "zstd" if zstd_available() else "gzip"
+    if compression not in _SUFFIXES:
+        raise ValueError(f"Unknown compression: {compression}")
+    if compression == "zstd" and not zstd_available():
+        raise BackupError("zstd compression requires the 'zstandard' package")
+    return compression
+
+
+def _open_writer(path: Path, compression: str) -> _Stream:
+    if compression == "gzip":
+        return gzip.open(path, "wb", compresslevel=6)
+    if compression == "zstd":
+        import zstandard
+
+        return zstandard.ZstdCompressor().stream_writer(open(path, "wb"))
+    return open(path, "wb")
+
+
+def _open_reader(path: Path, compression: str) -> _Stream:
+    if compression == "gzip":
+        return gzip.open(path, "rb")
+    if compression == "zstd":
+        try:
+            import zstandard
+        except ImportError:
+            raise BackupError("zstd backups require the 'zstandard' package")
+        return zstandard.ZstdDecompressor().stream_reader(open(path, "rb"))
+    return open(path, "rb")
+
+
+def _copy_hashed(src: _Stream, dst: _Stream) -> Tuple[str, int]:
+    """Copy a stream, returning (sha256 hex digest, bytes copied)"""
+    hasher = hashlib.sha256()
+    size = 0
+    while True:
+        chunk = src.read(_COPY_CHUNK)
+        if not chunk:
+            break
+        hasher.update(chunk)
+        dst.write(chunk)
+        size += len(chunk)
+    return hasher.hexdigest(), size
+
+
+def _file_sha256(path: Path) -> str:
+    hasher = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(_COPY_CHUNK), b""):
+            hasher.update(chunk)
+    return hasher.hexdigest()
+
+
+def _object_path(root: Path, digest: str) -> Path:
+    return root / "objects" / digest[:2] / digest
+
+
+def _latest_manifest(root: Path) -> Optional[Dict[str, Any]]:
+    manifests = sorted(root.glob(f"*/{MANIFEST_NAME}"), key=lambda p: p.stat().st_mtime)
+    for path in reversed(manifests):
+        try:
+            return json.loads(path.read_text())
+        except (OSError, ValueError):
+            continue
+    return None
+
+
+def _online_copy(
+    source: Path,
+    dest: Path,
+    pages: int,
+    progress: Optional[Callable[[int, int], None]],
+) -> None:
+    """Snapshot ``source`` into ``dest`` with the online backup API"""
+
+    def report(status: int, remaining: int, total: int) -> None:
+        if progress:
+            progress(total - remaining, total)
+
+    src = sqlite3.connect(str(source))
+    dst = sqlite3.connect(str(dest))
+    try:
+        if src.execute("PRAGMA journal_mode").fetchone()[0].lower() == "wal":
+            # Pin one read snapshot for the whole copy. In WAL mode this does
+            # not block writers, and steps never restart because of them.
+            src.execute("BEGIN")
+            src.execute("SELECT COUNT(*) FROM sqlite_master").fetchone()
+        # Otherwise each step holds the read lock only while copying its
+        # pages; a write in between restarts the copy
+        src.backup(dst, pages=pages, progress=report)
+        if src.in_transaction:
+            src.rollback()
+        # Backups are read back as a single file, never with a WAL beside it
+        dst.execute("PRAGMA journal_mode=DELETE")
+    finally:
+        dst.close()
+        src.close()
+
+
+def _backup_media(
+    media_dir: Path, root: Path, previous: Dict[str, Any], result: BackupResult
+) -> Dict[str, Dict[str, Any]]:
+    entries: Dict[str, Dict[str, Any]] = {}
+    if not media_dir.is_dir():
+        return entries
+    for path in sorted(p for p in media_dir.rglob("*") if p.is_file()):
+        rel = path.relative_to(media_dir).as_posix()
+        stat = path.stat()
+        known = previous.get(rel)
+        if (
+            known
+            and known.get("size") == stat.st_size
+            and known.get("mtime_ns") == stat.st_mtime_ns
+        ):
+            digest = known["sha256"]
+        else:
+            digest = _file_sha256(path)
+
+        target = _object_path(root, digest)
+        if not target.exists():
+            target.parent.mkdir(parents=True, exist_ok=True)
+            partial = target.with_suffix(".partial")
+            shutil.copyfile(path, partial)
+            os.replace(partial, target)
+            result.media_copied += 1
+            result.media_bytes_copied += stat.st_size
+
+        entries[rel] = {
+            "sha256": digest,
+            "size": stat.st_size,
+            "mtime_ns": stat.st_mtime_ns,
+        }
+    result.media_files = len(entries)
+    return entries
+
+
+def create_backup(
+    db_file: Path,
+    root: Path,
+    compression: str = "auto",
+    name: Optional[str] = None,
+    include_media: bool = True,
+    pages_per_step: int = BACKUP_PAGES_PER_STEP,
+    progress: Optional[Callable[[int, int], None]] = None,
+) -> BackupResult:
+    """
+    Write a consistent snapshot of a database into the backup ``root``.
+
+    Args:
+        db_file: SQLite database file; media/ beside it is backed up too
+        root: Backup root; created if missing, shared between snapshots
+        compression: 'auto', 'gzip', 'zstd' or 'none'
+        name: Snapshot directory name (default: timestamp)
+        include_media: Also back up the media/ directory
+        pages_per_step: Database pages copied per backup step
+        progress: Called with (pages copied, total pages) after each step
+
+    Returns:
+        BackupResult describing the snapshot
+    """
+    source = Path(db_file)
+    root = Path(root)
+    if not source.exists():
+        raise BackupError(f"Database not found: {source}")
+
+    compression = resolve_compression(compression)
+    name = name or datetime.now().strftime("%Y%m%d_%H%M%S")
+    snapshot = root / name
+    if snapshot.exists():
+        raise BackupError(f"Snapshot already exists: {snapshot}")
+    previous = _latest_manifest(root) if root.exists() else None
+    snapshot.mkdir(parents=True)
+
+    stored = snapshot / (DB_FILE_NAME + _SUFFIXES[compression])
+    scratch = snapshot / (DB_FILE_NAME + ".partial")
+    try:
+        _online_copy(source, scratch, pages_per_step, progress)
+        with open(scratch, "rb") as f_in, _open_writer(stored, compression) as f_out:
+            digest, size = _copy_hashed(f_in, f_out)
+    except Exception:
+        shutil.rmtree(snapshot, ignore_errors=True)
+        raise
+    finally:
+        scratch.unlink(missing_ok=True)
+
+    result = BackupResult(
+        snapshot=snapshot,
+        database_size=size,
+        stored_size=stored.stat().st_size,
+        media_files=0,
+        media_copied=0,
+        media_bytes_copied=0,
+    )
+    media: Dict[str, Dict[str, Any]] = {}
+    if include_media:
+        known = (previous or {}).get("media", {})
+        media = _backup_media(source.parent / "media", root, known, result)
+
+    manifest = {
+        "format": MANIFEST_FORMAT,
+        "created_at": datetime.now().isoformat(),
+        "source": str(source),
+        "database": {
+            "file": stored.name,
+            "compression": compression,
+            "sha256": digest,
+            "size": size,
+        },
+        "media": media,
+    }
+    # Written last: a snapshot without a manifest is incomplete
+    (snapshot / MANIFEST_NAME).write_text(json.dumps(manifest, indent=2))
+    logger.info(f"Backup written to {snapshot}")
+    return result
+
+
+def restore_backup(snapshot: Path, db_file: Path, force: bool = False) -> RestoreResult:
+    """
+    Restore a snapshot to ``db_file``, verifying every checksum.
+
+    Nothing is replaced until the database has been decompressed, matched
+    against its checksum and passed ``PRAGMA quick_check``. Media files go
+    to media/ beside ``db_file``.
+
+    Args:
+        snapshot: Snapshot directory (contains manifest.json)
+        db_file: SQLite database file to restore to
+        force: Replace an existing database
+
+    Returns:
+        RestoreResult describing what was restored
+    """
+    snapshot = Path(snapshot)
+    manifest_path = snapshot / MANIFEST_NAME
+    if not manifest_path.exists():
+        raise BackupError(f"Not a complete backup (no {MANIFEST_NAME}): {snapshot}")
+    manifest = json.loads(manifest_path.read_text())
+    if manifest.get("format") != MANIFEST_FORMAT:
+        raise BackupError(f"Unsupported backup format: {manifest.get('format')}")
+
+    target = Path(db_file)
+    if target.exists() and not force:
+        raise BackupError(f"Database already exists: {target} (use force to replace)")
+    target.parent.mkdir(parents=True, exist_ok=True)
+
+    info = manifest["database"]
+    scratch = target.with_name(target.name + ".restoring")
+    try:
+        with _open_reader(snapshot / info["file"], info["compression"]) as f_in:
+            with open(scratch, "wb") as f_out:
+                digest, size = _copy_hashed(f_in, f_out)
+        if digest != info["sha256"] or size != info["size"]:
+            raise BackupError(f"Checksum mismatch for {snapshot / info['file']}")
+        conn = sqlite3.connect(str(scratch))
+        try:
+            status = conn.execute("PRAGMA quick_check").fetchone()[0]
+        finally:
+            conn.close()
+        if status != "ok":
+            raise BackupError(f"Restored database failed integrity check: {status}")
+
+        root = snapshot.parent
+        media_dir = target.parent / "media"
+        for rel, entry in manifest.get("media", {}).items():
+            obj = _object_path(root, entry["sha256"])
+            if not obj.exists():
+                raise BackupError(f"Missing media object for {rel}: {obj}")
+            dest = media_dir / rel
+            dest.parent.mkdir(parents=True, exist_ok=True)
+            partial = dest.with_name(dest.name + ".restoring")
+            with open(obj, "rb") as f_in, open(partial, "wb") as f_out:
+                digest, _ = _copy_hashed(f_in, f_out)
+            if digest != entry["sha256"]:
+                partial.unlink()
+                raise BackupError(f"Checksum mismatch for media object {obj}")
+            os.replace(partial, dest)
+
+        # A leftover WAL from the old database would be replayed over the
+        # restored file
+        for suffix in ("-wal", "-shm"):
+            Path(str(target) + suffix).unlink(missing_ok=True)
+        os.replace(scratch, target)
+    finally:
+        scratch.unlink(missing_ok=True)
+
+    logger.info(f"Restored {snapshot} to {target}")
+    return RestoreResult(
+        database=target,
+        database_size=size,
+        media_files=len(manifest.get("media", {})),
+    )
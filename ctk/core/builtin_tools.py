@@ -846,6 +846,7 @@ def _do_search_conversations(ctx: ToolContext) -> ToolResult:
         results = ctx.db.search_conversations(
             query_text=query_text,
             limit=limit_val,
+            order_by="relevance",
             source=source,
             project=project,
             model=model,
@@ -885,6 +886,8 @@ def _do_search_conversations(ctx: ToolContext) -> ToolResult:
         conv_dict = conv.to_dict()
         title = conv_dict.get("title", "Untitled")[:50]
         result_str += f"[{i}] {conv_dict['id'][:8]} - {title}\n"
+        if conv_dict.get("snippet"):
+            result_str += f"    {conv_dict['snippet']}\n"
 
     if len(results_list) > 10:
         result_str += f"\n... and {len(results_list) - 10} more (showing first 10)\n"
@@ -1545,7 +1548,8 @@ USE THIS TOOL WHEN: user says "export to markdown", "save as json", "export conv
             " pinned_at, archived_at, created_at, updated_at, message_count),"
             " messages (id, conversation_id, role, content, parent_id,"
             " created_at), tags (conversation_id, tag)."
-            " Full-text search available via messages_fts table."
+            " Full-text search available via messages_fts (conversation_id,"
+            " content, reasoning, tools); use MATCH and ORDER BY rank."
         ),
         input_schema={
             "type": "object",
@@ -42,8 +42,10 @@ class Config:
             },
         },
         # Database "path" is a directory; ConversationDB stores
-        # ``conversations.db`` (and ``media/``) inside it.
-        "database": {"default_path": "~/.ctk"},
+        # ``conversations.db`` (and ``media/``) inside it. ``profile``
+        # names a SQLite tuning profile (ctk.core.sqlite_profile);
+        # ``pragmas`` overrides its individual settings.
+        "database": {"default_path": "~/.ctk", "profile": "performance"},
         "tagging": {
             "auto_tag": True,
             "default_provider": "openai",
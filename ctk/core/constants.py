@@ -20,9 +20,39 @@ DEFAULT_SEARCH_LIMIT = 1000  # FTS5 search result limit
 DEFAULT_TIMELINE_LIMIT = 30  # Timeline query default limit
 SEARCH_BUFFER = 100  # Extra records fetched for post-filtering
 TITLE_MATCH_BOOST = 10  # Boost factor for title matches in search
+SEARCH_SNIPPET_TOKENS = 12  # Tokens per FTS excerpt shown with search results
+SEARCH_HIGHLIGHT_MARK = "**"  # Wraps matched terms in search excerpts
+FTS_REBUILD_BATCH_SIZE = 5000  # Rows indexed per transaction by the FTS rebuild
+FTS_WEIGHT_TEXT = 1.0  # BM25 weight of message text
+FTS_WEIGHT_REASONING = 0.5  # BM25 weight of reasoning blocks
+FTS_WEIGHT_TOOLS = 0.3  # BM25 weight of tool names, arguments and results
 AMBIGUITY_CHECK_LIMIT = 2  # Max matches to check for ambiguous IDs
+CONVERSATION_INDEX_FILE = "conversations.idx"  # Resolution snapshot in ANN_INDEX_DIR
+CONVERSATION_INDEX_JOURNAL_MAX = 1000  # Journal records replayed before a rewrite
 VFS_LIST_LIMIT = 1000  # Default limit for VFS directory listings
 SEARCH_CONVERSATIONS_LIMIT = 500  # Default limit for search command conversations
+SAVE_BATCH_SIZE = 500  # Conversations written per transaction by save_conversations
+SQL_IN_CHUNK_SIZE = 500  # Max bound parameters per IN (...) clause
+LOAD_BATCH_SIZE = 200  # Full conversations fetched per load_conversations call
+MESSAGE_PAGE_SIZE = 50  # Message bodies fetched per page from a lazily loaded tree
+LAZY_LOAD_MIN_MESSAGES = 500  # Conversations this long open lazily in the TUI
+EMBEDDING_STORAGE_DTYPE = "float32"  # float32 | float16 | int8 embedding BLOBs
+SIMILARITY_BLOCK_SIZE = 512  # Rows scored per matrix product when building graphs
+ANN_INDEX_DIR = ".ctk_indexes"  # ANN index directory inside the database directory
+ANN_MIN_VECTORS = 20000  # Below this many embeddings exact search is used instead
+EMBED_BATCH_TOKENS = 8192  # Estimated tokens per embedding request
+EMBED_BATCH_ITEMS = 256  # Max chunks per embedding request
+EMBED_CONCURRENCY = 4  # Embedding requests kept in flight
+EMBED_CHECKPOINT_FILE = ".ctk_embeddings.checkpoint"  # Resume file in the db directory
+BACKUP_PAGES_PER_STEP = 1024  # Pages copied per online-backup step (lock hold time)
+MINHASH_NUM_PERM = 128  # MinHash signature length for near-duplicate detection
+EXPORT_PREFETCH_PER_JOB = 4  # Conversations in flight per `ctk export --jobs` worker
+EXPORT_MANIFEST_FILE = ".ctk-export-manifest.json"  # Incremental export state
+HTML_SHARD_SIZE = 200  # Conversations per lazily loaded HTML archive shard
+HTML_INDEX_BUCKETS = 64  # Search index files in a sharded HTML archive
+HTML_INDEX_MAX_TERM = 40  # Longer tokens (hashes, base64) are not indexed
+MEDIA_HASH_CHUNK_SIZE = 1 << 20  # Bytes read per step when hashing media files
+MEDIA_GC_GRACE_SECONDS = 3600  # media-gc spares newer unreferenced files (imports)
 
 # --- Input Validation Limits ---
 
@@ -36,6 +66,7 @@ MAX_RESULT_LIMIT = 10000  # Maximum results per query
 
 TITLE_TRUNCATE_WIDTH = 60  # Truncation width for titles in tables
 TITLE_TRUNCATE_WIDTH_SHORT = 50  # Shorter truncation width
+TUI_MESSAGE_WINDOW = 60  # Most messages mounted at once in the TUI message view
 
 # --- Estimation ---
 
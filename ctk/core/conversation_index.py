@@ -1,24 +1,87 @@
 """
-In-memory conversation index for O(1) slug and prefix resolution.
+Conversation index for fast slug and prefix resolution.
 
 This module provides fast lookups for conversation slugs and ID prefixes,
 avoiding the need to load all conversations from the database for each
 resolution. The index is loaded lazily on first access and can be
 incrementally updated.
 
-Memory footprint for 100k conversations: ~15-20MB
-Load time: ~0.5-2 seconds (background preload recommended)
-Lookup time: O(1) for exact matches, O(k) for prefix matches where k = matches
+When given a snapshot path, the index is persisted next to the database
+as a compact, memory-mapped file of sorted ID and slug tables searched
+with binary search, plus an append-only journal of later changes. The
+snapshot is validated against a change counter kept in the database
+(``index_generation``), so a process can resolve identifiers in
+O(log n) without reading the conversations table at all.
+
+Memory footprint for 100k conversations: ~15-20MB in memory, ~8MB mapped
+Load time: ~0.5-2 seconds from the database, ~1ms from a snapshot
+Lookup time: O(1) for exact matches in memory, O(log n) against a snapshot
 """
 
+import json
 import logging
+import mmap
+import os
+import struct
 import threading
 from dataclasses import dataclass
+from pathlib import Path
 from time import time
-from typing import Dict, List, Optional, Set, Tuple
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+from sqlalchemy import text
+from sqlalchemy.exc import SQLAlchemyError
+
+from ctk.core.constants import AMBIGUITY_CHECK_LIMIT, CONVERSATION_INDEX_JOURNAL_MAX
 
 logger = logging.getLogger(__name__)
 
+# Change counter of the conversations table, bumped by triggers
+GENERATION_TABLE = "index_generation"
+
+
+def install_generation_counter(conn) -> None:
+    """Create the conversations change counter and the triggers bumping it"""
+    conn.execute(
+        text(
+            f"CREATE TABLE IF NOT EXISTS {GENERATION_TABLE} ("
+            "name TEXT PRIMARY KEY, value INTEGER NOT NULL)"
+        )
+    )
+    # Start at a random value so a snapshot never validates against another
+    # database (e.g. a restored backup) that happens to share a count
+    conn.execute(
+        text(
+            f"INSERT OR IGNORE INTO {GENERATION_TABLE} (name, value)"
+            " VALUES ('conversations', abs(random() % 4611686018427387904))"
+        )
+    )
+    bump = (
+        f"UPDATE {GENERATION_TABLE} SET value = value + 1"
+        " WHERE name = 'conversations';"
+    )
+    for suffix, event in (
+        ("ai", "INSERT"),
+        ("ad", "DELETE"),
+        ("au", "UPDATE OF id, slug, title"),
+    ):
+        conn.execute(
+            text(
+                f"CREATE TRIGGER IF NOT EXISTS conversations_gen_{suffix}"
+                f" AFTER {event} ON conversations BEGIN {bump} END"
+            )
+        )
+
+
+def read_generation(conn) -> Optional[int]:
+    """Current change counter of the conversations table, None if untracked"""
+    try:
+        return conn.execute(
+            text(f"SELECT value FROM {GENERATION_TABLE} WHERE name = 'conversations'")
+        ).scalar()
+    except SQLAlchemyError:
+        return None
+
 
 @dataclass
 class IndexEntry:
@@ -29,27 +92,193 @@ class IndexEntry:
     title: Optional[str] = None
 
 
+_MAGIC = b"CTKCIX01"
+# magic, generation, id records, slug records
+_HEADER = struct.Struct("<8sqII")
+# (offset, length) into the string blob of id, slug and title
+_ID_RECORD = struct.Struct("<IIIIII")
+# position of the entry in the id table
+_SLUG_RECORD = struct.Struct("<I")
+# length marking a None string
+_NONE = 0xFFFFFFFF
+
+
+class _Snapshot:
+    """
+    Read-only, memory-mapped view of a written index snapshot.
+
+    Layout: header, id records sorted by lowercased id, slug records
+    sorted by lowercased slug, then a UTF-8 string blob. Records have a
+    fixed size, so the k-th key is read in O(1) and lookups are binary
+    searches over the mapped file; nothing is materialized up front.
+    """
+
+    def __init__(self, path: Path):
+        with open(path, "rb") as f:
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            magic, self.generation, self.id_count, self.slug_count = (
+                _HEADER.unpack_from(self._map, 0)
+            )
+            if magic != _MAGIC:
+                raise ValueError(f"{path} is not a conversation index snapshot")
+            self._ids_at = _HEADER.size
+            self._slugs_at = self._ids_at + self.id_count * _ID_RECORD.size
+            self._blob_at = self._slugs_at + self.slug_count * _SLUG_RECORD.size
+            if len(self._map) < self._blob_at:
+                raise ValueError(f"{path} is truncated")
+        except (struct.error, ValueError):
+            self._map.close()
+            raise
+
+    def close(self) -> None:
+        self._map.close()
+
+    def _str(self, offset: int, length: int) -> Optional[str]:
+        if length == _NONE:
+            return None
+        start = self._blob_at + offset
+        return self._map[start : start + length].decode("utf-8")
+
+    def entry(self, i: int) -> "IndexEntry":
+        fields = _ID_RECORD.unpack_from(self._map, self._ids_at + i * _ID_RECORD.size)
+        conv_id, slug, title = (
+            self._str(fields[k], fields[k + 1]) for k in range(0, 6, 2)
+        )
+        return IndexEntry(id=conv_id or "", slug=slug, title=title)
+
+    def _id_key(self, i: int) -> str:
+        offset, length = struct.unpack_from(
+            "<II", self._map, self._ids_at + i * _ID_RECORD.size
+        )
+        return (self._str(offset, length) or "").lower()
+
+    def _slug_position(self, j: int) -> int:
+        return _SLUG_RECORD.unpack_from(
+            self._map, self._slugs_at + j * _SLUG_RECORD.size
+        )[0]
+
+    def _slug_key(self, j: int) -> str:
+        # The slug is the second (offset, length) pair of the id record
+        record_at = self._ids_at + self._slug_position(j) * _ID_RECORD.size
+        offset, length = struct.unpack_from("<II", self._map, record_at + 8)
+        return (self._str(offset, length) or "").lower()
+
+    @staticmethod
+    def _lower_bound(key_at, count: int, key: str) -> int:
+        lo, hi = 0, count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if key_at(mid) < key:
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo
+
+    def _id_range(self, prefix: str) -> Iterator["IndexEntry"]:
+        i = self._lower_bound(self._id_key, self.id_count, prefix)
+        while i < self.id_count and self._id_key(i).startswith(prefix):
+            yield self.entry(i)
+            i += 1
+
+    def _slug_range(self, prefix: str) -> Iterator["IndexEntry"]:
+        j = self._lower_bound(self._slug_key, self.slug_count, prefix)
+        while j < self.slug_count and self._slug_key(j).startswith(prefix):
+            yield self.entry(self._slug_position(j))
+            j += 1
+
+    def find_id(self, conv_id: str) -> Optional["IndexEntry"]:
+        key = conv_id.lower()
+        for entry in self._id_range(key):
+            if entry.id == conv_id:
+                return entry
+            if entry.id.lower() != key:
+                break
+        return None
+
+    def find_slug(self, slug: str) -> Optional["IndexEntry"]:
+        key = slug.lower()
+        for entry in self._slug_range(key):
+            if entry.slug == slug:
+                return entry
+            if (entry.slug or "").lower() != key:
+                break
+        return None
+
+    def id_prefix(self, prefix: str) -> Iterator["IndexEntry"]:
+        """Entries whose id starts with ``prefix`` (case-insensitive)"""
+        return self._id_range(prefix.lower())
+
+    def slug_prefix(self, prefix: str) -> Iterator["IndexEntry"]:
+        """Entries whose slug starts with ``prefix`` (case-insensitive)"""
+        return self._slug_range(prefix.lower())
+
+    def entries(self) -> Iterator["IndexEntry"]:
+        for i in range(self.id_count):
+            yield self.entry(i)
+
+    @staticmethod
+    def write(path: Path, generation: int, entries: Iterable["IndexEntry"]) -> None:
+        """Atomically write a snapshot of ``entries`` at ``generation``"""
+        ordered = sorted(entries, key=lambda e: (e.id.lower(), e.id))
+        blob = bytearray()
+
+        def put(value: Optional[str]) -> Tuple[int, int]:
+            if value is None:
+                return 0, _NONE
+            data = value.encode("utf-8")
+            offset = len(blob)
+            blob.extend(data)
+            return offset, len(data)
+
+        id_records = bytearray()
+        for entry in ordered:
+            id_records += _ID_RECORD.pack(
+                *put(entry.id), *put(entry.slug), *put(entry.title)
+            )
+        slugs = {i: entry.slug for i, entry in enumerate(ordered) if entry.slug}
+        slugged = sorted(slugs, key=lambda i: (slugs[i].lower(), slugs[i]))
+        slug_records = b"".join(_SLUG_RECORD.pack(i) for i in slugged)
+
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+        with open(tmp, "wb") as f:
+            f.write(_HEADER.pack(_MAGIC, generation, len(ordered), len(slugged)))
+            f.write(id_records)
+            f.write(slug_records)
+            f.write(blob)
+        os.replace(tmp, path)
+
+
 class ConversationIndex:
     """
-    In-memory index for fast conversation lookups.
+    Index for fast conversation lookups.
 
-    Provides O(1) resolution for:
+    Provides fast resolution for:
     - Exact slug matches
     - Exact ID matches
     - ID prefix matches (with uniqueness check)
     - Slug prefix matches (with uniqueness check)
 
+    Entries live in in-memory dicts, layered over an optional memory-mapped
+    snapshot (see ``snapshot_path``). ``_removed`` holds snapshot ids that
+    were deleted or replaced by an in-memory entry since it was written.
+
     Thread-safe with RLock for re-entrant access.
     """
 
-    def __init__(self, db=None):
+    def __init__(self, db=None, snapshot_path: Optional[Path] = None):
         """
         Initialize the conversation index.
 
         Args:
             db: ConversationDB instance. If None, index must be populated manually.
+            snapshot_path: File to persist the index in. Requires ``db`` to
+                track changes (``db.index_generation()``); without it the
+                index is rebuilt from the database in every process.
         """
         self.db = db
+        self.snapshot_path = Path(snapshot_path) if snapshot_path else None
 
         # Primary indexes
         self._slug_to_id: Dict[str, str] = {}
@@ -60,6 +289,11 @@ class ConversationIndex:
         self._id_prefix_4: Dict[str, List[str]] = {}
         self._id_prefix_8: Dict[str, List[str]] = {}
 
+        # Persisted base layer and the database generation it reflects
+        self._snapshot: Optional[_Snapshot] = None
+        self._removed: Set[str] = set()
+        self._generation: Optional[int] = None
+
         # State
         self._loaded = False
         self._loading = False
@@ -69,6 +303,13 @@ class ConversationIndex:
         # Thread safety
         self._lock = threading.RLock()
 
+    @property
+    def journal_path(self) -> Optional[Path]:
+        """Append-only log of changes made since the snapshot was written"""
+        if self.snapshot_path is None:
+            return None
+        return self.snapshot_path.with_suffix(".log")
+
     @property
     def is_loaded(self) -> bool:
         """Check if index is loaded"""
@@ -110,7 +351,16 @@ class ConversationIndex:
 
             self._loading = True
             try:
-                self._load_from_database()
+                start = time()
+                if not self._load_from_snapshot():
+                    self._load_from_database()
+                self._load_time = time() - start
+                self._loaded = True
+                logger.info(
+                    f"ConversationIndex: Loaded {self._entry_count} entries"
+                    f" in {self._load_time:.3f}s"
+                    + (" from snapshot" if self._snapshot else "")
+                )
                 return True
             except Exception as e:
                 logger.error(f"ConversationIndex: Failed to load: {e}")
@@ -118,53 +368,219 @@ class ConversationIndex:
             finally:
                 self._loading = False
 
+    def ensure_current(self) -> bool:
+        """
+        Ensure the index is loaded and matches the database's generation.
+
+        Reloads (from the snapshot and journal when they are current, else
+        from the database) if another writer changed the conversations
+        table. Costs one primary-key read when nothing changed.
+
+        Returns:
+            True if the index is ready and tracked; False if it can't be
+            validated against the database (no snapshot path or no change
+            counter), in which case callers should query the database
+        """
+        if self.snapshot_path is None or not self.ensure_loaded():
+            return False
+        generation = self.db.index_generation()
+        if generation is None:
+            return False
+        if generation != self._generation:
+            with self._lock:
+                self.invalidate()
+            if not self.ensure_loaded():
+                return False
+        return self._generation is not None
+
     def _load_from_database(self):
         """Load index data from database"""
-        start = time()
-
         # Import here to avoid circular imports
         from ctk.core.db_models import ConversationModel
 
+        generation = None
         with self.db.session_scope() as session:
+            # Read the counter in the same transaction as the rows, so the
+            # snapshot is labelled with exactly the state it holds
+            if self.snapshot_path is not None:
+                generation = read_generation(session.connection())
+
             # Single query, minimal columns
             results = session.query(
                 ConversationModel.id, ConversationModel.slug, ConversationModel.title
             ).all()
 
-            # Clear existing data
-            self._slug_to_id.clear()
-            self._id_to_entry.clear()
-            self._id_prefix_4.clear()
-            self._id_prefix_8.clear()
-
-            # Build indexes
-            for conv_id, slug, title in results:
-                entry = IndexEntry(id=conv_id, slug=slug, title=title)
-                self._id_to_entry[conv_id] = entry
-
-                # Slug index
-                if slug:
-                    self._slug_to_id[slug] = conv_id
-
-                # ID prefix indexes
-                prefix_4 = conv_id[:4]
-                prefix_8 = conv_id[:8]
+        self._reset()
+        entries = [
+            IndexEntry(id=conv_id, slug=slug, title=title)
+            for conv_id, slug, title in results
+        ]
+
+        if generation is not None and self._write_snapshot(generation, entries):
+            return
+
+        # Build indexes
+        for entry in entries:
+            self._add_entry(entry)
+        self._generation = generation
+
+    def _load_from_snapshot(self) -> bool:
+        """Map the snapshot and replay its journal; False if either is stale"""
+        if self.snapshot_path is None or not self.snapshot_path.exists():
+            return False
+        generation = self.db.index_generation()
+        if generation is None:
+            return False
+        try:
+            snapshot = _Snapshot(self.snapshot_path)
+        except (OSError, ValueError) as e:
+            logger.warning(f"ConversationIndex: Ignoring snapshot: {e}")
+            return False
+
+        self._reset()
+        self._snapshot = snapshot
+        self._entry_count = snapshot.id_count
+        current = snapshot.generation
+        replayed = 0
+        for record in self._read_journal():
+            if record["a"] <= snapshot.generation:
+                continue  # already part of the snapshot
+            if record["b"] != current:
+                break  # a write was not journaled
+            self._apply_record(record)
+            current = record["a"]
+            replayed += 1
+
+        if current != generation:
+            logger.info("ConversationIndex: Snapshot is stale, rebuilding")
+            self._reset()
+            return False
+        self._generation = current
+        if replayed > CONVERSATION_INDEX_JOURNAL_MAX:
+            self._write_snapshot(current, list(self._entries()))
+        return True
+
+    def _write_snapshot(self, generation: int, entries: List[IndexEntry]) -> bool:
+        """Persist ``entries`` and switch lookups over to the new snapshot"""
+        assert self.snapshot_path is not None and self.journal_path is not None
+        try:
+            _Snapshot.write(self.snapshot_path, generation, entries)
+            # Records up to ``generation`` are now part of the snapshot
+            self.journal_path.unlink(missing_ok=True)
+            snapshot = _Snapshot(self.snapshot_path)
+        except (OSError, ValueError) as e:
+            logger.warning(f"ConversationIndex: Could not write snapshot: {e}")
+            return False
+        self._reset()
+        self._snapshot = snapshot
+        self._generation = generation
+        self._entry_count = snapshot.id_count
+        return True
+
+    def _read_journal(self) -> List[Dict[str, Any]]:
+        if self.journal_path is None:
+            return []
+        try:
+            lines = self.journal_path.read_text(encoding="utf-8").splitlines()
+        except OSError:
+            return []
+        records = []
+        for line in lines:
+            try:
+                records.append(json.loads(line))
+            except ValueError:
+                break  # torn write; later records can't be trusted
+        return records
+
+    def _apply_record(self, record: Dict[str, Any]) -> None:
+        for conv_id in record.get("del", []):
+            self._remove_entry(conv_id)
+        for conv_id, slug, title in record.get("add", []):
+            self._add_entry(IndexEntry(id=conv_id, slug=slug, title=title))
+
+    def apply_changes(
+        self,
+        added: Iterable[Tuple[str, Optional[str], Optional[str]]],
+        removed: Iterable[str],
+        generation_before: Optional[int],
+        generation_after: Optional[int],
+    ) -> None:
+        """
+        Record one committed write to the conversations table.
 
-                if prefix_4 not in self._id_prefix_4:
-                    self._id_prefix_4[prefix_4] = []
-                self._id_prefix_4[prefix_4].append(conv_id)
+        Patches the in-memory index (when loaded) and appends the change to
+        the snapshot's journal (when a snapshot exists), so the next process
+        can replay it instead of rebuilding. ``generation_before`` and
+        ``generation_after`` are the change counter read at the start and
+        end of the writing transaction.
 
-                if prefix_8 not in self._id_prefix_8:
-                    self._id_prefix_8[prefix_8] = []
-                self._id_prefix_8[prefix_8].append(conv_id)
+        Args:
+            added: (id, slug, title) of inserted or updated conversations
+            removed: IDs of deleted conversations
+            generation_before: Counter before the write
+            generation_after: Counter after the write
+        """
+        record = {
+            "b": generation_before,
+            "a": generation_after,
+            "add": [list(change) for change in added],
+            "del": list(removed),
+        }
+        with self._lock:
+            if self._loaded:
+                self._apply_record(record)
+                if self._generation is not None:
+                    if self._generation == generation_before:
+                        self._generation = generation_after
+                    else:
+                        # Missed someone else's write; reload on next check
+                        self._generation = -1
+
+            journal = self.journal_path
+            snapshot = self.snapshot_path
+            if (
+                journal is None
+                or snapshot is None
+                or generation_before is None
+                or generation_after is None
+                or not snapshot.exists()
+            ):
+                return
+            try:
+                with open(journal, "a", encoding="utf-8") as f:
+                    f.write(json.dumps(record, separators=(",", ":")) + "\n")
+            except OSError as e:
+                logger.warning(f"ConversationIndex: Could not journal change: {e}")
 
-            self._entry_count = len(results)
+    @property
+    def tracking(self) -> bool:
+        """True when writes should be reported through ``apply_changes``"""
+        if self._loaded:
+            return True
+        return self.snapshot_path is not None and self.snapshot_path.exists()
+
+    def _lookup_id(self, conv_id: str) -> Optional[IndexEntry]:
+        entry = self._id_to_entry.get(conv_id)
+        if entry is not None or self._snapshot is None or conv_id in self._removed:
+            return entry
+        return self._snapshot.find_id(conv_id)
+
+    def _lookup_slug(self, slug: str) -> Optional[str]:
+        conv_id = self._slug_to_id.get(slug)
+        if conv_id is not None or self._snapshot is None:
+            return conv_id
+        entry = self._snapshot.find_slug(slug)
+        if entry is None or entry.id in self._removed:
+            return None
+        return entry.id
 
-        self._load_time = time() - start
-        self._loaded = True
-        logger.info(
-            f"ConversationIndex: Loaded {self._entry_count} entries in {self._load_time:.3f}s"
-        )
+    def _entries(self) -> Iterator[IndexEntry]:
+        """Every live entry, snapshot first"""
+        if self._snapshot is not None:
+            for entry in self._snapshot.entries():
+                if entry.id not in self._removed:
+                    yield entry
+        yield from self._id_to_entry.values()
 
     def resolve(self, identifier: str) -> Optional[Tuple[str, Optional[str]]]:
         """
@@ -186,27 +602,31 @@ class ConversationIndex:
             return None
 
         # 1. Exact slug match (most common case)
-        if identifier in self._slug_to_id:
-            conv_id = self._slug_to_id[identifier]
+        conv_id = self._lookup_slug(identifier)
+        if conv_id is not None:
             return (conv_id, identifier)
 
         # 2. Exact ID match
-        if identifier in self._id_to_entry:
-            entry = self._id_to_entry[identifier]
+        entry = self._lookup_id(identifier)
+        if entry is not None:
             return (identifier, entry.slug)
 
         # 3. Slug prefix match
-        slug_matches = self._find_slug_prefix_matches(identifier)
+        slug_matches = self._find_slug_prefix_matches(
+            identifier, limit=AMBIGUITY_CHECK_LIMIT
+        )
         if len(slug_matches) == 1:
             slug, conv_id = slug_matches[0]
             return (conv_id, slug)
 
         # 4. ID prefix match (use prefix indexes for speed)
-        id_matches = self._find_id_prefix_matches(identifier)
+        id_matches = self._find_id_prefix_matches(
+            identifier, limit=AMBIGUITY_CHECK_LIMIT
+        )
         if len(id_matches) == 1:
             conv_id = id_matches[0]
-            entry = self._id_to_entry[conv_id]
-            return (conv_id, entry.slug)
+            entry = self._lookup_id(conv_id)
+            return (conv_id, entry.slug if entry else None)
 
         return None
 
@@ -226,13 +646,14 @@ class ConversationIndex:
             return (None, None, [])
 
         # Try exact matches first
-        if identifier in self._slug_to_id:
-            conv_id = self._slug_to_id[identifier]
-            entry = self._id_to_entry[conv_id]
-            return (conv_id, identifier, [(conv_id, identifier, entry.title)])
-
-        if identifier in self._id_to_entry:
-            entry = self._id_to_entry[identifier]
+        conv_id = self._lookup_slug(identifier)
+        if conv_id is not None:
+            entry = self._lookup_id(conv_id)
+            title = entry.title if entry else None
+            return (conv_id, identifier, [(conv_id, identifier, title)])
+
+        entry = self._lookup_id(identifier)
+        if entry is not None:
             return (identifier, entry.slug, [(identifier, entry.slug, entry.title)])
 
         # Collect all prefix matches
@@ -240,32 +661,56 @@ class ConversationIndex:
 
         # Slug prefix matches
         for slug, conv_id in self._find_slug_prefix_matches(identifier):
-            entry = self._id_to_entry[conv_id]
-            all_matches.append((conv_id, slug, entry.title))
+            entry = self._lookup_id(conv_id)
+            all_matches.append((conv_id, slug, entry.title if entry else None))
 
         # ID prefix matches (avoid duplicates)
         seen_ids = {m[0] for m in all_matches}
         for conv_id in self._find_id_prefix_matches(identifier):
             if conv_id not in seen_ids:
-                entry = self._id_to_entry[conv_id]
-                all_matches.append((conv_id, entry.slug, entry.title))
+                entry = self._lookup_id(conv_id)
+                if entry is not None:
+                    all_matches.append((conv_id, entry.slug, entry.title))
 
         if len(all_matches) == 1:
             return (all_matches[0][0], all_matches[0][1], all_matches)
 
         return (None, None, all_matches)
 
-    def _find_slug_prefix_matches(self, prefix: str) -> List[Tuple[str, str]]:
+    def _find_slug_prefix_matches(
+        self, prefix: str, limit: Optional[int] = None
+    ) -> List[Tuple[str, str]]:
         """Find slugs that start with prefix. Returns list of (slug, id)."""
         prefix_lower = prefix.lower()
         matches = []
         for slug, conv_id in self._slug_to_id.items():
             if slug.lower().startswith(prefix_lower):
                 matches.append((slug, conv_id))
+                if limit is not None and len(matches) >= limit:
+                    return matches
+        if self._snapshot is not None:
+            for entry in self._snapshot.slug_prefix(prefix_lower):
+                if entry.id in self._removed or entry.slug is None:
+                    continue
+                matches.append((entry.slug, entry.id))
+                if limit is not None and len(matches) >= limit:
+                    break
         return matches
 
-    def _find_id_prefix_matches(self, prefix: str) -> List[str]:
+    def _find_id_prefix_matches(
+        self, prefix: str, limit: Optional[int] = None
+    ) -> List[str]:
         """Find IDs that start with prefix. Uses prefix indexes for speed."""
+        matches = self._find_memory_id_prefix_matches(prefix)
+        if self._snapshot is not None:
+            for entry in self._snapshot.id_prefix(prefix):
+                if limit is not None and len(matches) >= limit:
+                    break
+                if entry.id not in self._removed:
+                    matches.append(entry.id)
+        return matches[:limit] if limit is not None else matches
+
+    def _find_memory_id_prefix_matches(self, prefix: str) -> List[str]:
         prefix_lower = prefix.lower()
 
         # Use prefix indexes if possible
@@ -313,25 +758,22 @@ class ConversationIndex:
         if not self.ensure_loaded():
             return []
 
-        prefix_lower = prefix.lower()
         results: List[Tuple[str, str, Optional[str]]] = []
         seen_ids = set()
 
         # Slug matches first (preferred)
-        for slug, conv_id in self._slug_to_id.items():
-            if slug.lower().startswith(prefix_lower):
-                results.append((slug, conv_id, slug))
-                seen_ids.add(conv_id)
-                if len(results) >= limit:
-                    break
+        for slug, conv_id in self._find_slug_prefix_matches(prefix, limit=limit):
+            results.append((slug, conv_id, slug))
+            seen_ids.add(conv_id)
 
         # ID prefix matches if we need more
         if len(results) < limit:
-            for conv_id in self._find_id_prefix_matches(prefix):
+            for conv_id in self._find_id_prefix_matches(prefix, limit=limit):
                 if conv_id not in seen_ids:
-                    entry = self._id_to_entry[conv_id]
-                    display = entry.slug or conv_id[:8]
-                    results.append((display, conv_id, entry.slug))
+                    entry = self._lookup_id(conv_id)
+                    entry_slug = entry.slug if entry else None
+                    display = entry_slug or conv_id[:8]
+                    results.append((display, conv_id, entry_slug))
                     if len(results) >= limit:
                         break
 
@@ -341,45 +783,20 @@ class ConversationIndex:
         """Get index entry by ID"""
         if not self.ensure_loaded():
             return None
-        return self._id_to_entry.get(conv_id)
+        return self._lookup_id(conv_id)
 
     def add(self, conv_id: str, slug: Optional[str], title: Optional[str] = None):
         """
         Add or update an entry in the index.
 
         Thread-safe. Can be called after index is loaded to keep it current.
+        Only the in-memory index changes; use ``apply_changes`` to also
+        journal the change for the on-disk snapshot.
         """
         with self._lock:
             if not self._loaded:
                 return  # Will be loaded fresh on next access
-
-            # Remove old slug mapping if it exists
-            old_entry = self._id_to_entry.get(conv_id)
-            if old_entry and old_entry.slug and old_entry.slug in self._slug_to_id:
-                del self._slug_to_id[old_entry.slug]
-
-            # Add new entry
-            entry = IndexEntry(id=conv_id, slug=slug, title=title)
-            self._id_to_entry[conv_id] = entry
-
-            if slug:
-                self._slug_to_id[slug] = conv_id
-
-            # Update prefix indexes
-            prefix_4 = conv_id[:4]
-            prefix_8 = conv_id[:8]
-
-            if prefix_4 not in self._id_prefix_4:
-                self._id_prefix_4[prefix_4] = []
-            if conv_id not in self._id_prefix_4[prefix_4]:
-                self._id_prefix_4[prefix_4].append(conv_id)
-
-            if prefix_8 not in self._id_prefix_8:
-                self._id_prefix_8[prefix_8] = []
-            if conv_id not in self._id_prefix_8[prefix_8]:
-                self._id_prefix_8[prefix_8].append(conv_id)
-
-            self._entry_count = len(self._id_to_entry)
+            self._add_entry(IndexEntry(id=conv_id, slug=slug, title=title))
 
     def remove(self, conv_id: str):
         """
@@ -390,11 +807,51 @@ class ConversationIndex:
         with self._lock:
             if not self._loaded:
                 return
+            self._remove_entry(conv_id)
 
-            entry = self._id_to_entry.pop(conv_id, None)
-            if not entry:
-                return
+    def _add_entry(self, entry: IndexEntry) -> None:
+        conv_id = entry.id
+        present = self._lookup_id(conv_id) is not None
+
+        # Remove old slug mapping if it exists
+        old_entry = self._id_to_entry.get(conv_id)
+        if old_entry and old_entry.slug and old_entry.slug in self._slug_to_id:
+            del self._slug_to_id[old_entry.slug]
+
+        # The in-memory entry replaces any snapshot one
+        if self._snapshot is not None and self._snapshot.find_id(conv_id):
+            self._removed.add(conv_id)
+
+        # Add new entry
+        self._id_to_entry[conv_id] = entry
+
+        if entry.slug:
+            self._slug_to_id[entry.slug] = conv_id
+
+        # Update prefix indexes
+        prefix_4 = conv_id[:4]
+        prefix_8 = conv_id[:8]
+
+        if prefix_4 not in self._id_prefix_4:
+            self._id_prefix_4[prefix_4] = []
+        if conv_id not in self._id_prefix_4[prefix_4]:
+            self._id_prefix_4[prefix_4].append(conv_id)
+
+        if prefix_8 not in self._id_prefix_8:
+            self._id_prefix_8[prefix_8] = []
+        if conv_id not in self._id_prefix_8[prefix_8]:
+            self._id_prefix_8[prefix_8].append(conv_id)
+
+        if not present:
+            self._entry_count += 1
+
+    def _remove_entry(self, conv_id: str) -> None:
+        present = self._lookup_id(conv_id) is not None
+        if self._snapshot is not None and self._snapshot.find_id(conv_id):
+            self._removed.add(conv_id)
 
+        entry = self._id_to_entry.pop(conv_id, None)
+        if entry:
             # Remove slug mapping
             if entry.slug and entry.slug in self._slug_to_id:
                 del self._slug_to_id[entry.slug]
@@ -415,7 +872,21 @@ class ConversationIndex:
                 except ValueError:
                     pass
 
-            self._entry_count = len(self._id_to_entry)
+        if present:
+            self._entry_count -= 1
+
+    def _reset(self) -> None:
+        """Drop all entries, including the mapped snapshot"""
+        self._slug_to_id.clear()
+        self._id_to_entry.clear()
+        self._id_prefix_4.clear()
+        self._id_prefix_8.clear()
+        self._removed.clear()
+        if self._snapshot is not None:
+            self._snapshot.close()
+            self._snapshot = None
+        self._generation = None
+        self._entry_count = 0
 
     def invalidate(self):
         """
@@ -425,11 +896,7 @@ class ConversationIndex:
         """
         with self._lock:
             self._loaded = False
-            self._slug_to_id.clear()
-            self._id_to_entry.clear()
-            self._id_prefix_4.clear()
-            self._id_prefix_8.clear()
-            self._entry_count = 0
+            self._reset()
 
     def get_stats(self) -> dict:
         """Get index statistics"""
@@ -440,4 +907,6 @@ class ConversationIndex:
             "slug_count": len(self._slug_to_id),
             "prefix_4_buckets": len(self._id_prefix_4),
             "prefix_8_buckets": len(self._id_prefix_8),
+            "snapshot_entries": self._snapshot.id_count if self._snapshot else 0,
+            "generation": self._generation,
         }
@@ -6,52 +6,106 @@ when multiple connections attempt to migrate simultaneously.
 """
 
 import fcntl
+import functools
 import logging
 import time
 from contextlib import contextmanager
 from datetime import datetime
 from pathlib import Path
-from typing import TYPE_CHECKING, Any, Dict, Generator, List, Optional, Tuple, Union
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Callable,
+    Dict,
+    Generator,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Sequence,
+    Set,
+    Tuple,
+    Type,
+    TypeVar,
+    Union,
+)
 
 if TYPE_CHECKING:
+    import numpy as np
+
+    from ctk.embeddings.ann import VectorIndex
+
+    from .embedding_matrix import EmbeddingMatrix
     from .models import PaginatedResult
 
-from sqlalchemy import and_, create_engine, distinct, func, or_, text
+from sqlalchemy import (
+    Float,
+    String,
+    and_,
+    cast,
+    create_engine,
+    distinct,
+    func,
+    insert,
+    or_,
+    text,
+)
 from sqlalchemy.exc import IntegrityError, OperationalError, SQLAlchemyError
 from sqlalchemy.orm import Session, scoped_session, selectinload, sessionmaker
 from sqlalchemy.pool import StaticPool
 
+from . import fts, sqlite_profile
 from .constants import (
     AMBIGUITY_CHECK_LIMIT,
+    ANN_INDEX_DIR,
+    CHARS_PER_TOKEN,
+    CONVERSATION_INDEX_FILE,
     DEFAULT_SEARCH_LIMIT,
     DEFAULT_TIMELINE_LIMIT,
+    EMBEDDING_STORAGE_DTYPE,
+    FTS_REBUILD_BATCH_SIZE,
+    LOAD_BATCH_SIZE,
     MIGRATION_LOCK_TIMEOUT,
-    SEARCH_BUFFER,
+    SAVE_BATCH_SIZE,
+    SEARCH_HIGHLIGHT_MARK,
+    SEARCH_SNIPPET_TOKENS,
+    SQL_IN_CHUNK_SIZE,
     TITLE_MATCH_BOOST,
 )
+from .conversation_index import ConversationIndex, read_generation
 from .db_models import (
     Base,
+    ChunkEmbeddingModel,
     ConversationModel,
     CurrentCommunityModel,
     CurrentGraphModel,
     CurrentNodeMetricsModel,
     EmbeddingModel,
     EmbeddingSessionModel,
+    MessageMediaModel,
     MessageModel,
+    MinHashSignatureModel,
     RoleEnum,
     SimilarityModel,
     TagModel,
     conversation_tags,
 )
+from .media_store import referenced_media
 from .models import (
     ConversationMetadata,
     ConversationSummary,
     ConversationTree,
+    LazyConversationTree,
     Message,
     MessageContent,
     MessageRole,
 )
-from .pagination import decode_cursor, encode_cursor
+from .pagination import (
+    decode_cursor,
+    decode_rank_cursor,
+    encode_cursor,
+    encode_rank_cursor,
+)
 
 logger = logging.getLogger(__name__)
 
@@ -66,6 +120,47 @@ def _escape_like(pattern: str) -> str:
     return pattern.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
 
 
+def _cursor_bounds(ts: datetime) -> Tuple[str, str]:
+    """Lowest and highest stored string forms of a cursor timestamp.
+
+    SQLAlchemy writes DateTime as ``YYYY-MM-DD HH:MM:SS.ffffff`` while
+    ``CURRENT_TIMESTAMP`` defaults write whole seconds, so a keyset bound
+    must treat both spellings of the same instant as equal: rows sort
+    before ``low``, after ``high``, or tie when they equal either.
+    """
+    high = ts.strftime("%Y-%m-%d %H:%M:%S.%f")
+    low = high if ts.microsecond else ts.strftime("%Y-%m-%d %H:%M:%S")
+    return low, high
+
+
+def _chunked(items: Sequence[Any], size: int) -> Iterator[Sequence[Any]]:
+    """Yield consecutive slices of ``items`` to keep IN (...) lists bounded."""
+    for i in range(0, len(items), size):
+        yield items[i : i + size]
+
+
+# Core tables for bulk inserts (typed, unlike the models' __table__)
+_TABLES = Base.metadata.tables
+
+
+class _SlugSet:
+    """Membership view of taken slugs that ignores one conversation's own.
+
+    Lets ``make_unique_slug`` test against the batch-wide slug map without
+    copying it for every conversation.
+    """
+
+    def __init__(self, owners: Dict[str, str], conversation_id: str):
+        self._owners = owners
+        self._conversation_id = conversation_id
+
+    def __contains__(self, slug: object) -> bool:
+        if not isinstance(slug, str):
+            return False
+        owner = self._owners.get(slug)
+        return owner is not None and owner != self._conversation_id
+
+
 @contextmanager
 def migration_lock(lock_path: Path, timeout: float = 30.0):
     """
@@ -123,10 +218,8 @@ def migration_lock(lock_path: Path, timeout: float = 30.0):
             logger.debug(f"Migration lock released: {lock_path}")
 
 
-def _summary_from_row(
-    conv: "ConversationModel", msg_count: int
-) -> "ConversationSummary":
-    """Build a ConversationSummary from a (ConversationModel, message_count) row.
+def _summary_from_row(conv: "ConversationModel") -> "ConversationSummary":
+    """Build a ConversationSummary from a ConversationModel row.
 
     Reads scalar columns directly from the ORM model rather than going through
     to_dict() so we avoid triggering lazy relationship loads for messages/tags.
@@ -148,21 +241,127 @@ def _summary_from_row(
         pinned_at=conv.pinned_at,
         archived_at=conv.archived_at,
         tags=[tag.name for tag in conv.tags],
-        message_count=msg_count,
+        message_count=conv.message_count or 0,
     )
 
 
+TreeT = TypeVar("TreeT", bound=ConversationTree)
+
+
+def _tree_header(conv_model: "ConversationModel", tree_cls: Type[TreeT]) -> TreeT:
+    """Build an empty ``tree_cls`` carrying a conversation row's title and metadata.
+
+    Tags must already be loaded (or loadable) on ``conv_model``.
+    """
+    metadata = ConversationMetadata.from_dict(conv_model.metadata_json or {})
+
+    # Columns are the single source of truth; override any blob values
+    metadata.version = conv_model.version or metadata.version
+    metadata.format = conv_model.format or metadata.format
+    metadata.source = conv_model.source
+    metadata.model = conv_model.model
+    metadata.project = conv_model.project
+    metadata.created_at = conv_model.created_at
+    metadata.updated_at = conv_model.updated_at
+    metadata.starred_at = conv_model.starred_at
+    metadata.pinned_at = conv_model.pinned_at
+    metadata.archived_at = conv_model.archived_at
+    metadata.slug = conv_model.slug
+    metadata.summary = conv_model.summary
+
+    # Load tags
+    metadata.tags = [tag.name for tag in conv_model.tags]
+
+    return tree_cls(id=conv_model.id, title=conv_model.title, metadata=metadata)
+
+
+def _original_message_id(conversation_id: str, db_id: str) -> str:
+    """Strip the conversation prefix the DB adds to message IDs.
+
+    Supports both the new (``conv_id::msg_id``) and the old
+    (``conv_id_msg_id``) formats.
+    """
+    new_prefix = f"{conversation_id}::"
+    old_prefix = f"{conversation_id}_"
+    if db_id.startswith(new_prefix):
+        return db_id[len(new_prefix) :]
+    if db_id.startswith(old_prefix):
+        # Backwards compatibility with old format
+        return db_id[len(old_prefix) :]
+    return db_id
+
+
+def _tree_from_models(
+    conv_model: "ConversationModel", messages: List["MessageModel"]
+) -> ConversationTree:
+    """Build a ConversationTree from a conversation row and its message rows.
+
+    Tags must already be loaded (or loadable) on ``conv_model``.
+    """
+    conversation_id = conv_model.id
+    conversation = _tree_header(conv_model, ConversationTree)
+
+    # Create mapping from unique IDs to original IDs
+    id_mapping = {
+        msg_model.id: _original_message_id(conversation_id, msg_model.id)
+        for msg_model in messages
+    }
+
+    for msg_model in messages:
+        content = MessageContent.from_dict(msg_model.content_json)
+
+        # Get original IDs
+        original_id = id_mapping.get(msg_model.id, msg_model.id)
+        original_parent_id = None
+        if msg_model.parent_id:
+            original_parent_id = id_mapping.get(
+                msg_model.parent_id, msg_model.parent_id
+            )
+
+        message = Message(
+            id=original_id,
+            role=MessageRole.from_string(msg_model.role.value),
+            content=content,
+            timestamp=msg_model.timestamp,
+            parent_id=original_parent_id,
+            metadata=msg_model.metadata_json or {},
+        )
+        conversation.add_message(message)
+
+    return conversation
+
+
 class ConversationDB:
     """SQLAlchemy-based database for storing conversations"""
 
-    def __init__(self, db_path: str = "conversations", echo: bool = False):
+    def __init__(
+        self,
+        db_path: str = "conversations",
+        echo: bool = False,
+        profile: Optional[str] = None,
+    ):
         """
         Initialize database connection
 
         Args:
             db_path: Path to database directory (will contain conversations.db and media/)
             echo: If True, log all SQL statements
+            profile: SQLite tuning profile (see ctk.core.sqlite_profile);
+                defaults to the ``database.profile`` config value
+
+        Raises:
+            ValueError: If the directory cannot be created or the profile
+                configuration is invalid
         """
+        # PostgreSQL connections are not tuned
+        self.profile: Optional[str] = None
+
+        # (provider, model) -> EmbeddingMatrix, see get_embedding_matrix()
+        self._embedding_matrices: Dict[Tuple[Optional[str], Optional[str]], Any] = {}
+        # embedding session id -> loaded ANN index entry, see get_ann_index()
+        self._ann_indexes: Dict[int, Dict[str, Any]] = {}
+        self._embedding_data_version: Optional[int] = None
+
         # Handle directory structure
         if db_path.startswith("postgresql://"):
             # PostgreSQL - use as-is
@@ -181,6 +380,8 @@ class ConversationDB:
                 connect_args={"check_same_thread": False},
                 poolclass=StaticPool,
             )
+            self.profile, pragmas = sqlite_profile.resolve_profile(profile)
+            sqlite_profile.install(self.engine, pragmas, in_memory=True)
         else:
             # SQLite - use directory structure
             self.db_dir = Path(db_path)
@@ -202,6 +403,16 @@ class ConversationDB:
                 connect_args={"check_same_thread": False},
                 poolclass=StaticPool,
             )
+            self.profile, pragmas = sqlite_profile.resolve_profile(profile)
+            sqlite_profile.install(self.engine, pragmas)
+
+        # ANN indexes live next to conversations.db; in-memory and
+        # PostgreSQL databases keep them in memory only
+        self._index_dir: Optional[Path] = (
+            self.db_dir / ANN_INDEX_DIR if self.db_dir is not None else None
+        )
+        # Slug / ID-prefix resolver, see the conversation_index property
+        self._conversation_index: Optional[ConversationIndex] = None
 
         # Create session factory
         self.Session = scoped_session(sessionmaker(bind=self.engine))
@@ -279,187 +490,75 @@ class ConversationDB:
             logger.debug(f"Slug generation skipped: {e}")
 
     def _setup_fts5(self):
-        """Setup FTS5 full-text search tables and triggers for SQLite databases."""
+        """Install the FTS5 search index (see ctk.core.fts) for SQLite databases.
+
+        Existing rows are not indexed here: small databases are indexed
+        inline, larger ones are left to ``rebuild_search_index`` (``ctk db
+        fts-rebuild``) and search falls back to LIKE until it completes.
+        """
         if self.db_dir is None:
             # Not SQLite - skip FTS5 setup
             return False
 
         try:
-            with self.engine.connect() as conn:
-                # Check if FTS5 tables already exist
-                result = conn.execute(
-                    text(
-                        "SELECT name FROM sqlite_master"
-                        " WHERE type='table' AND name='conversations_fts'"
-                    )
-                )
-                if result.fetchone():
-                    logger.debug("FTS5 tables already exist")
+            with self.engine.begin() as conn:
+                if not fts.is_installed(conn):
+                    fts.install(conn)
+                    logger.info("FTS5 full-text search tables and triggers created")
+                if fts.is_complete(conn):
                     return True
-
-                # Create FTS5 virtual table for conversations (title + summary)
-                conn.execute(
-                    text(
-                        """
-                    CREATE VIRTUAL TABLE IF NOT EXISTS conversations_fts USING fts5(
-                        conversation_id UNINDEXED,
-                        title,
-                        summary,
-                        tokenize = 'porter unicode61'
-                    )
-                """
-                    )
-                )
-
-                # Create FTS5 virtual table for messages (content)
-                conn.execute(
-                    text(
-                        """
-                    CREATE VIRTUAL TABLE IF NOT EXISTS messages_fts USING fts5(
-                        message_id UNINDEXED,
-                        conversation_id UNINDEXED,
-                        role UNINDEXED,
-                        content,
-                        tokenize = 'porter unicode61'
-                    )
-                """
-                    )
-                )
-
-                # Populate FTS tables with existing data
-                conn.execute(
-                    text(
-                        """
-                    INSERT INTO conversations_fts (conversation_id, title, summary)
-                    SELECT id, COALESCE(title, ''), COALESCE(summary, '')
-                    FROM conversations
-                """
-                    )
-                )
-
-                conn.execute(
-                    text(
-                        """
-                    INSERT INTO messages_fts (message_id, conversation_id, role, content)
-                    SELECT id, conversation_id, COALESCE(role, ''),
-                           COALESCE(json_extract(content_json, '$.text'), '')
-                    FROM messages
-                """
-                    )
-                )
-
-                # Create triggers to keep FTS in sync
-                # Conversations insert trigger
-                conn.execute(
-                    text(
-                        """
-                    CREATE TRIGGER IF NOT EXISTS conversations_fts_insert
-                    AFTER INSERT ON conversations
-                    BEGIN
-                        INSERT INTO conversations_fts (conversation_id, title, summary)
-                        VALUES (NEW.id, COALESCE(NEW.title, ''), COALESCE(NEW.summary, ''));
-                    END
-                """
-                    )
-                )
-
-                # Conversations update trigger
-                conn.execute(
-                    text(
-                        """
-                    CREATE TRIGGER IF NOT EXISTS conversations_fts_update
-                    AFTER UPDATE ON conversations
-                    BEGIN
-                        UPDATE conversations_fts
-                        SET title = COALESCE(NEW.title, ''),
-                            summary = COALESCE(NEW.summary, '')
-                        WHERE conversation_id = NEW.id;
-                    END
-                """
-                    )
-                )
-
-                # Conversations delete trigger
-                conn.execute(
-                    text(
-                        """
-                    CREATE TRIGGER IF NOT EXISTS conversations_fts_delete
-                    AFTER DELETE ON conversations
-                    BEGIN
-                        DELETE FROM conversations_fts WHERE conversation_id = OLD.id;
-                    END
-                """
-                    )
-                )
-
-                # Messages insert trigger
-                conn.execute(
-                    text(
-                        """
-                    CREATE TRIGGER IF NOT EXISTS messages_fts_insert
-                    AFTER INSERT ON messages
-                    BEGIN
-                        INSERT INTO messages_fts (message_id, conversation_id, role, content)
-                        VALUES (NEW.id, NEW.conversation_id, COALESCE(NEW.role, ''),
-                                COALESCE(json_extract(NEW.content_json, '$.text'), ''));
-                    END
-                """
-                    )
-                )
-
-                # Messages update trigger
-                conn.execute(
-                    text(
-                        """
-                    CREATE TRIGGER IF NOT EXISTS messages_fts_update
-                    AFTER UPDATE ON messages
-                    BEGIN
-                        UPDATE messages_fts
-                        SET role = COALESCE(NEW.role, ''),
-                            content = COALESCE(json_extract(NEW.content_json, '$.text'), '')
-                        WHERE message_id = NEW.id;
-                    END
-                """
-                    )
-                )
-
-                # Messages delete trigger
-                conn.execute(
-                    text(
-                        """
-                    CREATE TRIGGER IF NOT EXISTS messages_fts_delete
-                    AFTER DELETE ON messages
-                    BEGIN
-                        DELETE FROM messages_fts WHERE message_id = OLD.id;
-                    END
-                """
-                    )
+                pending = fts.pending_rows(conn)
+            if pending <= FTS_REBUILD_BATCH_SIZE:
+                fts.rebuild(self.engine)
+            else:
+                logger.warning(
+                    f"Search index is missing {pending} rows; text search uses"
+                    " slower LIKE matching until `ctk db fts-rebuild` is run"
                 )
-
-                conn.commit()
-                logger.info("FTS5 full-text search tables and triggers created")
-                return True
+            return True
 
         except Exception as e:
             logger.warning(f"FTS5 setup failed (search will use LIKE fallback): {e}")
             return False
 
     def _compute_has_fts5(self) -> bool:
-        """Probe the DB once to determine whether FTS5 tables exist."""
+        """Probe the DB once: is the FTS5 index installed and complete?"""
         if not self._is_sqlite:
             return False
         try:
             with self.engine.connect() as conn:
-                result = conn.execute(
-                    text(
-                        "SELECT name FROM sqlite_master"
-                        " WHERE type='table' AND name='conversations_fts'"
-                    )
-                )
-                return result.fetchone() is not None
+                return fts.is_installed(conn) and fts.is_complete(conn)
         except Exception:
             return False
 
+    def rebuild_search_index(
+        self,
+        batch_size: int = FTS_REBUILD_BATCH_SIZE,
+        restart: bool = False,
+        progress: Optional[Callable[[str, int, int], None]] = None,
+    ) -> Dict[str, int]:
+        """
+        Fill the FTS5 index in committed batches (resumable).
+
+        Args:
+            batch_size: Rows indexed per transaction
+            restart: Discard the index and rebuild from scratch
+            progress: Called with (table, rows done, rows total)
+
+        Returns:
+            Rows indexed per FTS table
+        """
+        if not self._is_sqlite or self.db_dir is None:
+            raise ValueError("Full-text search is only available for SQLite databases")
+        with self.engine.begin() as conn:
+            if not fts.is_installed(conn):
+                fts.install(conn)
+        indexed = fts.rebuild(
+            self.engine, batch_size=batch_size, restart=restart, progress=progress
+        )
+        self._has_fts = self._compute_has_fts5()
+        return indexed
+
     def _has_fts5(self) -> bool:
         """Return the cached FTS5 availability flag."""
         return self._has_fts
@@ -518,17 +617,100 @@ class ConversationDB:
 
         return self._escape_fts_query(query_text)
 
+    def _message_text_like(self, like_pattern: str):
+        """Filter clause: some message of the conversation matches the pattern.
+
+        A correlated EXISTS rather than a join keeps one row per
+        conversation, so list queries need no GROUP BY. On SQLite the
+        pattern is bound as ``:query``; callers must pass it via ``params``.
+        """
+        if self._is_sqlite:
+            return text(
+                "EXISTS (SELECT 1 FROM messages "
+                "WHERE messages.conversation_id = conversations.id "
+                "AND json_extract(messages.content_json, '$.text') "
+                "LIKE :query ESCAPE '\\')"
+            )
+        return ConversationModel.messages.any(
+            MessageModel.content_json["text"].astext.ilike(like_pattern, escape="\\")
+        )
+
+    _RANK_AGGREGATES = {"max": "MAX", "sum": "SUM"}
+
+    def _fts_rank_sql(
+        self,
+        title_only: bool = False,
+        content_only: bool = False,
+        aggregate: str = "max",
+    ) -> str:
+        """SQL selecting ``(conversation_id, relevance)`` for ``:fts_query`` hits.
+
+        Relevance is negated BM25, so higher is better. Message scores are
+        combined per conversation with ``aggregate`` ('max': best message,
+        'sum': all matching messages), and a title/summary hit adds its own
+        score plus ``:title_boost``. FTS5's hidden ``rank`` column is used
+        because ``bm25()`` is not allowed inside an aggregate query.
+        """
+        if aggregate not in self._RANK_AGGREGATES:
+            raise ValueError(f"Unknown rank aggregate: {aggregate}")
+        parts = []
+        if not content_only:
+            parts.append(
+                "SELECT conversation_id, :title_boost - rank AS score"
+                " FROM conversations_fts WHERE conversations_fts MATCH :fts_query"
+            )
+        if not title_only:
+            parts.append(
+                f"SELECT conversation_id, {self._RANK_AGGREGATES[aggregate]}(-rank)"
+                " AS score FROM messages_fts WHERE messages_fts MATCH :fts_query"
+                " GROUP BY conversation_id"
+            )
+        return (
+            "SELECT conversation_id, SUM(score) AS relevance FROM ("
+            + " UNION ALL ".join(parts)
+            + ") GROUP BY conversation_id"
+        )
+
+    def _fts_has_match(
+        self,
+        conn,
+        fts_query: str,
+        title_only: bool = False,
+        content_only: bool = False,
+    ) -> bool:
+        """Cheap probe: does ``fts_query`` match anything at all?
+
+        Returns False on FTS syntax errors so callers fall back to LIKE.
+        """
+        tables = []
+        if not content_only:
+            tables.append("conversations_fts")
+        if not title_only:
+            tables.append("messages_fts")
+        try:
+            for table in tables:
+                hit = conn.execute(
+                    text(f"SELECT 1 FROM {table} WHERE {table} MATCH :q LIMIT 1"),
+                    {"q": fts_query},
+                ).fetchone()
+                if hit:
+                    return True
+        except Exception as e:
+            logger.debug(f"FTS5 probe failed, falling back to LIKE: {e}")
+        return False
+
     def _search_fts5(
         self,
         query_text: str,
         title_only: bool = False,
         content_only: bool = False,
         limit: int = DEFAULT_SEARCH_LIMIT,
+        aggregate: str = "max",
     ) -> List[str]:
         """
-        Search using FTS5 and return matching conversation IDs with relevance ranking.
+        Search using FTS5 and return matching conversation IDs by relevance.
 
-        Returns conversation IDs ordered by relevance (title matches ranked higher).
+        Title and content scores are combined in SQL (see _fts_rank_sql).
         """
         fts_query = self._prepare_fts_query(query_text)
         if not fts_query:
@@ -536,67 +718,174 @@ class ConversationDB:
 
         try:
             with self.engine.connect() as conn:
-                matching_ids = set()
-                ranked_ids = []
+                result = conn.execute(
+                    text(
+                        self._fts_rank_sql(title_only, content_only, aggregate)
+                        + " ORDER BY relevance DESC, conversation_id LIMIT :limit"
+                    ),
+                    {
+                        "fts_query": fts_query,
+                        "title_boost": TITLE_MATCH_BOOST,
+                        "limit": limit,
+                    },
+                )
+                return [row[0] for row in result]
+        except Exception as e:
+            logger.warning(f"FTS5 search failed: {e}")
+            return []
 
-                if not content_only:
-                    # Search conversation titles (higher weight)
-                    try:
-                        result = conn.execute(
-                            text(
-                                """
-                            SELECT conversation_id, bm25(conversations_fts) as rank
-                            FROM conversations_fts
-                            WHERE conversations_fts MATCH :query
-                            ORDER BY rank
-                            LIMIT :limit
-                        """
-                            ),
-                            {"query": fts_query, "limit": limit},
-                        )
+    def _apply_text_search(
+        self,
+        query,
+        query_text: Optional[str],
+        title_only: bool,
+        content_only: bool,
+        rank_aggregate: str = "max",
+    ):
+        """Restrict a ConversationModel query to rows matching ``query_text``.
 
-                        for row in result:
-                            conv_id = row[0]
-                            if conv_id not in matching_ids:
-                                matching_ids.add(conv_id)
-                                ranked_ids.append(
-                                    (conv_id, row[1] - TITLE_MATCH_BOOST)
-                                )  # Boost title matches
-                    except Exception as e:
-                        logger.debug(f"FTS5 title search failed: {e}")
+        With FTS5 the query is joined to the ranking subquery, so every hit is
+        reachable (no candidate cap) and its relevance can be selected and
+        ordered on. Without FTS5, or when FTS finds nothing (tokenization can
+        miss substrings LIKE would find), LIKE over titles and message text is
+        used instead.
 
-                if not title_only:
-                    # Search message content - use subquery since bm25 can't be used with GROUP BY
-                    try:
-                        result = conn.execute(
-                            text(
-                                """
-                            SELECT DISTINCT conversation_id
-                            FROM messages_fts
-                            WHERE messages_fts MATCH :query
-                            LIMIT :limit
-                        """
-                            ),
-                            {"query": fts_query, "limit": limit},
-                        )
+        Returns:
+            (query, ranked, fts_query): ``ranked`` is the ranking subquery (or
+            None when LIKE was used) and ``fts_query`` the prepared MATCH
+            expression used for snippets.
+        """
+        if not query_text:
+            return query, None, None
+
+        if self._has_fts:
+            fts_query = self._prepare_fts_query(query_text)
+            if fts_query and self._fts_has_match(
+                query.session.connection(), fts_query, title_only, content_only
+            ):
+                # text() rejects binding a parameter its SQL doesn't use
+                params: Dict[str, Any] = {"fts_query": fts_query}
+                if not content_only:
+                    params["title_boost"] = TITLE_MATCH_BOOST
+                ranked = (
+                    text(self._fts_rank_sql(title_only, content_only, rank_aggregate))
+                    .bindparams(**params)
+                    .columns(conversation_id=String, relevance=Float)
+                    .subquery("ranked")
+                )
+                query = query.join(
+                    ranked, ranked.c.conversation_id == ConversationModel.id
+                )
+                return query, ranked, fts_query
 
-                        for row in result:
-                            conv_id = row[0]
-                            if conv_id not in matching_ids:
-                                matching_ids.add(conv_id)
-                                ranked_ids.append(
-                                    (conv_id, 0)
-                                )  # No rank for content matches
-                    except Exception as e:
-                        logger.debug(f"FTS5 content search failed: {e}")
+        like_pattern = f"%{_escape_like(query_text)}%"
+        if title_only:
+            query = query.filter(
+                ConversationModel.title.ilike(like_pattern, escape="\\")
+            )
+        elif content_only:
+            query = query.filter(self._message_text_like(like_pattern))
+        else:
+            query = query.filter(
+                or_(
+                    ConversationModel.title.ilike(like_pattern, escape="\\"),
+                    self._message_text_like(like_pattern),
+                )
+            )
+        if self._is_sqlite and not title_only:
+            query = query.params(query=like_pattern)
+        return query, None, None
 
-                # Sort by rank (lower is better in bm25)
-                ranked_ids.sort(key=lambda x: x[1])
-                return [conv_id for conv_id, _ in ranked_ids[:limit]]
+    def _fts_snippets(
+        self,
+        conn,
+        fts_query: str,
+        conversation_ids: List[str],
+        title_only: bool = False,
+        content_only: bool = False,
+    ) -> Dict[str, str]:
+        """Excerpts around the matched terms, one per conversation.
 
+        Uses the best-ranked matching message; conversations that only
+        matched on their title get the highlighted title instead.
+        """
+        mark = SEARCH_HIGHLIGHT_MARK
+        snippets: Dict[str, str] = {}
+        if not conversation_ids:
+            return snippets
+        params = {"q": fts_query, "mark": mark, "tokens": SEARCH_SNIPPET_TOKENS}
+        try:
+            for chunk in _chunked(conversation_ids, SQL_IN_CHUNK_SIZE):
+                ids = {f"id{i}": cid for i, cid in enumerate(chunk)}
+                in_list = ", ".join(f":{key}" for key in ids)
+                if not title_only:
+                    rows = conn.execute(
+                        text(
+                            "SELECT conversation_id, snippet(messages_fts, -1,"
+                            " :mark, :mark, '…', :tokens) FROM messages_fts"
+                            " WHERE messages_fts MATCH :q"
+                            f" AND conversation_id IN ({in_list}) ORDER BY rank"
+                        ),
+                        {**params, **ids},
+                    )
+                    for conv_id, snippet in rows:
+                        snippets.setdefault(conv_id, snippet)
+                if not content_only:
+                    rows = conn.execute(
+                        text(
+                            "SELECT conversation_id,"
+                            " highlight(conversations_fts, 1, :mark, :mark)"
+                            " FROM conversations_fts"
+                            " WHERE conversations_fts MATCH :q"
+                            f" AND conversation_id IN ({in_list})"
+                        ),
+                        {**params, **ids},
+                    )
+                    for conv_id, snippet in rows:
+                        snippets.setdefault(conv_id, snippet)
         except Exception as e:
-            logger.warning(f"FTS5 search failed: {e}")
-            return []
+            logger.debug(f"FTS5 snippet lookup failed: {e}")
+        return snippets
+
+    def _ranked_summaries(
+        self,
+        conn,
+        rows: List[Any],
+        fts_query: str,
+        title_only: bool = False,
+        content_only: bool = False,
+    ) -> List["ConversationSummary"]:
+        """Summaries for ``(ConversationModel, relevance)`` rows with excerpts."""
+        snippets = self._fts_snippets(
+            conn, fts_query, [conv.id for conv, _ in rows], title_only, content_only
+        )
+        items = []
+        for conv, relevance in rows:
+            summary = _summary_from_row(conv)
+            summary.score = relevance
+            summary.snippet = snippets.get(conv.id)
+            items.append(summary)
+        return items
+
+    def _page_summaries(
+        self,
+        session: Session,
+        results: List[Any],
+        ranked: Any,
+        fts_query: Optional[str],
+        title_only: bool = False,
+        content_only: bool = False,
+    ) -> List["ConversationSummary"]:
+        """Summaries for a search page; ranked rows also get score and excerpt"""
+        if ranked is None or fts_query is None:
+            return [_summary_from_row(conv) for conv in results]
+        return self._ranked_summaries(
+            session.connection(),
+            [tuple(row) for row in results],
+            fts_query,
+            title_only,
+            content_only,
+        )
 
     @contextmanager
     def session_scope(self):
@@ -634,109 +923,268 @@ class ConversationDB:
         Returns:
             The conversation ID
         """
+        self.save_conversations([conversation])
+        return conversation.id
+
+    def save_conversations(
+        self,
+        conversations: Iterable[ConversationTree],
+        batch_size: int = SAVE_BATCH_SIZE,
+    ) -> List[str]:
+        """
+        Save many conversations, one transaction per batch.
+
+        Equivalent to calling :meth:`save_conversation` for each tree, but
+        existing rows, slugs and tags are fetched once per batch and
+        messages are written with a single executemany, so bulk imports,
+        merges and splits avoid a commit and several queries per message.
+        ``conversations`` may be any iterable (including a generator); it is
+        consumed lazily, ``batch_size`` trees at a time. If the same ID
+        appears twice, the later tree wins, as with sequential saves.
+
+        Args:
+            conversations: ConversationTree objects to save
+            batch_size: Conversations per transaction
+
+        Returns:
+            The saved conversation IDs, in input order
+        """
+        if batch_size < 1:
+            raise ValueError("batch_size must be at least 1")
+
+        saved: List[str] = []
+        batch: List[ConversationTree] = []
+        for conversation in conversations:
+            batch.append(conversation)
+            if len(batch) >= batch_size:
+                self._save_batch(batch)
+                saved.extend(c.id for c in batch)
+                batch = []
+        if batch:
+            self._save_batch(batch)
+            saved.extend(c.id for c in batch)
+        return saved
+
+    def _save_batch(self, conversations: List[ConversationTree]) -> None:
+        """Write one batch of conversations in a single transaction."""
+        # Later duplicates replace earlier ones but keep the first position
+        by_id: Dict[str, ConversationTree] = {}
+        for conversation in conversations:
+            by_id[conversation.id] = conversation
+        conv_ids = list(by_id)
+
+        # A partially loaded tree must not overwrite stored bodies with
+        # skeletons; fetch the rest first (outside the write transaction)
+        for conversation in by_id.values():
+            if isinstance(conversation, LazyConversationTree):
+                conversation.load_all()
+
+        # Report the batch to the ConversationIndex when anyone relies on it
+        index = self.conversation_index if self._is_sqlite else None
+        if index is not None and not index.tracking:
+            index = None
+        generation_before = generation_after = None
+        index_changes: List[Tuple[str, Optional[str], Optional[str]]] = []
+
         with self.session_scope() as session:
-            # Check if conversation exists
-            existing = session.get(ConversationModel, conversation.id)
+            if index is not None:
+                generation_before = read_generation(session.connection())
+
+            existing: Dict[str, ConversationModel] = {}
+            for chunk in _chunked(conv_ids, SQL_IN_CHUNK_SIZE):
+                for model in session.query(ConversationModel).filter(
+                    ConversationModel.id.in_(chunk)
+                ):
+                    existing[model.id] = model
+
+            # Full refresh: drop old messages, media references and tag
+            # links of existing rows
+            for chunk in _chunked(list(existing), SQL_IN_CHUNK_SIZE):
+                session.query(MessageModel).filter(
+                    MessageModel.conversation_id.in_(chunk)
+                ).delete(synchronize_session=False)
+                session.query(MessageMediaModel).filter(
+                    MessageMediaModel.conversation_id.in_(chunk)
+                ).delete(synchronize_session=False)
+                session.execute(
+                    conversation_tags.delete().where(
+                        conversation_tags.c.conversation_id.in_(chunk)
+                    )
+                )
 
-            if existing:
-                # Update existing conversation
-                conv_model = existing
-                # Clear existing messages for full refresh
-                session.query(MessageModel).filter_by(
-                    conversation_id=conversation.id
-                ).delete()
-            else:
-                # Create new conversation
-                conv_model = ConversationModel(id=conversation.id)
-                session.add(conv_model)
-
-            # Update conversation fields
-            conv_model.title = conversation.title
-            conv_model.created_at = conversation.metadata.created_at
-            conv_model.updated_at = conversation.metadata.updated_at
-            conv_model.version = conversation.metadata.version
-            conv_model.format = conversation.metadata.format
-            conv_model.source = conversation.metadata.source
-            conv_model.model = conversation.metadata.model
-            conv_model.project = conversation.metadata.project
-            conv_model.summary = conversation.metadata.summary
-
-            # Auto-generate slug from title if not present
-            if not conversation.metadata.slug and conversation.title:
-                from ctk.core.slug import generate_slug, make_unique_slug
-
-                base_slug = generate_slug(conversation.title)
-                if base_slug:
-                    # Check for existing slugs to make unique
-                    existing_slugs = set(
-                        s[0]
-                        for s in session.query(ConversationModel.slug)
-                        .filter(ConversationModel.slug.isnot(None))
-                        .filter(ConversationModel.id != conversation.id)
-                        .all()
+            # Slugs are only loaded when a tree actually needs one generated;
+            # ``assigned`` tracks the batch's own, not yet flushed, slugs
+            slug_owner: Optional[Dict[str, str]] = None
+            assigned: Dict[str, str] = {}
+            tag_names: set = set()
+
+            # No autoflush: a half-populated row must not be INSERTed (and then
+            # UPDATEd, which resets updated_at) when the slug query runs
+            with session.no_autoflush:
+                for conversation in by_id.values():
+                    meta = conversation.metadata
+                    conv_model = existing.get(conversation.id)
+                    if conv_model is None:
+                        conv_model = ConversationModel(id=conversation.id)
+                        session.add(conv_model)
+
+                    conv_model.title = conversation.title
+                    conv_model.created_at = meta.created_at
+                    conv_model.updated_at = meta.updated_at
+                    conv_model.version = meta.version
+                    conv_model.format = meta.format
+                    conv_model.source = meta.source
+                    conv_model.model = meta.model
+                    conv_model.project = meta.project
+                    conv_model.summary = meta.summary
+
+                    # Auto-generate slug from title if not present
+                    if not meta.slug and conversation.title:
+                        from ctk.core.slug import generate_slug, make_unique_slug
+
+                        base_slug = generate_slug(conversation.title)
+                        if base_slug:
+                            if slug_owner is None:
+                                slug_owner = dict(
+                                    session.query(
+                                        ConversationModel.slug, ConversationModel.id
+                                    )
+                                    .filter(ConversationModel.slug.isnot(None))
+                                    .all()
+                                )
+                                slug_owner.update(assigned)
+                            # A conversation may keep its own slug
+                            taken = _SlugSet(slug_owner, conversation.id)
+                            meta.slug = make_unique_slug(base_slug, taken)
+                    if meta.slug:
+                        assigned[meta.slug] = conversation.id
+                        if slug_owner is not None:
+                            slug_owner[meta.slug] = conversation.id
+                    conv_model.slug = meta.slug
+
+                    # Store overflow metadata as JSON (columns are the single source of truth)
+                    conv_model.metadata_json = meta.to_blob()
+
+                    # Set denormalized branch flag (True when tree has more than
+                    # one root-to-leaf path)
+                    conv_model.is_branching = len(conversation.get_all_paths()) > 1
+
+                    # Denormalized message statistics (backfilled by migration 7)
+                    messages = conversation.message_map.values()
+                    conv_model.message_count = len(conversation.message_map)
+                    conv_model.char_count = sum(
+                        len(m.content.text or "") for m in messages
                     )
-                    conversation.metadata.slug = make_unique_slug(
-                        base_slug, existing_slugs
+                    conv_model.token_count = conv_model.char_count // CHARS_PER_TOKEN
+                    conv_model.last_message_at = max(
+                        (m.timestamp for m in messages if m.timestamp), default=None
                     )
-            conv_model.slug = conversation.metadata.slug
-
-            # Store overflow metadata as JSON (columns are the single source of truth)
-            conv_model.metadata_json = conversation.metadata.to_blob()
-
-            # Handle tags
-            self._update_tags(session, conv_model, conversation.metadata.tags)
-
-            # Save messages with unique IDs
-            # Create a mapping of old IDs to new IDs
-            # Note: Using '::' as delimiter instead of '_' to avoid ambiguity
-            # since both conversation IDs and message IDs may contain underscores
-            id_mapping = {}
-            for msg_id, message in conversation.message_map.items():
-                # Create unique ID by combining conversation ID and message ID
-                # Use '::' delimiter which is safer than '_' for ID parsing
-                unique_id = f"{conversation.id}::{message.id}"
-                id_mapping[message.id] = unique_id
-
-                # Map parent_id to new unique ID
-                unique_parent_id = None
-                if message.parent_id:
-                    unique_parent_id = f"{conversation.id}::{message.parent_id}"
-
-                # Check if this message already exists
-                existing_msg = (
-                    session.query(MessageModel).filter_by(id=unique_id).first()
-                )
-                if not existing_msg:
-                    msg_model = MessageModel(
-                        id=unique_id,
-                        conversation_id=conversation.id,
-                        role=RoleEnum(message.role.value),
-                        content_json=message.content.to_dict(),
-                        parent_id=unique_parent_id,
-                        timestamp=message.timestamp,
-                        metadata_json=message.metadata,
+                    conv_model.branch_count = conversation.count_branches()
+
+                    tag_names.update(meta.tags)
+
+            session.flush()
+            if index is not None:
+                generation_after = read_generation(session.connection())
+                # Rows are in the identity map; session.get() issues no SQL
+                for cid in conv_ids:
+                    model = session.get(ConversationModel, cid)
+                    index_changes.append((cid, model.slug, model.title))
+
+            # Tags: one lookup for the whole batch, create the missing ones
+            tag_ids: Dict[str, int] = {}
+            for chunk in _chunked(sorted(tag_names), SQL_IN_CHUNK_SIZE):
+                for tag_id, name in session.query(TagModel.id, TagModel.name).filter(
+                    TagModel.name.in_(chunk)
+                ):
+                    tag_ids[name] = tag_id
+            missing = [name for name in sorted(tag_names) if name not in tag_ids]
+            if missing:
+                new_tags = [
+                    TagModel(
+                        name=name,
+                        # Determine category from tag format
+                        category=name.split(":")[0] if ":" in name else None,
                     )
-                    session.add(msg_model)
+                    for name in missing
+                ]
+                session.add_all(new_tags)
+                session.flush()
+                tag_ids.update((tag.name, tag.id) for tag in new_tags)
 
-            # Set denormalized branch flag (True when tree has more than one root-to-leaf path)
-            conv_model.is_branching = len(conversation.get_all_paths()) > 1
+            links = [
+                {"conversation_id": conv_id, "tag_id": tag_ids[name]}
+                for conv_id, conversation in by_id.items()
+                for name in set(conversation.metadata.tags)
+            ]
+            if links:
+                session.execute(conversation_tags.insert(), links)
+
+            # Messages get unique IDs by combining conversation ID and
+            # message ID. Using '::' as delimiter instead of '_' avoids
+            # ambiguity since both IDs may contain underscores.
+            rows: Dict[str, Dict[str, Any]] = {}
+            for conv_id, conversation in by_id.items():
+                for message in conversation.message_map.values():
+                    unique_id = f"{conv_id}::{message.id}"
+                    if unique_id in rows:
+                        continue
+                    rows[unique_id] = {
+                        "id": unique_id,
+                        "conversation_id": conv_id,
+                        "role": RoleEnum(message.role.value),
+                        "content_json": message.content.to_dict(),
+                        "parent_id": (
+                            f"{conv_id}::{message.parent_id}"
+                            if message.parent_id
+                            else None
+                        ),
+                        "timestamp": message.timestamp,
+                        "metadata_json": message.metadata,
+                    }
 
-            session.commit()
-            msg_count = len(conversation.message_map)
-            logger.info(
-                f"Saved conversation {conversation.id} with {msg_count} messages"
-            )
+            # Skip IDs that survived the refresh (e.g. rows orphaned by a
+            # legacy schema) rather than failing the whole batch
+            for chunk in _chunked(list(rows), SQL_IN_CHUNK_SIZE):
+                for (msg_id,) in session.query(MessageModel.id).filter(
+                    MessageModel.id.in_(chunk)
+                ):
+                    rows.pop(msg_id, None)
+            if rows:
+                session.execute(
+                    insert(_TABLES[MessageModel.__tablename__]), list(rows.values())
+                )
 
-        return conversation.id
+            # Message -> media file references (see ctk.core.media_store)
+            media_links = [
+                {
+                    "message_id": row["id"],
+                    "media": name,
+                    "conversation_id": row["conversation_id"],
+                }
+                for row in rows.values()
+                for name in sorted(referenced_media(row["content_json"]))
+            ]
+            if media_links:
+                session.execute(
+                    insert(_TABLES[MessageMediaModel.__tablename__]), media_links
+                )
+
+        if index is not None:
+            index.apply_changes(index_changes, [], generation_before, generation_after)
+
+        msg_count = sum(len(c.message_map) for c in by_id.values())
+        logger.info(f"Saved {len(by_id)} conversation(s) with {msg_count} messages")
 
     def resolve_identifier(
         self, identifier: str
     ) -> Optional[Tuple[str, Optional[str]]]:
         """
-        Resolve a slug, ID, or prefix to (conversation_id, slug) using database indexes.
+        Resolve a slug, ID, or prefix to (conversation_id, slug).
 
-        This is a database-level resolution that uses indexes for O(log n) lookups.
-        For faster O(1) lookups, use ConversationIndex instead.
+        Directory databases answer from the memory-mapped ConversationIndex
+        snapshot (O(log n), no table scan even for prefixes); other
+        databases query the conversations table directly.
 
         Resolution order:
         1. Exact slug match
@@ -750,6 +1198,10 @@ class ConversationDB:
         Returns:
             Tuple of (conversation_id, slug) if unique match found, None otherwise
         """
+        index = self.conversation_index
+        if index.ensure_current():
+            return index.resolve(identifier)
+
         with self.session_scope() as session:
             # 1. Exact slug match (uses index)
             conv = (
@@ -791,12 +1243,37 @@ class ConversationDB:
 
             return None
 
-    def load_conversation(self, conversation_id: str) -> Optional[ConversationTree]:
+    @property
+    def conversation_index(self) -> ConversationIndex:
+        """Index for slug and ID-prefix resolution, persisted next to the DB."""
+        if self._conversation_index is None:
+            snapshot = (
+                self._index_dir / CONVERSATION_INDEX_FILE
+                if self._index_dir is not None
+                else None
+            )
+            self._conversation_index = ConversationIndex(self, snapshot_path=snapshot)
+        return self._conversation_index
+
+    def index_generation(self) -> Optional[int]:
+        """Change counter of conversation ids, slugs and titles (SQLite only)."""
+        if not self._is_sqlite:
+            return None
+        with self.session_scope() as session:
+            return read_generation(session.connection())
+
+    def load_conversation(
+        self, conversation_id: str, lazy: bool = False
+    ) -> Optional[ConversationTree]:
         """
         Load a conversation from the database
 
         Args:
             conversation_id: ID of the conversation to load
+            lazy: Load only the tree skeleton (ids, parents, roles,
+                timestamps, body lengths) and return a
+                :class:`LazyConversationTree` that fetches message bodies
+                on demand
 
         Returns:
             ConversationTree object or None if not found
@@ -807,79 +1284,145 @@ class ConversationDB:
             if not conv_model:
                 return None
 
-            # Create ConversationTree
-            metadata = ConversationMetadata.from_dict(conv_model.metadata_json or {})
-
-            # Columns are the single source of truth; override any blob values
-            metadata.version = conv_model.version or metadata.version
-            metadata.format = conv_model.format or metadata.format
-            metadata.source = conv_model.source
-            metadata.model = conv_model.model
-            metadata.project = conv_model.project
-            metadata.created_at = conv_model.created_at
-            metadata.updated_at = conv_model.updated_at
-            metadata.starred_at = conv_model.starred_at
-            metadata.pinned_at = conv_model.pinned_at
-            metadata.archived_at = conv_model.archived_at
-            metadata.slug = conv_model.slug
-            metadata.summary = conv_model.summary
-
-            # Load tags
-            metadata.tags = [tag.name for tag in conv_model.tags]
-
-            conversation = ConversationTree(
-                id=conv_model.id, title=conv_model.title, metadata=metadata
-            )
+            if lazy:
+                return self._load_skeleton(session, conv_model)
 
-            # Load messages and strip conversation ID prefix
+            # Load messages
             messages = (
                 session.query(MessageModel)
                 .filter_by(conversation_id=conversation_id)
                 .all()
             )
-
-            # Create mapping from unique IDs to original IDs
-            # Support both old format (conv_id_msg_id) and new format (conv_id::msg_id)
-            id_mapping = {}
-            for msg_model in messages:
-                # Strip conversation ID prefix to get original message ID
-                original_id = msg_model.id
-                # Try new format first (::)
-                new_prefix = f"{conversation_id}::"
-                old_prefix = f"{conversation_id}_"
-                if original_id.startswith(new_prefix):
-                    original_id = original_id[len(new_prefix) :]
-                elif original_id.startswith(old_prefix):
-                    # Backwards compatibility with old format
-                    original_id = original_id[len(old_prefix) :]
-                id_mapping[msg_model.id] = original_id
-
-            for msg_model in messages:
-                content = MessageContent.from_dict(msg_model.content_json)
-
-                # Get original IDs
-                original_id = id_mapping.get(msg_model.id, msg_model.id)
-                original_parent_id = None
-                if msg_model.parent_id:
-                    original_parent_id = id_mapping.get(
-                        msg_model.parent_id, msg_model.parent_id
-                    )
-
-                message = Message(
-                    id=original_id,
-                    role=MessageRole.from_string(msg_model.role.value),
-                    content=content,
-                    timestamp=msg_model.timestamp,
-                    parent_id=original_parent_id,
-                    metadata=msg_model.metadata_json or {},
-                )
-                conversation.add_message(message)
+            conversation = _tree_from_models(conv_model, messages)
 
             logger.info(
                 f"Loaded conversation {conversation_id} with {len(messages)} messages"
             )
             return conversation
 
+    def _load_skeleton(
+        self, session: Session, conv_model: ConversationModel
+    ) -> LazyConversationTree:
+        """Build a LazyConversationTree without reading any message body."""
+        conversation_id = conv_model.id
+        tree = _tree_header(conv_model, LazyConversationTree)
+        rows = (
+            session.query(
+                MessageModel.id,
+                MessageModel.parent_id,
+                MessageModel.role,
+                MessageModel.timestamp,
+                func.length(cast(MessageModel.content_json, String)),
+            )
+            .filter(MessageModel.conversation_id == conversation_id)
+            .all()
+        )
+        db_ids = {
+            db_id: _original_message_id(conversation_id, db_id) for db_id, *_ in rows
+        }
+        for db_id, parent_id, role, timestamp, length in rows:
+            message = Message(
+                id=db_ids[db_id],
+                role=MessageRole.from_string(role.value),
+                timestamp=timestamp,
+                parent_id=db_ids.get(parent_id, parent_id) if parent_id else None,
+            )
+            tree.add_message(message)
+            tree.mark_unloaded(message.id, length or 0)
+
+        tree.body_loader = functools.partial(
+            self._load_message_bodies, {orig: db_id for db_id, orig in db_ids.items()}
+        )
+        logger.info(
+            f"Loaded skeleton of conversation {conversation_id} "
+            f"with {len(rows)} messages"
+        )
+        return tree
+
+    def _load_message_bodies(
+        self, db_ids: Dict[str, str], message_ids: List[str]
+    ) -> Dict[str, Tuple[MessageContent, Dict[str, Any]]]:
+        """Fetch content and metadata for messages of a lazily loaded tree.
+
+        Args:
+            db_ids: Original message ID to stored (prefixed) ID
+            message_ids: Original IDs to fetch
+        """
+        original = {db_ids[mid]: mid for mid in message_ids if mid in db_ids}
+        bodies: Dict[str, Tuple[MessageContent, Dict[str, Any]]] = {}
+        with self.session_scope() as session:
+            for chunk in _chunked(list(original), SQL_IN_CHUNK_SIZE):
+                rows = session.query(
+                    MessageModel.id,
+                    MessageModel.content_json,
+                    MessageModel.metadata_json,
+                ).filter(MessageModel.id.in_(chunk))
+                for db_id, content_json, metadata_json in rows:
+                    bodies[original[db_id]] = (
+                        MessageContent.from_dict(content_json or {}),
+                        metadata_json or {},
+                    )
+        return bodies
+
+    def load_conversations(
+        self, conversation_ids: Iterable[str], *, fields: str = "full"
+    ) -> Dict[str, ConversationTree]:
+        """
+        Load many conversations with a handful of batched queries
+
+        Conversations and their tags come from one IN-list query per
+        ``SQL_IN_CHUNK_SIZE`` ids, messages from one more per chunk, and
+        the trees are rebuilt in a single pass. Use this instead of calling
+        ``load_conversation`` in a loop.
+
+        Args:
+            conversation_ids: IDs to load; duplicates are collapsed
+            fields: ``"full"`` loads every message, ``"header"`` loads only
+                the title and metadata (``message_map`` stays empty)
+
+        Returns:
+            Dict of ID to ConversationTree in request order; IDs that don't
+            exist are omitted
+        """
+        if fields not in ("full", "header"):
+            raise ValueError(f"fields must be 'full' or 'header', got {fields!r}")
+        ids = list(dict.fromkeys(conversation_ids))
+        if not ids:
+            return {}
+
+        with self.session_scope() as session:
+            conv_models: Dict[str, ConversationModel] = {}
+            for chunk in _chunked(ids, SQL_IN_CHUNK_SIZE):
+                rows = (
+                    session.query(ConversationModel)
+                    .options(selectinload(ConversationModel.tags))
+                    .filter(ConversationModel.id.in_(chunk))
+                    .all()
+                )
+                conv_models.update((row.id, row) for row in rows)
+
+            messages: Dict[str, List[MessageModel]] = {}
+            if fields == "full":
+                found = [cid for cid in ids if cid in conv_models]
+                for chunk in _chunked(found, SQL_IN_CHUNK_SIZE):
+                    rows = (
+                        session.query(MessageModel)
+                        .filter(MessageModel.conversation_id.in_(chunk))
+                        .all()
+                    )
+                    for msg_model in rows:
+                        messages.setdefault(msg_model.conversation_id, []).append(
+                            msg_model
+                        )
+
+            loaded = {
+                cid: _tree_from_models(conv_models[cid], messages.get(cid, []))
+                for cid in ids
+                if cid in conv_models
+            }
+            logger.debug(f"Loaded {len(loaded)} of {len(ids)} conversations ({fields})")
+            return loaded
+
     def resolve_conversation(self, id_or_slug: str) -> Optional[str]:
         """
         Resolve a conversation ID, slug, or partial ID/slug to a full conversation ID.
@@ -1075,16 +1618,11 @@ class ConversationDB:
         use_cursor = cursor is not None
 
         with self.session_scope() as session:
-            # Select scalar columns + aggregate message count in a single query.
-            # selectinload(tags) issues one extra batched SELECT for all loaded
-            # conversations, eliminating the per-row N+1 lazy loads.
-            query = (
-                session.query(
-                    ConversationModel,
-                    func.count(MessageModel.id).label("message_count"),
-                )
-                .outerjoin(MessageModel)
-                .options(selectinload(ConversationModel.tags))
+            # message_count is a denormalized column, so pages never join
+            # messages. selectinload(tags) issues one extra batched SELECT for
+            # all loaded conversations, eliminating per-row N+1 lazy loads.
+            query = session.query(ConversationModel).options(
+                selectinload(ConversationModel.tags)
             )
 
             # Apply shared WHERE-clause filters.
@@ -1108,9 +1646,6 @@ class ConversationDB:
                 else:
                     query = query.filter(ConversationModel.is_branching.is_(False))
 
-            # GROUP BY for the message-count aggregate.
-            query = query.group_by(ConversationModel.id)
-
             if use_cursor:
                 # Cursor-based (keyset) pagination
                 # Order by updated_at DESC, id DESC for deterministic ordering
@@ -1122,15 +1657,15 @@ class ConversationDB:
                 # Apply cursor filter (skip items already seen)
                 if cursor:  # non-empty cursor = subsequent page
                     cursor_ts, cursor_id = decode_cursor(cursor)
-                    # Format timestamp as string matching SQLite storage format
+                    # Format timestamp as strings matching SQLite storage format
                     # to avoid Python 3.12+ datetime adapter format mismatch
                     # (isoformat uses 'T' separator, SQLite uses space)
-                    cursor_ts_str = cursor_ts.strftime("%Y-%m-%d %H:%M:%S")
+                    ts_low, ts_high = _cursor_bounds(cursor_ts)
                     query = query.filter(
                         or_(
-                            ConversationModel.updated_at < cursor_ts_str,
+                            ConversationModel.updated_at < ts_low,
                             and_(
-                                ConversationModel.updated_at == cursor_ts_str,
+                                ConversationModel.updated_at.in_([ts_low, ts_high]),
                                 ConversationModel.id < cursor_id,
                             ),
                         )
@@ -1143,11 +1678,11 @@ class ConversationDB:
                 if has_more:
                     rows = rows[:page_size]
 
-                items = [_summary_from_row(conv, msg_count) for conv, msg_count in rows]
+                items = [_summary_from_row(conv) for conv in rows]
 
                 next_cursor = None
                 if has_more and rows:
-                    last_conv = rows[-1][0]
+                    last_conv = rows[-1]
                     next_cursor = encode_cursor(last_conv.updated_at, last_conv.id)
 
                 return PaginatedResult(
@@ -1166,7 +1701,7 @@ class ConversationDB:
                     query = query.limit(limit)
                 rows = query.offset(offset).all()
 
-                return [_summary_from_row(conv, msg_count) for conv, msg_count in rows]
+                return [_summary_from_row(conv) for conv in rows]
 
     def count_conversations(
         self,
@@ -1277,6 +1812,126 @@ class ConversationDB:
         finally:
             session.close()
 
+    def iter_tree_batches(
+        self,
+        *,
+        source: Optional[str] = None,
+        project: Optional[str] = None,
+        tag: Optional[str] = None,
+        tags: Optional[List[str]] = None,
+        model: Optional[str] = None,
+        archived: Optional[bool] = None,
+        starred: Optional[bool] = None,
+        pinned: Optional[bool] = None,
+        include_archived: bool = True,
+        where: Optional[Sequence[Any]] = None,
+        order: str = "id",
+        limit: Optional[int] = None,
+        batch_size: int = LOAD_BATCH_SIZE,
+        fields: str = "full",
+    ) -> Iterator[List[ConversationTree]]:
+        """
+        Walk matching conversations as full trees, one batch at a time.
+
+        Pages with a keyset (``WHERE id > :last``) rather than OFFSET, so
+        each page costs the same however deep the walk is, and every batch
+        is loaded with ``load_conversations``. Each page runs in its own
+        short session; memory stays bounded by ``batch_size`` trees.
+
+        Args:
+            source, project, tag, tags, model, archived, starred, pinned:
+                Same filters as ``list_conversations``
+            include_archived: Include archived conversations (default True,
+                since this is meant for whole-store operations)
+            where: Extra SQLAlchemy WHERE clauses ANDed onto the page query
+            order: ``"id"`` walks by primary key, which stays stable while
+                other writers update rows; ``"updated"`` walks newest first
+                by ``(updated_at, id)``
+            limit: Maximum number of conversations (None = all)
+            batch_size: Conversations per batch
+            fields: Passed to ``load_conversations`` (``"full"``/``"header"``)
+
+        Yields:
+            Lists of ConversationTree, at most ``batch_size`` long
+        """
+        if order not in ("id", "updated"):
+            raise ValueError(f"order must be 'id' or 'updated', got {order!r}")
+        if batch_size < 1:
+            raise ValueError("batch_size must be at least 1")
+
+        remaining = limit
+        last: Optional[Tuple[Optional[datetime], str]] = None
+        while remaining is None or remaining > 0:
+            page_size = batch_size if remaining is None else min(batch_size, remaining)
+            with self.session_scope() as session:
+                query = session.query(
+                    ConversationModel.id, ConversationModel.updated_at
+                )
+                query = self._apply_conversation_filters(
+                    query,
+                    starred=starred,
+                    pinned=pinned,
+                    archived=archived,
+                    source=source,
+                    project=project,
+                    model=model,
+                    tag=tag,
+                    tags=tags,
+                    include_archived=include_archived,
+                )
+                for clause in where or ():
+                    query = query.filter(clause)
+
+                if order == "id":
+                    if last is not None:
+                        query = query.filter(ConversationModel.id > last[1])
+                    query = query.order_by(ConversationModel.id)
+                else:
+                    last_ts, last_id = last if last is not None else (None, None)
+                    if last_id is not None and last_ts is None:
+                        # NULL timestamps sort last; only the id tiebreak is left
+                        query = query.filter(
+                            ConversationModel.updated_at.is_(None),
+                            ConversationModel.id < last_id,
+                        )
+                    elif last_id is not None and last_ts is not None:
+                        ts_low, ts_high = _cursor_bounds(last_ts)
+                        query = query.filter(
+                            or_(
+                                ConversationModel.updated_at < ts_low,
+                                ConversationModel.updated_at.is_(None),
+                                and_(
+                                    ConversationModel.updated_at.in_([ts_low, ts_high]),
+                                    ConversationModel.id < last_id,
+                                ),
+                            )
+                        )
+                    query = query.order_by(
+                        ConversationModel.updated_at.desc(),
+                        ConversationModel.id.desc(),
+                    )
+                rows = query.limit(page_size).all()
+
+            if not rows:
+                return
+            last = (rows[-1].updated_at, rows[-1].id)
+            loaded = self.load_conversations([row.id for row in rows], fields=fields)
+            if loaded:
+                yield list(loaded.values())
+            if remaining is not None:
+                remaining -= len(rows)
+            if len(rows) < page_size:
+                return
+
+    def iter_trees(self, **kwargs: Any) -> Iterator[ConversationTree]:
+        """
+        Yield matching conversations as full ConversationTrees.
+
+        Flattened ``iter_tree_batches``; accepts the same keyword arguments.
+        """
+        for batch in self.iter_tree_batches(**kwargs):
+            yield from batch
+
     def iter_search_results(
         self,
         query_text: Optional[str] = None,
@@ -1298,6 +1953,7 @@ class ConversationDB:
         order_by: str = "updated_at",
         ascending: bool = False,
         chunk_size: int = 100,
+        rank_aggregate: str = "max",
     ) -> "Generator[ConversationSummary, None, None]":
         """
         Generator version of search_conversations.
@@ -1305,9 +1961,10 @@ class ConversationDB:
         Yields ConversationSummary objects one at a time, enabling
         memory-efficient processing of large result sets.
 
-        Note: Due to GROUP BY in the query (for message_count),
-        results are materialized from the database but yielded
-        one at a time to consumers.
+        Message counts come from the denormalized ``message_count``
+        column, so there is no GROUP BY and rows are streamed with
+        ``yield_per(chunk_size)``. Full-text hits carry ``score`` and
+        ``snippet``; excerpts are looked up once per chunk.
 
         Args:
             query_text: Text to search for
@@ -1316,99 +1973,33 @@ class ConversationDB:
             content_only: Search only in message content
             date_from: Filter by created after date
             date_to: Filter by created before date
-            source: Filter by source platform
-            project: Filter by project name
-            model: Filter by model used
-            tags: Filter by tags (any match)
-            min_messages: Minimum number of messages
-            max_messages: Maximum number of messages
-            archived: Filter by archived status
-            starred: Filter by starred status
-            pinned: Filter by pinned status
-            include_archived: Include archived conversations
-            order_by: Field to order by
-            ascending: Sort order
-            chunk_size: Batch size hint (used for future optimization)
-
-        Yields:
-            ConversationSummary objects
-        """
-        # Try FTS5 search first if text query provided
-        fts_ids = None
-        if query_text and self._has_fts:
-            try:
-                search_limit = (limit or DEFAULT_SEARCH_LIMIT) + SEARCH_BUFFER
-                fts_ids = self._search_fts5(
-                    query_text,
-                    title_only=title_only,
-                    content_only=content_only,
-                    limit=search_limit,
-                )
-                if not fts_ids:
-                    # Zero FTS hits: fall through to LIKE so tokenization
-                    # differences do not produce false "no results". Only a
-                    # non-empty query that yields zero FTS ids triggers this;
-                    # the empty-query case never enters this branch.
-                    fts_ids = None
-            except Exception as e:
-                logger.debug(f"FTS5 search failed, falling back to LIKE: {e}")
-                fts_ids = None
-
-        session = self.Session()
-        try:
-            # Base query with message count
-            query = session.query(
-                ConversationModel,
-                func.count(MessageModel.id).label("message_count"),
-            ).outerjoin(MessageModel)
-
-            # Text search
-            if query_text:
-                like_pattern = f"%{_escape_like(query_text)}%"
-                if fts_ids is not None:
-                    query = query.filter(ConversationModel.id.in_(fts_ids))
-                elif title_only:
-                    query = query.filter(
-                        ConversationModel.title.ilike(like_pattern, escape="\\")
-                    )
-                elif content_only:
-                    if self._is_sqlite:
-                        query = query.filter(
-                            text(
-                                "json_extract(messages.content_json, '$.text') "
-                                "LIKE :query ESCAPE '\\'"
-                            )
-                        ).params(query=like_pattern)
-                    else:
-                        query = query.filter(
-                            MessageModel.content_json["text"].astext.ilike(
-                                like_pattern, escape="\\"
-                            )
-                        )
-                else:
-                    if self._is_sqlite:
-                        query = query.filter(
-                            or_(
-                                ConversationModel.title.ilike(
-                                    like_pattern, escape="\\"
-                                ),
-                                text(
-                                    "json_extract(messages.content_json, "
-                                    "'$.text') LIKE :query ESCAPE '\\'"
-                                ),
-                            )
-                        ).params(query=like_pattern)
-                    else:
-                        query = query.filter(
-                            or_(
-                                ConversationModel.title.ilike(
-                                    like_pattern, escape="\\"
-                                ),
-                                MessageModel.content_json["text"].astext.ilike(
-                                    like_pattern, escape="\\"
-                                ),
-                            )
-                        )
+            source: Filter by source platform
+            project: Filter by project name
+            model: Filter by model used
+            tags: Filter by tags (any match)
+            min_messages: Minimum number of messages
+            max_messages: Maximum number of messages
+            archived: Filter by archived status
+            starred: Filter by starred status
+            pinned: Filter by pinned status
+            include_archived: Include archived conversations
+            order_by: Field to order by ('relevance' ranks full-text hits)
+            ascending: Sort order
+            chunk_size: Rows fetched from the database per round trip
+            rank_aggregate: Combine message scores by 'max' or 'sum'
+
+        Yields:
+            ConversationSummary objects
+        """
+        session = self.Session()
+        try:
+            # message_count is a denormalized column: no join on messages
+            query = session.query(ConversationModel).options(
+                selectinload(ConversationModel.tags)
+            )
+            query, ranked, fts_query = self._apply_text_search(
+                query, query_text, title_only, content_only, rank_aggregate
+            )
 
             # Date filters
             if date_from:
@@ -1430,8 +2021,8 @@ class ConversationDB:
 
             # Tag filters
             if tags:
-                query = query.join(ConversationModel.tags).filter(
-                    TagModel.name.in_(tags)
+                query = query.filter(
+                    ConversationModel.tags.any(TagModel.name.in_(tags))
                 )
 
             # Archive filtering
@@ -1454,14 +2045,11 @@ class ConversationDB:
             elif pinned is False:
                 query = query.filter(ConversationModel.pinned_at.is_(None))
 
-            # Group by for message count
-            query = query.group_by(ConversationModel.id)
-
-            # Message count filters
+            # Message count filters (denormalized column, indexed)
             if min_messages is not None:
-                query = query.having(func.count(MessageModel.id) >= min_messages)
+                query = query.filter(ConversationModel.message_count >= min_messages)
             if max_messages is not None:
-                query = query.having(func.count(MessageModel.id) <= max_messages)
+                query = query.filter(ConversationModel.message_count <= max_messages)
 
             # Ordering
             order_field = {
@@ -1470,7 +2058,13 @@ class ConversationDB:
                 "title": ConversationModel.title,
             }.get(order_by, ConversationModel.updated_at)
 
-            if ascending:
+            if ranked is not None:
+                query = query.add_columns(ranked.c.relevance)
+            if ranked is not None and order_by == "relevance":
+                query = query.order_by(
+                    ranked.c.relevance.desc(), ConversationModel.id.asc()
+                )
+            elif ascending:
                 query = query.order_by(order_field.asc(), ConversationModel.id.asc())
             else:
                 query = query.order_by(order_field.desc(), ConversationModel.id.desc())
@@ -1478,12 +2072,24 @@ class ConversationDB:
             if limit is not None:
                 query = query.limit(limit)
 
-            # GROUP BY prevents efficient yield_per, so materialize
-            # but yield one at a time for streaming consumer interface
-            for conv, msg_count in query.all():
-                conv_dict = conv.to_dict()
-                conv_dict["message_count"] = msg_count
-                yield ConversationSummary.from_dict(conv_dict)
+            if ranked is None:
+                for conv in query.yield_per(chunk_size):
+                    yield _summary_from_row(conv)
+                return
+
+            conn = session.connection()
+            batch: List[Any] = []
+            for row in query.yield_per(chunk_size):
+                batch.append(tuple(row))
+                if len(batch) >= chunk_size:
+                    yield from self._ranked_summaries(
+                        conn, batch, fts_query, title_only, content_only
+                    )
+                    batch = []
+            if batch:
+                yield from self._ranked_summaries(
+                    conn, batch, fts_query, title_only, content_only
+                )
         finally:
             session.close()
 
@@ -1511,6 +2117,7 @@ class ConversationDB:
         ascending: bool = False,
         cursor: Optional[str] = None,
         page_size: int = 50,
+        rank_aggregate: str = "max",
     ) -> Union[List["ConversationSummary"], "PaginatedResult"]:
         """
         Advanced search with multiple filters
@@ -1534,8 +2141,14 @@ class ConversationDB:
             starred: If True, show only starred; if False, only non-starred; if None, both
             pinned: If True, show only pinned; if False, only non-pinned; if None, both
             include_archived: If True, include archived conversations (default: exclude)
-            order_by: Field to order by (created_at, updated_at, title, message_count)
+            order_by: Field to order by (created_at, updated_at, title,
+                message_count, relevance). 'relevance' ranks full-text hits by
+                BM25 (best first, ``ascending`` is ignored) and pages by
+                (score, id); without a text query it falls back to updated_at.
             ascending: Sort order
+            cursor: Keyset cursor ('' = first page); returns PaginatedResult
+            page_size: Results per page in cursor mode
+            rank_aggregate: Combine message scores by 'max' or 'sum'
 
         Returns:
             List of ConversationSummary objects, or PaginatedResult when cursor is used
@@ -1544,86 +2157,19 @@ class ConversationDB:
 
         use_cursor = cursor is not None
 
-        # Try FTS5 search first if text query provided and FTS5 available
-        fts_ids = None
-        if query_text and self._has_fts:
-            try:
-                # FTS5 yields a bounded candidate pool. In cursor mode
-                # that caps total reachable text-search results at
-                # ~limit+SEARCH_BUFFER regardless of how many pages a
-                # caller walks; paging past that ceiling would need a
-                # cursor-aware FTS query (tracked as a known limitation).
-                fts_ids = self._search_fts5(
-                    query_text,
-                    title_only=title_only,
-                    content_only=content_only,
-                    limit=limit + offset + SEARCH_BUFFER,
-                )
-                if not fts_ids:
-                    # Zero FTS hits: fall through to LIKE so tokenization
-                    # differences do not produce false "no results". Only a
-                    # non-empty query that yields zero FTS ids triggers this;
-                    # the empty-query case never enters this branch.
-                    fts_ids = None
-            except Exception as e:
-                logger.debug(f"FTS5 search failed, falling back to LIKE: {e}")
-                fts_ids = None
-
         with self.session_scope() as session:
-            # Base query with message count
-            query = session.query(
-                ConversationModel, func.count(MessageModel.id).label("message_count")
-            ).outerjoin(MessageModel)
-
-            # Text search - use FTS5 results or fall back to LIKE
-            if query_text:
-                like_pattern = f"%{_escape_like(query_text)}%"
-                if fts_ids is not None:
-                    # Use pre-computed FTS5 results
-                    query = query.filter(ConversationModel.id.in_(fts_ids))
-                elif title_only:
-                    query = query.filter(
-                        ConversationModel.title.ilike(like_pattern, escape="\\")
-                    )
-                elif content_only:
-                    if self._is_sqlite:
-                        query = query.filter(
-                            text(
-                                "json_extract(messages.content_json, '$.text') "
-                                "LIKE :query ESCAPE '\\'"
-                            )
-                        ).params(query=like_pattern)
-                    else:
-                        query = query.filter(
-                            MessageModel.content_json["text"].astext.ilike(
-                                like_pattern, escape="\\"
-                            )
-                        )
-                else:
-                    # Search both title and content (LIKE fallback)
-                    if self._is_sqlite:
-                        query = query.filter(
-                            or_(
-                                ConversationModel.title.ilike(
-                                    like_pattern, escape="\\"
-                                ),
-                                text(
-                                    "json_extract(messages.content_json, "
-                                    "'$.text') LIKE :query ESCAPE '\\'"
-                                ),
-                            )
-                        ).params(query=like_pattern)
-                    else:
-                        query = query.filter(
-                            or_(
-                                ConversationModel.title.ilike(
-                                    like_pattern, escape="\\"
-                                ),
-                                MessageModel.content_json["text"].astext.ilike(
-                                    like_pattern, escape="\\"
-                                ),
-                            )
-                        )
+            # message_count is a denormalized column: no join on messages
+            query = session.query(ConversationModel).options(
+                selectinload(ConversationModel.tags)
+            )
+            # FTS5 hits are joined to their ranking subquery, so every hit
+            # is reachable by offset or cursor (no candidate-pool ceiling)
+            query, ranked, fts_query = self._apply_text_search(
+                query, query_text, title_only, content_only, rank_aggregate
+            )
+            by_relevance = ranked is not None and order_by == "relevance"
+            if ranked is not None:
+                query = query.add_columns(ranked.c.relevance)
 
             # Date filters
             if date_from:
@@ -1645,8 +2191,8 @@ class ConversationDB:
 
             # Tag filters
             if tags:
-                query = query.join(ConversationModel.tags).filter(
-                    TagModel.name.in_(tags)
+                query = query.filter(
+                    ConversationModel.tags.any(TagModel.name.in_(tags))
                 )
 
             # Archive filtering
@@ -1672,14 +2218,11 @@ class ConversationDB:
             elif pinned is False:
                 query = query.filter(ConversationModel.pinned_at.is_(None))
 
-            # Group by for message count
-            query = query.group_by(ConversationModel.id)
-
-            # Message count filters
+            # Message count filters (denormalized column, indexed)
             if min_messages is not None:
-                query = query.having(func.count(MessageModel.id) >= min_messages)
+                query = query.filter(ConversationModel.message_count >= min_messages)
             if max_messages is not None:
-                query = query.having(func.count(MessageModel.id) <= max_messages)
+                query = query.filter(ConversationModel.message_count <= max_messages)
 
             # Branching filter: use denormalized is_branching column (set at save time)
             if has_branches is not None:
@@ -1695,19 +2238,49 @@ class ConversationDB:
                 "title": ConversationModel.title,
             }.get(order_by, ConversationModel.updated_at)
 
-            if use_cursor:
+            if use_cursor and by_relevance:
+                # Keyset over (relevance DESC, id ASC)
+                if cursor:
+                    cursor_score, cursor_id = decode_rank_cursor(cursor)
+                    query = query.filter(
+                        or_(
+                            ranked.c.relevance < cursor_score,
+                            and_(
+                                ranked.c.relevance == cursor_score,
+                                ConversationModel.id > cursor_id,
+                            ),
+                        )
+                    )
+                query = query.order_by(
+                    ranked.c.relevance.desc(), ConversationModel.id.asc()
+                )
+                rows = [tuple(row) for row in query.limit(page_size + 1).all()]
+                has_more = len(rows) > page_size
+                rows = rows[:page_size]
+                next_cursor = None
+                if has_more and rows:
+                    last_conv, last_score = rows[-1]
+                    next_cursor = encode_rank_cursor(last_score, last_conv.id)
+                return PaginatedResult(
+                    items=self._ranked_summaries(
+                        session.connection(), rows, fts_query, title_only, content_only
+                    ),
+                    next_cursor=next_cursor,
+                    has_more=has_more,
+                )
+            elif use_cursor:
                 # Cursor-based (keyset) pagination
                 # Apply cursor filter
                 if cursor:  # non-empty = subsequent page
                     cursor_ts, cursor_id = decode_cursor(cursor)
-                    # Format timestamp as string matching SQLite storage format
-                    cursor_ts_str = cursor_ts.strftime("%Y-%m-%d %H:%M:%S")
+                    # Format timestamp as strings matching SQLite storage format
+                    ts_low, ts_high = _cursor_bounds(cursor_ts)
                     if ascending:
                         query = query.filter(
                             or_(
-                                order_field > cursor_ts_str,
+                                order_field > ts_high,
                                 and_(
-                                    order_field == cursor_ts_str,
+                                    order_field.in_([ts_low, ts_high]),
                                     ConversationModel.id > cursor_id,
                                 ),
                             )
@@ -1715,9 +2288,9 @@ class ConversationDB:
                     else:
                         query = query.filter(
                             or_(
-                                order_field < cursor_ts_str,
+                                order_field < ts_low,
                                 and_(
-                                    order_field == cursor_ts_str,
+                                    order_field.in_([ts_low, ts_high]),
                                     ConversationModel.id < cursor_id,
                                 ),
                             )
@@ -1739,15 +2312,13 @@ class ConversationDB:
                 if has_more:
                     results = results[:page_size]
 
-                items = []
-                for conv, msg_count in results:
-                    conv_dict = conv.to_dict()
-                    conv_dict["message_count"] = msg_count
-                    items.append(ConversationSummary.from_dict(conv_dict))
+                items = self._page_summaries(
+                    session, results, ranked, fts_query, title_only, content_only
+                )
 
                 next_cursor = None
                 if has_more and results:
-                    last_conv = results[-1][0]
+                    last_conv = results[-1][0] if ranked is not None else results[-1]
                     last_sort_val = getattr(last_conv, order_by, last_conv.updated_at)
                     next_cursor = encode_cursor(last_sort_val, last_conv.id)
 
@@ -1758,11 +2329,21 @@ class ConversationDB:
                 )
             else:
                 # Traditional offset/limit pagination
-                if order_by == "message_count":
+                if by_relevance:
+                    query = query.order_by(
+                        ranked.c.relevance.desc(), ConversationModel.id.asc()
+                    )
+                elif order_by == "message_count":
                     if ascending:
-                        query = query.order_by(text("message_count ASC"))
+                        query = query.order_by(
+                            ConversationModel.message_count.asc(),
+                            ConversationModel.id.asc(),
+                        )
                     else:
-                        query = query.order_by(text("message_count DESC"))
+                        query = query.order_by(
+                            ConversationModel.message_count.desc(),
+                            ConversationModel.id.desc(),
+                        )
                 else:
                     if ascending:
                         query = query.order_by(order_field.asc())
@@ -1771,13 +2352,9 @@ class ConversationDB:
 
                 results = query.offset(offset).limit(limit).all()
 
-                output = []
-                for conv, msg_count in results:
-                    conv_dict = conv.to_dict()
-                    conv_dict["message_count"] = msg_count
-                    output.append(ConversationSummary.from_dict(conv_dict))
-
-                return output
+                return self._page_summaries(
+                    session, results, ranked, fts_query, title_only, content_only
+                )
 
     def delete_conversation(self, conversation_id: str) -> bool:
         """
@@ -1789,17 +2366,50 @@ class ConversationDB:
         Returns:
             True if deleted, False if not found
         """
+        index = self.conversation_index if self._is_sqlite else None
+        if index is not None and not index.tracking:
+            index = None
+
         with self.session_scope() as session:
             conv_model = session.get(ConversationModel, conversation_id)
             if not conv_model:
                 return False
 
+            generation_before = (
+                read_generation(session.connection()) if index is not None else None
+            )
+            session.query(MessageMediaModel).filter(
+                MessageMediaModel.conversation_id == conversation_id
+            ).delete(synchronize_session=False)
             # Cascading delete will handle messages and paths
             session.delete(conv_model)
+            session.flush()
+            generation_after = (
+                read_generation(session.connection()) if index is not None else None
+            )
             session.commit()
+            if index is not None:
+                index.apply_changes(
+                    [], [conversation_id], generation_before, generation_after
+                )
+            self._embeddings_removed(conversation_id)
             logger.info(f"Deleted conversation {conversation_id}")
             return True
 
+    def get_referenced_media(self) -> Set[str]:
+        """Names of media/ files referenced by stored messages
+
+        Used by ``ctk db media-gc`` and exports; references left behind by
+        messages deleted elsewhere are ignored.
+        """
+        with self.session_scope() as session:
+            rows = (
+                session.query(MessageMediaModel.media)
+                .join(MessageModel, MessageModel.id == MessageMediaModel.message_id)
+                .distinct()
+            )
+            return {name for (name,) in rows}
+
     def archive_conversation(self, conversation_id: str, archive: bool = True) -> bool:
         """
         Archive or unarchive a conversation
@@ -2022,33 +2632,6 @@ class ConversationDB:
                 ],
             }
 
-    def _update_tags(
-        self, session: Session, conv_model: ConversationModel, tag_names: List[str]
-    ):
-        """Update tags for a conversation"""
-        # Clear existing tags
-        conv_model.tags = []
-
-        # Deduplicate tag names
-        unique_tag_names = list(set(tag_names))
-
-        # Add new tags
-        for tag_name in unique_tag_names:
-            # Get or create tag
-            tag = session.query(TagModel).filter_by(name=tag_name).first()
-            if not tag:
-                # Determine category from tag format
-                category = None
-                if ":" in tag_name:
-                    category = tag_name.split(":")[0]
-
-                tag = TagModel(name=tag_name, category=category)
-                session.add(tag)
-
-            # Only add if not already in tags (shouldn't happen after clear, but safe)
-            if tag not in conv_model.tags:
-                conv_model.tags.append(tag)
-
     def add_tags(self, conversation_id: str, tag_names: List[str]) -> bool:
         """
         Add tags to a conversation (appends to existing tags)
@@ -2289,24 +2872,31 @@ class ConversationDB:
         chunking_strategy: str = "message",
         aggregation_strategy: str = "weighted_mean",
         aggregation_weights: Optional[Dict[str, float]] = None,
+        dtype: str = EMBEDDING_STORAGE_DTYPE,
+        config_hash: Optional[str] = None,
+        content_hash: Optional[str] = None,
     ) -> int:
         """
         Save or update embedding for a conversation.
 
         Args:
             conversation_id: Conversation ID
-            embedding: Embedding vector
+            embedding: Embedding vector (list or NumPy array)
             model: Embedding model name
             provider: Provider name (e.g., 'ollama')
             chunking_strategy: How text was chunked
             aggregation_strategy: How chunks were aggregated
             aggregation_weights: Weights used for aggregation
+            dtype: Storage precision: 'float32', 'float16' or 'int8'
+            config_hash: ConversationEmbeddingConfig.to_hash() of the run
+            content_hash: Hash of the embedded content, used to detect
+                changes (see ctk.core.embedding_pipeline.content_hash)
 
         Returns:
             Embedding ID
 
         Raises:
-            ValueError: If conversation not found
+            ValueError: If conversation not found or dtype is unsupported
             SQLAlchemyError: On database errors
         """
         with self.session_scope() as session:
@@ -2332,12 +2922,12 @@ class ConversationDB:
 
             if existing:
                 # Update existing embedding
-                existing.embedding = embedding
-                existing.dimensions = len(embedding)
+                existing.set_vector(embedding, dtype)
                 existing.aggregation_weights = aggregation_weights
+                existing.config_hash = config_hash
+                existing.content_hash = content_hash
                 session.flush()
-                logger.info(f"Updated embedding for conversation {conversation_id}")
-                return existing.id
+                emb_id, action = existing.id, "Updated"
             else:
                 # Create new embedding
                 emb = EmbeddingModel(
@@ -2347,13 +2937,321 @@ class ConversationDB:
                     chunking_strategy=chunking_strategy,
                     aggregation_strategy=aggregation_strategy,
                     aggregation_weights=aggregation_weights,
-                    embedding=embedding,
-                    dimensions=len(embedding),
+                    config_hash=config_hash,
+                    content_hash=content_hash,
                 )
+                emb.set_vector(embedding, dtype)
                 session.add(emb)
                 session.flush()
-                logger.info(f"Created embedding for conversation {conversation_id}")
-                return emb.id
+                emb_id, action = emb.id, "Created"
+
+        # Only once committed: a rolled-back save must not reach loaded indexes
+        self._embeddings_saved([conversation_id], [embedding], provider, model)
+        logger.info(f"{action} embedding for conversation {conversation_id}")
+        return emb_id
+
+    def save_embeddings(
+        self,
+        embeddings: Iterable[Tuple[str, Any]],
+        model: str,
+        provider: str,
+        chunking_strategy: str = "message",
+        aggregation_strategy: str = "weighted_mean",
+        aggregation_weights: Optional[Dict[str, float]] = None,
+        dtype: str = EMBEDDING_STORAGE_DTYPE,
+        batch_size: int = SAVE_BATCH_SIZE,
+        config_hash: Optional[str] = None,
+        content_hashes: Optional[Dict[str, str]] = None,
+    ) -> int:
+        """
+        Save or update many embeddings, one transaction per batch.
+
+        Equivalent to calling :meth:`save_embedding` for each pair, but
+        existing rows are fetched once per batch instead of per vector.
+
+        Args:
+            embeddings: ``(conversation_id, vector)`` pairs
+            model: Embedding model name
+            provider: Provider name (e.g., 'ollama')
+            chunking_strategy: How text was chunked
+            aggregation_strategy: How chunks were aggregated
+            aggregation_weights: Weights used for aggregation
+            dtype: Storage precision: 'float32', 'float16' or 'int8'
+            batch_size: Embeddings per transaction
+            config_hash: ConversationEmbeddingConfig.to_hash() of the run
+            content_hashes: Conversation ID -> content hash
+
+        Returns:
+            Number of embeddings written
+
+        Raises:
+            ValueError: If a conversation is not found, dtype is unsupported
+                or batch_size < 1
+            SQLAlchemyError: On database errors
+        """
+        if batch_size < 1:
+            raise ValueError("batch_size must be at least 1")
+
+        written = 0
+        batch: List[Tuple[str, Any]] = []
+        for item in embeddings:
+            batch.append(item)
+            if len(batch) >= batch_size:
+                written += self._save_embedding_batch(
+                    batch,
+                    model,
+                    provider,
+                    chunking_strategy,
+                    aggregation_strategy,
+                    aggregation_weights,
+                    dtype,
+                    config_hash,
+                    content_hashes or {},
+                )
+                batch = []
+        if batch:
+            written += self._save_embedding_batch(
+                batch,
+                model,
+                provider,
+                chunking_strategy,
+                aggregation_strategy,
+                aggregation_weights,
+                dtype,
+                config_hash,
+                content_hashes or {},
+            )
+        return written
+
+    def _save_embedding_batch(
+        self,
+        batch: List[Tuple[str, Any]],
+        model: str,
+        provider: str,
+        chunking_strategy: str,
+        aggregation_strategy: str,
+        aggregation_weights: Optional[Dict[str, float]],
+        dtype: str,
+        config_hash: Optional[str],
+        content_hashes: Dict[str, str],
+    ) -> int:
+        """Write one batch of embeddings in a single transaction."""
+        # Later duplicates replace earlier ones
+        by_id: Dict[str, Any] = dict(batch)
+        conv_ids = list(by_id)
+
+        with self.session_scope() as session:
+            found: set = set()
+            existing: Dict[str, EmbeddingModel] = {}
+            for chunk in _chunked(conv_ids, SQL_IN_CHUNK_SIZE):
+                found.update(
+                    row[0]
+                    for row in session.query(ConversationModel.id).filter(
+                        ConversationModel.id.in_(chunk)
+                    )
+                )
+                for emb in session.query(EmbeddingModel).filter(
+                    EmbeddingModel.conversation_id.in_(chunk),
+                    EmbeddingModel.model == model,
+                    EmbeddingModel.provider == provider,
+                    EmbeddingModel.chunking_strategy == chunking_strategy,
+                    EmbeddingModel.aggregation_strategy == aggregation_strategy,
+                ):
+                    existing[emb.conversation_id] = emb
+
+            missing = [cid for cid in conv_ids if cid not in found]
+            if missing:
+                raise ValueError(f"Conversation {missing[0]} not found")
+
+            for conversation_id, embedding in by_id.items():
+                emb = existing.get(conversation_id)
+                if emb is None:
+                    emb = EmbeddingModel(
+                        conversation_id=conversation_id,
+                        model=model,
+                        provider=provider,
+                        chunking_strategy=chunking_strategy,
+                        aggregation_strategy=aggregation_strategy,
+                    )
+                    session.add(emb)
+                emb.aggregation_weights = aggregation_weights
+                emb.config_hash = config_hash
+                emb.content_hash = content_hashes.get(conversation_id)
+                emb.set_vector(embedding, dtype)
+            session.flush()
+
+        self._embeddings_saved(conv_ids, list(by_id.values()), provider, model)
+        logger.info(f"Saved {len(conv_ids)} embeddings")
+        return len(conv_ids)
+
+    def get_embedding_content_hashes(
+        self,
+        model: str,
+        provider: str,
+        chunking_strategy: str = "message",
+        aggregation_strategy: str = "weighted_mean",
+    ) -> Dict[str, Optional[str]]:
+        """
+        Content hash of every stored embedding for a configuration.
+
+        One query in place of a :meth:`get_embedding` call per conversation
+        when deciding what still needs embedding. Embeddings saved without
+        a hash map to None.
+
+        Returns:
+            Dict of conversation ID -> content hash
+        """
+        with self.session_scope() as session:
+            rows = session.query(
+                EmbeddingModel.conversation_id, EmbeddingModel.content_hash
+            ).filter(
+                EmbeddingModel.model == model,
+                EmbeddingModel.provider == provider,
+                EmbeddingModel.chunking_strategy == chunking_strategy,
+                EmbeddingModel.aggregation_strategy == aggregation_strategy,
+            )
+            return {conv_id: content for conv_id, content in rows}
+
+    def get_chunk_embeddings(
+        self,
+        text_hashes: Iterable[str],
+        provider: str,
+        model: str,
+        config_hash: str,
+    ) -> Dict[str, "np.ndarray"]:
+        """
+        Look up cached chunk embeddings by text hash.
+
+        Args:
+            text_hashes: Hashes of the chunk texts
+            provider: Provider name
+            model: Embedding model name
+            config_hash: ConversationEmbeddingConfig.chunk_hash()
+
+        Returns:
+            Dict of text hash -> float NumPy array, for the hashes found
+        """
+        hashes = list(dict.fromkeys(text_hashes))
+        found: Dict[str, "np.ndarray"] = {}
+        with self.session_scope() as session:
+            for chunk in _chunked(hashes, SQL_IN_CHUNK_SIZE):
+                for row in session.query(ChunkEmbeddingModel).filter(
+                    ChunkEmbeddingModel.text_hash.in_(chunk),
+                    ChunkEmbeddingModel.provider == provider,
+                    ChunkEmbeddingModel.model == model,
+                    ChunkEmbeddingModel.config_hash == config_hash,
+                ):
+                    found[row.text_hash] = row.embedding
+        return found
+
+    def save_chunk_embeddings(
+        self,
+        chunks: Iterable[Tuple[str, Any]],
+        provider: str,
+        model: str,
+        config_hash: str,
+        dtype: str = EMBEDDING_STORAGE_DTYPE,
+    ) -> int:
+        """
+        Add chunk embeddings to the cache; hashes already cached are kept.
+
+        Args:
+            chunks: ``(text_hash, vector)`` pairs
+            provider: Provider name
+            model: Embedding model name
+            config_hash: ConversationEmbeddingConfig.chunk_hash()
+            dtype: Storage precision: 'float32', 'float16' or 'int8'
+
+        Returns:
+            Number of chunk embeddings added
+        """
+        from .vectors import encode_vector
+
+        by_hash: Dict[str, Any] = dict(chunks)
+        if not by_hash:
+            return 0
+        with self.session_scope() as session:
+            for chunk in _chunked(list(by_hash), SQL_IN_CHUNK_SIZE):
+                for (text_hash,) in session.query(ChunkEmbeddingModel.text_hash).filter(
+                    ChunkEmbeddingModel.text_hash.in_(chunk),
+                    ChunkEmbeddingModel.provider == provider,
+                    ChunkEmbeddingModel.model == model,
+                    ChunkEmbeddingModel.config_hash == config_hash,
+                ):
+                    by_hash.pop(text_hash, None)
+
+            rows = []
+            for text_hash, vector in by_hash.items():
+                encoded = encode_vector(vector, dtype)
+                rows.append(
+                    {
+                        "text_hash": text_hash,
+                        "provider": provider,
+                        "model": model,
+                        "config_hash": config_hash,
+                        "vector": encoded.blob,
+                        "dtype": encoded.dtype,
+                        "scale": encoded.scale,
+                        "dimensions": encoded.dimensions,
+                    }
+                )
+            if rows:
+                session.execute(insert(ChunkEmbeddingModel), rows)
+        return len(rows)
+
+    def get_minhash_signatures(
+        self, config_hash: str
+    ) -> Dict[str, Tuple[Optional[datetime], bytes]]:
+        """
+        Cached MinHash signatures for a MinHasher configuration.
+
+        Returns:
+            Dict of conversation ID -> (updated_at it was computed from,
+            signature bytes)
+        """
+        with self.session_scope() as session:
+            rows = session.query(
+                MinHashSignatureModel.conversation_id,
+                MinHashSignatureModel.source_updated_at,
+                MinHashSignatureModel.signature,
+            ).filter(MinHashSignatureModel.config_hash == config_hash)
+            return {conv_id: (updated, blob) for conv_id, updated, blob in rows}
+
+    def save_minhash_signatures(
+        self,
+        signatures: Iterable[Tuple[str, Optional[datetime], bytes]],
+        config_hash: str,
+    ) -> int:
+        """
+        Store MinHash signatures, replacing older ones for the same configuration.
+
+        Args:
+            signatures: ``(conversation_id, source_updated_at, signature)``
+            config_hash: MinHasher.config_hash
+
+        Returns:
+            Number of signatures written
+        """
+        rows = [
+            {
+                "conversation_id": conv_id,
+                "config_hash": config_hash,
+                "source_updated_at": updated,
+                "signature": blob,
+            }
+            for conv_id, updated, blob in signatures
+        ]
+        if not rows:
+            return 0
+        ids = [row["conversation_id"] for row in rows]
+        with self.session_scope() as session:
+            for chunk in _chunked(ids, SQL_IN_CHUNK_SIZE):
+                session.query(MinHashSignatureModel).filter(
+                    MinHashSignatureModel.config_hash == config_hash,
+                    MinHashSignatureModel.conversation_id.in_(chunk),
+                ).delete(synchronize_session=False)
+            session.execute(insert(MinHashSignatureModel), rows)
+        return len(rows)
 
     def get_embedding(
         self,
@@ -2362,7 +3260,7 @@ class ConversationDB:
         provider: str,
         chunking_strategy: str = "message",
         aggregation_strategy: str = "weighted_mean",
-    ) -> Optional[List[float]]:
+    ) -> Optional["np.ndarray"]:
         """
         Get cached embedding for a conversation.
 
@@ -2374,7 +3272,8 @@ class ConversationDB:
             aggregation_strategy: Aggregation strategy used
 
         Returns:
-            Embedding vector or None if not found
+            Embedding as a float NumPy array (a read-only, zero-copy view
+            for float32 storage) or None if not found
         """
         with self.session_scope() as session:
             emb = (
@@ -2404,7 +3303,8 @@ class ConversationDB:
             provider: Filter by provider name
 
         Returns:
-            List of embedding dictionaries with conversation_id and embedding
+            List of embedding dictionaries with conversation_id, embedding
+            (float NumPy array), dtype and norm
         """
         with self.session_scope() as session:
             query = session.query(EmbeddingModel)
@@ -2426,6 +3326,8 @@ class ConversationDB:
                     "chunking_strategy": emb.chunking_strategy,
                     "aggregation_strategy": emb.aggregation_strategy,
                     "dimensions": emb.dimensions,
+                    "dtype": emb.dtype,
+                    "norm": emb.norm,
                     "created_at": emb.created_at,
                 }
                 for emb in embeddings
@@ -2459,8 +3361,209 @@ class ConversationDB:
                 query = query.filter(EmbeddingModel.provider == provider)
 
             count = query.delete()
-            logger.info(f"Deleted {count} embeddings")
-            return count
+
+        self._embeddings_removed(conversation_id, provider, model)
+        logger.info(f"Deleted {count} embeddings")
+        return count
+
+    def get_embedding_matrix(
+        self, provider: Optional[str] = None, model: Optional[str] = None
+    ) -> "EmbeddingMatrix":
+        """
+        Get all stored embeddings as one normalized in-memory matrix.
+
+        The matrix is cached per (provider, model) and rebuilt after
+        ``save_embedding``/``delete_embeddings`` or a write to the database
+        file from another connection, so repeated similarity queries cost a
+        matrix-vector product instead of a table scan.
+
+        Args:
+            provider: Only include embeddings from this provider
+            model: Only include embeddings from this model
+
+        Returns:
+            EmbeddingMatrix (empty if no embeddings match). Treat it as
+            read-only; it is shared between callers.
+        """
+        from .embedding_matrix import EmbeddingMatrix
+
+        self._check_data_version()
+
+        key = (provider, model)
+        matrix = self._embedding_matrices.get(key)
+        if matrix is None:
+            with self.session_scope() as session:
+                query = session.query(
+                    EmbeddingModel.conversation_id,
+                    EmbeddingModel.provider,
+                    EmbeddingModel.model,
+                    EmbeddingModel.vector,
+                    EmbeddingModel.dtype,
+                    EmbeddingModel.scale,
+                    EmbeddingModel.dimensions,
+                )
+                if model:
+                    query = query.filter(EmbeddingModel.model == model)
+                if provider:
+                    query = query.filter(EmbeddingModel.provider == provider)
+                matrix = EmbeddingMatrix.from_rows(query.order_by(EmbeddingModel.id))
+            self._embedding_matrices[key] = matrix
+        return matrix
+
+    def get_ann_index(
+        self, session_id: Optional[int] = None, backend: Optional[str] = None
+    ) -> Optional["VectorIndex"]:
+        """
+        Get the approximate nearest-neighbour index for an embedding session.
+
+        The index covers every stored embedding with the session's provider
+        and model. It is loaded from ``.ctk_indexes/`` when the saved copy
+        still matches the embeddings table; otherwise it is rebuilt and
+        saved. Once loaded, ``save_embedding`` and the delete methods keep
+        it up to date, and changes are written back on ``close()``.
+
+        Args:
+            session_id: Embedding session (default: the current one)
+            backend: Index backend (see ctk.embeddings.ann.BACKENDS);
+                defaults to hnswlib when installed, else the NumPy IVF index
+
+        Returns:
+            VectorIndex, or None if there is no session or no embeddings
+        """
+        from ctk.embeddings.ann import IndexStore, create_index
+
+        self._check_data_version()
+        if session_id is None:
+            session = self.get_current_embedding_session()
+        else:
+            session = self.get_embedding_session(session_id)
+        if not session:
+            return None
+
+        session_id = session["id"]
+        entry = self._ann_indexes.get(session_id)
+        if entry and backend in (None, entry["index"].backend):
+            return entry["index"]
+
+        provider = session["provider"]
+        model = session["model"] or provider
+        fingerprint = self._embedding_fingerprint(provider, model)
+        store = IndexStore(self._index_dir) if self._index_dir else None
+
+        index = store.load(session_id) if store else None
+        if index is not None and (
+            index.metadata.get("fingerprint") != fingerprint
+            or backend not in (None, index.backend)
+        ):
+            index = None
+
+        if index is None:
+            matrix = self.get_embedding_matrix(provider=provider, model=model)
+            if not len(matrix):
+                return None
+            index = create_index(matrix.dimensions, backend)
+            index.add(matrix.ids, matrix.matrix)
+            index.metadata["fingerprint"] = fingerprint
+            if store:
+                store.save(session_id, index)
+            logger.info(
+                f"Built {index.backend} index for embedding session {session_id} "
+                f"({len(index)} vectors)"
+            )
+
+        self._ann_indexes[session_id] = {
+            "index": index,
+            "provider": provider,
+            "model": model,
+            "dirty": False,
+        }
+        return index
+
+    def flush_ann_indexes(self) -> None:
+        """Write loaded ANN indexes that changed since they were loaded."""
+        if self._index_dir is None:
+            return
+        from ctk.embeddings.ann import IndexStore
+
+        store = IndexStore(self._index_dir)
+        for session_id, entry in self._ann_indexes.items():
+            if not entry["dirty"]:
+                continue
+            index = entry["index"]
+            index.metadata["fingerprint"] = self._embedding_fingerprint(
+                entry["provider"], entry["model"]
+            )
+            store.save(session_id, index)
+            entry["dirty"] = False
+
+    def _embedding_fingerprint(self, provider: str, model: str) -> List[Any]:
+        """Cheap summary of the stored embeddings, used to detect stale indexes."""
+        with self.session_scope() as session:
+            count, max_id, total_norm = (
+                session.query(
+                    func.count(EmbeddingModel.id),
+                    func.max(EmbeddingModel.id),
+                    func.sum(EmbeddingModel.norm),
+                )
+                .filter(EmbeddingModel.provider == provider)
+                .filter(EmbeddingModel.model == model)
+                .one()
+            )
+        return [count, max_id, round(float(total_norm or 0.0), 6)]
+
+    def _embeddings_saved(
+        self,
+        conversation_ids: List[str],
+        embeddings: List[Any],
+        provider: str,
+        model: str,
+    ) -> None:
+        """Drop cached matrices and add the vectors to matching loaded indexes."""
+        self._embedding_matrices.clear()
+        for session_id, entry in list(self._ann_indexes.items()):
+            if (entry["provider"], entry["model"]) != (provider, model):
+                continue
+            try:
+                entry["index"].add(conversation_ids, embeddings)
+                entry["dirty"] = True
+            except ValueError:
+                # e.g. a different dimensionality; rebuild on next use
+                del self._ann_indexes[session_id]
+
+    def _embeddings_removed(
+        self,
+        conversation_id: Optional[str],
+        provider: Optional[str] = None,
+        model: Optional[str] = None,
+    ) -> None:
+        """Drop cached matrices and keep loaded indexes in step with a delete."""
+        self._embedding_matrices.clear()
+        for session_id, entry in list(self._ann_indexes.items()):
+            if provider and entry["provider"] != provider:
+                continue
+            if model and entry["model"] != model:
+                continue
+            if conversation_id:
+                if entry["index"].remove([conversation_id]):
+                    entry["dirty"] = True
+            else:
+                # Bulk delete: the saved copy's fingerprint no longer matches
+                del self._ann_indexes[session_id]
+
+    def _check_data_version(self) -> None:
+        """Drop embedding caches if another connection committed since last use."""
+        version = self._get_data_version()
+        if version != self._embedding_data_version:
+            self._embedding_matrices.clear()
+            self._ann_indexes.clear()
+            self._embedding_data_version = version
+
+    def _get_data_version(self) -> Optional[int]:
+        """SQLite's PRAGMA data_version; changes when another connection commits."""
+        if not self._is_sqlite:
+            return None
+        with self.engine.connect() as conn:
+            return conn.execute(text("PRAGMA data_version")).scalar()
 
     # ==================== Similarity Methods ====================
 
@@ -3042,8 +4145,29 @@ class ConversationDB:
             all_tags = session.query(TagModel.name).all()
             return sorted([t[0] for t in all_tags])
 
+    def get_connection_settings(self) -> Dict[str, Any]:
+        """
+        Report the active tuning profile and the live PRAGMA values.
+
+        Returns:
+            Dict with ``profile`` (None for non-SQLite backends) and
+            ``pragmas`` mapping each tuned PRAGMA to its current value
+        """
+        if self.profile is None:
+            return {"profile": None, "pragmas": {}}
+        with self.engine.connect() as conn:
+            pragmas = sqlite_profile.read_pragmas(conn)
+        return {"profile": self.profile, "pragmas": pragmas}
+
     def close(self):
         """Close database connection"""
+        try:
+            self.flush_ann_indexes()
+        except Exception as e:
+            logger.warning(f"Could not save ANN indexes: {e}")
+        if self._conversation_index is not None:
+            # Unmaps the snapshot file
+            self._conversation_index.invalidate()
         self.Session.remove()
         self.engine.dispose()
         logger.info("Database connection closed")
@@ -17,12 +17,12 @@ from sqlalchemy import (
     ForeignKey,
     Index,
     Integer,
+    LargeBinary,
     String,
     Table,
     Text,
     UniqueConstraint,
 )
-from sqlalchemy.ext.hybrid import hybrid_property
 from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column, relationship
 from sqlalchemy.sql import func
 
@@ -92,6 +92,15 @@ class ConversationModel(Base):
     # Maintained at save time; replaces the write-only PathModel path-count subquery.
     is_branching: Mapped[bool] = mapped_column(Boolean, default=False, index=True)
 
+    # Denormalized message statistics, maintained at save time so list and
+    # search pages never join messages. char_count sums the message text;
+    # token_count is its CHARS_PER_TOKEN estimate.
+    message_count: Mapped[int] = mapped_column(Integer, default=0)
+    char_count: Mapped[int] = mapped_column(Integer, default=0)
+    token_count: Mapped[int] = mapped_column(Integer, default=0)
+    last_message_at: Mapped[Optional[datetime]] = mapped_column(DateTime, nullable=True)
+    branch_count: Mapped[int] = mapped_column(Integer, default=0)
+
     # Full metadata as JSON (catch-all)
     metadata_json: Mapped[Optional[dict]] = mapped_column(JSON, nullable=True)
 
@@ -123,6 +132,8 @@ class ConversationModel(Base):
         Index("idx_conv_pinned", "pinned_at"),
         Index("idx_conv_archived", "archived_at"),
         Index("idx_conv_slug", "slug"),
+        Index("idx_conv_message_count", "message_count", "id"),
+        Index("idx_conv_last_message", "last_message_at"),
     )
 
     def to_dict(self) -> dict:
@@ -144,7 +155,13 @@ class ConversationModel(Base):
             "archived_at": self.archived_at.isoformat() if self.archived_at else None,
             "tags": [tag.name for tag in self.tags],
             "metadata": self.metadata_json or {},
-            "message_count": len(self.messages) if self.messages else 0,
+            "message_count": self.message_count or 0,
+            "char_count": self.char_count or 0,
+            "token_count": self.token_count or 0,
+            "last_message_at": (
+                self.last_message_at.isoformat() if self.last_message_at else None
+            ),
+            "branch_count": self.branch_count or 0,
         }
 
 
@@ -196,6 +213,26 @@ class MessageModel(Base):
         }
 
 
+class MessageMediaModel(Base):
+    """SQLAlchemy model linking messages to the media files they reference.
+
+    ``media`` is a file name inside the database's media/ directory (see
+    ctk.core.media_store); rows are rewritten with their conversation's
+    messages.
+    """
+
+    __tablename__ = "message_media"
+
+    message_id: Mapped[str] = mapped_column(String, primary_key=True)
+    media: Mapped[str] = mapped_column(String, primary_key=True)
+    conversation_id: Mapped[str] = mapped_column(String, ForeignKey("conversations.id"))
+
+    __table_args__ = (
+        Index("idx_message_media_media", "media"),
+        Index("idx_message_media_conversation", "conversation_id"),
+    )
+
+
 class TagModel(Base):
     """SQLAlchemy model for tags"""
 
@@ -308,12 +345,27 @@ class EmbeddingModel(Base):
         JSON, nullable=True
     )  # Role weights
 
-    # Embedding data
-    embedding_json: Mapped[list] = mapped_column(
-        JSON
-    )  # List of floats (numpy array serialized)
+    # Embedding data: raw little-endian vector (see ctk.core.vectors)
+    vector: Mapped[bytes] = mapped_column(LargeBinary)
+    dtype: Mapped[str] = mapped_column(
+        String, default="float32"
+    )  # 'float32', 'float16' or 'int8'
+    norm: Mapped[Optional[float]] = mapped_column(
+        Float, nullable=True
+    )  # L2 norm of the original vector
+    scale: Mapped[Optional[float]] = mapped_column(
+        Float, nullable=True
+    )  # int8 dequantization factor
     dimensions: Mapped[int] = mapped_column(Integer)  # Embedding dimensionality
 
+    # Change detection (see ctk.core.embedding_pipeline)
+    config_hash: Mapped[Optional[str]] = mapped_column(
+        String, nullable=True
+    )  # ConversationEmbeddingConfig.to_hash()
+    content_hash: Mapped[Optional[str]] = mapped_column(
+        String, nullable=True
+    )  # Hash of the chunk texts, weights and config
+
     # Timestamps
     created_at: Mapped[datetime] = mapped_column(DateTime, default=func.now())
 
@@ -338,19 +390,28 @@ class EmbeddingModel(Base):
         ),
     )
 
-    @hybrid_property
-    def embedding(self) -> list:
-        """Get embedding as list of floats"""
-        return self.embedding_json
+    @property
+    def embedding(self):
+        """Get embedding as a float NumPy array (zero-copy for float32)"""
+        from .vectors import decode_vector
+
+        return decode_vector(self.vector, self.dtype or "float32", self.scale)
 
-    @embedding.setter  # type: ignore[no-redef]  # mypy does not model hybrid_property setter
+    @embedding.setter
     def embedding(self, value):
-        """Set embedding from list of floats or numpy array"""
-        if hasattr(value, "tolist"):
-            # Convert numpy array to list
-            self.embedding_json = value.tolist()
-        else:
-            self.embedding_json = value
+        """Set embedding from list of floats or numpy array, keeping the dtype"""
+        self.set_vector(value, self.dtype or "float32")
+
+    def set_vector(self, value, dtype: str = "float32") -> None:
+        """Encode ``value`` into the vector columns using storage ``dtype``"""
+        from .vectors import encode_vector
+
+        encoded = encode_vector(value, dtype)
+        self.vector = encoded.blob
+        self.dtype = encoded.dtype
+        self.norm = encoded.norm
+        self.scale = encoded.scale
+        self.dimensions = encoded.dimensions
 
     def to_dict(self) -> dict:
         """Convert to dictionary"""
@@ -363,10 +424,78 @@ class EmbeddingModel(Base):
             "aggregation_strategy": self.aggregation_strategy,
             "aggregation_weights": self.aggregation_weights,
             "dimensions": self.dimensions,
+            "dtype": self.dtype,
+            "norm": self.norm,
+            "config_hash": self.config_hash,
+            "content_hash": self.content_hash,
             "created_at": self.created_at.isoformat() if self.created_at else None,
         }
 
 
+class ChunkEmbeddingModel(Base):
+    """SQLAlchemy model for cached embeddings of individual text chunks.
+
+    Keyed by the chunk text's hash, so unchanged messages are never sent to
+    the provider twice and conversation vectors can be re-aggregated.
+    """
+
+    __tablename__ = "embedding_chunks"
+
+    # Primary key
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
+
+    # Cache key
+    text_hash: Mapped[str] = mapped_column(String)  # SHA-256 of the chunk text
+    provider: Mapped[str] = mapped_column(String)
+    model: Mapped[str] = mapped_column(String)
+    config_hash: Mapped[str] = mapped_column(
+        String
+    )  # ConversationEmbeddingConfig.chunk_hash()
+
+    # Embedding data: raw little-endian vector (see ctk.core.vectors)
+    vector: Mapped[bytes] = mapped_column(LargeBinary)
+    dtype: Mapped[str] = mapped_column(String, default="float32")
+    scale: Mapped[Optional[float]] = mapped_column(Float, nullable=True)
+    dimensions: Mapped[int] = mapped_column(Integer)
+
+    # Timestamps
+    created_at: Mapped[datetime] = mapped_column(DateTime, default=func.now())
+
+    __table_args__ = (
+        UniqueConstraint(
+            "text_hash", "provider", "model", "config_hash", name="uq_embedding_chunk"
+        ),
+    )
+
+    @property
+    def embedding(self):
+        """Get embedding as a float NumPy array (zero-copy for float32)"""
+        from .vectors import decode_vector
+
+        return decode_vector(self.vector, self.dtype or "float32", self.scale)
+
+
+class MinHashSignatureModel(Base):
+    """SQLAlchemy model for cached MinHash signatures used by near-dedupe.
+
+    A signature is reused while the conversation's ``updated_at`` matches
+    the value it was computed from.
+    """
+
+    __tablename__ = "minhash_signatures"
+
+    conversation_id: Mapped[str] = mapped_column(
+        String, ForeignKey("conversations.id"), primary_key=True
+    )
+    config_hash: Mapped[str] = mapped_column(
+        String, primary_key=True
+    )  # MinHasher.config_hash
+    source_updated_at: Mapped[Optional[datetime]] = mapped_column(
+        DateTime, nullable=True
+    )
+    signature: Mapped[bytes] = mapped_column(LargeBinary)  # little-endian uint32
+
+
 class SimilarityModel(Base):
     """SQLAlchemy model for precomputed conversation similarities"""
 
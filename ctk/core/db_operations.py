@@ -11,10 +11,13 @@ from enum import Enum
 from pathlib import Path
 from typing import Any, Callable, Dict, Iterator, List, Optional, Set, Tuple
 
+import numpy as np
 from sqlalchemy import text
 
+from .constants import MINHASH_NUM_PERM
 from .database import ConversationDB
 from .db_models import ConversationModel, TagModel
+from .minhash import LSHIndex, MinHasher, estimate_jaccard, optimal_bands
 from .models import ConversationTree
 
 logger = logging.getLogger(__name__)
@@ -62,20 +65,53 @@ class DatabaseOperations:
         strategy: MergeStrategy = MergeStrategy.NEWEST,
         dedupe: DuplicateStrategy = DuplicateStrategy.EXACT,
         progress_callback: Optional[Callable] = None,
+        workers: Optional[int] = None,
     ) -> Dict[str, Any]:
         """
         Merge multiple databases into one.
 
+        SQLite inputs are scanned in parallel and copied row-for-row (see
+        ``merge_engine``); PostgreSQL endpoints fall back to a tree-by-tree
+        merge through the ORM.
+
         Args:
             input_dbs: List of database paths to merge
             output_db: Output database path
             strategy: How to resolve conflicts
             dedupe: Deduplication strategy
             progress_callback: Optional callback for progress updates
+            workers: Processes used to scan inputs (default: CPU count)
 
         Returns:
             Statistics about the merge operation
         """
+        if not any(
+            path.startswith("postgresql://") or path == ":memory:"
+            for path in [*input_dbs, output_db]
+        ):
+            from .merge_engine import parallel_merge
+
+            return parallel_merge(
+                input_dbs,
+                output_db,
+                strategy=strategy,
+                dedupe=dedupe,
+                workers=workers,
+                progress_callback=progress_callback,
+            )
+        return self._merge_trees(
+            input_dbs, output_db, strategy, dedupe, progress_callback
+        )
+
+    def _merge_trees(
+        self,
+        input_dbs: List[str],
+        output_db: str,
+        strategy: MergeStrategy,
+        dedupe: DuplicateStrategy,
+        progress_callback: Optional[Callable],
+    ) -> Dict[str, Any]:
+        """Merge by loading and re-saving whole conversation trees"""
         stats = {
             "total_input": 0,
             "total_output": 0,
@@ -99,6 +135,7 @@ class DatabaseOperations:
             with ConversationDB(db_path) as input_db:
                 # Stream conversations in batches
                 for batch in self._stream_conversations(input_db):
+                    pending: List[ConversationTree] = []
                     for conv in batch:
                         stats["total_input"] += 1
 
@@ -113,6 +150,12 @@ class DatabaseOperations:
                             if strategy == MergeStrategy.SKIP:
                                 continue
 
+                            # Conflicts compare against the output, so it
+                            # must reflect everything accepted so far
+                            if pending:
+                                output.save_conversations(pending)
+                                pending = []
+
                             # Resolve conflict
                             resolved = self._resolve_conflict(
                                 conv, output, duplicate_type, strategy
@@ -123,8 +166,8 @@ class DatabaseOperations:
                             stats["conflicts_resolved"] += 1
                             conv = resolved
 
-                        # Save conversation
-                        output.save_conversation(conv)
+                        # Queue conversation for the batch write
+                        pending.append(conv)
                         seen_ids.add(conv.id)
 
                         if seen_hashes is not None:
@@ -136,6 +179,8 @@ class DatabaseOperations:
                         if progress_callback:
                             progress_callback(stats)
 
+                    output.save_conversations(pending)
+
         output.close()
         return stats
 
@@ -190,8 +235,7 @@ class DatabaseOperations:
         # Save unique conversations if output specified
         if output_db and left_unique:
             output = ConversationDB(output_db)
-            for conv in left_unique:
-                output.save_conversation(conv)
+            output.save_conversations(left_unique)
             output.close()
 
         # If symmetric, also find right-unique
@@ -250,6 +294,7 @@ class DatabaseOperations:
         for db_path in input_dbs:
             with ConversationDB(db_path) as db:
                 for batch in self._stream_conversations(db):
+                    pending = []
                     for conv in batch:
                         key = self._get_comparison_key(conv, comparison)
 
@@ -259,13 +304,15 @@ class DatabaseOperations:
                         occurrences = len(occurrence_map[key])
 
                         if occurrences >= min_count:
-                            output.save_conversation(conv)
+                            pending.append(conv)
                             saved_keys.add(key)
 
                             if occurrences == len(input_dbs):
                                 stats["common_to_all"] += 1
                             stats["common_to_min"] += 1
 
+                    output.save_conversations(pending)
+
         output.close()
         return stats
 
@@ -302,37 +349,26 @@ class DatabaseOperations:
 
         output = ConversationDB(output_db)
 
-        with ConversationDB(input_db) as input:
-            # Build filter query
-            with input.session_scope() as session:
-                q = session.query(ConversationModel)
-
-                if source:
-                    q = q.filter(ConversationModel.source == source)
-
-                if after:
-                    q = q.filter(ConversationModel.updated_at >= after)
-
-                if before:
-                    q = q.filter(ConversationModel.updated_at <= before)
+        # Build filter clauses
+        where: List[Any] = []
+        if after:
+            where.append(ConversationModel.updated_at >= after)
+        if before:
+            where.append(ConversationModel.updated_at <= before)
+        for tag in tags or ():
+            where.append(ConversationModel.tags.any(TagModel.name == tag))
+        if query:
+            # Allow raw SQL for power users
+            where.append(text(query))
 
-                if tags:
-                    for tag in tags:
-                        q = q.join(ConversationModel.tags).filter(TagModel.name == tag)
-
-                if query:
-                    # Allow raw SQL for power users
-                    q = q.filter(text(query))
-
-                # Collect conversation IDs that pass filters
-                conv_ids_to_save = []
-
-                for conv_model in q.yield_per(self.batch_size):
+        with ConversationDB(input_db) as input:
+            for batch in self._stream_conversations(input, source=source, where=where):
+                kept = []
+                for conv in batch:
                     stats["total_input"] += 1
 
                     # Additional filtering that's easier to do in Python
-                    # Count messages via relationship
-                    msg_count = len(conv_model.messages) if conv_model.messages else 0
+                    msg_count = len(conv.message_map)
                     if min_messages and msg_count < min_messages:
                         stats["filtered_out"] += 1
                         continue
@@ -341,14 +377,9 @@ class DatabaseOperations:
                         stats["filtered_out"] += 1
                         continue
 
-                    conv_ids_to_save.append(conv_model.id)
+                    kept.append(conv)
 
-            # Load and save conversations outside the session scope
-            for conv_id in conv_ids_to_save:
-                conv = input.load_conversation(conv_id)
-                if conv:
-                    output.save_conversation(conv)
-                    stats["total_output"] += 1
+                stats["total_output"] += len(output.save_conversations(kept))
 
         output.close()
         return stats
@@ -466,8 +497,7 @@ class DatabaseOperations:
             output_file = output_path / f"{safe_key}.db"
 
             with ConversationDB(str(output_file)) as output:
-                for conv in conversations:
-                    output.save_conversation(conv)
+                output.save_conversations(conversations)
 
             stats["databases_created"] += 1
             logger.info(
@@ -479,38 +509,16 @@ class DatabaseOperations:
     # Helper methods
 
     def _stream_conversations(
-        self, db: ConversationDB, batch_size: Optional[int] = None
+        self, db: ConversationDB, batch_size: Optional[int] = None, **filters: Any
     ) -> Iterator[List[ConversationTree]]:
-        """Stream conversations in batches for memory efficiency"""
+        """Stream conversations in batches for memory efficiency
+
+        Keyset-paged by ID via ``ConversationDB.iter_tree_batches``, so the
+        walk is linear in the table size and stable under concurrent writes.
+        """
         if batch_size is None:
             batch_size = self.batch_size
-
-        offset = 0
-        while True:
-            batch = []
-
-            # Get conversation IDs in this batch
-            with db.session_scope() as session:
-                conv_models = (
-                    session.query(ConversationModel.id)
-                    .offset(offset)
-                    .limit(batch_size)
-                    .all()
-                )
-
-                if not conv_models:
-                    break
-
-                conv_ids = [model.id for model in conv_models]
-
-            # Load full conversations using their IDs
-            for conv_id in conv_ids:
-                conv = db.load_conversation(conv_id)
-                if conv:
-                    batch.append(conv)
-
-            yield batch
-            offset += batch_size
+        yield from db.iter_tree_batches(batch_size=batch_size, **filters)
 
     def _build_index(self, db_path: str, comparison: DuplicateStrategy) -> Set[str]:
         """Build an index of conversation keys for comparison"""
@@ -682,15 +690,18 @@ class DatabaseOperations:
 
         with ConversationDB(input_db) as input:
             for batch in self._stream_conversations(input):
+                kept = []
                 for conv in batch:
                     stats["total_conversations"] += 1
 
                     if conv.id not in skip_ids:
-                        output.save_conversation(conv)
+                        kept.append(conv)
                         stats["conversations_kept"] += 1
                     else:
                         stats["conversations_removed"] += 1
 
+                output.save_conversations(kept)
+
         output.close()
 
     def _dedupe_in_place(
@@ -717,12 +728,7 @@ class DatabaseOperations:
 
     def _select_keeper(self, db: ConversationDB, group: List[str], keep: str) -> str:
         """Select which conversation to keep from a duplicate group"""
-        candidates = []
-
-        for conv_id in group:
-            conv = db.load_conversation(conv_id)
-            if conv:
-                candidates.append(conv)
+        candidates = list(db.load_conversations(group).values())
 
         if not candidates:
             return group[0]
@@ -760,16 +766,21 @@ class DatabaseOperations:
 
         with ConversationDB(input_db) as input:
             for batch in self._stream_conversations(input):
+                # Group the batch by destination chunk, one write per chunk
+                routed: Dict[int, List[ConversationTree]] = defaultdict(list)
                 for conv in batch:
                     stats["total_conversations"] += 1
 
-                    chunk_dbs[current_chunk].save_conversation(conv)
+                    routed[current_chunk].append(conv)
                     count_in_chunk += 1
 
                     if count_in_chunk >= chunk_size and current_chunk < chunks - 1:
                         current_chunk += 1
                         count_in_chunk = 0
 
+                for idx, convs in routed.items():
+                    chunk_dbs[idx].save_conversations(convs)
+
         # Close all chunk databases
         for db in chunk_dbs:
             db.close()
@@ -825,36 +836,82 @@ class ConversationComparator:
         return intersection / union
 
     def find_similar_groups(
-        self, db_path: str, threshold: float = 0.95
+        self,
+        db_path: str,
+        threshold: float = 0.95,
+        num_perm: int = MINHASH_NUM_PERM,
+        persist: bool = True,
     ) -> List[List[str]]:
         """
-        Find groups of similar conversations using clustering.
-        """
-        groups = []
-        processed = set()
+        Find groups of near-duplicate conversations.
 
-        db_ops = DatabaseOperations()
-        conversations = []
+        Each conversation's word set (as in :meth:`compute_similarity`) is
+        reduced to a MinHash signature in a streaming pass; with ``persist``
+        the signatures are cached in the database and reruns only rehash
+        conversations updated since. LSH banding proposes candidate pairs,
+        and a candidate joins a group when its estimated Jaccard similarity
+        to the group's first conversation reaches ``threshold``.
+
+        Memory is proportional to ``num_perm`` per conversation.
+        """
+        hasher = MinHasher(num_perm=num_perm)
+        ids: List[str] = []
+        signatures: List[Optional[np.ndarray]] = []
 
-        # Load all conversations (this could be optimized for very large DBs)
         with ConversationDB(db_path) as db:
-            for batch in db_ops._stream_conversations(db):
-                conversations.extend(batch)
+            cached = db.get_minhash_signatures(hasher.config_hash) if persist else {}
+            for headers in db.iter_tree_batches(fields="header"):
+                blobs: Dict[str, bytes] = {}
+                stale = []
+                for header in headers:
+                    hit = cached.pop(header.id, None)
+                    if hit is not None and hit[0] == header.metadata.updated_at:
+                        blobs[header.id] = hit[1]
+                    else:
+                        stale.append(header)
+
+                fresh = []
+                if stale:
+                    trees = db.load_conversations([h.id for h in stale])
+                    for header in stale:
+                        tree = trees.get(header.id)
+                        words = self._extract_text(tree).lower().split() if tree else []
+                        # Empty conversations are never similar (see
+                        # compute_similarity); store b"" to remember that
+                        blob = b""
+                        if words:
+                            blob = hasher.to_bytes(hasher.signature(words))
+                        blobs[header.id] = blob
+                        fresh.append((header.id, header.metadata.updated_at, blob))
+                if persist and fresh:
+                    db.save_minhash_signatures(fresh, hasher.config_hash)
+
+                for header in headers:
+                    ids.append(header.id)
+                    blob = blobs[header.id]
+                    signatures.append(hasher.from_bytes(blob) if blob else None)
+
+        bands, rows = optimal_bands(threshold, num_perm)
+        index: LSHIndex[int] = LSHIndex(bands, rows)
+        for position, signature in enumerate(signatures):
+            if signature is not None:
+                index.add(position, signature)
 
-        # Simple clustering algorithm
-        for i, conv1 in enumerate(conversations):
-            if conv1.id in processed:
+        groups = []
+        processed: Set[int] = set()
+        for i, signature in enumerate(signatures):
+            if signature is None or i in processed:
                 continue
 
-            group = [conv1.id]
-            processed.add(conv1.id)
-
-            for j, conv2 in enumerate(conversations[i + 1 :], i + 1):
-                if conv2.id not in processed:
-                    similarity = self.compute_similarity(conv1, conv2)
-                    if similarity >= threshold:
-                        group.append(conv2.id)
-                        processed.add(conv2.id)
+            group = [ids[i]]
+            processed.add(i)
+            for j in sorted(index.candidates(signature)):
+                other = signatures[j]
+                if j <= i or j in processed or other is None:
+                    continue
+                if estimate_jaccard(signature, other) >= threshold:
+                    group.append(ids[j])
+                    processed.add(j)
 
             if len(group) > 1:
                 groups.append(group)
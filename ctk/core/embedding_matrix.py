@@ -0,0 +1,156 @@
+"""
+In-memory matrix of stored conversation embeddings.
+
+Similarity queries used to walk every candidate and issue a DB query (and
+often a write) per pair. ``EmbeddingMatrix`` instead holds all vectors
+for a (provider, model) as one L2-normalized float32 matrix with an
+id <-> row map, so cosine top-k is a single matrix-vector product plus
+``np.argpartition``.
+
+Instances are built and cached by ``ConversationDB.get_embedding_matrix``
+and dropped whenever embeddings are saved or deleted.
+"""
+
+import logging
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from .vectors import decode_vector
+
+logger = logging.getLogger(__name__)
+
+
+class EmbeddingMatrix:
+    """Normalized embedding rows keyed by conversation ID."""
+
+    def __init__(
+        self,
+        ids: Sequence[str],
+        matrix: np.ndarray,
+        provider: Optional[str] = None,
+        model: Optional[str] = None,
+    ):
+        """
+        Args:
+            ids: Conversation ID for each row
+            matrix: ``(len(ids), dims)`` float32 array of unit-length rows
+                (all-zero rows stand for zero vectors)
+            provider: Provider the vectors came from
+            model: Model the vectors came from
+        """
+        self.ids: List[str] = list(ids)
+        self.index: Dict[str, int] = {cid: i for i, cid in enumerate(self.ids)}
+        self.matrix = matrix
+        self.provider = provider
+        self.model = model
+
+    @classmethod
+    def from_rows(cls, rows: Iterable[Any]) -> "EmbeddingMatrix":
+        """Build from embedding rows.
+
+        Each row needs ``conversation_id``, ``provider``, ``model``,
+        ``vector``, ``dtype``, ``scale`` and ``dimensions`` attributes (an
+        ``EmbeddingModel`` or a column tuple from a query). The first row
+        fixes the dimensionality; rows of another size cannot be compared
+        and are skipped. If a conversation has several rows, the last wins.
+        """
+        rows = list(rows)
+        if not rows:
+            return cls.empty()
+
+        dims = rows[0].dimensions
+        kept: Dict[str, Any] = {}
+        skipped = 0
+        for row in rows:
+            if row.dimensions != dims:
+                skipped += 1
+                continue
+            kept.pop(row.conversation_id, None)
+            kept[row.conversation_id] = row
+        if skipped:
+            logger.debug(f"Skipped {skipped} embeddings not of dimension {dims}")
+
+        matrix = np.empty((len(kept), dims), dtype=np.float32)
+        for i, row in enumerate(kept.values()):
+            matrix[i] = decode_vector(row.vector, row.dtype or "float32", row.scale)
+
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        np.divide(matrix, norms, out=matrix, where=norms > 0)
+        return cls(list(kept), matrix, rows[0].provider, rows[0].model)
+
+    @classmethod
+    def empty(cls) -> "EmbeddingMatrix":
+        return cls([], np.zeros((0, 0), dtype=np.float32))
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def __contains__(self, conversation_id: object) -> bool:
+        return conversation_id in self.index
+
+    @property
+    def dimensions(self) -> int:
+        return int(self.matrix.shape[1]) if self.matrix.ndim == 2 else 0
+
+    def vector(self, conversation_id: str) -> Optional[np.ndarray]:
+        """Normalized row for a conversation, or None if it has no embedding."""
+        row = self.index.get(conversation_id)
+        return None if row is None else self.matrix[row]
+
+    def scores(self, query: Any) -> Optional[np.ndarray]:
+        """Cosine similarity of ``query`` against every row.
+
+        Returns None when the query is a zero vector or has the wrong size.
+        """
+        q = np.asarray(query, dtype=np.float32).ravel()
+        if not len(self) or q.shape[0] != self.dimensions:
+            return None
+        norm = float(np.linalg.norm(q))
+        if norm == 0:
+            return None
+        return self.matrix @ (q / norm)
+
+    def top_k(
+        self,
+        query: Any,
+        k: int,
+        exclude: Iterable[str] = (),
+        min_score: Optional[float] = None,
+        allowed: Optional[Iterable[str]] = None,
+    ) -> List[Tuple[str, float]]:
+        """Most similar conversations to ``query`` by cosine similarity.
+
+        Args:
+            query: Query vector (any scale)
+            k: Maximum number of results
+            exclude: Conversation IDs to leave out (e.g. the query itself)
+            min_score: Drop results scoring below this
+            allowed: If given, only these conversation IDs are eligible
+
+        Returns:
+            ``[(conversation_id, score)]`` sorted by score, descending
+        """
+        scores = self.scores(query)
+        if scores is None or k <= 0:
+            return []
+
+        if allowed is not None:
+            eligible = np.zeros(len(self), dtype=bool)
+            rows = [self.index[c] for c in allowed if c in self.index]
+            eligible[rows] = True
+            scores = np.where(eligible, scores, -np.inf)
+        for cid in exclude:
+            row = self.index.get(cid)
+            if row is not None:
+                scores[row] = -np.inf
+
+        k = min(k, len(scores))
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top], kind="stable")]
+        floor = -np.inf if min_score is None else min_score
+        return [
+            (self.ids[i], float(scores[i]))
+            for i in top
+            if scores[i] > -np.inf and scores[i] >= floor
+        ]
@@ -0,0 +1,432 @@
+"""
+Concurrent, batched, incremental and resumable embedding of conversations.
+
+``ConversationEmbedder.embed_conversation`` sends one request per
+conversation, and saving each result is its own transaction, so an
+OpenAI-compatible endpoint (real OpenAI, Ollama, vLLM) only ever sees one
+small request at a time. ``EmbeddingPipeline`` instead:
+
+- skips conversations whose content hash (chunk texts, weights and
+  embedding config) matches the one stored with their embedding,
+- reuses chunk vectors from the ``embedding_chunks`` cache, keyed by the
+  chunk text's hash, so only new or edited messages reach the provider,
+- packs the remaining chunks from many conversations into requests bounded
+  by an estimated token budget and a chunk count,
+- keeps up to ``concurrency`` requests in flight on a thread pool,
+- aggregates a conversation once all of its chunks are available,
+- writes finished embeddings in bulk with ``ConversationDB.save_embeddings``
+  and records them in an ``EmbeddingCheckpoint``, so an interrupted run
+  resumes where it stopped.
+
+Only the worker threads talk to the provider; loading conversations,
+aggregation and database access stay on the calling thread.
+"""
+
+import hashlib
+import json
+import logging
+import time
+from concurrent.futures import (
+    ALL_COMPLETED,
+    FIRST_COMPLETED,
+    Future,
+    ThreadPoolExecutor,
+    wait,
+)
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Iterable,
+    List,
+    Mapping,
+    Optional,
+    Sequence,
+    Set,
+    Tuple,
+)
+
+import numpy as np
+
+from .constants import (
+    CHARS_PER_TOKEN,
+    EMBED_BATCH_ITEMS,
+    EMBED_BATCH_TOKENS,
+    EMBED_CONCURRENCY,
+    SAVE_BATCH_SIZE,
+)
+from .models import ConversationTree
+
+logger = logging.getLogger(__name__)
+
+# (text hash, text)
+_Chunk = Tuple[str, str]
+
+
+def text_hash(text: str) -> str:
+    """Cache key of a chunk's text."""
+    return hashlib.sha256(text.encode("utf-8", "surrogatepass")).hexdigest()
+
+
+def content_hash(
+    text_hashes: Sequence[str], weights: Sequence[float], config_hash: str
+) -> str:
+    """Hash of everything a conversation embedding is computed from."""
+    payload = json.dumps([config_hash, list(text_hashes), list(weights)])
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:32]
+
+
+@dataclass
+class PipelineStats:
+    """Outcome of an ``EmbeddingPipeline.run``."""
+
+    embedded: int = 0
+    skipped: int = 0
+    unchanged: int = 0  # skipped because their content hash matched
+    failed: Dict[str, str] = field(default_factory=dict)  # id -> error
+    requests: int = 0
+    chunks: int = 0  # chunks sent to the provider
+    cached_chunks: int = 0  # chunks not sent: cached or repeated in the run
+    seconds: float = 0.0
+
+    @property
+    def conversations_per_sec(self) -> float:
+        return self.embedded / self.seconds if self.seconds > 0 else 0.0
+
+
+@dataclass
+class _Pending:
+    """Chunk embeddings collected so far for one conversation."""
+
+    weights: List[float]
+    vectors: List[Any]
+    remaining: int
+    content_hash: str
+
+
+class EmbeddingCheckpoint:
+    """Append-only record of the conversations an unfinished run has saved.
+
+    The first line is a JSON header with the run's key (its embedding
+    configuration); each later line is one conversation ID. A file written
+    under another key is ignored and replaced on the first write.
+    """
+
+    def __init__(self, path: Path, key: str):
+        self.path = Path(path)
+        self.key = key
+        self._started = False
+
+    def load(self) -> Set[str]:
+        """Conversation IDs saved by an earlier run with the same key."""
+        try:
+            with open(self.path, encoding="utf-8") as fh:
+                header = json.loads(fh.readline() or "{}")
+                if header.get("key") != self.key:
+                    return set()
+                done = {line.strip() for line in fh if line.strip()}
+        except (OSError, ValueError) as e:
+            if self.path.exists():
+                logger.warning(f"Ignoring unreadable checkpoint {self.path}: {e}")
+            return set()
+        self._started = True
+        return done
+
+    def mark(self, conversation_ids: Iterable[str]) -> None:
+        """Record conversations whose embeddings are committed."""
+        mode = "a" if self._started else "w"
+        with open(self.path, mode, encoding="utf-8") as fh:
+            if not self._started:
+                fh.write(json.dumps({"key": self.key}) + "\n")
+                self._started = True
+            fh.writelines(f"{cid}\n" for cid in conversation_ids)
+
+    def clear(self) -> None:
+        """Remove the checkpoint once a run has finished."""
+        try:
+            self.path.unlink()
+        except FileNotFoundError:
+            pass
+        self._started = False
+
+
+class EmbeddingPipeline:
+    """Embed conversations with batched, concurrent provider requests."""
+
+    def __init__(
+        self,
+        embedder: Any,
+        db: Any,
+        batch_tokens: int = EMBED_BATCH_TOKENS,
+        batch_items: int = EMBED_BATCH_ITEMS,
+        concurrency: int = EMBED_CONCURRENCY,
+        write_batch: int = SAVE_BATCH_SIZE,
+        checkpoint: Optional[EmbeddingCheckpoint] = None,
+        use_chunk_cache: bool = True,
+    ):
+        """
+        Args:
+            embedder: ConversationEmbedder providing chunking, the provider
+                and aggregation
+            db: ConversationDB the embeddings are written to
+            batch_tokens: Estimated tokens per request (a longer chunk is
+                sent on its own)
+            batch_items: Max chunks per request
+            concurrency: Requests kept in flight
+            write_batch: Embeddings per database transaction
+            checkpoint: Where to record progress, if anywhere
+            use_chunk_cache: Read and fill the chunk cache. Ignored for
+                providers that are not ``cacheable`` (e.g. TF-IDF).
+
+        Raises:
+            ValueError: If any size or count is < 1
+        """
+        for name, value in (
+            ("batch_tokens", batch_tokens),
+            ("batch_items", batch_items),
+            ("concurrency", concurrency),
+            ("write_batch", write_batch),
+        ):
+            if value < 1:
+                raise ValueError(f"{name} must be at least 1")
+
+        self.embedder = embedder
+        self.db = db
+        self.batch_tokens = batch_tokens
+        self.batch_items = batch_items
+        self.concurrency = concurrency
+        self.write_batch = write_batch
+        self.checkpoint = checkpoint
+        self.use_chunk_cache = use_chunk_cache and getattr(
+            embedder.provider, "cacheable", True
+        )
+
+        config = embedder.config
+        self.provider_name = config.provider
+        self.model_name = config.model or config.provider
+        self.config_hash = config.to_hash()
+        self.chunk_config_hash = config.chunk_hash()
+
+    def run(
+        self,
+        conversations: Iterable[ConversationTree],
+        skip: Iterable[str] = (),
+        progress: Optional[Callable[[int], None]] = None,
+        stored_hashes: Optional[Mapping[str, Optional[str]]] = None,
+    ) -> PipelineStats:
+        """
+        Embed and save ``conversations``.
+
+        ``conversations`` is consumed lazily, so it can be a generator that
+        loads trees on demand. A failed request only fails the conversations
+        it carried; they are reported in ``PipelineStats.failed`` and left out
+        of the checkpoint so the next run retries them.
+
+        Args:
+            conversations: Trees to embed
+            skip: Conversation IDs to leave alone
+            progress: Called with the number of conversations just saved
+            stored_hashes: Conversation ID -> content hash of its stored
+                embedding (see ``ConversationDB.get_embedding_content_hashes``);
+                conversations whose hash still matches are skipped
+
+        Returns:
+            PipelineStats
+        """
+        skip = set(skip)
+        stored_hashes = stored_hashes or {}
+        seen: Set[str] = set()
+        stats = PipelineStats()
+        started = time.perf_counter()
+
+        pending: Dict[str, _Pending] = {}
+        ready: List[Tuple[str, Any, str]] = []
+        # Chunk vectors returned by the provider, not yet in the cache
+        fresh: Dict[str, Any] = {}
+        # text hash -> [(conversation_id, chunk position)] awaiting it
+        waiting: Dict[str, List[Tuple[str, int]]] = {}
+        batch: List[_Chunk] = []
+        batch_tokens = 0
+        in_flight: Dict["Future[Any]", List[_Chunk]] = {}
+        zero: Optional[np.ndarray] = None
+
+        def fail(conversation_id: str, error: Any) -> None:
+            pending.pop(conversation_id, None)
+            stats.failed[conversation_id] = str(error)
+            logger.warning(f"Failed to embed {conversation_id}: {error}")
+
+        def flush_ready() -> None:
+            if self.use_chunk_cache and fresh:
+                self.db.save_chunk_embeddings(
+                    list(fresh.items()),
+                    provider=self.provider_name,
+                    model=self.model_name,
+                    config_hash=self.chunk_config_hash,
+                )
+                fresh.clear()
+            if not ready:
+                return
+            written = list(ready)
+            ready.clear()
+            self.db.save_embeddings(
+                [(cid, vector) for cid, vector, _ in written],
+                model=self.model_name,
+                provider=self.provider_name,
+                chunking_strategy=self.embedder.config.chunking.value,
+                aggregation_strategy=self.embedder.config.aggregation.value,
+                aggregation_weights=self.embedder.config.role_weights,
+                batch_size=self.write_batch,
+                config_hash=self.config_hash,
+                content_hashes={cid: content for cid, _, content in written},
+            )
+            ids = [cid for cid, _, _ in written]
+            if self.checkpoint is not None:
+                self.checkpoint.mark(ids)
+            stats.embedded += len(ids)
+            if progress is not None:
+                progress(len(ids))
+
+        def add_ready(conversation_id: str, vector: Any, content: str) -> None:
+            ready.append((conversation_id, vector, content))
+            if len(ready) >= self.write_batch:
+                flush_ready()
+
+        def deliver(conversation_id: str, position: int, vector: Any) -> None:
+            entry = pending.get(conversation_id)
+            if entry is None:  # failed in another request
+                return
+            entry.vectors[position] = vector
+            entry.remaining -= 1
+            if entry.remaining:
+                return
+            del pending[conversation_id]
+            try:
+                aggregated = self.embedder.aggregate_chunks(
+                    entry.vectors, entry.weights
+                )
+            except Exception as e:
+                fail(conversation_id, e)
+                return
+            add_ready(conversation_id, aggregated, entry.content_hash)
+
+        def collect(return_when: str) -> None:
+            done, _ = wait(list(in_flight), return_when=return_when)
+            for future in done:
+                chunks = in_flight.pop(future)
+                try:
+                    responses = future.result()
+                    if len(responses) != len(chunks):
+                        raise ValueError(
+                            f"Provider returned {len(responses)} embeddings "
+                            f"for {len(chunks)} inputs"
+                        )
+                except Exception as e:
+                    for digest, _ in chunks:
+                        for cid, _ in waiting.pop(digest, []):
+                            if cid in pending:
+                                fail(cid, e)
+                    continue
+                for (digest, _), response in zip(chunks, responses):
+                    if self.use_chunk_cache:
+                        fresh[digest] = response.embedding
+                    for cid, position in waiting.pop(digest, []):
+                        deliver(cid, position, response.embedding)
+
+        def submit() -> None:
+            nonlocal batch, batch_tokens
+            if not batch:
+                return
+            while len(in_flight) >= self.concurrency:
+                collect(FIRST_COMPLETED)
+            texts = [text for _, text in batch]
+            future = executor.submit(self.embedder.provider.embed_batch, texts)
+            in_flight[future] = batch
+            stats.requests += 1
+            stats.chunks += len(batch)
+            batch, batch_tokens = [], 0
+
+        executor = ThreadPoolExecutor(
+            max_workers=self.concurrency, thread_name_prefix="ctk-embed"
+        )
+        try:
+            for conversation in conversations:
+                if conversation is None:
+                    continue
+                conversation_id = conversation.id
+                if conversation_id in seen:
+                    continue
+                seen.add(conversation_id)
+                if conversation_id in skip:
+                    stats.skipped += 1
+                    continue
+
+                chunks = self.embedder._extract_text_chunks(conversation)
+                digests = [text_hash(text) for text, _ in chunks]
+                weights = [weight for _, weight in chunks]
+                content = content_hash(digests, weights, self.config_hash)
+                if stored_hashes.get(conversation_id) == content:
+                    stats.unchanged += 1
+                    continue
+
+                if not chunks:
+                    # Empty conversation - zero vector, as embed_conversation
+                    if zero is None:
+                        zero = np.zeros(self.embedder.provider.get_dimensions())
+                    add_ready(conversation_id, zero, content)
+                    continue
+
+                cached: Dict[str, Any] = {}
+                if self.use_chunk_cache:
+                    lookup = [d for d in digests if d not in fresh and d not in waiting]
+                    if lookup:
+                        cached = self.db.get_chunk_embeddings(
+                            lookup,
+                            provider=self.provider_name,
+                            model=self.model_name,
+                            config_hash=self.chunk_config_hash,
+                        )
+
+                pending[conversation_id] = _Pending(
+                    weights=weights,
+                    vectors=[None] * len(chunks),
+                    remaining=len(chunks),
+                    content_hash=content,
+                )
+                for position, ((text, _), digest) in enumerate(zip(chunks, digests)):
+                    vector = cached.get(digest)
+                    if vector is None:
+                        vector = fresh.get(digest)
+                    if vector is not None:
+                        stats.cached_chunks += 1
+                        deliver(conversation_id, position, vector)
+                        continue
+                    if digest in waiting:
+                        # Same text already queued (possibly by this conversation)
+                        stats.cached_chunks += 1
+                        waiting[digest].append((conversation_id, position))
+                        continue
+
+                    waiting[digest] = [(conversation_id, position)]
+                    tokens = max(1, len(text) // CHARS_PER_TOKEN)
+                    if batch and (
+                        batch_tokens + tokens > self.batch_tokens
+                        or len(batch) >= self.batch_items
+                    ):
+                        submit()
+                    batch.append((digest, text))
+                    batch_tokens += tokens
+
+            submit()
+            while in_flight:
+                collect(ALL_COMPLETED)
+        finally:
+            # Keep whatever finished, even when interrupted
+            for future in in_flight:
+                future.cancel()
+            executor.shutdown(wait=True)
+            flush_ready()
+            stats.seconds = time.perf_counter() - started
+
+        return stats
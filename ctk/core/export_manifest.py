@@ -0,0 +1,227 @@
+"""
+Incremental directory exports.
+
+Directory exporters (Hugo, ECHO, Markdown) keep a manifest in the output
+directory that maps each conversation ID to a fingerprint of its tree and
+the files rendered from it. Re-exporting into the same directory then
+costs time proportional to what changed:
+
+- a conversation whose fingerprint matches, exported with the same
+  exporter version and options, is skipped before rendering;
+- a changed conversation is rendered again, and files it no longer
+  produces (a retitled Hugo bundle, say) are deleted;
+- files of conversations that are no longer exported are deleted.
+
+The manifest is only trusted while its listed files still exist, and is
+rewritten atomically at the end of each run.
+"""
+
+import hashlib
+import json
+import os
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Set
+
+from .constants import EXPORT_MANIFEST_FILE
+from .models import ConversationTree
+
+MANIFEST_VERSION = 1
+
+
+def conversation_fingerprint(conv: ConversationTree) -> str:
+    """SHA-256 over the tree's serialized form (messages, metadata, tags)
+
+    ``metadata.updated_at`` is left out: ConversationTree.add_message stamps
+    it with the current time, so a tree rebuilt from the database never
+    carries the same value twice.
+    """
+    data = conv.to_dict()
+    data["metadata"].pop("updated_at", None)
+    payload = json.dumps(data, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+@dataclass
+class ManifestStats:
+    """Per-run counts reported by incremental exports"""
+
+    added: int = 0
+    updated: int = 0
+    unchanged: int = 0
+    removed: int = 0
+
+    def __str__(self) -> str:
+        return (
+            f"{self.added} added, {self.updated} updated, "
+            f"{self.unchanged} unchanged, {self.removed} removed"
+        )
+
+
+class ExportManifest:
+    """
+    Conversation-to-files manifest for one export directory.
+
+    Typical use::
+
+        manifest = ExportManifest(output_dir, "hugo", version, options)
+        for conv in manifest.changed(conversations):
+            files = render_and_write(conv)
+            manifest.record(conv.id, files)
+        stats = manifest.finish()
+
+    Args:
+        output_dir: Export directory; the manifest lives at its root
+        exporter: Exporter name
+        version: Exporter version; a new version re-renders everything
+        options: Options that affect rendered output
+        incremental: False ignores the previous manifest for skipping
+            (every conversation is rendered) but still uses it to clean up
+    """
+
+    def __init__(
+        self,
+        output_dir: Path,
+        exporter: str,
+        version: str,
+        options: Optional[Dict[str, Any]] = None,
+        incremental: bool = True,
+    ):
+        self.output_dir = Path(output_dir)
+        self.path = self.output_dir / EXPORT_MANIFEST_FILE
+        self.exporter = exporter
+        self.options_hash = hashlib.sha256(
+            json.dumps(
+                {"version": version, "options": options or {}},
+                sort_keys=True,
+                default=str,
+            ).encode("utf-8")
+        ).hexdigest()
+        self.stats = ManifestStats()
+        self._previous: Dict[str, Dict[str, Any]] = {}
+        self._entries: Dict[str, Dict[str, Any]] = {}
+        self._pending: Dict[str, Optional[str]] = {}
+        self._reusable = False
+        self._load(incremental)
+
+    def _load(self, incremental: bool) -> None:
+        try:
+            data = json.loads(self.path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return
+        if (
+            not isinstance(data, dict)
+            or data.get("version") != MANIFEST_VERSION
+            or data.get("exporter") != self.exporter
+        ):
+            return
+        self._previous = data.get("conversations") or {}
+        self._reusable = incremental and data.get("options") == self.options_hash
+
+    def is_current(self, conv_id: str, fingerprint: str) -> bool:
+        """True (and the entry is kept) if the previous output is still valid"""
+        entry = self._previous.get(conv_id)
+        if not (
+            self._reusable
+            and entry
+            and entry.get("hash") == fingerprint
+            and all((self.output_dir / rel).exists() for rel in entry["files"])
+        ):
+            return False
+        self._entries[conv_id] = entry
+        self.stats.unchanged += 1
+        return True
+
+    def changed(
+        self, conversations: Iterable[ConversationTree]
+    ) -> Iterator[ConversationTree]:
+        """Yield only the conversations that need rendering"""
+        for conv in conversations:
+            try:
+                fingerprint = conversation_fingerprint(conv)
+            except Exception:
+                # Malformed tree: let the exporter render it and report why
+                fingerprint = None
+            if fingerprint and self.is_current(conv.id, fingerprint):
+                continue
+            self._pending[conv.id] = fingerprint
+            yield conv
+
+    def record(self, conv_id: str, files: Iterable[Path]) -> None:
+        """Register the files just written for a conversation from changed()"""
+        fingerprint = self._pending.pop(conv_id, None)
+        if conv_id in self._previous:
+            self.stats.updated += 1
+        else:
+            self.stats.added += 1
+        self._entries[conv_id] = {
+            "hash": fingerprint,
+            "files": sorted({self._relative(Path(f)) for f in files}),
+        }
+
+    def keep(self, conv_id: str) -> None:
+        """Leave a conversation's previous output in place (its render failed).
+
+        The entry loses its fingerprint, so the next run tries again.
+        """
+        self._pending.pop(conv_id, None)
+        previous = self._previous.get(conv_id)
+        if previous is not None:
+            self._entries[conv_id] = {"hash": None, "files": previous["files"]}
+
+    def finish(self) -> ManifestStats:
+        """Delete stale and removed outputs, then save the manifest"""
+        claimed: Set[str] = {
+            rel for entry in self._entries.values() for rel in entry["files"]
+        }
+        stale: List[str] = []
+        for conv_id, entry in self._previous.items():
+            if conv_id not in self._entries:
+                self.stats.removed += 1
+            stale.extend(rel for rel in entry["files"] if rel not in claimed)
+        self._delete(stale)
+
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_name(f"{self.path.name}.{os.getpid()}.tmp")
+        tmp.write_text(
+            json.dumps(
+                {
+                    "version": MANIFEST_VERSION,
+                    "exporter": self.exporter,
+                    "options": self.options_hash,
+                    "conversations": self._entries,
+                },
+                indent=1,
+                sort_keys=True,
+                ensure_ascii=False,
+            ),
+            encoding="utf-8",
+        )
+        os.replace(tmp, self.path)
+        return self.stats
+
+    def _relative(self, path: Path) -> str:
+        if not path.is_absolute():
+            path = Path.cwd() / path
+        base = self.output_dir.resolve()
+        return path.resolve().relative_to(base).as_posix()
+
+    def _delete(self, relative_paths: Iterable[str]) -> None:
+        """Remove files (never outside output_dir) and prune emptied dirs"""
+        base = self.output_dir.resolve()
+        parents: Set[Path] = set()
+        for rel in relative_paths:
+            path = (base / rel).resolve()
+            if base not in path.parents:
+                continue
+            path.unlink(missing_ok=True)
+            parents.add(path.parent)
+
+        # Deepest first, so a bundle's images/ goes before the bundle itself
+        for directory in sorted(parents, key=lambda p: len(p.parts), reverse=True):
+            while directory != base and base in directory.parents:
+                try:
+                    directory.rmdir()
+                except OSError:
+                    break  # Not empty
+                directory = directory.parent
@@ -0,0 +1,85 @@
+"""
+Ordered process-pool rendering for exporters.
+
+Exporters that write one file (or one block of output) per conversation
+spend most of their time in pure-Python rendering: path selection,
+sanitizer regexes, Markdown and JSON formatting. ``ordered_map`` fans that
+per-conversation work out to worker processes and hands the results back
+in input order, so the caller stays a single, deterministic writer.
+
+At most ``jobs * EXPORT_PREFETCH_PER_JOB`` conversations are in flight, so
+a lazy iterator of trees (``ConversationDB.iter_trees``) is consumed only as
+fast as the writer drains results and memory stays bounded however large
+the export is.
+
+The render function and its arguments are pickled to the workers: use a
+module-level function or a bound method of a plugin instance, with options
+bound through ``functools.partial``.
+"""
+
+import os
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from typing import Callable, Deque, Iterable, Iterator, Optional, TypeVar
+
+from .constants import EXPORT_PREFETCH_PER_JOB
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+
+def resolve_jobs(jobs: Optional[int]) -> int:
+    """Worker count for a ``--jobs`` value: None/1 = inline, 0 = one per CPU"""
+    if jobs is None:
+        return 1
+    if jobs < 0:
+        raise ValueError(f"jobs must be 0 (all CPUs) or positive, got {jobs}")
+    if jobs == 0:
+        return os.cpu_count() or 1
+    return jobs
+
+
+def ordered_map(
+    fn: Callable[[T], R],
+    items: Iterable[T],
+    jobs: Optional[int] = 1,
+    prefetch: int = EXPORT_PREFETCH_PER_JOB,
+) -> Iterator[R]:
+    """
+    Yield ``fn(item)`` for each item, in input order.
+
+    With one job the calls run inline, one at a time, with no pool and no
+    pickling. Otherwise a ProcessPoolExecutor runs them with at most
+    ``jobs * prefetch`` submitted but not yet yielded. An exception raised
+    by ``fn`` propagates from the position of the item that raised it.
+    Closing the generator early cancels the queued work.
+
+    Args:
+        fn: Picklable callable applied to each item
+        items: Items to render; consumed lazily
+        jobs: Worker processes (see ``resolve_jobs``)
+        prefetch: In-flight items per worker
+
+    Yields:
+        Results of ``fn``, in the order of ``items``
+    """
+    workers = resolve_jobs(jobs)
+    if workers == 1:
+        for item in items:
+            yield fn(item)
+        return
+
+    window = max(1, workers * prefetch)
+    pending: Deque[Future] = deque()
+    executor = ProcessPoolExecutor(max_workers=workers)
+    try:
+        for item in items:
+            if len(pending) >= window:
+                yield pending.popleft().result()
+            pending.append(executor.submit(fn, item))
+        while pending:
+            yield pending.popleft().result()
+    finally:
+        for future in pending:
+            future.cancel()
+        executor.shutdown(wait=True)
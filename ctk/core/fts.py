@@ -0,0 +1,405 @@
+"""
+SQLite FTS5 search index over conversations and messages.
+
+Both FTS tables are external-content tables: they hold only the inverted
+index and read text back (for snippets and deletes) through the
+``conversations_search`` and ``messages_search`` views, which derive it from
+the base tables. No text is stored twice. ``messages_fts`` indexes message
+text, reasoning blocks and tool calls (name, arguments, result) as separate
+columns, ranked with per-column BM25 weights.
+
+Triggers keep the index in sync with the base tables. A (re)build runs in
+rowid batches and records its progress in ``search_index_state``: rows at
+or below ``last_rowid`` are indexed, rows in ``(last_rowid, upper_rowid]``
+are left to the rebuild, and the triggers handle everything else, so
+writes made while a rebuild is under way are neither lost nor indexed
+twice. Until the rebuild completes, searches fall back to LIKE.
+"""
+
+import logging
+from dataclasses import dataclass
+from typing import Callable, Dict, Optional, Tuple
+
+from sqlalchemy import text
+from sqlalchemy.engine import Connection, Engine
+
+from .constants import (
+    FTS_REBUILD_BATCH_SIZE,
+    FTS_WEIGHT_REASONING,
+    FTS_WEIGHT_TEXT,
+    FTS_WEIGHT_TOOLS,
+)
+
+logger = logging.getLogger(__name__)
+
+STATE_TABLE = "search_index_state"
+TOKENIZER = "porter unicode61"
+
+
+@dataclass(frozen=True)
+class _FtsSpec:
+    table: str  # FTS5 virtual table
+    view: str  # external content view
+    base: str  # base table the view reads
+    rowid_col: str  # view column holding the base rowid
+    columns: Tuple[str, ...]  # FTS columns, in order
+    unindexed: Tuple[str, ...]  # columns stored for filtering, not tokenized
+    view_sql: str  # SELECT list of the view (after rowid_col)
+    watched: Tuple[str, ...]  # base columns whose update re-indexes a row
+    rank: Optional[str] = None  # rank function configured on the table
+
+
+_CONVERSATIONS = _FtsSpec(
+    table="conversations_fts",
+    view="conversations_search",
+    base="conversations",
+    rowid_col="conv_rowid",
+    columns=("conversation_id", "title", "summary"),
+    unindexed=("conversation_id",),
+    view_sql="""
+        id AS conversation_id,
+        COALESCE(title, '') AS title,
+        COALESCE(summary, '') AS summary
+    """,
+    watched=("title", "summary"),
+)
+
+_MESSAGES = _FtsSpec(
+    table="messages_fts",
+    view="messages_search",
+    base="messages",
+    rowid_col="msg_rowid",
+    columns=(
+        "message_id",
+        "conversation_id",
+        "role",
+        "content",
+        "reasoning",
+        "tools",
+    ),
+    unindexed=("message_id", "conversation_id", "role"),
+    view_sql="""
+        id AS message_id,
+        conversation_id,
+        COALESCE(role, '') AS role,
+        COALESCE(json_extract(content_json, '$.text'), '') AS content,
+        COALESCE((
+            SELECT group_concat(trim(
+                COALESCE(json_extract(r.value, '$.summary'), '') || ' ' ||
+                COALESCE(json_extract(r.value, '$.text'), '')
+            ), char(10))
+            FROM json_each(content_json, '$.reasoning') r
+        ), '') AS reasoning,
+        COALESCE((
+            SELECT group_concat(trim(
+                COALESCE(json_extract(t.value, '$.name'), '') || ' ' ||
+                COALESCE(json_extract(t.value, '$.arguments'), '') || ' ' ||
+                COALESCE(json_extract(t.value, '$.result'), '') || ' ' ||
+                COALESCE(json_extract(t.value, '$.error'), '')
+            ), char(10))
+            FROM json_each(content_json, '$.tool_calls') t
+        ), '') AS tools
+    """,
+    watched=("content_json", "role", "conversation_id"),
+    rank=(
+        f"bm25(0.0, 0.0, 0.0, {FTS_WEIGHT_TEXT}, "
+        f"{FTS_WEIGHT_REASONING}, {FTS_WEIGHT_TOOLS})"
+    ),
+)
+
+SPECS = (_CONVERSATIONS, _MESSAGES)
+
+# Trigger names used before the index moved to external content
+_LEGACY_TRIGGERS = (
+    "conversations_fts_insert",
+    "conversations_fts_update",
+    "conversations_fts_delete",
+    "messages_fts_insert",
+    "messages_fts_update",
+    "messages_fts_delete",
+)
+
+
+def _exists(conn: Connection, kind: str, name: str) -> bool:
+    row = conn.execute(
+        text("SELECT 1 FROM sqlite_master WHERE type = :kind AND name = :name"),
+        {"kind": kind, "name": name},
+    ).fetchone()
+    return row is not None
+
+
+def is_installed(conn: Connection) -> bool:
+    """True when the tables, views and state of the current layout exist"""
+    if not _exists(conn, "table", STATE_TABLE):
+        return False
+    return all(
+        _exists(conn, "table", spec.table) and _exists(conn, "view", spec.view)
+        for spec in SPECS
+    )
+
+
+def drop_legacy(conn: Connection) -> bool:
+    """Drop FTS tables that store their own copy of the text.
+
+    Returns True if a legacy index was found. The replacement is created
+    empty by :func:`install` and filled by :func:`rebuild`.
+    """
+    row = conn.execute(
+        text("SELECT sql FROM sqlite_master WHERE type='table' AND name='messages_fts'")
+    ).fetchone()
+    if row is None or "content=" in (row[0] or ""):
+        return False
+    for trigger in _LEGACY_TRIGGERS:
+        conn.execute(text(f"DROP TRIGGER IF EXISTS {trigger}"))
+    for spec in SPECS:
+        conn.execute(text(f"DROP TABLE IF EXISTS {spec.table}"))
+    return True
+
+
+def _watermark(spec: _FtsSpec, row: str) -> str:
+    """Trigger WHEN clause: is this base row covered by the triggers?"""
+    return (
+        f"COALESCE((SELECT complete OR {row}.rowid <= last_rowid"
+        f" OR {row}.rowid > upper_rowid FROM {STATE_TABLE}"
+        f" WHERE name = '{spec.table}'), 1)"
+    )
+
+
+def _index_rows(spec: _FtsSpec, where: str, delete: bool = False) -> str:
+    cols = ", ".join(spec.columns)
+    if delete:
+        return (
+            f"INSERT INTO {spec.table} ({spec.table}, rowid, {cols})"
+            f" SELECT 'delete', {spec.rowid_col}, {cols} FROM {spec.view}"
+            f" WHERE {where}"
+        )
+    return (
+        f"INSERT INTO {spec.table} (rowid, {cols})"
+        f" SELECT {spec.rowid_col}, {cols} FROM {spec.view} WHERE {where}"
+    )
+
+
+def _install_spec(conn: Connection, spec: _FtsSpec) -> None:
+    conn.execute(
+        text(
+            f"CREATE VIEW IF NOT EXISTS {spec.view} AS"
+            f" SELECT rowid AS {spec.rowid_col}, {spec.view_sql} FROM {spec.base}"
+        )
+    )
+    columns = ", ".join(
+        f"{c} UNINDEXED" if c in spec.unindexed else c for c in spec.columns
+    )
+    conn.execute(
+        text(
+            f"CREATE VIRTUAL TABLE IF NOT EXISTS {spec.table} USING fts5("
+            f"{columns}, content='{spec.view}', content_rowid='{spec.rowid_col}',"
+            f" tokenize = '{TOKENIZER}')"
+        )
+    )
+    if spec.rank:
+        conn.execute(
+            text(f"INSERT INTO {spec.table} ({spec.table}, rank) VALUES ('rank', :r)"),
+            {"r": spec.rank},
+        )
+
+    watched = ", ".join(spec.watched)
+    this_row = f"{spec.rowid_col} = NEW.rowid"
+    old_row = f"{spec.rowid_col} = OLD.rowid"
+    triggers = {
+        f"{spec.table}_ai": (
+            f"AFTER INSERT ON {spec.base}",
+            "NEW",
+            _index_rows(spec, this_row),
+        ),
+        f"{spec.table}_bd": (
+            f"BEFORE DELETE ON {spec.base}",
+            "OLD",
+            _index_rows(spec, old_row, delete=True),
+        ),
+        f"{spec.table}_bu": (
+            f"BEFORE UPDATE OF {watched} ON {spec.base}",
+            "OLD",
+            _index_rows(spec, old_row, delete=True),
+        ),
+        f"{spec.table}_au": (
+            f"AFTER UPDATE OF {watched} ON {spec.base}",
+            "NEW",
+            _index_rows(spec, this_row),
+        ),
+    }
+    for name, (event, row, body) in triggers.items():
+        conn.execute(
+            text(
+                f"CREATE TRIGGER IF NOT EXISTS {name} {event}"
+                f" WHEN {_watermark(spec, row)}"
+                f" BEGIN {body}; END"
+            )
+        )
+
+    # An empty base table is trivially indexed; otherwise leave the
+    # existing rows to rebuild()
+    upper = conn.execute(text(f"SELECT MAX(rowid) FROM {spec.base}")).scalar()
+    conn.execute(
+        text(
+            f"INSERT OR IGNORE INTO {STATE_TABLE}"
+            " (name, last_rowid, upper_rowid, complete)"
+            " VALUES (:name, 0, :upper, :complete)"
+        ),
+        {"name": spec.table, "upper": upper or 0, "complete": int(upper is None)},
+    )
+
+
+def install(conn: Connection) -> None:
+    """Create the state table, views, FTS tables and triggers (idempotent)"""
+    conn.execute(
+        text(
+            f"CREATE TABLE IF NOT EXISTS {STATE_TABLE} ("
+            " name TEXT PRIMARY KEY,"
+            " last_rowid INTEGER NOT NULL DEFAULT 0,"
+            " upper_rowid INTEGER NOT NULL DEFAULT 0,"
+            " complete INTEGER NOT NULL DEFAULT 0)"
+        )
+    )
+    for spec in SPECS:
+        _install_spec(conn, spec)
+
+
+def is_complete(conn: Connection) -> bool:
+    """True when every FTS table covers all rows of its base table"""
+    rows = conn.execute(text(f"SELECT name, complete FROM {STATE_TABLE}")).fetchall()
+    done = {name: bool(complete) for name, complete in rows}
+    return all(done.get(spec.table, False) for spec in SPECS)
+
+
+def pending_rows(conn: Connection) -> int:
+    """Base rows still waiting for the rebuild"""
+    pending = 0
+    for spec in SPECS:
+        state = conn.execute(
+            text(
+                f"SELECT last_rowid, upper_rowid, complete FROM {STATE_TABLE}"
+                " WHERE name = :name"
+            ),
+            {"name": spec.table},
+        ).fetchone()
+        if state is None or state[2]:
+            continue
+        pending += conn.execute(
+            text(
+                f"SELECT COUNT(*) FROM {spec.base}"
+                " WHERE rowid > :last AND rowid <= :upper"
+            ),
+            {"last": state[0], "upper": state[1]},
+        ).scalar_one()
+    return pending
+
+
+def _reset(conn: Connection, spec: _FtsSpec) -> None:
+    """Empty an FTS table and mark all current base rows for the rebuild"""
+    conn.execute(text(f"INSERT INTO {spec.table} ({spec.table}) VALUES ('delete-all')"))
+    upper = conn.execute(text(f"SELECT MAX(rowid) FROM {spec.base}")).scalar()
+    conn.execute(
+        text(
+            f"UPDATE {STATE_TABLE} SET last_rowid = 0, upper_rowid = :upper,"
+            " complete = 0 WHERE name = :name"
+        ),
+        {"upper": upper or 0, "name": spec.table},
+    )
+
+
+def rebuild(
+    engine: Engine,
+    batch_size: int = FTS_REBUILD_BATCH_SIZE,
+    restart: bool = False,
+    progress: Optional[Callable[[str, int, int], None]] = None,
+) -> Dict[str, int]:
+    """
+    Index base rows into the FTS tables in committed batches.
+
+    An interrupted rebuild resumes where it stopped; ``restart`` discards
+    the index and starts over (needed after VACUUM, which may renumber
+    rowids).
+
+    Args:
+        engine: SQLite engine of the database
+        batch_size: Rows indexed per transaction
+        restart: Empty the index and rebuild everything
+        progress: Called with (table, rows done, rows total) after each batch
+
+    Returns:
+        Rows indexed per FTS table
+    """
+    if batch_size < 1:
+        raise ValueError("batch_size must be positive")
+
+    indexed: Dict[str, int] = {}
+    for spec in SPECS:
+        with engine.begin() as conn:
+            if restart:
+                _reset(conn, spec)
+            last, upper, complete = conn.execute(
+                text(
+                    f"SELECT last_rowid, upper_rowid, complete FROM {STATE_TABLE}"
+                    " WHERE name = :name"
+                ),
+                {"name": spec.table},
+            ).one()
+            total = conn.execute(
+                text(
+                    f"SELECT COUNT(*) FROM {spec.base}"
+                    " WHERE rowid > :last AND rowid <= :upper"
+                ),
+                {"last": last, "upper": upper},
+            ).scalar_one()
+
+        done = 0
+        while not complete:
+            with engine.begin() as conn:
+                count, end = conn.execute(
+                    text(
+                        "SELECT COUNT(*), MAX(rowid) FROM ("
+                        f"SELECT rowid FROM {spec.base}"
+                        " WHERE rowid > :last AND rowid <= :upper"
+                        " ORDER BY rowid LIMIT :n)"
+                    ),
+                    {"last": last, "upper": upper, "n": batch_size},
+                ).one()
+                if not count:
+                    conn.execute(
+                        text(
+                            f"UPDATE {STATE_TABLE} SET complete = 1, last_rowid = 0,"
+                            " upper_rowid = 0 WHERE name = :name"
+                        ),
+                        {"name": spec.table},
+                    )
+                    conn.execute(
+                        text(
+                            f"INSERT INTO {spec.table} ({spec.table})"
+                            " VALUES ('optimize')"
+                        )
+                    )
+                    complete = True
+                    break
+                conn.execute(
+                    text(
+                        _index_rows(
+                            spec,
+                            f"{spec.rowid_col} > :last AND {spec.rowid_col} <= :end",
+                        )
+                    ),
+                    {"last": last, "end": end},
+                )
+                conn.execute(
+                    text(
+                        f"UPDATE {STATE_TABLE} SET last_rowid = :end"
+                        " WHERE name = :name"
+                    ),
+                    {"end": end, "name": spec.table},
+                )
+            last = end
+            done += count
+            if progress:
+                progress(spec.table, done, total)
+        indexed[spec.table] = done
+        logger.info(f"Indexed {done} rows into {spec.table}")
+    return indexed
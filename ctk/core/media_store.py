@@ -0,0 +1,157 @@
+"""
+Content-addressed media store.
+
+Media files live flat in a database's ``media/`` directory, named by the
+SHA-256 of their bytes plus the original extension
+(``media/<sha256>.png``). Importing the same file twice stores one blob;
+messages keep referring to it by a ``media/<name>`` URL, so exporters and
+the TUI resolve blobs exactly like older (UUID-named) media files.
+
+The ``message_media`` table (MessageMediaModel) records which message uses
+which blob. Exports use it to copy or hardlink only referenced files, and
+``ctk db media-gc`` deletes the files nothing references.
+"""
+
+import hashlib
+import os
+import shutil
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Set
+
+from .constants import MEDIA_GC_GRACE_SECONDS, MEDIA_HASH_CHUNK_SIZE
+
+MEDIA_PREFIX = "media/"
+
+# MessageContent fields holding MediaContent lists
+MEDIA_KINDS = ("images", "audio", "video", "documents")
+
+
+def media_name(ref: Optional[str]) -> Optional[str]:
+    """File name inside media/ a reference points at, else None.
+
+    Both ``media/<name>`` and a bare ``<name>`` count: exporters look bare
+    file names up in media/ too.
+    """
+    if not ref:
+        return None
+    name = ref[len(MEDIA_PREFIX) :] if ref.startswith(MEDIA_PREFIX) else ref
+    if not name or name.startswith(".") or any(c in name for c in "/\\:"):
+        return None
+    return name
+
+
+def referenced_media(content: Dict[str, Any]) -> Set[str]:
+    """Media file names referenced by a serialized MessageContent"""
+    names = set()
+    for kind in MEDIA_KINDS:
+        for item in content.get(kind) or []:
+            if not isinstance(item, dict):
+                continue
+            for key in ("url", "path"):
+                name = media_name(item.get(key))
+                if name:
+                    names.add(name)
+    return names
+
+
+def file_digest(path: Path) -> str:
+    """SHA-256 of a file, read in chunks"""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(MEDIA_HASH_CHUNK_SIZE), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def link_or_copy(src: Path, dest: Path, link: bool = False) -> None:
+    """Put ``src`` at ``dest``: a hardlink if asked and possible, else a copy.
+
+    An existing ``dest`` of the same size is left alone; media names are
+    never reused for different content.
+    """
+    if dest.exists():
+        if dest.stat().st_size == src.stat().st_size:
+            return
+        dest.unlink()
+    if link:
+        try:
+            os.link(src, dest)
+            return
+        except OSError:
+            pass  # Other filesystem, or links unsupported: copy instead
+    shutil.copy2(src, dest)
+
+
+class MediaStore:
+    """
+    Hash-named media blobs in one directory.
+
+    Args:
+        media_dir: The database's media/ directory
+    """
+
+    def __init__(self, media_dir: Path):
+        self.media_dir = Path(media_dir)
+
+    def path(self, name: str) -> Path:
+        """Location of a media file"""
+        return self.media_dir / name
+
+    def put(self, source: Path) -> str:
+        """Store a file (once per distinct content), returning its reference.
+
+        Returns:
+            ``media/<sha256><ext>`` for MediaContent.url
+        """
+        source = Path(source)
+        name = f"{file_digest(source)}{source.suffix.lower()}"
+        dest = self.media_dir / name
+        if not dest.exists():
+            self.media_dir.mkdir(parents=True, exist_ok=True)
+            tmp = dest.with_name(f".{name}.{os.getpid()}.tmp")
+            # copyfile, not copy2: the blob's mtime is its arrival time,
+            # which protects it from media-gc until it is referenced
+            shutil.copyfile(source, tmp)
+            os.replace(tmp, dest)
+        else:
+            # Restart the grace period: the blob may be unreferenced and old,
+            # and media-gc must not delete it before this import references it
+            os.utime(dest)
+        return MEDIA_PREFIX + name
+
+    def export(self, names: Iterable[str], dest_dir: Path, link: bool = False) -> int:
+        """Copy (or hardlink) the named media files into ``dest_dir``
+
+        Returns:
+            Number of files present in the store and exported
+        """
+        dest_dir = Path(dest_dir)
+        exported = 0
+        for name in sorted(set(names)):
+            src = self.media_dir / name
+            if not src.is_file():
+                continue
+            dest_dir.mkdir(parents=True, exist_ok=True)
+            link_or_copy(src, dest_dir / name, link=link)
+            exported += 1
+        return exported
+
+    def unreferenced(
+        self, referenced: Set[str], grace_seconds: float = MEDIA_GC_GRACE_SECONDS
+    ) -> List[Path]:
+        """Files no message references, older than ``grace_seconds``.
+
+        The grace period spares blobs an import in progress has stored but
+        not yet saved a message for.
+        """
+        if not self.media_dir.is_dir():
+            return []
+        cutoff = time.time() - grace_seconds
+        return sorted(
+            path
+            for path in self.media_dir.iterdir()
+            if path.is_file()
+            and path.name not in referenced
+            and path.stat().st_mtime < cutoff
+        )
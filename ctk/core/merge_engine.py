@@ -0,0 +1,365 @@
+"""
+Parallel merge engine behind ``ctk db merge``.
+
+Merging is split into three stages so the expensive parts scale out:
+
+1. **Scan** (process pool): each worker opens one input database, bringing
+   its schema up to date, and returns a digest per conversation: ID,
+   ``updated_at``, message count and, when the dedupe strategy needs one, a
+   content hash computed straight from the stored message rows.
+2. **Plan** (parent, input order): the merge rules (duplicate detection and
+   conflict resolution) are replayed over the digests, which decides which
+   input owns each output conversation.
+3. **Copy** (single writer): the winning rows are copied with
+   ``ATTACH DATABASE`` + ``INSERT ... SELECT``, one transaction per input,
+   so conversations never round-trip through ORM objects.
+
+Scans run ahead of the writer: database *n* is copied while later inputs
+are still being scanned.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import time
+from concurrent.futures import Executor, Future, ProcessPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Sequence, Set
+
+from sqlalchemy import text
+
+from .database import ConversationDB
+from .db_operations import DuplicateStrategy, MergeStrategy
+from .migrations import backfill_conversation_stats, backfill_message_media
+
+logger = logging.getLogger(__name__)
+
+_IN_MERGE_IDS = "(SELECT id FROM temp.merge_ids)"
+
+
+@dataclass
+class ConversationDigest:
+    """What the planner needs to know about one input conversation"""
+
+    id: str
+    updated_at: Optional[str]
+    message_count: int
+    content_hash: Optional[str] = None
+
+
+@dataclass
+class DatabaseScan:
+    """Digests of one input database plus the file the writer attaches"""
+
+    path: str
+    db_file: str
+    digests: List[ConversationDigest]
+    seconds: float
+
+
+def _canonical_json(raw: Optional[str]) -> str:
+    """Stored JSON re-serialized with sorted keys, so hashes ignore key order"""
+    if not raw:
+        return ""
+    try:
+        return json.dumps(json.loads(raw), sort_keys=True, separators=(",", ":"))
+    except ValueError:
+        return raw
+
+
+def _content_hashes(conn) -> Dict[str, str]:
+    """SHA-256 of each conversation's messages (role + content, by message ID).
+
+    Hashes the same fields as ``ConversationComparator.compute_hash`` but
+    reads the stored rows directly instead of rebuilding MessageContent
+    objects. The two hashes are not interchangeable.
+    """
+    hashes: Dict[str, str] = {}
+    current: Optional[str] = None
+    hasher = hashlib.sha256()
+    rows = conn.execute(
+        text(
+            "SELECT conversation_id, role, content_json FROM messages"
+            " ORDER BY conversation_id, id"
+        )
+    )
+    for conv_id, role, content in rows:
+        if conv_id != current:
+            if current is not None:
+                hashes[current] = hasher.hexdigest()
+            current, hasher = conv_id, hashlib.sha256()
+        hasher.update((role or "").encode())
+        hasher.update(_canonical_json(content).encode())
+    if current is not None:
+        hashes[current] = hasher.hexdigest()
+    return hashes
+
+
+def scan_database(path: str, with_hashes: bool = False) -> DatabaseScan:
+    """Digest every conversation in one input database.
+
+    Runs in a worker process, so it only takes and returns picklable values.
+    """
+    start = time.perf_counter()
+    with ConversationDB(path) as db:
+        with db.engine.connect() as conn:
+            rows = conn.execute(
+                text(
+                    "SELECT c.id, c.updated_at, COUNT(m.id) FROM conversations c"
+                    " LEFT JOIN messages m ON m.conversation_id = c.id"
+                    " GROUP BY c.id ORDER BY c.id"
+                )
+            ).fetchall()
+            hashes = _content_hashes(conn) if with_hashes else {}
+        db_file = db.db_path
+
+    empty = hashlib.sha256().hexdigest()
+    digests = [
+        ConversationDigest(
+            id=conv_id,
+            updated_at=str(updated_at) if updated_at is not None else None,
+            message_count=count,
+            content_hash=hashes.get(conv_id, empty) if with_hashes else None,
+        )
+        for conv_id, updated_at, count in rows
+    ]
+    return DatabaseScan(
+        path=path,
+        db_file=db_file,
+        digests=digests,
+        seconds=time.perf_counter() - start,
+    )
+
+
+@dataclass
+class MergePlan:
+    """Replays the merge rules over digests, one input database at a time.
+
+    Same semantics as merging tree by tree: inputs are taken in order, a
+    duplicate either replaces the accepted version (per ``strategy``) or is
+    dropped, and ``updated_at``/message counts come from the stored rows.
+    """
+
+    strategy: MergeStrategy
+    dedupe: DuplicateStrategy
+    accepted: Dict[str, ConversationDigest] = field(default_factory=dict)
+    seen_hashes: Set[str] = field(default_factory=set)
+
+    @property
+    def uses_hashes(self) -> bool:
+        return self.dedupe in (DuplicateStrategy.HASH, DuplicateStrategy.SMART)
+
+    def _is_duplicate(self, digest: ConversationDigest) -> bool:
+        if self.dedupe in (DuplicateStrategy.EXACT, DuplicateStrategy.SMART):
+            if digest.id in self.accepted:
+                return True
+        if self.uses_hashes and digest.content_hash in self.seen_hashes:
+            return True
+        return False
+
+    def _wins(self, digest: ConversationDigest) -> bool:
+        """Whether a duplicate replaces the accepted conversation with its ID"""
+        existing = self.accepted.get(digest.id)
+        if existing is None:
+            # Same content under a new ID: nothing to replace
+            return True
+        if self.strategy == MergeStrategy.NEWEST:
+            return (digest.updated_at or "") > (existing.updated_at or "")
+        if self.strategy == MergeStrategy.OLDEST:
+            return (digest.updated_at or "") < (existing.updated_at or "")
+        if self.strategy == MergeStrategy.LONGEST:
+            return digest.message_count > existing.message_count
+        # MANUAL would need interactive resolution; keep the existing one
+        return False
+
+    def admit(self, scan: DatabaseScan, stats: Dict[str, Any]) -> List[str]:
+        """Return the IDs from ``scan`` that should be written to the output"""
+        chosen: Dict[str, None] = {}
+        for digest in scan.digests:
+            stats["total_input"] += 1
+            if self._is_duplicate(digest):
+                stats["duplicates_found"] += 1
+                if self.strategy == MergeStrategy.SKIP or not self._wins(digest):
+                    continue
+                stats["conflicts_resolved"] += 1
+            self.accepted[digest.id] = digest
+            if digest.content_hash is not None:
+                self.seen_hashes.add(digest.content_hash)
+            chosen[digest.id] = None
+        return list(chosen)
+
+
+def _shared_columns(conn, table: str) -> str:
+    """Columns of ``table`` present in both the output and the attached input"""
+    main = [row[1] for row in conn.execute(text(f"PRAGMA main.table_info({table})"))]
+    src = {
+        row[1] for row in conn.execute(text(f"PRAGMA merge_src.table_info({table})"))
+    }
+    return ", ".join(name for name in main if name in src)
+
+
+def copy_conversations(
+    output: ConversationDB, db_file: str, ids: Sequence[str]
+) -> None:
+    """Copy conversations (rows, messages, tag links) from ``db_file``.
+
+    Existing output rows with the same IDs are replaced. Deletes and inserts
+    go through the FTS triggers, so search stays in sync. Tags are matched
+    by name because tag IDs differ between databases, and message media
+    references are recomputed from the copied messages.
+    """
+    if not ids:
+        return
+    with output.engine.connect() as conn:
+        conn.execute(text("ATTACH DATABASE :path AS merge_src"), {"path": db_file})
+        try:
+            conn.execute(
+                text("CREATE TEMP TABLE IF NOT EXISTS merge_ids (id TEXT PRIMARY KEY)")
+            )
+            conn.execute(text("DELETE FROM temp.merge_ids"))
+            conn.execute(
+                text("INSERT INTO temp.merge_ids (id) VALUES (:id)"),
+                [{"id": conv_id} for conv_id in ids],
+            )
+
+            conv_cols = _shared_columns(conn, "conversations")
+            msg_cols = _shared_columns(conn, "messages")
+            statements = [
+                "DELETE FROM main.message_media"
+                f" WHERE conversation_id IN {_IN_MERGE_IDS}",
+                "DELETE FROM main.messages"
+                f" WHERE conversation_id IN {_IN_MERGE_IDS}",
+                "DELETE FROM main.conversation_tags"
+                f" WHERE conversation_id IN {_IN_MERGE_IDS}",
+                f"DELETE FROM main.paths WHERE conversation_id IN {_IN_MERGE_IDS}",
+                f"DELETE FROM main.conversations WHERE id IN {_IN_MERGE_IDS}",
+                f"INSERT INTO main.conversations ({conv_cols})"
+                f" SELECT {conv_cols} FROM merge_src.conversations"
+                f" WHERE id IN {_IN_MERGE_IDS}",
+                f"INSERT OR IGNORE INTO main.messages ({msg_cols})"
+                f" SELECT {msg_cols} FROM merge_src.messages"
+                f" WHERE conversation_id IN {_IN_MERGE_IDS}",
+                "INSERT OR IGNORE INTO main.tags"
+                " (name, category, description, created_at)"
+                " SELECT DISTINCT t.name, t.category, t.description, t.created_at"
+                " FROM merge_src.tags t"
+                " JOIN merge_src.conversation_tags ct ON ct.tag_id = t.id"
+                f" WHERE ct.conversation_id IN {_IN_MERGE_IDS}",
+                "INSERT OR IGNORE INTO main.conversation_tags"
+                " (conversation_id, tag_id)"
+                " SELECT ct.conversation_id, mt.id"
+                " FROM merge_src.conversation_tags ct"
+                " JOIN merge_src.tags st ON st.id = ct.tag_id"
+                " JOIN main.tags mt ON mt.name = st.name"
+                f" WHERE ct.conversation_id IN {_IN_MERGE_IDS}",
+            ]
+            for statement in statements:
+                conn.execute(text(statement))
+            # Rebuilt from the copied rows: input message IDs that collided
+            # with existing output messages were not copied
+            backfill_message_media(conn, f"conversation_id IN {_IN_MERGE_IDS}")
+            if "message_count" not in conv_cols.split(", "):
+                # Input predates the denormalized stats columns
+                backfill_conversation_stats(conn, f"id IN {_IN_MERGE_IDS}")
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            conn.execute(text("DETACH DATABASE merge_src"))
+
+
+class _InlineExecutor(Executor):
+    """Runs submitted calls immediately; used when one worker is enough"""
+
+    def submit(self, fn, *args, **kwargs):  # type: ignore[override]
+        future: Future = Future()
+        try:
+            future.set_result(fn(*args, **kwargs))
+        except BaseException as exc:
+            future.set_exception(exc)
+        return future
+
+
+def parallel_merge(
+    input_dbs: List[str],
+    output_db: str,
+    strategy: MergeStrategy = MergeStrategy.NEWEST,
+    dedupe: DuplicateStrategy = DuplicateStrategy.EXACT,
+    workers: Optional[int] = None,
+    progress_callback: Optional[Callable] = None,
+) -> Dict[str, Any]:
+    """
+    Merge ``input_dbs`` into ``output_db`` using the scan/plan/copy pipeline.
+
+    Args:
+        input_dbs: Input database paths, in priority order
+        output_db: Output database path
+        strategy: How to resolve conflicts
+        dedupe: Deduplication strategy
+        workers: Scanner processes (default: one per input, up to CPU count)
+        progress_callback: Called with the stats dict after each input
+
+    Returns:
+        Merge statistics; ``databases`` holds per-input throughput
+    """
+    stats: Dict[str, Any] = {
+        "total_input": 0,
+        "total_output": 0,
+        "duplicates_found": 0,
+        "conflicts_resolved": 0,
+        "databases_merged": len(input_dbs),
+        "databases": [],
+    }
+    if workers is None:
+        workers = min(len(input_dbs), os.cpu_count() or 1)
+    plan = MergePlan(strategy=strategy, dedupe=dedupe)
+
+    executor: Executor = (
+        ProcessPoolExecutor(max_workers=workers)
+        if workers > 1 and len(input_dbs) > 1
+        else _InlineExecutor()
+    )
+    futures: List[Future] = []
+    try:
+        futures = [
+            executor.submit(scan_database, path, plan.uses_hashes) for path in input_dbs
+        ]
+        with ConversationDB(output_db) as output:
+            for future in futures:
+                scan = future.result()
+                before = stats["total_input"]
+                ids = plan.admit(scan, stats)
+
+                start = time.perf_counter()
+                copy_conversations(output, scan.db_file, ids)
+                copy_seconds = time.perf_counter() - start
+
+                scanned = stats["total_input"] - before
+                elapsed = scan.seconds + copy_seconds
+                stats["databases"].append(
+                    {
+                        "path": scan.path,
+                        "conversations": scanned,
+                        "copied": len(ids),
+                        "scan_seconds": scan.seconds,
+                        "copy_seconds": copy_seconds,
+                        "conversations_per_second": (
+                            scanned / elapsed if elapsed > 0 else 0.0
+                        ),
+                    }
+                )
+                stats["total_output"] = len(plan.accepted)
+                logger.info(
+                    f"Merged {scan.path}: {len(ids)}/{scanned} conversations "
+                    f"copied in {elapsed:.2f}s"
+                )
+                if progress_callback:
+                    progress_callback(stats)
+    finally:
+        for future in futures:
+            future.cancel()
+        executor.shutdown(wait=True)
+
+    return stats
@@ -5,9 +5,10 @@ under its own transaction; user_version advances only when a step commits.
 Adding a schema change means appending a Migration, never editing an old one.
 """
 
+import json
 import logging
 from dataclasses import dataclass
-from typing import Callable, List, Optional
+from typing import Callable, Dict, List, Optional
 
 from sqlalchemy import text
 from sqlalchemy.engine import Connection, Engine
@@ -75,11 +76,312 @@ def _m3_is_branching(conn: Connection) -> None:
     )
 
 
+_EMBEDDINGS_V5_DDL = """
+CREATE TABLE conversation_embeddings (
+    id INTEGER NOT NULL,
+    conversation_id VARCHAR NOT NULL,
+    provider VARCHAR NOT NULL,
+    model VARCHAR NOT NULL,
+    chunking_strategy VARCHAR NOT NULL,
+    aggregation_strategy VARCHAR NOT NULL,
+    aggregation_weights JSON,
+    vector BLOB NOT NULL,
+    dtype VARCHAR NOT NULL,
+    norm FLOAT,
+    scale FLOAT,
+    dimensions INTEGER NOT NULL,
+    created_at DATETIME NOT NULL,
+    PRIMARY KEY (id),
+    CONSTRAINT uq_conversation_embedding UNIQUE
+        (conversation_id, provider, model, chunking_strategy, aggregation_strategy),
+    FOREIGN KEY(conversation_id) REFERENCES conversations (id)
+)
+"""
+
+_EMBEDDING_INDEXES = {
+    "idx_emb_conversation": "conversation_id",
+    "idx_emb_provider": "provider",
+    "idx_emb_model": "model",
+}
+
+
+def _m5_binary_embeddings(conn: Connection) -> None:
+    """Replace embedding_json float lists with float32 BLOBs plus dtype/norm.
+
+    SQLite cannot drop a NOT NULL column in place, so the table is rebuilt
+    and every row re-encoded. Rows whose JSON cannot be decoded are
+    dropped with a warning; embeddings can always be regenerated.
+    """
+    from .vectors import encode_vector
+
+    cols = _columns(conn, "conversation_embeddings")
+    if "vector" in cols or "embedding_json" not in cols:
+        return
+
+    conn.execute(text("ALTER TABLE conversation_embeddings RENAME TO _embeddings_v4"))
+    # Indexes follow the renamed table; free their names for the new one
+    for name in _EMBEDDING_INDEXES:
+        conn.execute(text(f"DROP INDEX IF EXISTS {name}"))
+    conn.execute(text(_EMBEDDINGS_V5_DDL))
+    for name, column in _EMBEDDING_INDEXES.items():
+        conn.execute(text(f"CREATE INDEX {name} ON conversation_embeddings ({column})"))
+
+    insert = text(
+        "INSERT INTO conversation_embeddings (id, conversation_id, provider, "
+        "model, chunking_strategy, aggregation_strategy, aggregation_weights, "
+        "vector, dtype, norm, scale, dimensions, created_at) VALUES (:id, "
+        ":conversation_id, :provider, :model, :chunking_strategy, "
+        ":aggregation_strategy, :aggregation_weights, :vector, :dtype, :norm, "
+        ":scale, :dimensions, :created_at)"
+    )
+    result = conn.execute(
+        text(
+            "SELECT id, conversation_id, provider, model, chunking_strategy, "
+            "aggregation_strategy, aggregation_weights, embedding_json, "
+            "created_at FROM _embeddings_v4"
+        )
+    )
+    converted = skipped = 0
+    while True:
+        rows = result.fetchmany(500)
+        if not rows:
+            break
+        batch = []
+        for row in rows:
+            try:
+                values = row.embedding_json
+                if isinstance(values, (str, bytes)):
+                    values = json.loads(values)
+                encoded = encode_vector(values)
+            except (TypeError, ValueError) as exc:
+                skipped += 1
+                logger.warning("Dropping unreadable embedding %s: %s", row.id, exc)
+                continue
+            batch.append(
+                {
+                    "id": row.id,
+                    "conversation_id": row.conversation_id,
+                    "provider": row.provider,
+                    "model": row.model,
+                    "chunking_strategy": row.chunking_strategy,
+                    "aggregation_strategy": row.aggregation_strategy,
+                    "aggregation_weights": row.aggregation_weights,
+                    "vector": encoded.blob,
+                    "dtype": encoded.dtype,
+                    "norm": encoded.norm,
+                    "scale": encoded.scale,
+                    "dimensions": encoded.dimensions,
+                    "created_at": row.created_at,
+                }
+            )
+        if batch:
+            conn.execute(insert, batch)
+            converted += len(batch)
+
+    conn.execute(text("DROP TABLE _embeddings_v4"))
+    logger.info(
+        "Converted %d embeddings to binary storage (%d dropped)", converted, skipped
+    )
+
+
+def _m6_embedding_content_hashes(conn: Connection) -> None:
+    cols = _columns(conn, "conversation_embeddings")
+    if not cols:
+        return
+    for column in ("config_hash", "content_hash"):
+        if column not in cols:
+            conn.execute(
+                text(f"ALTER TABLE conversation_embeddings ADD COLUMN {column} VARCHAR")
+            )
+
+
+_STATS_COLUMNS = {
+    "message_count": "INTEGER DEFAULT 0",
+    "char_count": "INTEGER DEFAULT 0",
+    "token_count": "INTEGER DEFAULT 0",
+    "last_message_at": "DATETIME",
+    "branch_count": "INTEGER DEFAULT 0",
+}
+
+
+def backfill_conversation_stats(conn: Connection, where: str = "") -> None:
+    """Recompute the denormalized message statistics of conversations.
+
+    Mirrors what ConversationDB._save_batch computes: branch points are
+    parents with more than one child, tokens are chars // CHARS_PER_TOKEN.
+    ``where`` is an optional SQL condition on ``conversations`` limiting
+    which rows are refreshed.
+    """
+    from .constants import CHARS_PER_TOKEN
+
+    condition = f" WHERE {where}" if where else ""
+    conn.execute(
+        text(
+            """
+            UPDATE conversations SET
+                message_count = (
+                    SELECT COUNT(*) FROM messages m
+                    WHERE m.conversation_id = conversations.id
+                ),
+                char_count = (
+                    SELECT COALESCE(SUM(LENGTH(
+                        COALESCE(json_extract(m.content_json, '$.text'), '')
+                    )), 0)
+                    FROM messages m WHERE m.conversation_id = conversations.id
+                ),
+                last_message_at = (
+                    SELECT MAX(m.timestamp) FROM messages m
+                    WHERE m.conversation_id = conversations.id
+                ),
+                branch_count = (
+                    SELECT COUNT(*) FROM (
+                        SELECT m.parent_id FROM messages m
+                        JOIN messages p ON p.id = m.parent_id
+                        WHERE m.conversation_id = conversations.id
+                        GROUP BY m.parent_id HAVING COUNT(*) > 1
+                    )
+                )
+            """
+            + condition
+        )
+    )
+    conn.execute(
+        text(
+            f"UPDATE conversations SET token_count = char_count / {CHARS_PER_TOKEN}"
+            + condition
+        )
+    )
+
+
+def backfill_message_media(conn: Connection, where: str = "") -> int:
+    """Record the media files messages reference in ``message_media``.
+
+    Mirrors what ConversationDB._save_batch records. ``where`` is an
+    optional SQL condition on ``messages`` limiting which rows are read;
+    existing references are kept (INSERT OR IGNORE).
+
+    Returns:
+        Number of references found
+    """
+    from .media_store import MEDIA_KINDS, referenced_media
+
+    # Only messages whose JSON mentions a media list need parsing
+    condition = " OR ".join(f"content_json LIKE '%\"{kind}\"%'" for kind in MEDIA_KINDS)
+    rows = conn.execute(
+        text(
+            "SELECT id, conversation_id, content_json FROM messages WHERE "
+            + (f"({where}) AND ({condition})" if where else condition)
+        )
+    )
+    links: List[Dict[str, str]] = []
+    for msg_id, conv_id, content in rows:
+        if isinstance(content, str):
+            try:
+                content = json.loads(content)
+            except ValueError:
+                continue
+        if isinstance(content, dict):
+            links.extend(
+                {"message_id": msg_id, "media": name, "conversation_id": conv_id}
+                for name in sorted(referenced_media(content))
+            )
+    if links:
+        conn.execute(
+            text(
+                "INSERT OR IGNORE INTO message_media "
+                "(message_id, media, conversation_id) "
+                "VALUES (:message_id, :media, :conversation_id)"
+            ),
+            links,
+        )
+    return len(links)
+
+
+def _m7_conversation_stats(conn: Connection) -> None:
+    """Add denormalized message statistics to conversations and backfill them."""
+    cols = _columns(conn, "conversations")
+    for column, ddl in _STATS_COLUMNS.items():
+        if column not in cols:
+            conn.execute(text(f"ALTER TABLE conversations ADD COLUMN {column} {ddl}"))
+
+    backfill_conversation_stats(conn)
+    conn.execute(
+        text(
+            "CREATE INDEX IF NOT EXISTS idx_conv_message_count "
+            "ON conversations(message_count, id)"
+        )
+    )
+    conn.execute(
+        text(
+            "CREATE INDEX IF NOT EXISTS idx_conv_last_message "
+            "ON conversations(last_message_at)"
+        )
+    )
+
+
+def _m8_external_content_fts(conn: Connection) -> None:
+    """Drop FTS tables that duplicate message text.
+
+    ConversationDB recreates them as external-content tables; existing
+    rows are indexed by ``ctk db fts-rebuild`` (inline for small databases).
+    """
+    from .fts import drop_legacy
+
+    if drop_legacy(conn):
+        logger.info("Dropped legacy FTS tables; the search index will be rebuilt")
+
+
+def _m9_index_generation(conn: Connection) -> None:
+    """Count changes to conversation ids, slugs and titles.
+
+    ConversationIndex labels its on-disk snapshot with this counter and
+    rebuilds it when the two disagree.
+    """
+    from .conversation_index import install_generation_counter
+
+    install_generation_counter(conn)
+
+
+def _m10_message_media(conn: Connection) -> None:
+    """Create the message -> media reference table and backfill it."""
+    if not _columns(conn, "messages"):
+        return
+    conn.execute(
+        text(
+            "CREATE TABLE IF NOT EXISTS message_media ("
+            "message_id VARCHAR NOT NULL, media VARCHAR NOT NULL, "
+            "conversation_id VARCHAR NOT NULL REFERENCES conversations (id), "
+            "PRIMARY KEY (message_id, media))"
+        )
+    )
+    conn.execute(
+        text(
+            "CREATE INDEX IF NOT EXISTS idx_message_media_media "
+            "ON message_media(media)"
+        )
+    )
+    conn.execute(
+        text(
+            "CREATE INDEX IF NOT EXISTS idx_message_media_conversation "
+            "ON message_media(conversation_id)"
+        )
+    )
+
+    count = backfill_message_media(conn)
+    logger.info("Recorded %d message media references", count)
+
+
 MIGRATIONS: List[Migration] = [
     Migration(1, "slug_summary_index", _m1_slug_summary_index),
     Migration(2, "keyset_list_index", _m2_keyset_list_index),
     Migration(3, "is_branching_column", _m3_is_branching),
     Migration(4, "rebuild_list_index", _m4_rebuild_list_index),
+    Migration(5, "binary_embeddings", _m5_binary_embeddings),
+    Migration(6, "embedding_content_hashes", _m6_embedding_content_hashes),
+    Migration(7, "conversation_stats", _m7_conversation_stats),
+    Migration(8, "external_content_fts", _m8_external_content_fts),
+    Migration(9, "index_generation", _m9_index_generation),
+    Migration(10, "message_media", _m10_message_media),
 ]
 
 
@@ -0,0 +1,115 @@
+"""
+MinHash signatures and LSH banding for near-duplicate detection.
+
+A MinHash signature summarises a token set in ``num_perm`` integers such
+that the fraction of equal positions between two signatures estimates the
+Jaccard similarity of the sets. LSH splits each signature into bands;
+conversations sharing any whole band become candidate pairs, so only a
+small fraction of the N^2 pairs is ever compared.
+"""
+
+import hashlib
+import zlib
+from collections import defaultdict
+from typing import Dict, Generic, Hashable, Iterable, List, Set, Tuple, TypeVar
+
+import numpy as np
+
+_MERSENNE_PRIME = np.uint64((1 << 61) - 1)
+_MAX_HASH = np.uint64((1 << 32) - 1)
+
+
+class MinHasher:
+    """Computes fixed-size MinHash signatures for token sets"""
+
+    def __init__(self, num_perm: int = 128, seed: int = 1):
+        if num_perm < 1:
+            raise ValueError("num_perm must be at least 1")
+        self.num_perm = num_perm
+        self.seed = seed
+        rng = np.random.RandomState(seed)
+        # a * h + b stays below 2**64 for 32-bit token hashes
+        self._a = rng.randint(1, 1 << 32, size=num_perm, dtype=np.uint64)
+        self._b = rng.randint(0, 1 << 32, size=num_perm, dtype=np.uint64)
+
+    @property
+    def config_hash(self) -> str:
+        """Identifies signatures produced by this configuration"""
+        key = f"minhash:words:{self.num_perm}:{self.seed}"
+        return hashlib.sha256(key.encode()).hexdigest()[:16]
+
+    def signature(self, tokens: Iterable[str]) -> np.ndarray:
+        """
+        Signature of a token set (uint32 array of length ``num_perm``).
+
+        An empty set yields all-max values, which match nothing but other
+        empty sets; callers should skip those.
+        """
+        hashes = np.fromiter(
+            (zlib.crc32(token.encode()) for token in set(tokens)), dtype=np.uint64
+        )
+        if not hashes.size:
+            return np.full(self.num_perm, _MAX_HASH, dtype=np.uint32)
+        permuted = (np.outer(self._a, hashes) + self._b[:, None]) % _MERSENNE_PRIME
+        return (permuted & _MAX_HASH).min(axis=1).astype(np.uint32)
+
+    def to_bytes(self, signature: np.ndarray) -> bytes:
+        return signature.astype("<u4").tobytes()
+
+    def from_bytes(self, blob: bytes) -> np.ndarray:
+        return np.frombuffer(blob, dtype="<u4").astype(np.uint32)
+
+
+def estimate_jaccard(sig1: np.ndarray, sig2: np.ndarray) -> float:
+    """Fraction of agreeing positions: an unbiased Jaccard estimate"""
+    return float(np.count_nonzero(sig1 == sig2)) / len(sig1)
+
+
+def optimal_bands(threshold: float, num_perm: int) -> Tuple[int, int]:
+    """
+    Choose ``(bands, rows)`` with ``bands * rows <= num_perm``.
+
+    Minimises the (equally weighted) probability mass of false positives
+    below ``threshold`` and false negatives above it, using the
+    S-curve ``1 - (1 - s**rows)**bands``.
+    """
+    grid = np.linspace(0.0, 1.0, 201)
+    best, best_error = (1, num_perm), float("inf")
+    for bands in range(1, num_perm + 1):
+        rows = num_perm // bands
+        if rows < 1:
+            break
+        hit = 1.0 - (1.0 - grid**rows) ** bands
+        below = grid < threshold
+        # Uniform grid, so sums are proportional to the integrals
+        error = hit[below].sum() + (1.0 - hit[~below]).sum()
+        if error < best_error:
+            best, best_error = (bands, rows), error
+    return best
+
+
+K = TypeVar("K", bound=Hashable)
+
+
+class LSHIndex(Generic[K]):
+    """Buckets signatures by band so candidates are found without N^2 scans"""
+
+    def __init__(self, bands: int, rows: int):
+        self.bands = bands
+        self.rows = rows
+        self._buckets: List[Dict[bytes, List[K]]] = [
+            defaultdict(list) for _ in range(bands)
+        ]
+
+    def add(self, key: K, signature: np.ndarray) -> None:
+        for band, bucket in enumerate(self._buckets):
+            start = band * self.rows
+            bucket[signature[start : start + self.rows].tobytes()].append(key)
+
+    def candidates(self, signature: np.ndarray) -> Set[K]:
+        """Keys sharing at least one band with ``signature``"""
+        found: Set[K] = set()
+        for band, bucket in enumerate(self._buckets):
+            start = band * self.rows
+            found.update(bucket.get(signature[start : start + self.rows].tobytes(), ()))
+        return found
@@ -3,12 +3,11 @@ Core data models for conversation representation
 """
 
 import copy as _copy
-import hashlib
 import uuid
 from dataclasses import dataclass, field
 from datetime import datetime
 from enum import Enum
-from typing import Any, Dict, List, Optional
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set, Tuple
 
 
 class MessageRole(Enum):
@@ -511,10 +510,13 @@ class ConversationSummary:
     archived_at: Optional[datetime] = None
     slug: Optional[str] = None
     summary: Optional[str] = None
+    # Set on relevance-ranked full-text search results only
+    score: Optional[float] = None
+    snippet: Optional[str] = None
 
     def to_dict(self) -> Dict[str, Any]:
         """Convert to dictionary"""
-        return {
+        data: Dict[str, Any] = {
             "id": self.id,
             "title": self.title,
             "slug": self.slug,
@@ -530,6 +532,11 @@ class ConversationSummary:
             "archived_at": self.archived_at.isoformat() if self.archived_at else None,
             "summary": self.summary,
         }
+        if self.score is not None:
+            data["score"] = self.score
+        if self.snippet is not None:
+            data["snippet"] = self.snippet
+        return data
 
     @classmethod
     def from_dict(cls, data: Dict[str, Any]) -> "ConversationSummary":
@@ -569,6 +576,8 @@ class ConversationSummary:
             ),
             slug=data.get("slug"),
             summary=data.get("summary"),
+            score=data.get("score"),
+            snippet=data.get("snippet"),
         )
 
 
@@ -604,29 +613,70 @@ class ConversationTree:
     _paths_cache: Optional[List[List["Message"]]] = field(
         default=None, repr=False, compare=False
     )
-    _paths_cache_hash: Optional[str] = field(default=None, repr=False, compare=False)
+    _paths_cache_key: Optional[Tuple[int, Tuple[str, ...]]] = field(
+        default=None, repr=False, compare=False
+    )
 
-    def _compute_tree_hash(self) -> str:
-        """
-        Compute a hash of the tree structure for cache invalidation.
+    # Parent id -> child ids, built lazily and kept current by the
+    # mutators below. ``_children_source`` remembers the message_map (and
+    # its size) the index was built from, so reassigning message_map or
+    # inserting into it directly triggers a rebuild on the next lookup.
+    _children: Optional[Dict[Optional[str], List[str]]] = field(
+        default=None, repr=False, compare=False
+    )
+    _children_source: Optional[Tuple[Dict[str, Message], int]] = field(
+        default=None, repr=False, compare=False
+    )
+    # Bumped on every structural change; keys the paths cache
+    _version: int = field(default=0, repr=False, compare=False)
 
-        The hash is based on message IDs and parent relationships,
-        so any structural change will invalidate the cache.
-        """
-        structure = sorted(
-            [(m.id, m.parent_id or "") for m in self.message_map.values()]
-        )
-        # Also include root_message_ids order
-        structure_str = str(structure) + str(self.root_message_ids)
-        return hashlib.md5(structure_str.encode()).hexdigest()
+    def _structure_changed(self) -> None:
+        """Record a structural change made through the tree's own API"""
+        self._version += 1
+        self._paths_cache = None
+        self._paths_cache_key = None
+        if self._children is not None:
+            self._children_source = (self.message_map, len(self.message_map))
 
     def _invalidate_paths_cache(self) -> None:
-        """Invalidate the paths cache (called when tree structure changes)"""
-        self._paths_cache = None
-        self._paths_cache_hash = None
+        """
+        Invalidate cached structure.
+
+        Call after changing ``parent_id`` links or ``message_map`` entries
+        directly instead of going through the tree's methods.
+        """
+        self._children = None
+        self._children_source = None
+        self._structure_changed()
+
+    def _child_index(self) -> Dict[Optional[str], List[str]]:
+        """Return the parent -> child ids index, rebuilding it if stale"""
+        source = self._children_source
+        if (
+            self._children is None
+            or source is None
+            or source[0] is not self.message_map
+            or source[1] != len(self.message_map)
+        ):
+            index: Dict[Optional[str], List[str]] = {}
+            for msg in self.message_map.values():
+                index.setdefault(msg.parent_id, []).append(msg.id)
+            self._children = index
+            self._children_source = (self.message_map, len(self.message_map))
+            self._version += 1
+        return self._children
 
     def add_message(self, message: Message) -> None:
         """Add a message to the conversation tree"""
+        index = self._child_index()
+        previous = self.message_map.get(message.id)
+        if previous is None:
+            index.setdefault(message.parent_id, []).append(message.id)
+        elif previous.parent_id != message.parent_id:
+            siblings = index.get(previous.parent_id)
+            if siblings and message.id in siblings:
+                siblings.remove(message.id)
+            index.setdefault(message.parent_id, []).append(message.id)
         self.message_map[message.id] = message
 
         # If no parent, it's a root message
@@ -638,27 +688,26 @@ class ConversationTree:
         self.metadata.updated_at = datetime.now()
 
         # Invalidate paths cache since tree structure changed
-        self._invalidate_paths_cache()
+        self._structure_changed()
 
     def get_children(self, message_id: str) -> List[Message]:
         """Get all direct children of a message"""
-        children = []
-        for msg in self.message_map.values():
-            if msg.parent_id == message_id:
-                children.append(msg)
+        child_ids = self._child_index().get(message_id)
+        if not child_ids:
+            return []
+        children = [self.message_map[cid] for cid in child_ids]
         return sorted(children, key=lambda m: m.timestamp or datetime.min)
 
     def get_all_paths(self) -> List[List[Message]]:
         """
         Get all possible conversation paths from root to leaf.
 
-        Results are cached based on tree structure hash. The cache is
-        automatically invalidated when messages are added or the tree
-        structure changes.
+        Results are cached against the tree's structural version, which
+        every mutating method bumps, so a cache hit costs O(roots).
         """
-        # Check if cache is valid
-        current_hash = self._compute_tree_hash()
-        if self._paths_cache is not None and self._paths_cache_hash == current_hash:
+        self._child_index()
+        key = (self._version, tuple(self.root_message_ids))
+        if self._paths_cache is not None and self._paths_cache_key == key:
             return self._paths_cache
 
         # Cache miss or invalidated - compute paths
@@ -670,31 +719,46 @@ class ConversationTree:
 
         # Update cache
         self._paths_cache = all_paths
-        self._paths_cache_hash = current_hash
+        self._paths_cache_key = key
 
         return all_paths
 
     def _get_paths_from_message(self, message_id: str) -> List[List[Message]]:
-        """Get all paths starting from a specific message"""
+        """
+        Get all paths starting from a specific message.
+
+        Iterative depth-first walk so long chains don't hit the recursion
+        limit; paths come out in the same order as a recursive descent.
+        """
         message = self.message_map.get(message_id)
         if not message:
             return []
 
         children = self.get_children(message_id)
-
         if not children:
             # Leaf node - return single path with just this message
             return [[message]]
 
-        # Get paths from all children and prepend this message
-        all_paths = []
-        for child in children:
-            child_paths = self._get_paths_from_message(child.id)
-            for child_path in child_paths:
-                complete_path = [message] + child_path
-                all_paths.append(complete_path)
+        paths: List[List[Message]] = []
+        path = [message]
+        stack = [iter(children)]
+
+        while stack:
+            child = next(stack[-1], None)
+            if child is None:
+                stack.pop()
+                path.pop()
+                continue
+            path.append(child)
+            children = self.get_children(child.id)
+            if children:
+                stack.append(iter(children))
+            else:
+                # Leaf node - the current path is complete
+                paths.append(list(path))
+                path.pop()
 
-        return all_paths
+        return paths
 
     def get_longest_path(self) -> List[Message]:
         """Get the longest conversation path (most messages)"""
@@ -724,12 +788,11 @@ class ConversationTree:
 
     def count_branches(self) -> int:
         """Count the number of branch points in the conversation"""
-        branch_count = 0
-        for msg_id in self.message_map:
-            children = self.get_children(msg_id)
-            if len(children) > 1:
-                branch_count += 1
-        return branch_count
+        return sum(
+            1
+            for parent_id, child_ids in self._child_index().items()
+            if len(child_ids) > 1 and parent_id in self.message_map
+        )
 
     # ------------------------------------------------------------------
     # Tree primitives
@@ -747,13 +810,14 @@ class ConversationTree:
         """
         if node_id not in self.message_map:
             return []
+        index = self._child_index()
         out: List[str] = []
         frontier: List[str] = [node_id]
         while frontier:
             current = frontier.pop()
-            for child in self.get_children(current):
-                out.append(child.id)
-                frontier.append(child.id)
+            for child_id in index.get(current, ()):
+                out.append(child_id)
+                frontier.append(child_id)
         return out
 
     def ancestors_of(self, node_id: str) -> List[str]:
@@ -780,10 +844,15 @@ class ConversationTree:
         if node_id not in self.message_map:
             raise KeyError(node_id)
         to_drop = {node_id, *self.descendants_of(node_id)}
+        index = self._child_index()
+        siblings = index.get(self.message_map[node_id].parent_id)
+        if siblings and node_id in siblings:
+            siblings.remove(node_id)
         for mid in to_drop:
             self.message_map.pop(mid, None)
+            index.pop(mid, None)
         self.root_message_ids = [r for r in self.root_message_ids if r not in to_drop]
-        self._invalidate_paths_cache()
+        self._structure_changed()
         self.metadata.updated_at = datetime.now()
         return len(to_drop)
 
@@ -802,6 +871,7 @@ class ConversationTree:
             mid: msg for mid, msg in self.message_map.items() if mid in keep
         }
         self.root_message_ids = [r for r in self.root_message_ids if r in keep]
+        # The kept chain is at most a handful of ids; rebuild lazily
         self._invalidate_paths_cache()
         self.metadata.updated_at = datetime.now()
         return before - len(self.message_map)
@@ -863,6 +933,7 @@ class ConversationTree:
             raise KeyError(parent_id)
         # Old-id → new-id mapping for every message in ``other``.
         id_map: Dict[str, str] = {old: str(uuid.uuid4()) for old in other.message_map}
+        index = self._child_index()
         for old_id, msg in other.message_map.items():
             cloned = _copy.deepcopy(msg)
             cloned.id = id_map[old_id]
@@ -871,7 +942,8 @@ class ConversationTree:
             else:
                 cloned.parent_id = id_map.get(msg.parent_id, parent_id)
             self.message_map[cloned.id] = cloned
-        self._invalidate_paths_cache()
+            index.setdefault(cloned.parent_id, []).append(cloned.id)
+        self._structure_changed()
         self.metadata.updated_at = datetime.now()
         return len(id_map)
 
@@ -904,3 +976,79 @@ class ConversationTree:
             conv.root_message_ids = data["root_message_ids"]
 
         return conv
+
+
+# Fetches (content, metadata) for the given message ids; ids that no longer
+# exist are left out of the result
+BodyLoader = Callable[[List[str]], Dict[str, Tuple[MessageContent, Dict[str, Any]]]]
+
+
+@dataclass
+class LazyConversationTree(ConversationTree):
+    """ConversationTree whose message bodies are fetched on demand.
+
+    Built by ``ConversationDB.load_conversation(..., lazy=True)``. Every
+    message starts as a skeleton (id, parent, role, timestamp) with empty
+    content; ``load_bodies`` fills them in place through ``body_loader``,
+    and ``body_lengths`` gives the stored size of each body beforehand.
+    Serializing or copying the tree loads whatever is still missing, and
+    ``ConversationDB.save_conversation`` does the same, so a partially
+    loaded tree never overwrites stored messages with empty ones.
+    """
+
+    body_loader: Optional[BodyLoader] = field(default=None, repr=False, compare=False)
+    body_lengths: Dict[str, int] = field(
+        default_factory=dict, repr=False, compare=False
+    )
+    _unloaded: Set[str] = field(default_factory=set, repr=False, compare=False)
+
+    def mark_unloaded(self, message_id: str, length: int = 0) -> None:
+        """Record that ``message_id`` is a skeleton awaiting its body"""
+        self._unloaded.add(message_id)
+        self.body_lengths[message_id] = length
+
+    def is_loaded(self, message_id: str) -> bool:
+        return message_id not in self._unloaded
+
+    @property
+    def fully_loaded(self) -> bool:
+        return not self._unloaded
+
+    def load_bodies(self, message_ids: Iterable[str]) -> int:
+        """
+        Fill in the bodies of any skeleton messages among ``message_ids``
+
+        Returns:
+            Number of messages whose body was fetched
+        """
+        missing = [
+            mid
+            for mid in dict.fromkeys(message_ids)
+            if mid in self._unloaded and mid in self.message_map
+        ]
+        if not missing or self.body_loader is None:
+            return 0
+        bodies = self.body_loader(missing)
+        for mid in missing:
+            self._unloaded.discard(mid)
+            if mid in bodies:
+                message = self.message_map[mid]
+                message.content, message.metadata = bodies[mid]
+        return len(bodies)
+
+    def load_all(self) -> int:
+        """Fetch every body that is still missing"""
+        return self.load_bodies(list(self._unloaded))
+
+    def copy(self, *, new_id: bool = True) -> "ConversationTree":
+        self.load_all()
+        return super().copy(new_id=new_id)
+
+    def copy_subtree(self, node_id: str) -> "ConversationTree":
+        if node_id in self.message_map:
+            self.load_bodies([node_id, *self.descendants_of(node_id)])
+        return super().copy_subtree(node_id)
+
+    def to_dict(self) -> Dict[str, Any]:
+        self.load_all()
+        return super().to_dict()
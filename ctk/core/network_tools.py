@@ -30,12 +30,14 @@ fit a chat turn (slow, big-memory).
 from __future__ import annotations
 
 import logging
-from typing import Any, Dict, List, Optional, Tuple
+from typing import Any, Dict, List, Optional, Sequence, Tuple
 
 import numpy as np
 from sqlalchemy import or_
 
-from ctk.core.similarity import cosine_similarity, extract_conversation_text
+from ctk.core.constants import ANN_MIN_VECTORS
+from ctk.core.embedding_matrix import EmbeddingMatrix
+from ctk.core.similarity import extract_conversation_text
 from ctk.core.tools_registry import ToolProvider, register_provider
 
 logger = logging.getLogger(__name__)
@@ -202,8 +204,45 @@ def _query_similarities(db, seed_id: str, limit: int, min_sim: float):
         return out
 
 
+def _session_matrix(db) -> EmbeddingMatrix:
+    """Embeddings of the current embedding session's provider and model.
+
+    The same vectors db.get_ann_index() indexes, so _nearest gives the
+    same candidates either way. Without a session, every embedding.
+    """
+    session = db.get_current_embedding_session()
+    if not session:
+        return db.get_embedding_matrix()
+    provider = session["provider"]
+    return db.get_embedding_matrix(
+        provider=provider, model=session["model"] or provider
+    )
+
+
+def _nearest(
+    db,
+    matrix: EmbeddingMatrix,
+    query_vec: Any,
+    limit: int,
+    exclude: Sequence[str] = (),
+    min_sim: Optional[float] = None,
+) -> List[Tuple[str, float]]:
+    """Top ``limit`` conversations by cosine similarity to ``query_vec``.
+
+    Large collections go through the current embedding session's ANN
+    index; smaller ones (or a mismatched index) use the exact matrix, which
+    should come from _session_matrix.
+    """
+    if len(matrix) >= ANN_MIN_VECTORS:
+        index = db.get_ann_index()
+        if index is not None and index.dimensions == matrix.dimensions:
+            return index.search(query_vec, limit, exclude=exclude, min_score=min_sim)
+    return matrix.top_k(query_vec, limit, exclude=exclude, min_score=min_sim)
+
+
 def _compute_cosine_fallback(
-    all_embs: List[Dict[str, Any]],
+    db,
+    matrix: EmbeddingMatrix,
     seed_id: str,
     limit: int,
     min_sim: float,
@@ -211,38 +250,22 @@ def _compute_cosine_fallback(
     """Compute on-the-fly cosine similarity from stored embeddings.
 
     Returns a sorted list of (other_id, similarity) pairs, or None if the
-    seed conversation has no embedding in the provided list.
+    seed conversation has no embedding in ``matrix``.
     """
-    target_vec: Optional[np.ndarray] = None
-    candidate_embs: Dict[str, np.ndarray] = {}
-
-    for rec in all_embs:
-        vec = np.array(rec["embedding"])
-        if rec["conversation_id"] == seed_id:
-            target_vec = vec
-        else:
-            candidate_embs[rec["conversation_id"]] = vec
-
+    target_vec = matrix.vector(seed_id)
     if target_vec is None:
         return None
-
-    results: List[Tuple[str, float]] = []
-    for cid, vec in candidate_embs.items():
-        sim = float(cosine_similarity(target_vec, vec))
-        if sim >= min_sim:
-            results.append((cid, sim))
-
-    results.sort(key=lambda x: x[1], reverse=True)
-    return results[:limit]
+    return _nearest(db, matrix, target_vec, limit, exclude=[seed_id], min_sim=min_sim)
 
 
 def _format_results(db, pairs) -> str:
     """Render ``[(conv_id, score)]`` as a list with titles for the model."""
     if not pairs:
         return "(no similar conversations found)"
+    headers = db.load_conversations((conv_id for conv_id, _ in pairs), fields="header")
     lines = []
     for conv_id, score in pairs:
-        tree = db.load_conversation(conv_id)
+        tree = headers.get(conv_id)
         title = (tree.title if tree else "(missing)") or "(untitled)"
         lines.append(f"{conv_id[:8]}  {title}  ({score:.3f})")
     return "\n".join(lines)
@@ -271,14 +294,14 @@ def _do_semantic_search(db, args: Dict[str, Any]) -> str:
         return "Error: query is required"
     top_k = int(args.get("top_k", 10))
 
-    all_embs = db.get_all_embeddings()
-    if not all_embs:
+    matrix = _session_matrix(db)
+    if not len(matrix):
         return (
             "No embeddings found. Generate them first with "
             "`ctk db embeddings` then `ctk db links`."
         )
 
-    provider_name = all_embs[0].get("provider", "tfidf")
+    provider_name = matrix.provider or "tfidf"
 
     try:
         from ctk.core.similarity import (
@@ -298,9 +321,9 @@ def _do_semantic_search(db, args: Dict[str, Any]) -> str:
 
             tfidf = TFIDFEmbedding(config.provider_config)
             texts = []
-            for emb_record in all_embs:
+            for conv_id in matrix.ids:
                 try:
-                    conv = db.load_conversation(emb_record["conversation_id"])
+                    conv = db.load_conversation(conv_id)
                     if conv:
                         texts.append(extract_conversation_text(conv))
                 except Exception:
@@ -321,31 +344,17 @@ def _do_semantic_search(db, args: Dict[str, Any]) -> str:
         logger.error("Failed to embed query: %s", exc)
         return f"Error embedding query: {exc}"
 
-    results = []
-    for emb_record in all_embs:
-        stored_vec = np.array(emb_record["embedding"])
-        sim = cosine_similarity(query_vec, stored_vec)
-        if sim > 0:
-            results.append(
-                {
-                    "conversation_id": emb_record["conversation_id"],
-                    "similarity": sim,
-                }
-            )
-
-    results.sort(key=lambda x: x["similarity"], reverse=True)
-    results = results[:top_k]
+    results = [
+        (cid, sim) for cid, sim in _nearest(db, matrix, query_vec, top_k) if sim > 0
+    ]
 
     if not results:
         return "No semantically similar conversations found."
 
-    result_ids = [r["conversation_id"] for r in results]
-    title_cache = _build_title_cache(db, result_ids)
+    title_cache = _build_title_cache(db, [cid for cid, _ in results])
 
     lines = [f'Semantic search results for "{query}":\n']
-    for i, r in enumerate(results, 1):
-        cid = r["conversation_id"]
-        sim = r["similarity"]
+    for i, (cid, sim) in enumerate(results, 1):
         title = title_cache.get(cid, "Unknown")
         lines.append(f"[{i}] {cid[:8]} ({sim:.2f}) {title}")
 
@@ -390,15 +399,15 @@ def _do_find_similar(db, args: Dict[str, Any]) -> str:
         return _format_results(db, pairs)
 
     # Table is empty for this conversation. Check whether embeddings exist.
-    all_embs = db.get_all_embeddings()
-    if not all_embs:
+    matrix = _session_matrix(db)
+    if not len(matrix):
         return (
             "No embeddings found. Generate them first with "
             "`ctk db embeddings` then `ctk db links`."
         )
 
     # On-the-fly cosine fallback: compute directly from stored embeddings.
-    fallback = _compute_cosine_fallback(all_embs, seed_id, limit, min_sim)
+    fallback = _compute_cosine_fallback(db, matrix, seed_id, limit, min_sim)
     if fallback is None:
         return (
             f"No embedding found for conversation {seed_id[:8]}. "
@@ -53,3 +53,37 @@ def decode_cursor(cursor: str) -> Tuple[datetime, str]:
         raise ValueError(f"Invalid cursor JSON: {e}") from e
 
     return datetime.fromisoformat(data["u"]), data["id"]
+
+
+def encode_rank_cursor(score: float, conversation_id: str) -> str:
+    """Encode a cursor for relevance-ordered search results.
+
+    Args:
+        score: Relevance score of the last item on current page
+        conversation_id: ID of the last item on current page
+
+    Returns:
+        URL-safe base64-encoded cursor string
+    """
+    data = {"s": score, "id": conversation_id}
+    return base64.urlsafe_b64encode(json.dumps(data).encode()).decode()
+
+
+def decode_rank_cursor(cursor: str) -> Tuple[float, str]:
+    """Decode a cursor produced by :func:`encode_rank_cursor`.
+
+    Raises:
+        ValueError: If cursor is not valid base64 or JSON
+        KeyError: If cursor JSON is missing required fields
+    """
+    try:
+        raw = base64.urlsafe_b64decode(cursor.encode())
+    except Exception as e:
+        raise ValueError(f"Invalid cursor encoding: {e}") from e
+
+    try:
+        data = json.loads(raw)
+    except json.JSONDecodeError as e:
+        raise ValueError(f"Invalid cursor JSON: {e}") from e
+
+    return float(data["s"]), data["id"]
@@ -16,8 +16,21 @@ import json
 import logging
 from abc import ABC, abstractmethod
 from pathlib import Path
-from typing import Any, Dict, List, Optional, Set, Tuple, Type, cast
-
+from typing import (
+    IO,
+    Any,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Set,
+    Tuple,
+    Type,
+    cast,
+)
+
+from .export_manifest import ManifestStats
 from .models import ConversationTree
 
 logger = logging.getLogger(__name__)
@@ -296,11 +309,24 @@ class BasePlugin(ABC):
 class ImporterPlugin(BasePlugin):
     """Base class for importer plugins"""
 
+    # True when iter_import builds one tree per input element, so it can be
+    # fed a lazy iterator of conversation dicts (see ``ctk import --stream``).
+    streaming: bool = False
+
     @abstractmethod
     def import_data(self, data: Any, **kwargs) -> List[ConversationTree]:
         """Import data and return ConversationTree objects"""
         pass
 
+    def iter_import(self, data: Any, **kwargs) -> Iterator[ConversationTree]:
+        """Yield ConversationTree objects one at a time.
+
+        The default delegates to import_data, so it holds every tree in
+        memory; importers with ``streaming = True`` override this to build
+        each tree only when the consumer asks for it.
+        """
+        yield from self.import_data(data, **kwargs)
+
     def detect_format(self, data: Any) -> bool:
         """Auto-detect if this importer can handle the data"""
         return self.validate(data)
@@ -309,6 +335,10 @@ class ImporterPlugin(BasePlugin):
 class ExporterPlugin(BasePlugin):
     """Base class for exporter plugins"""
 
+    # True when export_stream writes one conversation at a time, so it can be
+    # fed a lazy iterator of trees (see ``ctk export``) in constant memory.
+    streaming: bool = False
+
     @abstractmethod
     def export_data(self, conversations: List[ConversationTree], **kwargs) -> Any:
         """Export ConversationTree objects to target format"""
@@ -335,11 +365,42 @@ class ExporterPlugin(BasePlugin):
         # "longest" and any unknown value fall through to the longest path
         return conv.get_longest_path()
 
-    def export_to_file(
-        self, conversations: List[ConversationTree], file_path: str, **kwargs
-    ) -> None:
-        """Export to file"""
+    def export_stream(
+        self, conversations: Iterable[ConversationTree], fh: IO[str], **kwargs
+    ) -> int:
+        """Write conversations to an open text file handle.
+
+        The default collects every tree and writes the result of
+        export_data, so it holds the whole export in memory; exporters with
+        ``streaming = True`` override this to write each conversation as it
+        is pulled from the iterable.
+
+        Returns:
+            Number of conversations written
+        """
+        conversations = list(conversations)
         data = self.export_data(conversations, **kwargs)
+        if isinstance(data, bytes):
+            data = data.decode("utf-8")
+        elif not isinstance(data, str):
+            data = json.dumps(data, indent=2)
+        fh.write(data)
+        return len(conversations)
+
+    def export_to_file(
+        self, conversations: Iterable[ConversationTree], file_path: str, **kwargs
+    ) -> Optional[ManifestStats]:
+        """Export to file
+
+        Returns:
+            Counts for an incremental directory export, otherwise None
+        """
+        if self.streaming:
+            with open(file_path, "w", encoding="utf-8", newline="") as fh:
+                self.export_stream(conversations, fh, **kwargs)
+            return None
+
+        data = self.export_data(list(conversations), **kwargs)
 
         if isinstance(data, str):
             mode = "w"
@@ -352,6 +413,7 @@ class ExporterPlugin(BasePlugin):
 
         with open(file_path, mode) as f:
             f.write(data)
+        return None
 
 
 class PluginRegistry:
@@ -9,15 +9,21 @@ This module provides:
 
 import hashlib
 import json
+import math
+import time
 from dataclasses import asdict, dataclass, field
 from enum import Enum
-from typing import Any, Dict, List, Optional, Tuple, Union, cast
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Tuple, Union, cast
 
 import numpy as np
 
+from ctk.core.constants import SIMILARITY_BLOCK_SIZE
 from ctk.core.models import ConversationTree, MessageRole
 from ctk.embeddings.base import AggregationStrategy, ChunkingStrategy, EmbeddingProvider
 
+if TYPE_CHECKING:
+    from ctk.embeddings.ann import VectorIndex
+
 
 # ==================== Shared Utilities ====================
 
@@ -136,6 +142,29 @@ class ConversationEmbeddingConfig:
         config_json = json.dumps(config_dict, sort_keys=True)
         return hashlib.sha256(config_json.encode()).hexdigest()[:16]
 
+    def chunk_hash(self) -> str:
+        """Hash of the settings that affect a single chunk's vector.
+
+        Unlike :meth:`to_hash` this ignores chunking, aggregation and
+        weights, so cached chunk embeddings survive changes to those.
+        Credentials and timeouts are left out as well.
+        """
+        provider_config = {
+            k: v
+            for k, v in self.provider_config.items()
+            if k not in ("api_key", "timeout")
+        }
+        config_json = json.dumps(
+            {
+                "provider": self.provider,
+                "model": self.model,
+                "provider_config": provider_config,
+            },
+            sort_keys=True,
+            default=str,
+        )
+        return hashlib.sha256(config_json.encode()).hexdigest()[:16]
+
 
 # ==================== Conversation Embedder ====================
 
@@ -220,12 +249,28 @@ class ConversationEmbedder:
 
         # Batch embed all texts
         embedding_responses = self.provider.embed_batch(texts)
-        embeddings = [np.array(resp.embedding) for resp in embedding_responses]
+        return self.aggregate_chunks(
+            [resp.embedding for resp in embedding_responses], weights
+        )
+
+    def aggregate_chunks(
+        self, embeddings: List[Any], weights: List[float]
+    ) -> np.ndarray:
+        """
+        Combine chunk embeddings into one conversation embedding.
+
+        Args:
+            embeddings: One vector per chunk from ``_extract_text_chunks``
+            weights: The matching chunk weights
 
-        # Aggregate using specified strategy
-        # Convert numpy arrays to plain lists to satisfy EmbeddingProvider.aggregate_embeddings
+        Returns:
+            Embedding vector as numpy array
+        """
+        # Convert to plain lists to satisfy EmbeddingProvider.aggregate_embeddings
         # signature
-        embeddings_as_lists: List[List[float]] = [e.tolist() for e in embeddings]
+        embeddings_as_lists: List[List[float]] = [
+            np.asarray(e, dtype=float).tolist() for e in embeddings
+        ]
         if self.config.aggregation == AggregationStrategy.WEIGHTED_MEAN:
             aggregated = self.provider.aggregate_embeddings(
                 embeddings_as_lists,
@@ -509,7 +554,15 @@ class SimilarityComputer:
         if candidates is None:
             if not self.db:
                 raise ValueError("Database required when candidates not specified")
-            candidates = [c.id for c in self.db.list_conversations()]
+            candidate_ids = [c.id for c in self.db.list_conversations()]
+            if use_cache and self.metric in (
+                SimilarityMetric.COSINE,
+                SimilarityMetric.DOT_PRODUCT,
+            ):
+                return self._find_similar_in_matrix(
+                    query_emb, query_id, candidate_ids, top_k, threshold
+                )
+            candidates = list(candidate_ids)
 
         # Compute similarities
         results = []
@@ -542,6 +595,47 @@ class SimilarityComputer:
         # Return top K
         return results[:top_k]
 
+    def _find_similar_in_matrix(
+        self,
+        query_emb: np.ndarray,
+        query_id: Optional[str],
+        candidates: List[str],
+        top_k: int,
+        threshold: Optional[float],
+    ) -> List[SimilarityResult]:
+        """
+        Rank all candidates with one product against the DB's embedding matrix.
+
+        Candidates without a stored embedding are embedded (and saved) first,
+        so results match the pairwise path without a query per candidate.
+        """
+        provider = self.embedder.config.provider
+        model = self.embedder.config.model or provider
+        matrix = self.db.get_embedding_matrix(provider=provider, model=model)
+        missing = [c for c in candidates if c not in matrix]
+        if missing:
+            for cand_id in missing:
+                self._get_embedding(cand_id, use_cache=True)
+            matrix = self.db.get_embedding_matrix(provider=provider, model=model)
+
+        ranked = matrix.top_k(
+            query_emb,
+            top_k,
+            exclude=[query_id] if query_id else (),
+            min_score=threshold,
+            allowed=candidates,
+        )
+        return [
+            SimilarityResult(
+                conversation1_id=query_id or "unknown",
+                conversation2_id=cand_id,
+                similarity=score,
+                method=self.metric.value,
+                metadata={"cached": True},
+            )
+            for cand_id, score in ranked
+        ]
+
     def compute_similarity_matrix(
         self,
         conversations: List[Union[ConversationTree, str]],
@@ -551,6 +645,9 @@ class SimilarityComputer:
         """
         Compute pairwise similarity matrix.
 
+        Materializes all N*N scores; use :meth:`compute_top_neighbors` for
+        large collections.
+
         Args:
             conversations: List of conversations
             use_cache: Use cached embeddings
@@ -561,33 +658,214 @@ class SimilarityComputer:
         """
         n = len(conversations)
         matrix = np.zeros((n, n))
+        if n == 0:
+            return matrix
 
-        # Get all embeddings first
-        embeddings = []
+        embeddings = self._embedding_array(conversations, use_cache)
+        for start, stop in self._blocks(n, SIMILARITY_BLOCK_SIZE, show_progress):
+            matrix[start:stop] = self._score_block(embeddings[start:stop], embeddings)
+
+        np.fill_diagonal(matrix, 1.0)  # Self-similarity
+        return matrix
+
+    def compute_top_neighbors(
+        self,
+        conversations: List[Union[ConversationTree, str]],
+        k: Optional[int],
+        threshold: Optional[float] = None,
+        block_size: int = SIMILARITY_BLOCK_SIZE,
+        use_cache: bool = True,
+        show_progress: bool = False,
+        stats: Optional[Dict[str, Any]] = None,
+        index: Optional["VectorIndex"] = None,
+    ) -> List[List[Tuple[int, float]]]:
+        """
+        Find each conversation's most similar neighbours without an NxN matrix.
+
+        Rows are scored ``block_size`` at a time with one matrix product
+        against all embeddings, and only the top ``k`` per row survive, so
+        peak memory is about ``block_size * N`` floats. With an ANN
+        ``index`` (cosine/dot only) each row is a single approximate query
+        instead.
+
+        Args:
+            conversations: List of conversations
+            k: Neighbours kept per row (None or 0 keeps all)
+            threshold: Drop neighbours scoring below this
+            block_size: Rows scored per matrix product
+            use_cache: Use cached embeddings
+            show_progress: Show progress bar
+            stats: If given, filled with ``pairs`` (similarity scores
+                computed: N*N for the blocked product, the hits returned
+                with an ``index``), ``seconds`` and ``pairs_per_sec``
+            index: Approximate nearest-neighbour index holding these
+                conversations' embeddings (see ctk.embeddings.ann)
+
+        Returns:
+            For each conversation, ``[(index, similarity)]`` into
+            ``conversations`` sorted by similarity, descending
+
+        Raises:
+            ValueError: If block_size < 1, or an index is given for a
+                metric other than cosine/dot
+        """
+        if block_size < 1:
+            raise ValueError("block_size must be at least 1")
+        n = len(conversations)
+        neighbors: List[List[Tuple[int, float]]] = [[] for _ in range(n)]
+        if n < 2:
+            return neighbors
+        k = min(k or n - 1, n - 1)
+
+        embeddings = self._embedding_array(conversations, use_cache)
+        started = time.perf_counter()
+        if index is not None:
+            neighbors, scored = self._index_neighbors(
+                conversations, embeddings, index, k, threshold, show_progress
+            )
+        else:
+            scored = 0
+            for start, stop in self._blocks(n, block_size, show_progress):
+                scores = self._score_block(embeddings[start:stop], embeddings)
+                scored += scores.size
+                rows = np.arange(stop - start)
+                scores[rows, rows + start] = -np.inf
+                if threshold is not None:
+                    scores[scores < threshold] = -np.inf
+
+                top = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+                top_scores = np.take_along_axis(scores, top, axis=1)
+                order = np.argsort(-top_scores, axis=1, kind="stable")
+                top = np.take_along_axis(top, order, axis=1)
+                top_scores = np.take_along_axis(top_scores, order, axis=1)
+
+                for row in rows:
+                    keep = np.isfinite(top_scores[row])
+                    neighbors[start + row] = list(
+                        zip(top[row][keep].tolist(), top_scores[row][keep].tolist())
+                    )
+
+        if stats is not None:
+            elapsed = time.perf_counter() - started
+            stats["pairs"] = scored
+            stats["seconds"] = elapsed
+            stats["pairs_per_sec"] = stats["pairs"] / elapsed if elapsed > 0 else 0.0
+        return neighbors
+
+    def _index_neighbors(
+        self,
+        conversations: List[Union[ConversationTree, str]],
+        embeddings: np.ndarray,
+        index: "VectorIndex",
+        k: int,
+        threshold: Optional[float],
+        show_progress: bool,
+    ) -> Tuple[List[List[Tuple[int, float]]], int]:
+        """Top-k neighbours per row from one ANN query each.
+
+        Returns:
+            (neighbours, number of hits the index returned)
+        """
+        if self.metric not in (SimilarityMetric.COSINE, SimilarityMetric.DOT_PRODUCT):
+            raise ValueError("ANN indexes only support cosine/dot similarity")
+
+        ids = [c if isinstance(c, str) else c.id for c in conversations]
+        position = {cid: i for i, cid in enumerate(ids)}
+        # The index may hold conversations outside this set; over-fetch so
+        # that filtering them out still leaves k neighbours.
+        spread = min(math.ceil(len(index) / len(ids)), 10)
+        fetch = min(len(index), k * max(1, spread) + 1)
+
+        rows: Any = range(len(ids))
+        if show_progress:
+            try:
+                from tqdm import tqdm
+
+                rows = tqdm(rows, desc="Querying ANN index")
+            except ImportError:
+                pass
+
+        neighbors = []
+        scored = 0
+        for i in rows:
+            hits = index.search(
+                embeddings[i], fetch, exclude=[ids[i]], min_score=threshold
+            )
+            scored += len(hits)
+            neighbors.append([(position[h], s) for h, s in hits if h in position][:k])
+        return neighbors, scored
+
+    def _embedding_array(
+        self, conversations: List[Union[ConversationTree, str]], use_cache: bool
+    ) -> np.ndarray:
+        """Stack embeddings into an ``(N, dims)`` float32 array.
+
+        For cosine and dot product the rows are L2-normalized and, for
+        conversation IDs, read from the database's cached embedding matrix.
+        """
+        normalized = self.metric in (
+            SimilarityMetric.COSINE,
+            SimilarityMetric.DOT_PRODUCT,
+        )
+        cached = None
+        if normalized and use_cache and self.db:
+            provider = self.embedder.config.provider
+            cached = self.db.get_embedding_matrix(
+                provider=provider, model=self.embedder.config.model or provider
+            )
+
+        rows = []
         for conv in conversations:
-            emb, _ = self._get_embedding(conv, use_cache)
-            embeddings.append(emb)
+            vec = None
+            if cached is not None and isinstance(conv, str):
+                vec = cached.vector(conv)
+            if vec is None:
+                vec, _ = self._get_embedding(conv, use_cache)
+            rows.append(np.asarray(vec, dtype=np.float32).ravel())
+
+        if len({len(r) for r in rows}) > 1:
+            raise ValueError(
+                "Embeddings have different dimensions; regenerate them with one provider"
+            )
+        embeddings = np.vstack(rows)
+        if normalized:
+            norms = np.linalg.norm(embeddings, axis=1, keepdims=True)
+            np.divide(embeddings, norms, out=embeddings, where=norms > 0)
+        return embeddings
 
-        # Compute pairwise similarities
-        iterator = range(n)
+    @staticmethod
+    def _blocks(n: int, block_size: int, show_progress: bool):
+        """Yield ``(start, stop)`` row ranges, with a progress bar if asked."""
+        starts: Any = range(0, n, block_size)
         if show_progress:
             try:
                 from tqdm import tqdm
 
-                iterator = tqdm(iterator, desc="Computing similarity matrix")
+                starts = tqdm(starts, desc="Computing similarities", unit="block")
             except ImportError:
                 pass
+        for start in starts:
+            yield start, min(start + block_size, n)
+
+    def _score_block(self, block: np.ndarray, embeddings: np.ndarray) -> np.ndarray:
+        """Vectorized :meth:`_compute_metric` of each block row against all rows."""
+        if self.metric in (SimilarityMetric.COSINE, SimilarityMetric.DOT_PRODUCT):
+            # Rows are already normalized by _embedding_array
+            return block @ embeddings.T
+
+        if self.metric == SimilarityMetric.EUCLIDEAN:
+            sq = (
+                np.sum(block**2, axis=1)[:, None]
+                + np.sum(embeddings**2, axis=1)[None, :]
+                - 2.0 * (block @ embeddings.T)
+            )
+            return 1.0 / (1.0 + np.sqrt(np.maximum(sq, 0.0)))
 
-        for i in iterator:
-            for j in range(i, n):
-                if i == j:
-                    matrix[i, j] = 1.0  # Self-similarity
-                else:
-                    sim = self._compute_metric(embeddings[i], embeddings[j])
-                    matrix[i, j] = sim
-                    matrix[j, i] = sim  # Symmetric
+        if self.metric == SimilarityMetric.MANHATTAN:
+            dist = np.stack([np.abs(embeddings - row).sum(axis=1) for row in block])
+            return 1.0 / (1.0 + dist)
 
-        return matrix
+        raise ValueError(f"Unknown similarity metric: {self.metric}")
 
     def _get_embedding(
         self, source: Union[ConversationTree, np.ndarray, str], use_cache: bool
@@ -812,6 +1090,8 @@ class ConversationGraphBuilder:
         max_links_per_node: Optional[int] = 10,
         use_cache: bool = True,
         show_progress: bool = False,
+        block_size: int = SIMILARITY_BLOCK_SIZE,
+        index: Optional["VectorIndex"] = None,
     ) -> ConversationGraph:
         """
         Build graph of conversation relationships.
@@ -822,9 +1102,13 @@ class ConversationGraphBuilder:
             max_links_per_node: Maximum outgoing links per node
             use_cache: Use cached embeddings and similarities
             show_progress: Show progress bar
+            block_size: Rows scored per matrix product (bounds peak memory)
+            index: Optional ANN index for approximate kNN construction
+                (see ctk.embeddings.ann); exact when None
 
         Returns:
-            ConversationGraph object
+            ConversationGraph object; ``metadata["pairs_per_sec"]`` reports
+            similarity throughput
         """
         # Get all conversation IDs
         if conversations is None:
@@ -832,37 +1116,25 @@ class ConversationGraphBuilder:
                 raise ValueError("Database required when conversations not specified")
             conversations = [c.id for c in self.similarity.db.list_conversations()]
 
-        # Compute similarity matrix
-        # cast: conversations is List[str]; compute_similarity_matrix accepts
+        # cast: conversations is List[str]; compute_top_neighbors accepts
         # List[Union[ConversationTree, str]]
-        matrix = self.similarity.compute_similarity_matrix(
+        stats: Dict[str, Any] = {}
+        neighbors = self.similarity.compute_top_neighbors(
             cast(List[Union[ConversationTree, str]], conversations),
+            k=max_links_per_node,
+            threshold=threshold,
+            block_size=block_size,
             use_cache=use_cache,
             show_progress=show_progress,
+            stats=stats,
+            index=index,
         )
 
-        # Build links
+        # Build links, adding each edge once from its lower-index end
         links = []
-        n = len(conversations)
-
-        for i in range(n):
-            # Get similarities for this node
-            similarities = [(j, matrix[i, j]) for j in range(n) if i != j]
-
-            # Sort by similarity descending
-            similarities.sort(key=lambda x: x[1], reverse=True)
-
-            # Apply threshold and max_links
-            count = 0
-            for j, sim in similarities:
-                if sim < threshold:
-                    break
-
-                if max_links_per_node and count >= max_links_per_node:
-                    break
-
-                # Only add if not already added (avoid duplicates)
-                if i < j:  # Only add edge once
+        for i, row in enumerate(neighbors):
+            for j, sim in row:
+                if i < j:
                     links.append(
                         ConversationLink(
                             source_id=conversations[i],
@@ -871,8 +1143,6 @@ class ConversationGraphBuilder:
                         )
                     )
 
-                count += 1
-
         return ConversationGraph(
             nodes=conversations,
             links=links,
@@ -881,6 +1151,8 @@ class ConversationGraphBuilder:
                 "max_links_per_node": max_links_per_node,
                 "total_nodes": len(conversations),
                 "total_links": len(links),
+                "pairs_per_sec": stats.get("pairs_per_sec"),
+                "index": index.backend if index is not None else "exact",
             },
         )
 
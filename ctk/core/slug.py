@@ -6,7 +6,7 @@ Provides functions for creating URL-friendly slugs from conversation titles.
 
 import re
 import unicodedata
-from typing import Optional
+from typing import Container, Optional
 
 
 def generate_slug(title: Optional[str], max_length: int = 60) -> Optional[str]:
@@ -72,13 +72,15 @@ def generate_slug(title: Optional[str], max_length: int = 60) -> Optional[str]:
     return slug if slug else None
 
 
-def make_unique_slug(base_slug: str, existing_slugs: set, max_suffix: int = 100) -> str:
+def make_unique_slug(
+    base_slug: str, existing_slugs: Container[str], max_suffix: int = 100
+) -> str:
     """
     Make a slug unique by appending a numeric suffix if needed.
 
     Args:
         base_slug: The base slug to make unique
-        existing_slugs: Set of existing slugs to check against
+        existing_slugs: Slugs already taken (anything supporting ``in``)
         max_suffix: Maximum suffix number to try (default 100)
 
     Returns:
@@ -0,0 +1,175 @@
+"""
+SQLite connection tuning profiles.
+
+The conversation database is shared between the TUI, the MCP server and
+batch jobs (import, merge, embeddings), so the defaults SQLite ships with
+(rollback journal, full fsync on every commit, tiny page cache) make
+writers block readers and turn bulk work into fsync-bound loops. A
+*profile* is a named set of PRAGMAs applied to every new connection via
+an engine ``connect`` hook.
+
+Profiles are selected in ``~/.ctk/config.json``::
+
+    "database": {
+        "profile": "performance",
+        "pragmas": {"mmap_size": 1073741824}
+    }
+
+``pragmas`` overrides individual values of the chosen profile.
+"""
+
+import logging
+import re
+from typing import Any, Dict, Optional, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_PROFILE = "performance"
+
+# Applied in this order; journal_mode goes first because it can fail on
+# read-only files and the remaining per-connection settings still apply.
+PRAGMA_ORDER = (
+    "journal_mode",
+    "synchronous",
+    "busy_timeout",
+    "cache_size",
+    "mmap_size",
+    "temp_store",
+)
+
+PROFILES: Dict[str, Dict[str, Any]] = {
+    # WAL lets readers proceed while one writer commits; NORMAL only
+    # fsyncs at checkpoints, which is durable against application crashes
+    # (a power loss can roll back the last few transactions).
+    "performance": {
+        "journal_mode": "WAL",
+        "synchronous": "NORMAL",
+        "busy_timeout": 5000,  # ms to wait on a locked DB before failing
+        "cache_size": -65536,  # negative = KiB, i.e. 64 MiB of page cache
+        "mmap_size": 268435456,  # 256 MiB memory-mapped reads
+        "temp_store": "MEMORY",
+    },
+    # Same concurrency, but fsync on every commit.
+    "safe": {
+        "journal_mode": "WAL",
+        "synchronous": "FULL",
+        "busy_timeout": 5000,
+    },
+    # Leave SQLite's compiled-in defaults untouched.
+    "default": {},
+}
+
+_KEYWORD_VALUES = {
+    "journal_mode": {"DELETE", "TRUNCATE", "PERSIST", "MEMORY", "WAL", "OFF"},
+    "synchronous": {"OFF", "NORMAL", "FULL", "EXTRA", "0", "1", "2", "3"},
+    "temp_store": {"DEFAULT", "FILE", "MEMORY", "0", "1", "2"},
+}
+_INTEGER = re.compile(r"^-?\d+$")
+
+
+def _validate(name: str, value: Any) -> str:
+    """Return the SQL literal for a PRAGMA value, or raise ValueError.
+
+    PRAGMA statements cannot take bound parameters, so names and values
+    are checked against a whitelist before being interpolated.
+    """
+    if name not in PRAGMA_ORDER:
+        raise ValueError(f"Unsupported SQLite pragma: {name}")
+    literal = str(value).strip()
+    if name in _KEYWORD_VALUES:
+        literal = literal.upper()
+        if literal not in _KEYWORD_VALUES[name]:
+            raise ValueError(f"Invalid value for PRAGMA {name}: {value!r}")
+    elif isinstance(value, bool) or not _INTEGER.match(literal):
+        raise ValueError(f"PRAGMA {name} expects an integer, got {value!r}")
+    return literal
+
+
+def resolve_profile(
+    name: Optional[str] = None, overrides: Optional[Dict[str, Any]] = None
+) -> Tuple[str, Dict[str, str]]:
+    """Resolve a profile name plus overrides into validated PRAGMA values.
+
+    When ``name`` is None the ``database.profile`` and ``database.pragmas``
+    config keys are used. Unknown profiles and invalid values raise
+    ValueError so a typo in the config does not silently fall back.
+
+    Returns:
+        ``(profile_name, {pragma: sql_literal})`` in application order
+    """
+    if name is None:
+        from .config import get_config
+
+        config = get_config()
+        name = config.get("database.profile") or DEFAULT_PROFILE
+        if overrides is None:
+            overrides = config.get("database.pragmas") or {}
+
+    if name not in PROFILES:
+        raise ValueError(
+            f"Unknown database profile '{name}'. "
+            f"Choose one of: {', '.join(sorted(PROFILES))}"
+        )
+
+    settings = {**PROFILES[name], **(overrides or {})}
+    pragmas = {
+        key: _validate(key, settings[key]) for key in PRAGMA_ORDER if key in settings
+    }
+    unknown = set(settings) - set(PRAGMA_ORDER)
+    if unknown:
+        raise ValueError(f"Unsupported SQLite pragma: {', '.join(sorted(unknown))}")
+    return name, pragmas
+
+
+def apply_pragmas(dbapi_connection, pragmas: Dict[str, str], in_memory: bool) -> None:
+    """Run the PRAGMAs on a raw DB-API connection.
+
+    Failures are logged and skipped: a read-only file cannot switch to WAL
+    but still benefits from the cache and timeout settings.
+    """
+    cursor = dbapi_connection.cursor()
+    try:
+        for name, literal in pragmas.items():
+            # journal_mode and mmap have no effect on :memory: databases
+            if in_memory and name in ("journal_mode", "mmap_size"):
+                continue
+            try:
+                cursor.execute(f"PRAGMA {name} = {literal}")
+            except Exception as e:
+                logger.debug(f"PRAGMA {name} = {literal} failed: {e}")
+    finally:
+        cursor.close()
+
+
+def install(engine: Engine, pragmas: Dict[str, str], in_memory: bool = False) -> None:
+    """Apply ``pragmas`` to every connection ``engine`` opens."""
+
+    @event.listens_for(engine, "connect")
+    def _on_connect(dbapi_connection, connection_record):
+        apply_pragmas(dbapi_connection, pragmas, in_memory)
+
+
+# PRAGMA reads return enum settings as integers
+_READ_NAMES: Dict[str, Dict[int, str]] = {
+    "synchronous": {0: "OFF", 1: "NORMAL", 2: "FULL", 3: "EXTRA"},
+    "temp_store": {0: "DEFAULT", 1: "FILE", 2: "MEMORY"},
+}
+
+
+def read_pragmas(connection) -> Dict[str, Any]:
+    """Current values of the tuned PRAGMAs on a SQLAlchemy connection."""
+    from sqlalchemy import text
+
+    values: Dict[str, Any] = {}
+    for name in PRAGMA_ORDER:
+        row = connection.execute(text(f"PRAGMA {name}")).fetchone()
+        value = row[0] if row else None
+        if isinstance(value, str):
+            value = value.upper()
+        elif isinstance(value, int) and name in _READ_NAMES:
+            value = _READ_NAMES[name].get(value, value)
+        values[name] = value
+    return values
@@ -8,7 +8,7 @@ and other components to reduce code duplication.
 import json
 import logging
 from datetime import datetime
-from typing import Any, Optional, Union
+from typing import IO, Any, Iterator, Optional, Union
 
 logger = logging.getLogger(__name__)
 
@@ -125,3 +125,107 @@ def try_parse_json(data: Any) -> Optional[dict]:
             return None
 
     return None
+
+
+def iter_json_array(fh: IO[str], chunk_size: int = 1 << 16) -> Iterator[Any]:
+    """
+    Yield the elements of a top-level JSON array read from a text stream.
+
+    Only one element (plus one read-ahead chunk) is held in memory at a
+    time, so multi-GB exports parse with flat memory. A top-level object
+    is yielded as a single element, matching how importers treat a bare
+    conversation dict.
+
+    Args:
+        fh: Text-mode file object positioned at the start of the document
+        chunk_size: Number of characters to read per refill
+
+    Yields:
+        Decoded JSON values, one per array element
+
+    Raises:
+        ValueError: If the document is not a JSON array or object, or is
+            malformed/truncated
+    """
+    decoder = json.JSONDecoder()
+    buf = ""
+    pos = 0
+    eof = False
+    read_size = chunk_size
+
+    def fill() -> bool:
+        nonlocal buf, pos, eof
+        if eof:
+            return False
+        chunk = fh.read(read_size)
+        if not chunk:
+            eof = True
+            return False
+        # Drop consumed input so the buffer never grows past one element.
+        buf = buf[pos:] + chunk
+        pos = 0
+        return True
+
+    def skip_ws() -> Optional[str]:
+        nonlocal pos
+        while True:
+            while pos < len(buf) and buf[pos] in " \t\r\n":
+                pos += 1
+            if pos < len(buf):
+                return buf[pos]
+            if not fill():
+                return None
+
+    first = skip_ws()
+    if first is None:
+        return
+    if first == "\ufeff":
+        pos += 1
+        first = skip_ws()
+    if first == "{":
+        while fill():
+            pass
+        value, end = decoder.raw_decode(buf, pos)
+        pos = end
+        if skip_ws() is not None:
+            raise ValueError("Unexpected data after top-level JSON object")
+        yield value
+        return
+    if first != "[":
+        raise ValueError("Expected a JSON array or object at top level")
+    pos += 1
+
+    expect_value = True
+    after_comma = False
+    while True:
+        ch = skip_ws()
+        if ch is None:
+            raise ValueError("Truncated JSON array")
+        if ch == "]":
+            if after_comma:
+                raise ValueError("Trailing ',' in JSON array")
+            return
+        if not expect_value:
+            if ch != ",":
+                raise ValueError(f"Expected ',' or ']' in JSON array, got {ch!r}")
+            pos += 1
+            expect_value = after_comma = True
+            continue
+        while True:
+            try:
+                value, end = decoder.raw_decode(buf, pos)
+            except json.JSONDecodeError as e:
+                # Element spans past the buffer: read more and retry,
+                # doubling the refill size so huge elements stay linear.
+                if not fill():
+                    raise ValueError(f"Malformed JSON array element: {e}") from e
+                read_size = min(read_size * 2, 1 << 26)
+                continue
+            if end == len(buf) and fill():
+                # A scalar ending exactly at the buffer edge may be cut short.
+                continue
+            break
+        pos = end
+        read_size = chunk_size
+        expect_value = after_comma = False
+        yield value
@@ -0,0 +1,599 @@
+"""
+Approximate nearest-neighbour (ANN) indexes for conversation embeddings.
+
+Exact cosine search (``ctk.core.embedding_matrix``) is a single
+matrix-vector product but still linear in the number of embeddings. A
+``VectorIndex`` trades a little recall for sub-linear queries:
+
+- ``IVFIndex``: pure-NumPy inverted file index. Vectors are clustered with
+  spherical k-means and a query only scans the ``nprobe`` closest lists.
+- ``HNSWIndex``: hnswlib's HNSW graph, used when hnswlib is installed
+  (``pip install hnswlib``).
+
+Indexes hold L2-normalized float32 vectors keyed by conversation ID, score
+by cosine similarity and support incremental add/remove. ``IndexStore``
+persists one index per embedding session under ``.ctk_indexes/`` in the
+database directory.
+"""
+
+import json
+import logging
+import math
+import os
+import shutil
+import time
+from abc import ABC, abstractmethod
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple, Type
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+META_FILE = "index.json"
+
+IVF_NPROBE = 16  # Lists scanned per query
+IVF_MIN_TRAIN = 1024  # Below this many vectors the IVF index scans everything
+IVF_KMEANS_ITERATIONS = 10
+IVF_SAMPLE_PER_LIST = 256  # k-means training points per list
+
+
+def _normalize_rows(vectors: Any, dimensions: int) -> np.ndarray:
+    """Copy ``vectors`` to an ``(n, dimensions)`` float32 array of unit rows."""
+    rows = np.array(vectors, dtype=np.float32, ndmin=2)
+    if rows.ndim != 2 or rows.shape[1] != dimensions:
+        raise ValueError(
+            f"Expected vectors of dimension {dimensions}, got shape {rows.shape}"
+        )
+    norms = np.linalg.norm(rows, axis=1, keepdims=True)
+    np.divide(rows, norms, out=rows, where=norms > 0)
+    return rows
+
+
+def _top(scores: np.ndarray, k: int) -> np.ndarray:
+    """Positions of the ``k`` largest scores, best first."""
+    k = min(k, len(scores))
+    if k <= 0:
+        return np.zeros(0, dtype=np.int64)
+    top = np.argpartition(-scores, k - 1)[:k]
+    return top[np.argsort(-scores[top], kind="stable")]
+
+
+def _write_atomic(path: Path, data: bytes) -> None:
+    tmp = path.with_name(path.name + ".tmp")
+    with open(tmp, "wb") as fh:
+        fh.write(data)
+    os.replace(tmp, path)
+
+
+class VectorIndex(ABC):
+    """Cosine-similarity index over vectors keyed by conversation ID."""
+
+    backend: str = ""
+
+    def __init__(self, dimensions: int):
+        self.dimensions = dimensions
+        # Free-form values persisted with the index (e.g. a freshness stamp)
+        self.metadata: Dict[str, Any] = {}
+
+    @abstractmethod
+    def add(self, ids: Sequence[str], vectors: Any) -> None:
+        """Insert vectors, replacing any already stored under the same IDs."""
+
+    @abstractmethod
+    def remove(self, ids: Iterable[str]) -> int:
+        """Remove IDs; returns how many were present."""
+
+    @abstractmethod
+    def __len__(self) -> int:
+        """Number of stored vectors."""
+
+    @abstractmethod
+    def __contains__(self, conversation_id: object) -> bool:
+        """Whether a conversation's vector is stored."""
+
+    @abstractmethod
+    def _search(self, query: np.ndarray, k: int) -> List[Tuple[str, float]]:
+        """Top ``k`` for a unit-length query, best first."""
+
+    @abstractmethod
+    def save(self, directory: Path) -> None:
+        """Write the index to ``directory`` (created if needed)."""
+
+    @classmethod
+    @abstractmethod
+    def load(cls, directory: Path) -> "VectorIndex":
+        """Read an index written by :meth:`save`."""
+
+    def search(
+        self,
+        query: Any,
+        k: int,
+        exclude: Iterable[str] = (),
+        min_score: Optional[float] = None,
+    ) -> List[Tuple[str, float]]:
+        """Approximate top-``k`` conversations for ``query``.
+
+        Returns ``[(conversation_id, cosine)]`` sorted by score, descending.
+        Zero or wrongly sized queries return an empty list.
+        """
+        q = np.asarray(query, dtype=np.float32).ravel()
+        if k <= 0 or not len(self) or q.shape[0] != self.dimensions:
+            return []
+        norm = float(np.linalg.norm(q))
+        if norm == 0:
+            return []
+        skip = set(exclude)
+        hits = self._search(q / norm, k + len(skip))
+        floor = -np.inf if min_score is None else min_score
+        return [(cid, s) for cid, s in hits if cid not in skip and s >= floor][:k]
+
+    def _meta(self, **extra: Any) -> bytes:
+        meta = {
+            "backend": self.backend,
+            "dimensions": self.dimensions,
+            "metadata": self.metadata,
+            **extra,
+        }
+        return json.dumps(meta).encode("utf-8")
+
+
+class IVFIndex(VectorIndex):
+    """Inverted file index (IVF-Flat) implemented with NumPy.
+
+    Until ``min_train`` vectors are present, searches are exact. After that
+    the vectors are clustered into about ``sqrt(n)`` lists, and a query
+    scores only the members of its ``nprobe`` nearest lists. New vectors
+    join their nearest list. The clustering is retrained once the index has
+    grown to four times the size it was trained at.
+    """
+
+    backend = "ivf"
+
+    def __init__(
+        self,
+        dimensions: int,
+        nprobe: int = IVF_NPROBE,
+        min_train: int = IVF_MIN_TRAIN,
+        seed: int = 0,
+    ):
+        super().__init__(dimensions)
+        self.nprobe = nprobe
+        self.min_train = min_train
+        self.seed = seed
+        self._vectors = np.zeros((0, dimensions), dtype=np.float32)
+        self._alive = np.zeros(0, dtype=bool)
+        self._assign = np.zeros(0, dtype=np.int64)
+        self._count = 0  # rows of _vectors in use (alive or deleted)
+        self._ids: List[Optional[str]] = []
+        self._rows: Dict[str, int] = {}
+        self._centroids: Optional[np.ndarray] = None
+        self._lists: List[np.ndarray] = []
+        self._trained_size = 0
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    def __contains__(self, conversation_id: object) -> bool:
+        return conversation_id in self._rows
+
+    @property
+    def is_trained(self) -> bool:
+        return self._centroids is not None
+
+    def add(self, ids: Sequence[str], vectors: Any) -> None:
+        vecs = _normalize_rows(vectors, self.dimensions)
+        if len(ids) != len(vecs):
+            raise ValueError(f"Got {len(ids)} ids for {len(vecs)} vectors")
+        if not len(ids):
+            return
+
+        # Last occurrence wins within the batch; stored copies are replaced
+        last = {cid: i for i, cid in enumerate(ids)}
+        if len(last) < len(ids):
+            ids, vecs = list(last), vecs[list(last.values())]
+        self.remove(ids)
+
+        start, n = self._count, len(ids)
+        self._reserve(start + n)
+        self._vectors[start : start + n] = vecs
+        self._alive[start : start + n] = True
+        self._ids.extend(ids)
+        self._rows.update((cid, start + i) for i, cid in enumerate(ids))
+        self._count += n
+
+        if self._centroids is None:
+            self._assign[start : start + n] = -1
+            if len(self) >= self.min_train:
+                self.train()
+        elif len(self) > 4 * self._trained_size:
+            self.train()
+        else:
+            assign = np.argmax(vecs @ self._centroids.T, axis=1)
+            self._assign[start : start + n] = assign
+            for c in np.unique(assign):
+                new_rows = start + np.flatnonzero(assign == c)
+                self._lists[c] = np.concatenate([self._lists[c], new_rows])
+
+    def remove(self, ids: Iterable[str]) -> int:
+        removed = 0
+        for cid in ids:
+            row = self._rows.pop(cid, None)
+            if row is not None:
+                self._alive[row] = False
+                self._ids[row] = None
+                removed += 1
+        if removed and self._count > 64 and len(self) < self._count // 2:
+            self._compact()
+        return removed
+
+    def train(self) -> None:
+        """Cluster the stored vectors and rebuild the inverted lists."""
+        alive = np.flatnonzero(self._alive[: self._count])
+        n = len(alive)
+        if n == 0:
+            self._centroids, self._lists, self._trained_size = None, [], 0
+            return
+
+        # ~sqrt(n) lists, each with enough points to place its centroid
+        nlist = max(1, min(int(math.sqrt(n)), n // 39))
+        rng = np.random.default_rng(self.seed)
+        data = self._vectors[alive]
+        sample_size = min(n, nlist * IVF_SAMPLE_PER_LIST)
+        sample = data[rng.choice(n, sample_size, replace=False)]
+        centroids = sample[rng.choice(sample_size, nlist, replace=False)].copy()
+
+        for _ in range(IVF_KMEANS_ITERATIONS):
+            labels = np.argmax(sample @ centroids.T, axis=1)
+            sums = np.zeros_like(centroids)
+            np.add.at(sums, labels, sample)
+            empty = np.bincount(labels, minlength=nlist) == 0
+            if empty.any():
+                sums[empty] = sample[rng.choice(sample_size, int(empty.sum()))]
+            centroids = _normalize_rows(sums, self.dimensions)
+
+        assign = np.full(self._count, -1, dtype=np.int64)
+        for lo in range(0, n, 4096):
+            block = alive[lo : lo + 4096]
+            assign[block] = np.argmax(self._vectors[block] @ centroids.T, axis=1)
+
+        self._centroids = centroids
+        self._assign[: self._count] = assign
+        self._rebuild_lists()
+        self._trained_size = n
+
+    def _rebuild_lists(self) -> None:
+        if self._centroids is None:
+            self._lists = []
+            return
+        alive = np.flatnonzero(self._alive[: self._count])
+        labels = self._assign[alive]
+        order = np.argsort(labels, kind="stable")
+        counts = np.bincount(labels, minlength=len(self._centroids))
+        self._lists = np.split(alive[order], np.cumsum(counts)[:-1])
+
+    def _reserve(self, size: int) -> None:
+        capacity = len(self._vectors)
+        if size <= capacity:
+            return
+        capacity = max(size, 2 * capacity, 64)
+        vectors = np.zeros((capacity, self.dimensions), dtype=np.float32)
+        vectors[: self._count] = self._vectors[: self._count]
+        alive = np.zeros(capacity, dtype=bool)
+        alive[: self._count] = self._alive[: self._count]
+        assign = np.full(capacity, -1, dtype=np.int64)
+        assign[: self._count] = self._assign[: self._count]
+        self._vectors, self._alive, self._assign = vectors, alive, assign
+
+    def _compact(self) -> None:
+        """Drop deleted rows (keeps the trained centroids)."""
+        keep = np.flatnonzero(self._alive[: self._count])
+        self._vectors = self._vectors[keep]
+        self._assign = self._assign[keep]
+        self._alive = np.ones(len(keep), dtype=bool)
+        self._ids = [self._ids[r] for r in keep]
+        self._rows = {cid: i for i, cid in enumerate(self._ids) if cid is not None}
+        self._count = len(keep)
+        if self._centroids is not None:
+            self._rebuild_lists()
+
+    def _search(self, query: np.ndarray, k: int) -> List[Tuple[str, float]]:
+        if self._centroids is None:
+            rows = np.flatnonzero(self._alive[: self._count])
+        else:
+            probe = _top(self._centroids @ query, self.nprobe)
+            rows = np.concatenate([self._lists[c] for c in probe])
+            rows = rows[self._alive[rows]]
+        if not len(rows):
+            return []
+        scores = self._vectors[rows] @ query
+        return [(self._ids[rows[i]], float(scores[i])) for i in _top(scores, k)]
+
+    def save(self, directory: Path) -> None:
+        directory = Path(directory)
+        directory.mkdir(parents=True, exist_ok=True)
+        if len(self) < self._count:
+            self._compact()
+        vectors = self._vectors[: self._count]
+        assign = self._assign[: self._count]
+        tmp = directory / "vectors.npz.tmp"
+        with open(tmp, "wb") as fh:
+            if self._centroids is None:
+                np.savez(fh, vectors=vectors, assign=assign)
+            else:
+                np.savez(fh, vectors=vectors, assign=assign, centroids=self._centroids)
+        os.replace(tmp, directory / "vectors.npz")
+        _write_atomic(
+            directory / META_FILE,
+            self._meta(
+                ids=self._ids,
+                nprobe=self.nprobe,
+                min_train=self.min_train,
+                seed=self.seed,
+                trained_size=self._trained_size,
+            ),
+        )
+
+    @classmethod
+    def load(cls, directory: Path) -> "IVFIndex":
+        directory = Path(directory)
+        meta = json.loads((directory / META_FILE).read_text(encoding="utf-8"))
+        index = cls(
+            meta["dimensions"],
+            nprobe=meta["nprobe"],
+            min_train=meta["min_train"],
+            seed=meta["seed"],
+        )
+        index.metadata = meta.get("metadata", {})
+        with np.load(directory / "vectors.npz", allow_pickle=False) as data:
+            vectors = data["vectors"]
+            assign = data["assign"]
+            centroids = data["centroids"] if "centroids" in data.files else None
+        if len(vectors) != len(meta["ids"]):
+            raise ValueError(f"Index at {directory} is inconsistent")
+
+        index._vectors = np.ascontiguousarray(vectors, dtype=np.float32)
+        index._assign = assign.astype(np.int64)
+        index._alive = np.ones(len(vectors), dtype=bool)
+        index._ids = list(meta["ids"])
+        index._rows = {cid: i for i, cid in enumerate(index._ids) if cid is not None}
+        index._count = len(vectors)
+        index._trained_size = meta.get("trained_size", 0)
+        if centroids is not None:
+            index._centroids = centroids
+            index._rebuild_lists()
+        return index
+
+
+class HNSWIndex(VectorIndex):
+    """HNSW graph index backed by hnswlib (optional dependency)."""
+
+    backend = "hnswlib"
+
+    def __init__(
+        self,
+        dimensions: int,
+        m: int = 16,
+        ef_construction: int = 200,
+        ef_search: int = 64,
+    ):
+        super().__init__(dimensions)
+        hnswlib = _import_hnswlib()
+        self.m = m
+        self.ef_construction = ef_construction
+        self.ef_search = ef_search
+        self._index = hnswlib.Index(space="ip", dim=dimensions)
+        self._index.init_index(max_elements=1024, ef_construction=ef_construction, M=m)
+        self._labels: Dict[str, int] = {}
+        self._ids: Dict[int, str] = {}
+        self._deleted: List[int] = []  # labels marked deleted, reusable
+        self._next_label = 0
+
+    def __len__(self) -> int:
+        return len(self._labels)
+
+    def __contains__(self, conversation_id: object) -> bool:
+        return conversation_id in self._labels
+
+    def add(self, ids: Sequence[str], vectors: Any) -> None:
+        vecs = _normalize_rows(vectors, self.dimensions)
+        if len(ids) != len(vecs):
+            raise ValueError(f"Got {len(ids)} ids for {len(vecs)} vectors")
+        last = {cid: i for i, cid in enumerate(ids)}
+        ids, vecs = list(last), vecs[list(last.values())]
+        if not ids:
+            return
+
+        labels = []
+        for cid in ids:
+            label = self._labels.get(cid)
+            if label is None:
+                if self._deleted:
+                    label = self._deleted.pop()
+                    self._index.unmark_deleted(label)
+                else:
+                    label = self._next_label
+                    self._next_label += 1
+                self._labels[cid] = label
+                self._ids[label] = cid
+            labels.append(label)
+
+        needed = self._next_label
+        if needed > self._index.get_max_elements():
+            self._index.resize_index(max(needed, 2 * self._index.get_max_elements()))
+        # Adding an existing label updates its vector in place
+        self._index.add_items(vecs, np.asarray(labels, dtype=np.int64))
+
+    def remove(self, ids: Iterable[str]) -> int:
+        removed = 0
+        for cid in ids:
+            label = self._labels.pop(cid, None)
+            if label is not None:
+                self._index.mark_deleted(label)
+                del self._ids[label]
+                self._deleted.append(label)
+                removed += 1
+        return removed
+
+    def _search(self, query: np.ndarray, k: int) -> List[Tuple[str, float]]:
+        k = min(k, len(self))
+        self._index.set_ef(max(self.ef_search, k))
+        labels, distances = self._index.knn_query(query, k=k)
+        # Inner-product space reports 1 - dot as the distance
+        return [
+            (self._ids[int(label)], float(1.0 - dist))
+            for label, dist in zip(labels[0], distances[0])
+        ]
+
+    def save(self, directory: Path) -> None:
+        directory = Path(directory)
+        directory.mkdir(parents=True, exist_ok=True)
+        tmp = directory / "hnsw.bin.tmp"
+        self._index.save_index(str(tmp))
+        os.replace(tmp, directory / "hnsw.bin")
+        _write_atomic(
+            directory / META_FILE,
+            self._meta(
+                labels=self._labels,
+                deleted=self._deleted,
+                next_label=self._next_label,
+                m=self.m,
+                ef_construction=self.ef_construction,
+                ef_search=self.ef_search,
+            ),
+        )
+
+    @classmethod
+    def load(cls, directory: Path) -> "HNSWIndex":
+        directory = Path(directory)
+        meta = json.loads((directory / META_FILE).read_text(encoding="utf-8"))
+        index = cls(
+            meta["dimensions"],
+            m=meta["m"],
+            ef_construction=meta["ef_construction"],
+            ef_search=meta["ef_search"],
+        )
+        index.metadata = meta.get("metadata", {})
+        index._index.load_index(str(directory / "hnsw.bin"))
+        index._labels = dict(meta["labels"])
+        index._ids = {label: cid for cid, label in index._labels.items()}
+        index._deleted = list(meta["deleted"])
+        index._next_label = meta["next_label"]
+        return index
+
+
+def _import_hnswlib():
+    try:
+        import hnswlib
+    except ImportError:
+        raise ImportError("hnswlib required for the HNSW index: pip install hnswlib")
+    return hnswlib
+
+
+BACKENDS: Dict[str, Type[VectorIndex]] = {
+    IVFIndex.backend: IVFIndex,
+    HNSWIndex.backend: HNSWIndex,
+}
+
+
+def default_backend() -> str:
+    """hnswlib when installed, otherwise the NumPy IVF index."""
+    try:
+        _import_hnswlib()
+    except ImportError:
+        return IVFIndex.backend
+    return HNSWIndex.backend
+
+
+def create_index(dimensions: int, backend: Optional[str] = None) -> VectorIndex:
+    """Create an empty index.
+
+    Args:
+        dimensions: Vector dimensionality
+        backend: ``"ivf"``, ``"hnswlib"`` or None for :func:`default_backend`
+
+    Raises:
+        ValueError: On an unknown backend
+        ImportError: If the backend's library is not installed
+    """
+    backend = backend or default_backend()
+    if backend not in BACKENDS:
+        raise ValueError(
+            f"Unknown index backend '{backend}'. Choose one of: {', '.join(BACKENDS)}"
+        )
+    return BACKENDS[backend](dimensions)
+
+
+def load_index(directory: Path) -> VectorIndex:
+    """Load an index saved by ``VectorIndex.save``, whatever its backend."""
+    meta = json.loads((Path(directory) / META_FILE).read_text(encoding="utf-8"))
+    backend = meta.get("backend")
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown index backend '{backend}' in {directory}")
+    return BACKENDS[backend].load(directory)
+
+
+class IndexStore:
+    """On-disk home for ANN indexes, one directory per embedding session."""
+
+    def __init__(self, root: Path):
+        self.root = Path(root)
+
+    def path(self, session_id: int) -> Path:
+        return self.root / f"session-{session_id}"
+
+    def load(self, session_id: int) -> Optional[VectorIndex]:
+        """The saved index for a session, or None if missing or unreadable."""
+        directory = self.path(session_id)
+        if not (directory / META_FILE).exists():
+            return None
+        try:
+            return load_index(directory)
+        except (OSError, ValueError, KeyError, ImportError) as e:
+            logger.warning(f"Ignoring unreadable index at {directory}: {e}")
+            return None
+
+    def save(self, session_id: int, index: VectorIndex) -> None:
+        index.save(self.path(session_id))
+
+    def delete(self, session_id: int) -> None:
+        shutil.rmtree(self.path(session_id), ignore_errors=True)
+
+
+def measure_recall(
+    index: VectorIndex, exact: Any, queries: Any, k: int = 10
+) -> Dict[str, float]:
+    """Compare an index with exact search over the same vectors.
+
+    Args:
+        index: Index to evaluate
+        exact: Exact searcher with ``top_k(query, k)`` (an EmbeddingMatrix)
+        queries: ``(q, dims)`` array of query vectors
+        k: Neighbours per query
+
+    Returns:
+        Dict with ``recall`` (mean fraction of the exact top-k found) and
+        mean per-query latency in milliseconds for both paths
+    """
+    hits = 0
+    total = 0
+    ann_seconds = 0.0
+    exact_seconds = 0.0
+    for query in np.asarray(queries, dtype=np.float32):
+        started = time.perf_counter()
+        truth = {cid for cid, _ in exact.top_k(query, k)}
+        exact_seconds += time.perf_counter() - started
+
+        started = time.perf_counter()
+        found = {cid for cid, _ in index.search(query, k)}
+        ann_seconds += time.perf_counter() - started
+
+        hits += len(truth & found)
+        total += len(truth)
+
+    n = max(len(queries), 1)
+    return {
+        "recall": hits / total if total else 1.0,
+        "ann_ms": 1000 * ann_seconds / n,
+        "exact_ms": 1000 * exact_seconds / n,
+    }
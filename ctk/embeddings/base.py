@@ -59,6 +59,10 @@ class EmbeddingProvider(ABC):
     different providers (Ollama, OpenAI, Anthropic, etc.)
     """
 
+    # Whether a text's embedding depends only on the text, provider, model
+    # and config, so it may be reused from the chunk cache
+    cacheable: bool = True
+
     def __init__(self, config: Dict[str, Any]):
         """
         Initialize provider with configuration.
@@ -33,6 +33,9 @@ class TFIDFEmbedding(EmbeddingProvider):
     - Vocabulary size affects memory usage
     """
 
+    # Vectors depend on the corpus the vectorizer was fitted on
+    cacheable = False
+
     def __init__(self, config: Dict[str, Any]):
         """
         Initialize TF-IDF embedding provider.
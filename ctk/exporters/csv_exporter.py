@@ -2,7 +2,7 @@
 
 import csv
 import io
-from typing import Any, List
+from typing import IO, Any, Iterable, List
 
 from ctk.core.models import ConversationTree
 from ctk.core.plugin import ExporterPlugin
@@ -32,6 +32,7 @@ class CSVExporter(ExporterPlugin):
     description = "Export conversations as CSV files for spreadsheets and data analysis"
     version = "1.0.0"
     supported_formats = ["csv", "tsv"]
+    streaming = True
 
     def validate(self, data: Any) -> bool:
         """Validate that data contains ConversationTree objects."""
@@ -54,19 +55,30 @@ class CSVExporter(ExporterPlugin):
         Returns:
             CSV-formatted string.
         """
+        output = io.StringIO()
+        self.export_stream(conversations, output, **kwargs)
+        return output.getvalue()
+
+    def export_stream(
+        self, conversations: Iterable[ConversationTree], fh: IO[str], **kwargs
+    ) -> int:
+        """Write CSV rows to fh one conversation at a time.
+
+        Takes the same options as export_data. Open fh with ``newline=""``
+        so the csv module controls line endings.
+
+        Returns:
+            Number of conversations written.
+        """
         mode = kwargs.get("mode", "conversations")
         delimiter = kwargs.get("delimiter", ",")
         path_selection = kwargs.get("path_selection", "longest")
 
-        output = io.StringIO()
-        writer = csv.writer(output, delimiter=delimiter)
+        writer = csv.writer(fh, delimiter=delimiter)
 
         if mode == "messages":
-            self._export_messages(writer, conversations, path_selection)
-        else:
-            self._export_conversations(writer, conversations)
-
-        return output.getvalue()
+            return self._export_messages(writer, conversations, path_selection)
+        return self._export_conversations(writer, conversations)
 
     def _export_conversations(self, writer, conversations):
         """Export conversation-level summary rows."""
@@ -85,7 +97,9 @@ class CSVExporter(ExporterPlugin):
         ]
         writer.writerow(headers)
 
+        count = 0
         for conv in conversations:
+            count += 1
             meta = conv.metadata
             writer.writerow(
                 [
@@ -102,6 +116,7 @@ class CSVExporter(ExporterPlugin):
                     "true" if meta.archived_at else "false",
                 ]
             )
+        return count
 
     def _export_messages(self, writer, conversations, path_selection):
         """Export message-level detail rows."""
@@ -116,7 +131,9 @@ class CSVExporter(ExporterPlugin):
         ]
         writer.writerow(headers)
 
+        count = 0
         for conv in conversations:
+            count += 1
             path = self.select_path(conv, path_selection)
 
             for msg in path:
@@ -136,6 +153,7 @@ class CSVExporter(ExporterPlugin):
                         msg.parent_id or "",
                     ]
                 )
+        return count
 
 
 
@@ -9,14 +9,20 @@ Exports conversations in an ECHO-compliant directory structure with:
 """
 
 import json
-import shutil
+import logging
 from datetime import datetime
 from pathlib import Path
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
 
+from ctk.core.backup import DB_FILE_NAME, _online_copy
+from ctk.core.constants import BACKUP_PAGES_PER_STEP
+from ctk.core.export_manifest import ExportManifest, ManifestStats
+from ctk.core.export_pool import ordered_map
 from ctk.core.models import ConversationTree, Message
 from ctk.core.plugin import ExporterPlugin
 
+logger = logging.getLogger(__name__)
+
 
 class ECHOExporter(ExporterPlugin):
     """Export conversations to ECHO-compliant directory structure."""
@@ -41,14 +47,20 @@ class ECHOExporter(ExporterPlugin):
         return self.export_to_directory(conversations, output_dir, **kwargs)
 
     def export_to_file(
-        self, conversations: List[ConversationTree], file_path: str, **kwargs
-    ) -> None:
+        self, conversations: Iterable[ConversationTree], file_path: str, **kwargs
+    ) -> ManifestStats:
         """
         Export to ECHO directory structure.
 
         For ECHO export, file_path is treated as the output directory.
         """
-        self.export_to_directory(conversations, file_path, **kwargs)
+        summary = self.export_to_directory(list(conversations), file_path, **kwargs)
+        return ManifestStats(
+            added=summary["added"],
+            updated=summary["updated"],
+            unchanged=summary["unchanged"],
+            removed=summary["removed"],
+        )
 
     def export_to_directory(
         self,
@@ -68,6 +80,9 @@ class ECHOExporter(ExporterPlugin):
             db_path: Path to source SQLite database (for optional copy)
             include_db: Whether to include SQLite database copy
             owner_name: Name of archive owner for README
+            jobs: Worker processes rendering conversations (0 = one per CPU)
+            incremental: Skip conversations unchanged since the last export
+                into this directory (default True)
 
         Returns:
             Summary dict with export statistics
@@ -88,54 +103,59 @@ class ECHOExporter(ExporterPlugin):
             "conversations": [],
         }
 
-        # Export each conversation
-        for conv in conversations:
-            conv_export_dir = conv_dir / conv.id
-            conv_export_dir.mkdir(exist_ok=True)
-
-            # Export conversation JSON (tree structure)
-            conv_json = self._export_conversation_json(conv)
-            (conv_export_dir / "conversation.json").write_text(
-                json.dumps(conv_json, indent=2, ensure_ascii=False), encoding="utf-8"
-            )
-
-            # Export conversation markdown (human-readable)
-            conv_md = self._export_conversation_markdown(conv)
-            (conv_export_dir / "conversation.md").write_text(conv_md, encoding="utf-8")
+        # Conversation files only depend on the tree, so the manifest needs no
+        # options: unchanged conversations are skipped before rendering
+        manifest = ExportManifest(
+            output_path,
+            self.name,
+            self.version,
+            incremental=kwargs.get("incremental", True),
+        )
 
-            # Export metadata
-            metadata = self._export_conversation_metadata(conv)
-            (conv_export_dir / "metadata.json").write_text(
-                json.dumps(metadata, indent=2, ensure_ascii=False), encoding="utf-8"
-            )
+        def indexed(convs: Iterable[ConversationTree]) -> Iterator[ConversationTree]:
+            # Every exported conversation is listed, in input order, even
+            # when its files are up to date
+            for conv in convs:
+                index_data["conversations"].append(self._index_entry(conv))
+                yield conv
+
+        # Render changed conversations on ``jobs`` worker processes; their
+        # files are written here, in input order
+        for conv_id, files in ordered_map(
+            self._render_conversation,
+            manifest.changed(indexed(conversations)),
+            kwargs.get("jobs", 1),
+        ):
+            conv_export_dir = conv_dir / conv_id
+            conv_export_dir.mkdir(exist_ok=True)
+            written = []
+            for filename, content in files.items():
+                path = conv_export_dir / filename
+                path.write_text(content, encoding="utf-8")
+                written.append(path)
+            manifest.record(conv_id, written)
 
-            # Add to index
-            index_data["conversations"].append(
-                {
-                    "id": conv.id,
-                    "title": conv.title,
-                    "created": (
-                        conv.metadata.created_at.isoformat()
-                        if conv.metadata.created_at
-                        else None
-                    ),
-                    "source": conv.metadata.source,
-                    "model": conv.metadata.model,
-                    "message_count": len(conv.message_map),
-                    "path": f"conversations/{conv.id}/",
-                }
-            )
+        stats = manifest.finish()
+        logger.info(f"Incremental export: {stats}")
 
         # Write index
         (output_path / "index.json").write_text(
             json.dumps(index_data, indent=2, ensure_ascii=False), encoding="utf-8"
         )
 
-        # Optionally copy database
+        # Optionally copy database: an online snapshot, so rows still in the
+        # WAL are included and a concurrent writer cannot tear the copy
         if include_db and db_path:
             db_source = Path(db_path)
+            if db_source.is_dir():
+                db_source = db_source / DB_FILE_NAME
             if db_source.exists():
-                shutil.copy2(db_source, output_path / "conversations.db")
+                _online_copy(
+                    db_source,
+                    output_path / "conversations.db",
+                    BACKUP_PAGES_PER_STEP,
+                    None,
+                )
 
         # Generate README
         readme_content = self._generate_readme(
@@ -147,7 +167,7 @@ class ECHOExporter(ExporterPlugin):
 
         # Generate manifest.json for longecho integration
         include_site = kwargs.get("include_site", False)
-        manifest = {
+        longecho_manifest = {
             "version": "1.0",
             "name": (
                 f"{owner_name}'s Conversation Archive"
@@ -160,10 +180,11 @@ class ECHOExporter(ExporterPlugin):
             "icon": "chat",
         }
         if include_site:
-            manifest["site"] = "site/"
+            longecho_manifest["site"] = "site/"
 
         (output_path / "manifest.json").write_text(
-            json.dumps(manifest, indent=2, ensure_ascii=False), encoding="utf-8"
+            json.dumps(longecho_manifest, indent=2, ensure_ascii=False),
+            encoding="utf-8",
         )
 
         # Generate HTML site if requested
@@ -179,12 +200,51 @@ class ECHOExporter(ExporterPlugin):
                 str(site_dir / "index.html"),
                 embed=True,
                 db_dir=kwargs.get("db_dir"),
+                jobs=kwargs.get("jobs", 1),
             )
 
         return {
             "total_exported": len(conversations),
             "output_dir": str(output_path),
             "db_included": include_db and db_path is not None,
+            "added": stats.added,
+            "updated": stats.updated,
+            "unchanged": stats.unchanged,
+            "removed": stats.removed,
+        }
+
+    def _render_conversation(
+        self, conv: ConversationTree
+    ) -> Tuple[str, Dict[str, str]]:
+        """Render one conversation's files (no file writes)."""
+        files = {
+            # Conversation JSON (tree structure)
+            "conversation.json": json.dumps(
+                self._export_conversation_json(conv), indent=2, ensure_ascii=False
+            ),
+            # Conversation markdown (human-readable)
+            "conversation.md": self._export_conversation_markdown(conv),
+            # Metadata
+            "metadata.json": json.dumps(
+                self._export_conversation_metadata(conv), indent=2, ensure_ascii=False
+            ),
+        }
+        return conv.id, files
+
+    def _index_entry(self, conv: ConversationTree) -> Dict[str, Any]:
+        """Entry for a conversation in index.json."""
+        return {
+            "id": conv.id,
+            "title": conv.title,
+            "created": (
+                conv.metadata.created_at.isoformat()
+                if conv.metadata.created_at
+                else None
+            ),
+            "source": conv.metadata.source,
+            "model": conv.metadata.model,
+            "message_count": len(conv.message_map),
+            "path": f"conversations/{conv.id}/",
         }
 
     def _export_conversation_json(self, conv: ConversationTree) -> Dict[str, Any]:
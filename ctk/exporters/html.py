@@ -2,14 +2,40 @@
 HTML Exporter - Interactive browser-based conversation viewer with localStorage
 """
 
+import functools
 import json
 import os
+import re
 from datetime import datetime
-from typing import Any, Dict, List, Optional, Tuple
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Set, Tuple
 
+from ctk.core.constants import HTML_INDEX_BUCKETS, HTML_INDEX_MAX_TERM, HTML_SHARD_SIZE
+from ctk.core.export_pool import ordered_map
+from ctk.core.media_store import MediaStore
 from ctk.core.models import ConversationTree
 from ctk.core.plugin import ExporterPlugin
 
+# Must agree with tokenize() in the sharded archive's JavaScript
+_TOKEN_RE = re.compile(r"\w+")
+
+
+def _index_terms(conv_dict: Dict[str, Any]) -> List[str]:
+    """Distinct search terms of a prepared conversation (title, tags, messages)"""
+    texts = [conv_dict["title"], *conv_dict["tags"]]
+    texts.extend(msg["content"] for msg in conv_dict["messages"])
+    terms = set()
+    for text in texts:
+        terms.update(_TOKEN_RE.findall(text.lower()))
+    return sorted(t for t in terms if 1 < len(t) <= HTML_INDEX_MAX_TERM)
+
+
+def _write_json(path: Path, data: Any) -> None:
+    path.write_text(
+        json.dumps(data, ensure_ascii=False, separators=(",", ":")),
+        encoding="utf-8",
+    )
+
 
 class HTMLExporter(ExporterPlugin):
     """Export conversations to interactive HTML app with localStorage features"""
@@ -23,7 +49,7 @@ class HTMLExporter(ExporterPlugin):
         return False
 
     def export_to_file(
-        self, conversations: List[ConversationTree], file_path: str, **kwargs
+        self, conversations: Iterable[ConversationTree], file_path: str, **kwargs
     ) -> None:
         """
         Export to file(s)
@@ -32,18 +58,41 @@ class HTMLExporter(ExporterPlugin):
         - embed=True (default): Single HTML file with all data embedded (including base64 images)
         - embed=False: Separate index.html + conversations.jsonl + media/ (requires web server)
         - media_dir: Put media in specified directory, embed conversation data in HTML
+        - sharded=True: index.html + data/ with conversation summaries, bodies in
+          shards fetched on demand and a prebuilt search index (requires web
+          server; for large archives)
+        - link_media=True: Hardlink media files instead of copying them
+
+        Modes with a media directory copy only the files the exported
+        conversations reference.
         """
         embed = kwargs.pop("embed", True)  # Default to embedded for better UX
         db_dir = kwargs.pop("db_dir", None)  # Database directory for media files
         media_dir = kwargs.pop(
             "media_dir", None
         )  # Optional: output media to separate directory
+        sharded = kwargs.pop("sharded", False)
+        link_media = kwargs.pop("link_media", False)
+        media_names: Set[str] = set()  # Filled as conversations are prepared
 
-        if media_dir:
-            # Hybrid mode: embed conversation data but put media in separate directory
-            import shutil
-            from pathlib import Path
+        if sharded:
+            if file_path.endswith(".html"):
+                output_dir = os.path.dirname(file_path) or "."
+                html_path = file_path
+            else:
+                output_dir = file_path
+                html_path = os.path.join(output_dir, "index.html")
+            self._export_sharded(
+                conversations,
+                output_dir,
+                html_path,
+                db_dir=db_dir,
+                link_media=link_media,
+                **kwargs,
+            )
 
+        elif media_dir:
+            # Hybrid mode: embed conversation data but put media in separate directory
             # Determine output directory and paths
             if file_path.endswith(".html"):
                 output_dir = os.path.dirname(file_path) or "."
@@ -62,21 +111,20 @@ class HTMLExporter(ExporterPlugin):
             os.makedirs(output_dir, exist_ok=True)
             os.makedirs(media_output_dir, exist_ok=True)
 
-            # Copy media files if db_dir is provided
-            if db_dir:
-                source_media = Path(db_dir) / "media"
-                if source_media.exists():
-                    for media_file in source_media.iterdir():
-                        if media_file.is_file():
-                            shutil.copy2(media_file, media_output_dir)
-
             # Generate HTML with embedded data but media URLs pointing to media_dir
             html_content = self.export_conversations(
-                conversations, embed=True, db_dir=db_dir, media_dir=media_dir, **kwargs
+                self._collect_media(conversations, media_names),
+                embed=True,
+                db_dir=db_dir,
+                media_dir=media_dir,
+                **kwargs,
             )
             with open(html_path, "w", encoding="utf-8") as f:
                 f.write(html_content)
 
+            # Copy the referenced media files if db_dir is provided
+            self._copy_media(db_dir, media_output_dir, media_names, link_media)
+
         elif embed:
             # Single file export with embedded data (images encoded as base64)
             html_content = self.export_conversations(
@@ -86,9 +134,6 @@ class HTMLExporter(ExporterPlugin):
                 f.write(html_content)
         else:
             # Multi-file export: index.html + conversations.jsonl + media/
-            import shutil
-            from pathlib import Path
-
             if file_path.endswith(".html"):
                 # Specific HTML filename provided - use its directory
                 output_dir = os.path.dirname(file_path) or "."
@@ -105,24 +150,20 @@ class HTMLExporter(ExporterPlugin):
 
             jsonl_path = os.path.join(output_dir, "conversations.jsonl")
 
-            # Copy media files if db_dir is provided
-            if db_dir:
-                source_media = Path(db_dir) / "media"
-                if source_media.exists():
-                    # Copy all media files
-                    for media_file in source_media.iterdir():
-                        if media_file.is_file():
-                            shutil.copy2(media_file, media_output_dir)
-
             # Generate HTML without embedded data
-            html_content = self.export_conversations(
-                conversations, embed=False, **kwargs
+            html_content = self._generate_html(
+                [], {}, kwargs.get("theme", "auto"), embed=False
             )
             with open(html_path, "w", encoding="utf-8") as f:
                 f.write(html_content)
 
             # Generate JSONL data
-            conv_data, stats = self._prepare_data(conversations)
+            conv_data, stats = self._prepare_data(
+                self._collect_media(conversations, media_names),
+                jobs=kwargs.get("jobs", 1),
+            )
+            # Copy the referenced media files if db_dir is provided
+            self._copy_media(db_dir, media_output_dir, media_names, link_media)
             with open(jsonl_path, "w", encoding="utf-8") as f:
                 for conv in conv_data:
                     f.write(json.dumps(conv, ensure_ascii=False) + "\n")
@@ -133,246 +174,418 @@ class HTMLExporter(ExporterPlugin):
         """Export conversations to HTML5"""
         return self.export_conversations(conversations, **kwargs)
 
+    @staticmethod
+    def _collect_media(
+        conversations: Iterable[ConversationTree], names: Set[str]
+    ) -> Iterator[ConversationTree]:
+        """Pass conversations through, adding the media file names they use.
+
+        A name is the last component of an image reference, the same file
+        _prepare_conversation points media URLs at.
+        """
+        for conv in conversations:
+            for msg in conv.message_map.values():
+                for img in getattr(msg.content, "images", None) or []:
+                    ref = img.url or img.path
+                    if ref and not ref.startswith("data:"):
+                        names.add(ref.replace("\\", "/").rsplit("/", 1)[-1])
+            yield conv
+
+    @staticmethod
+    def _copy_media(
+        db_dir: Optional[str],
+        media_output_dir: str,
+        names: Iterable[str],
+        link: bool = False,
+    ) -> None:
+        """Copy (or hardlink) the named files of the database's media store"""
+        if db_dir:
+            MediaStore(Path(db_dir) / "media").export(
+                names, Path(media_output_dir), link=link
+            )
+
+    def _export_sharded(
+        self,
+        conversations: Iterable[ConversationTree],
+        output_dir: str,
+        html_path: str,
+        db_dir: Optional[str] = None,
+        theme: str = "auto",
+        jobs: Optional[int] = 1,
+        shard_size: int = HTML_SHARD_SIZE,
+        link_media: bool = False,
+        **kwargs: Any,
+    ) -> None:
+        """Write a lazily loaded archive for very large exports
+
+        Layout under output_dir:
+
+        - ``index.html``: the app, without conversation data
+        - ``data/summaries.json``: stats and one summary per conversation
+          (no messages), all the browse, filter and timeline views need
+        - ``data/shards/NNNNN.json``: message bodies of ``shard_size``
+          conversations, fetched when one of them is opened
+        - ``data/index/<bucket>.json``: inverted index, term -> delta-encoded
+          positions in the summaries list; terms are bucketed by first
+          character so a query fetches only the buckets of its terms
+        - ``media/``: the media files these conversations reference
+
+        Conversations are prepared on ``jobs`` worker processes and written
+        shard by shard, so only summaries and postings stay in memory.
+        """
+        data_dir = Path(output_dir) / "data"
+        shard_dir = data_dir / "shards"
+        index_dir = data_dir / "index"
+        media_output_dir = os.path.join(output_dir, "media")
+        for directory in (shard_dir, index_dir, Path(media_output_dir)):
+            directory.mkdir(parents=True, exist_ok=True)
+
+        stats = self._new_stats()
+        summaries: List[Dict[str, Any]] = []
+        postings: Dict[str, List[int]] = {}
+        shard: List[Dict[str, Any]] = []
+
+        def flush() -> None:
+            shard_no = (len(summaries) - 1) // shard_size
+            _write_json(shard_dir / f"{shard_no:05d}.json", shard)
+            shard.clear()
+
+        prepare = functools.partial(self._prepare_indexed, media_dir="media")
+        media_names: Set[str] = set()
+        for conv_dict, earliest, latest, terms in ordered_map(
+            prepare, self._collect_media(conversations, media_names), jobs
+        ):
+            self._add_to_stats(stats, conv_dict, earliest, latest)
+            position = len(summaries)
+            summary = {
+                k: v
+                for k, v in conv_dict.items()
+                if k not in ("messages", "root_message_ids")
+            }
+            summary["shard"] = position // shard_size
+            summaries.append(summary)
+            shard.append(
+                {
+                    "id": conv_dict["id"],
+                    "messages": conv_dict["messages"],
+                    "root_message_ids": conv_dict["root_message_ids"],
+                }
+            )
+            if len(shard) == shard_size:
+                flush()
+            for term in terms:
+                postings.setdefault(term, []).append(position)
+        if shard:
+            flush()
+        self._copy_media(db_dir, media_output_dir, media_names, link_media)
+
+        # Every bucket is written, even empty, so lookups never 404
+        buckets: List[Dict[str, List[int]]] = [{} for _ in range(HTML_INDEX_BUCKETS)]
+        for term in sorted(postings):
+            positions = postings[term]
+            buckets[ord(term[0]) % HTML_INDEX_BUCKETS][term] = [
+                pos - prev for prev, pos in zip([0] + positions, positions)
+            ]
+        for number, bucket in enumerate(buckets):
+            _write_json(index_dir / f"{number}.json", bucket)
+
+        _write_json(
+            data_dir / "summaries.json",
+            {
+                "stats": self._finish_stats(stats),
+                "shard_size": shard_size,
+                "index_buckets": HTML_INDEX_BUCKETS,
+                "index_max_term": HTML_INDEX_MAX_TERM,
+                "conversations": summaries,
+            },
+        )
+        with open(html_path, "w", encoding="utf-8") as f:
+            f.write(self._generate_html([], {}, theme, embed=False, sharded=True))
+
+    def _prepare_indexed(
+        self, conv: ConversationTree, media_dir: Optional[str] = None
+    ) -> Tuple[Dict[str, Any], Optional[datetime], Optional[datetime], List[str]]:
+        """Prepare one conversation and its search terms (for a worker)"""
+        conv_dict, earliest, latest = self._prepare_conversation(
+            conv, embed=False, media_dir=media_dir
+        )
+        return conv_dict, earliest, latest, _index_terms(conv_dict)
+
+    @staticmethod
+    def _new_stats() -> Dict[str, Any]:
+        return {
+            "total_conversations": 0,
+            "total_messages": 0,
+            "sources": {},
+            "models": {},
+            "tags": {},
+            "date_range": {"earliest": None, "latest": None},
+        }
+
+    @staticmethod
+    def _add_to_stats(
+        stats: Dict[str, Any],
+        conv_dict: Dict[str, Any],
+        earliest: Optional[datetime],
+        latest: Optional[datetime],
+    ) -> None:
+        """Fold one prepared conversation into the running stats"""
+        date_range = stats["date_range"]
+        stats["total_conversations"] += 1
+        stats["total_messages"] += conv_dict["message_count"]
+        if earliest and (
+            not date_range["earliest"] or earliest < date_range["earliest"]
+        ):
+            date_range["earliest"] = earliest
+        if latest and (not date_range["latest"] or latest > date_range["latest"]):
+            date_range["latest"] = latest
+
+        source = conv_dict["source"]
+        model = conv_dict["model"]
+        stats["sources"][source] = stats["sources"].get(source, 0) + 1
+        stats["models"][model] = stats["models"].get(model, 0) + 1
+        for tag in conv_dict["tags"]:
+            stats["tags"][tag] = stats["tags"].get(tag, 0) + 1
+
+    @staticmethod
+    def _finish_stats(stats: Dict[str, Any]) -> Dict[str, Any]:
+        """Convert dates for JSON"""
+        if stats["date_range"]["earliest"]:
+            stats["date_range"]["earliest"] = stats["date_range"][
+                "earliest"
+            ].isoformat()
+        if stats["date_range"]["latest"]:
+            stats["date_range"]["latest"] = stats["date_range"]["latest"].isoformat()
+        return stats
+
     def _prepare_data(
         self,
-        conversations: List[ConversationTree],
+        conversations: Iterable[ConversationTree],
         db_dir: Optional[str] = None,
         embed: bool = True,
         media_dir: Optional[str] = None,
+        jobs: Optional[int] = 1,
     ) -> Tuple[List[Dict[str, Any]], Dict[str, Any]]:
         """Prepare conversation data and stats
 
         Args:
-            conversations: List of conversations to export
+            conversations: Conversations to export
             db_dir: Database directory for resolving media file paths
             embed: Whether to embed media as base64
             media_dir: If set, use file URLs to this directory instead of embedding
+            jobs: Worker processes preparing conversations (0 = one per CPU);
+                stats are aggregated here, in input order
         """
+        conv_data: List[Dict[str, Any]] = []
+        stats = self._new_stats()
+
+        prepare = functools.partial(
+            self._prepare_conversation, db_dir=db_dir, embed=embed, media_dir=media_dir
+        )
+        for conv_dict, earliest, latest in ordered_map(prepare, conversations, jobs):
+            self._add_to_stats(stats, conv_dict, earliest, latest)
+            conv_data.append(conv_dict)
+
+        return conv_data, self._finish_stats(stats)
+
+    def _prepare_conversation(
+        self,
+        conv: ConversationTree,
+        db_dir: Optional[str] = None,
+        embed: bool = True,
+        media_dir: Optional[str] = None,
+    ) -> Tuple[Dict[str, Any], Optional[datetime], Optional[datetime]]:
+        """Prepare one conversation's data and its message date range"""
         import base64
         from pathlib import Path
 
-        conv_data: List[Dict[str, Any]] = []
-        date_range: Dict[str, Any] = {"earliest": None, "latest": None}
-        stats: Dict[str, Any] = {
-            "total_conversations": len(conversations),
-            "total_messages": 0,
-            "sources": {},
-            "models": {},
-            "tags": {},
-            "date_range": date_range,
-        }
+        messages = []
+        earliest: Optional[datetime] = None
+        latest: Optional[datetime] = None
+        all_messages = list(conv.message_map.values())
+
+        for msg in sorted(all_messages, key=lambda m: m.timestamp or datetime.min):
+            if msg.timestamp:
+                if not earliest or msg.timestamp < earliest:
+                    earliest = msg.timestamp
+                if not latest or msg.timestamp > latest:
+                    latest = msg.timestamp
+
+            # Extract images if present
+            images = []
+            if hasattr(msg.content, "images") and msg.content.images:
+                for img in msg.content.images:
+                    img_data = {
+                        "url": img.url,
+                        "caption": img.caption,
+                        "mime_type": img.mime_type or "image/png",
+                    }
 
-        for conv in conversations:
-            messages = []
-            all_messages = list(conv.message_map.values())
-            stats["total_messages"] += len(all_messages)
-
-            for msg in sorted(all_messages, key=lambda m: m.timestamp or datetime.min):
-                if msg.timestamp:
-                    if (
-                        not stats["date_range"]["earliest"]
-                        or msg.timestamp < stats["date_range"]["earliest"]
-                    ):
-                        stats["date_range"]["earliest"] = msg.timestamp
-                    if (
-                        not stats["date_range"]["latest"]
-                        or msg.timestamp > stats["date_range"]["latest"]
-                    ):
-                        stats["date_range"]["latest"] = msg.timestamp
-
-                # Extract images if present
-                images = []
-                if hasattr(msg.content, "images") and msg.content.images:
-                    for img in msg.content.images:
-                        img_data = {
-                            "url": img.url,
-                            "caption": img.caption,
-                            "mime_type": img.mime_type or "image/png",
-                        }
-
-                        # Determine the filename for this image
-                        img_ref = img.url or img.path
+                    # Determine the filename for this image
+                    img_ref = img.url or img.path
+                    if img_ref:
+                        # Get just the filename
+                        if img_ref.startswith("media/"):
+                            filename = img_ref[6:]  # Remove 'media/' prefix
+                        elif "/" in img_ref:
+                            filename = img_ref.split("/")[-1]
+                        elif "\\" in img_ref:
+                            filename = img_ref.split("\\")[-1]
+                        else:
+                            filename = img_ref
+                    else:
+                        filename = None
+
+                    # If media_dir is set, use file URLs instead of embedding
+                    if media_dir and filename:
+                        # Set URL to point to media_dir
+                        img_data["url"] = f"{media_dir}/{filename}"
+                        # Don't embed data - we're using file references
+                    elif img.data:
+                        # Already have base64 data
+                        img_data["data"] = img.data
+                    elif embed and db_dir:
+                        # Try to read image from disk and encode as base64
+                        image_path = None
                         if img_ref:
-                            # Get just the filename
+                            # Try various path resolutions
+                            candidates = []
                             if img_ref.startswith("media/"):
-                                filename = img_ref[6:]  # Remove 'media/' prefix
-                            elif "/" in img_ref:
-                                filename = img_ref.split("/")[-1]
-                            elif "\\" in img_ref:
-                                filename = img_ref.split("\\")[-1]
+                                # Relative URL like 'media/xxx.png'
+                                candidates.append(Path(db_dir) / img_ref)
+                            elif "/" not in img_ref and "\\" not in img_ref:
+                                # Just a filename - look in media/ directory
+                                candidates.append(Path(db_dir) / "media" / img_ref)
+                                # Also try directly in db_dir
+                                candidates.append(Path(db_dir) / img_ref)
                             else:
-                                filename = img_ref
-                        else:
-                            filename = None
-
-                        # If media_dir is set, use file URLs instead of embedding
-                        if media_dir and filename:
-                            # Set URL to point to media_dir
-                            img_data["url"] = f"{media_dir}/{filename}"
-                            # Don't embed data - we're using file references
-                        elif img.data:
-                            # Already have base64 data
-                            img_data["data"] = img.data
-                        elif embed and db_dir:
-                            # Try to read image from disk and encode as base64
-                            image_path = None
-                            if img_ref:
-                                # Try various path resolutions
-                                candidates = []
-                                if img_ref.startswith("media/"):
-                                    # Relative URL like 'media/xxx.png'
-                                    candidates.append(Path(db_dir) / img_ref)
-                                elif "/" not in img_ref and "\\" not in img_ref:
-                                    # Just a filename - look in media/ directory
-                                    candidates.append(Path(db_dir) / "media" / img_ref)
-                                    # Also try directly in db_dir
-                                    candidates.append(Path(db_dir) / img_ref)
-                                else:
-                                    # Some other path - try relative to db_dir
-                                    candidates.append(Path(db_dir) / img_ref)
-                                    # Also try as absolute path
-                                    if Path(img_ref).is_absolute():
-                                        candidates.append(Path(img_ref))
-
-                                # Find first existing path
-                                for candidate in candidates:
-                                    if candidate.exists():
-                                        image_path = candidate
-                                        break
-
-                            if image_path:
-                                try:
-                                    with open(image_path, "rb") as f:
-                                        img_data["data"] = base64.b64encode(
-                                            f.read()
-                                        ).decode("utf-8")
-                                    # Detect mime type from extension if not set
-                                    if (
-                                        not img_data["mime_type"]
-                                        or img_data["mime_type"] == "image/png"
-                                    ):
-                                        ext = image_path.suffix.lower()
-                                        mime_map = {
-                                            ".png": "image/png",
-                                            ".jpg": "image/jpeg",
-                                            ".jpeg": "image/jpeg",
-                                            ".gif": "image/gif",
-                                            ".webp": "image/webp",
-                                            ".svg": "image/svg+xml",
-                                            ".jfif": "image/jpeg",
-                                            ".JPG": "image/jpeg",
-                                        }
-                                        img_data["mime_type"] = mime_map.get(
-                                            ext, "image/png"
-                                        )
-                                except Exception as e:
-                                    import sys
-
-                                    print(
-                                        f"Warning: Could not read image {image_path}: {e}",
-                                        file=sys.stderr,
+                                # Some other path - try relative to db_dir
+                                candidates.append(Path(db_dir) / img_ref)
+                                # Also try as absolute path
+                                if Path(img_ref).is_absolute():
+                                    candidates.append(Path(img_ref))
+
+                            # Find first existing path
+                            for candidate in candidates:
+                                if candidate.exists():
+                                    image_path = candidate
+                                    break
+
+                        if image_path:
+                            try:
+                                with open(image_path, "rb") as f:
+                                    img_data["data"] = base64.b64encode(
+                                        f.read()
+                                    ).decode("utf-8")
+                                # Detect mime type from extension if not set
+                                if (
+                                    not img_data["mime_type"]
+                                    or img_data["mime_type"] == "image/png"
+                                ):
+                                    ext = image_path.suffix.lower()
+                                    mime_map = {
+                                        ".png": "image/png",
+                                        ".jpg": "image/jpeg",
+                                        ".jpeg": "image/jpeg",
+                                        ".gif": "image/gif",
+                                        ".webp": "image/webp",
+                                        ".svg": "image/svg+xml",
+                                        ".jfif": "image/jpeg",
+                                        ".JPG": "image/jpeg",
+                                    }
+                                    img_data["mime_type"] = mime_map.get(
+                                        ext, "image/png"
                                     )
-                            elif img_ref:
+                            except Exception as e:
                                 import sys
 
                                 print(
-                                    f"Warning: Image not found: {img_ref}"
-                                    f" (looked in {db_dir}/media/)",
+                                    f"Warning: Could not read image {image_path}: {e}",
                                     file=sys.stderr,
                                 )
-
-                        images.append(img_data)
-
-                # Extract tool calls if present
-                tool_calls = []
-                if hasattr(msg.content, "tool_calls") and msg.content.tool_calls:
-                    for tool in msg.content.tool_calls:
-                        tool_data = {
-                            "id": tool.id,
-                            "name": tool.name,
-                            "arguments": tool.arguments,
-                            "status": tool.status,
-                        }
-                        if tool.result is not None:
-                            tool_data["result"] = tool.result
-                        if tool.error:
-                            tool_data["error"] = tool.error
-                        tool_calls.append(tool_data)
-
-                msg_dict = {
-                    "id": msg.id,
-                    "role": (
-                        msg.role.value if hasattr(msg.role, "value") else str(msg.role)
-                    ),
-                    "content": (
-                        msg.content.get_text()
-                        if hasattr(msg.content, "get_text")
-                        else str(msg.content)
-                    ),
-                    "timestamp": msg.timestamp.isoformat() if msg.timestamp else None,
-                    "parent_id": msg.parent_id,
-                    "has_code": "```"
-                    in (
-                        msg.content.get_text()
-                        if hasattr(msg.content, "get_text")
-                        else ""
-                    ),
-                    "has_images": bool(images),
-                    "images": images,
-                    "has_tools": bool(tool_calls),
-                    "tool_calls": tool_calls,
-                }
-                messages.append(msg_dict)
-
-            source = conv.metadata.source or "Unknown"
-            model = conv.metadata.model or "Unknown"
-            tags = conv.metadata.tags or []
-
-            stats["sources"][source] = stats["sources"].get(source, 0) + 1
-            stats["models"][model] = stats["models"].get(model, 0) + 1
-            for tag in tags:
-                stats["tags"][tag] = stats["tags"].get(tag, 0) + 1
-
-            conv_dict = {
-                "id": conv.id,
-                "title": conv.title or "Untitled Conversation",
-                "messages": messages,
-                "root_message_ids": conv.root_message_ids,
-                "created_at": (
-                    conv.metadata.created_at.isoformat()
-                    if conv.metadata.created_at
-                    else None
+                        elif img_ref:
+                            import sys
+
+                            print(
+                                f"Warning: Image not found: {img_ref}"
+                                f" (looked in {db_dir}/media/)",
+                                file=sys.stderr,
+                            )
+
+                    images.append(img_data)
+
+            # Extract tool calls if present
+            tool_calls = []
+            if hasattr(msg.content, "tool_calls") and msg.content.tool_calls:
+                for tool in msg.content.tool_calls:
+                    tool_data = {
+                        "id": tool.id,
+                        "name": tool.name,
+                        "arguments": tool.arguments,
+                        "status": tool.status,
+                    }
+                    if tool.result is not None:
+                        tool_data["result"] = tool.result
+                    if tool.error:
+                        tool_data["error"] = tool.error
+                    tool_calls.append(tool_data)
+
+            msg_dict = {
+                "id": msg.id,
+                "role": (
+                    msg.role.value if hasattr(msg.role, "value") else str(msg.role)
                 ),
-                "updated_at": (
-                    conv.metadata.updated_at.isoformat()
-                    if conv.metadata.updated_at
-                    else None
+                "content": (
+                    msg.content.get_text()
+                    if hasattr(msg.content, "get_text")
+                    else str(msg.content)
                 ),
-                "source": source,
-                "model": model,
-                "tags": tags,
-                "message_count": len(messages),
+                "timestamp": msg.timestamp.isoformat() if msg.timestamp else None,
+                "parent_id": msg.parent_id,
+                "has_code": "```"
+                in (msg.content.get_text() if hasattr(msg.content, "get_text") else ""),
+                "has_images": bool(images),
+                "images": images,
+                "has_tools": bool(tool_calls),
+                "tool_calls": tool_calls,
             }
-            conv_data.append(conv_dict)
-
-        # Convert dates for JSON
-        if stats["date_range"]["earliest"]:
-            stats["date_range"]["earliest"] = stats["date_range"][
-                "earliest"
-            ].isoformat()
-        if stats["date_range"]["latest"]:
-            stats["date_range"]["latest"] = stats["date_range"]["latest"].isoformat()
-
-        return conv_data, stats
+            messages.append(msg_dict)
+
+        source = conv.metadata.source or "Unknown"
+        model = conv.metadata.model or "Unknown"
+        tags = conv.metadata.tags or []
+
+        conv_dict = {
+            "id": conv.id,
+            "title": conv.title or "Untitled Conversation",
+            "messages": messages,
+            "root_message_ids": conv.root_message_ids,
+            "created_at": (
+                conv.metadata.created_at.isoformat()
+                if conv.metadata.created_at
+                else None
+            ),
+            "updated_at": (
+                conv.metadata.updated_at.isoformat()
+                if conv.metadata.updated_at
+                else None
+            ),
+            "source": source,
+            "model": model,
+            "tags": tags,
+            "message_count": len(messages),
+        }
+        return conv_dict, earliest, latest
 
     def export_conversations(
         self,
-        conversations: List[ConversationTree],
+        conversations: Iterable[ConversationTree],
         include_metadata: bool = True,
         theme: str = "auto",
         embed: bool = True,
         db_dir: Optional[str] = None,
         media_dir: Optional[str] = None,
+        jobs: Optional[int] = 1,
         **kwargs: Any,
     ) -> str:
         """
@@ -385,18 +598,33 @@ class HTMLExporter(ExporterPlugin):
             embed: Whether to embed data in HTML (True) or load from external JSONL (False)
             db_dir: Database directory for resolving media file paths
             media_dir: If set, use file URLs to this directory instead of embedding base64
+            jobs: Worker processes preparing conversation data (0 = one per CPU)
         """
         conv_data, stats = self._prepare_data(
-            conversations, db_dir=db_dir, embed=embed, media_dir=media_dir
+            conversations, db_dir=db_dir, embed=embed, media_dir=media_dir, jobs=jobs
         )
         return self._generate_html(conv_data, stats, theme, embed)
 
     def _generate_html(
-        self, conversations: List[Dict], stats: Dict, theme: str, embed: bool = True
+        self,
+        conversations: List[Dict],
+        stats: Dict,
+        theme: str,
+        embed: bool = True,
+        sharded: bool = False,
     ) -> str:
         """Generate complete HTML5 document"""
 
-        if embed:
+        if sharded:
+            # Load summaries from data/; bodies and index buckets on demand
+            data_script = f"""
+        let CONVERSATIONS = [];
+        let STATS = {{}};
+
+        {self._get_sharded_loader()}
+        {self._get_javascript()}
+"""
+        elif embed:
             # Embed data directly in HTML
             conv_json = json.dumps(conversations, ensure_ascii=False, indent=2)
             stats_json = json.dumps(stats, ensure_ascii=False, indent=2)
@@ -2581,7 +2809,10 @@ function renderMath(element) {
 }
 
 // ==================== Init ====================
-document.addEventListener('DOMContentLoaded', init);
+document.addEventListener('DOMContentLoaded', () => {
+    // A sharded archive calls init() itself once its summaries have arrived
+    if (typeof DATA_LOADED === 'undefined' || DATA_LOADED) init();
+});
 
 function init() {
     setupTabs();
@@ -2934,6 +3165,12 @@ function handleMainSearch(e) {
     const searchTitles = document.getElementById('searchTitles').checked;
     const useRegex = document.getElementById('searchRegex').checked;
 
+    if (typeof searchIndex === 'function') {
+        // Sharded archive: message bodies are not loaded, use the search index
+        handleIndexedSearch(query, searchTitles, searchContent);
+        return;
+    }
+
     const results = [];
 
     for (const conv of CONVERSATIONS) {
@@ -3321,6 +3558,16 @@ function createConversationItem(conv) {
 }
 
 function showConversation(conv, pathLeafId) {
+    if (!conv.messages) {
+        // Sharded archive: fetch the conversation's shard on first open
+        loadConversation(conv)
+            .then(() => showConversation(conv, pathLeafId))
+            .catch(err => {
+                console.error('Failed to load conversation:', err);
+                alert('Failed to load conversation: ' + err.message);
+            });
+        return;
+    }
     state.currentConv = conv;
     state.markAsRead(conv.id);
 
@@ -4519,6 +4766,173 @@ fetch('conversations.jsonl')
     });
 """
 
+    def _get_sharded_loader(self) -> str:
+        """Get JavaScript code for a sharded archive (see _export_sharded)"""
+        return """
+// Sharded archive: data/summaries.json up front; conversation bodies
+// (data/shards/) and search index buckets (data/index/) when first needed
+let DATA_LOADED = false;
+let ARCHIVE = { indexBuckets: 1, indexMaxTerm: Infinity };
+const CONVERSATION_BY_ID = new Map();
+const shardCache = new Map();
+const indexCache = new Map();
+let searchSeq = 0;
+
+function fetchJSON(url) {
+    return fetch(url).then(response => {
+        if (!response.ok) {
+            throw new Error(
+                `Failed to load ${url}: ${response.status} ${response.statusText}`
+            );
+        }
+        return response.json();
+    });
+}
+
+// Fetch once; a failed fetch is forgotten so it can be retried
+function cachedFetch(cache, key, url) {
+    if (!cache.has(key)) {
+        cache.set(key, fetchJSON(url).catch(err => {
+            cache.delete(key);
+            throw err;
+        }));
+    }
+    return cache.get(key);
+}
+
+function loadConversation(conv) {
+    const name = String(conv.shard).padStart(5, '0');
+    return cachedFetch(shardCache, conv.shard, `data/shards/${name}.json`)
+        .then(bodies => {
+            for (const body of bodies) {
+                const target = CONVERSATION_BY_ID.get(body.id);
+                if (target && !target.messages) {
+                    target.messages = body.messages;
+                    target.root_message_ids = body.root_message_ids;
+                }
+            }
+        });
+}
+
+// Must agree with _TOKEN_RE / _index_terms in the exporter: overlong
+// tokens are not indexed, so they cannot narrow a search either
+function tokenize(text) {
+    return (text.toLowerCase().match(/[\\p{L}\\p{N}_]+/gu) || [])
+        .filter(t => t.length > 1 && t.length <= ARCHIVE.indexMaxTerm);
+}
+
+function loadIndexBucket(term) {
+    const bucket = term.codePointAt(0) % ARCHIVE.indexBuckets;
+    return cachedFetch(indexCache, bucket, `data/index/${bucket}.json`);
+}
+
+function decodePostings(deltas, into) {
+    let position = 0;
+    for (const delta of deltas) {
+        position += delta;
+        into.add(position);
+    }
+}
+
+// Conversations containing every query term; the last term (still being
+// typed) also matches as a prefix
+async function searchIndex(query) {
+    const terms = tokenize(query);
+    if (!terms.length) return [];
+    let found = null;
+    for (let i = 0; i < terms.length; i++) {
+        const term = terms[i];
+        const bucket = await loadIndexBucket(term);
+        const positions = new Set();
+        if (i === terms.length - 1) {
+            for (const key of Object.keys(bucket)) {
+                if (key.startsWith(term)) decodePostings(bucket[key], positions);
+            }
+        } else if (bucket[term]) {
+            decodePostings(bucket[term], positions);
+        }
+        found = found === null
+            ? positions
+            : new Set([...found].filter(p => positions.has(p)));
+        if (!found.size) break;
+    }
+    return [...found].sort((a, b) => a - b).map(p => CONVERSATIONS[p]);
+}
+
+function handleIndexedSearch(query, searchTitles, searchContent) {
+    const seq = ++searchSeq;
+    const titleMatches = searchTitles && query
+        ? CONVERSATIONS.filter(c => c.title.toLowerCase().includes(query))
+        : [];
+    const contentSearch = searchContent && query
+        ? searchIndex(query)
+        : Promise.resolve([]);
+
+    contentSearch.then(contentMatches => {
+        if (seq !== searchSeq) return; // A newer query superseded this one
+        const results = new Map();
+        for (const conv of titleMatches) {
+            results.set(conv.id, {
+                conversation: conv,
+                matches: [{ type: 'title', text: conv.title }]
+            });
+        }
+        for (const conv of contentMatches) {
+            if (results.has(conv.id)) continue;
+            // Bodies are not loaded yet, so the title stands in as the snippet
+            results.set(conv.id, {
+                conversation: conv,
+                matches: [{ type: 'message', text: conv.title }]
+            });
+        }
+        renderSearchResults([...results.values()], query);
+    }).catch(error => console.error('Search failed:', error));
+}
+
+// Show loading indicator
+const loadingDiv = document.createElement('div');
+loadingDiv.id = 'loading-indicator';
+loadingDiv.style.cssText =
+    'position: fixed; top: 50%; left: 50%; transform: translate(-50%, -50%);' +
+    ' background: var(--bg-primary); padding: 2rem; border-radius: 8px;' +
+    ' box-shadow: var(--shadow); z-index: 10000; text-align: center;';
+loadingDiv.innerHTML =
+    '<div style="font-size: 1.5rem;">Loading conversations...</div>';
+document.body.appendChild(loadingDiv);
+
+fetchJSON('data/summaries.json')
+    .then(data => {
+        ARCHIVE = {
+            indexBuckets: data.index_buckets,
+            indexMaxTerm: data.index_max_term,
+        };
+        STATS = data.stats;
+        for (const conv of data.conversations) {
+            CONVERSATIONS.push(conv);
+            CONVERSATION_BY_ID.set(conv.id, conv);
+        }
+        DATA_LOADED = true;
+        loadingDiv.remove();
+
+        // Before DOMContentLoaded its listener runs init()
+        if (document.readyState !== 'loading') init();
+    })
+    .catch(error => {
+        console.error('Error loading conversations:', error);
+        loadingDiv.innerHTML = `
+            <div style="color: var(--danger); font-size: 1.2rem; margin-bottom: 1rem;">
+                ⚠️ Error Loading Data</div>
+            <div style="margin-bottom: 1rem;">${escapeHtml(error.message)}</div>
+            <div style="font-size: 0.9rem; color: var(--text-secondary);">
+                <p>This archive loads its data from the <code>data/</code>
+                    directory next to this file.</p>
+                <p style="margin-top: 1rem;">View it through a web server, e.g.
+                    <code>python -m http.server</code></p>
+            </div>
+        `;
+    });
+"""
+
 
 # Register the exporter
 exporter = HTMLExporter()
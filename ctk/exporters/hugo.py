@@ -5,17 +5,33 @@ Exports conversations as Hugo page bundles for static site generation.
 Each conversation becomes a directory with index.md and associated media.
 """
 
+import functools
 import os
 import re
-import shutil
+from dataclasses import dataclass, field
 from datetime import datetime
 from pathlib import Path
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, Iterable, List, Optional, Tuple
 
+from ctk.core.export_manifest import ExportManifest, ManifestStats
+from ctk.core.export_pool import ordered_map
+from ctk.core.media_store import link_or_copy
 from ctk.core.models import ConversationTree, Message, MessageRole
 from ctk.core.plugin import ExporterPlugin
 
 
+@dataclass
+class _Bundle:
+    """A rendered page bundle, written by the parent process"""
+
+    conv_id: str
+    bundle_dir: Path
+    index: str = ""
+    images_dir: Optional[Path] = None
+    image_copies: List[Tuple[Path, Path]] = field(default_factory=list)
+    error: Optional[Exception] = None
+
+
 class HugoExporter(ExporterPlugin):
     """Export conversations as Hugo page bundles"""
 
@@ -34,8 +50,8 @@ class HugoExporter(ExporterPlugin):
         return len(conversations)
 
     def export_to_file(
-        self, conversations: List[ConversationTree], file_path: str, **kwargs
-    ) -> None:
+        self, conversations: Iterable[ConversationTree], file_path: str, **kwargs
+    ) -> ManifestStats:
         """
         Export conversations as Hugo page bundles.
 
@@ -49,6 +65,11 @@ class HugoExporter(ExporterPlugin):
                 - include_draft: Mark as draft (default: False)
                 - date_prefix: Include date in directory name (default: True)
                 - hugo_organize: Organization strategy - "none" (flat), "tags", "source", "date" (default: "date")
+                - jobs: Worker processes rendering bundles (0 = one per CPU, default 1)
+                - incremental: Skip conversations unchanged since the last export
+                  into this directory (default: True; see ExportManifest)
+                - link_media: Hardlink images from the database instead of
+                  copying them (default: False)
         """
         db_dir = kwargs.get("db_dir")
         path_selection = kwargs.get("path_selection", "longest")
@@ -60,31 +81,55 @@ class HugoExporter(ExporterPlugin):
         output_dir = Path(file_path)
         output_dir.mkdir(parents=True, exist_ok=True)
 
+        options = {
+            "db_dir": db_dir,
+            "path_selection": path_selection,
+            "include_draft": include_draft,
+            "date_prefix": date_prefix,
+            "hugo_organize": hugo_organize,
+        }
+        manifest = ExportManifest(
+            output_dir,
+            self.name,
+            self.version,
+            options,
+            incremental=kwargs.get("incremental", True),
+        )
+
+        # Changed bundles are rendered on ``jobs`` worker processes and
+        # written here, in input order
+        render = functools.partial(
+            self._render_bundle,
+            output_dir=output_dir,
+            db_dir=db_dir,
+            path_selection=path_selection,
+            include_draft=include_draft,
+            date_prefix=date_prefix,
+            hugo_organize=hugo_organize,
+        )
+        changed = manifest.changed(conversations)
         exported_count = 0
-        for conv in conversations:
+        for bundle in ordered_map(render, changed, kwargs.get("jobs", 1)):
             try:
-                # Determine target directory based on organization strategy
-                target_dir = self._get_target_dir(conv, output_dir, hugo_organize)
-                target_dir.mkdir(parents=True, exist_ok=True)
-
-                self._export_conversation(
-                    conv,
-                    target_dir,
-                    db_dir=db_dir,
-                    path_selection=path_selection,
-                    include_draft=include_draft,
-                    date_prefix=date_prefix,
+                if bundle.error is not None:
+                    raise bundle.error
+                written = self._write_bundle(
+                    bundle, link=kwargs.get("link_media", False)
                 )
+                manifest.record(bundle.conv_id, written)
                 exported_count += 1
             except Exception as e:
                 import sys
 
+                manifest.keep(bundle.conv_id)
                 print(
-                    f"Warning: Failed to export conversation {conv.id}: {e}",
+                    f"Warning: Failed to export conversation {bundle.conv_id}: {e}",
                     file=sys.stderr,
                 )
 
+        stats = manifest.finish()
         print(f"Exported {exported_count} conversation(s) to {output_dir}")
+        return stats
 
     def _get_target_dir(
         self, conv: ConversationTree, base_dir: Path, organize_strategy: str
@@ -146,7 +191,7 @@ class HugoExporter(ExporterPlugin):
             # Default to base_dir
             return base_dir
 
-    def _export_conversation(
+    def _render_bundle(
         self,
         conv: ConversationTree,
         output_dir: Path,
@@ -154,46 +199,72 @@ class HugoExporter(ExporterPlugin):
         path_selection: str = "longest",
         include_draft: bool = False,
         date_prefix: bool = True,
-    ) -> None:
-        """Export a single conversation as a Hugo page bundle."""
+        hugo_organize: str = "date",
+    ) -> "_Bundle":
+        """Render a single conversation as a Hugo page bundle (no file writes).
 
-        # Generate slug from title
-        slug = self._generate_slug(conv.title or "untitled", conv.id)
+        Failures are returned on the bundle rather than raised, so one bad
+        conversation does not abort a parallel export.
+        """
+        try:
+            # Determine target directory based on organization strategy
+            target_dir = self._get_target_dir(conv, output_dir, hugo_organize)
 
-        # Add date prefix if requested
-        if date_prefix and conv.metadata.created_at:
-            date_str = conv.metadata.created_at.strftime("%Y-%m-%d")
-            bundle_name = f"{date_str}-{slug}"
-        else:
-            bundle_name = slug
+            # Generate slug from title
+            slug = self._generate_slug(conv.title or "untitled", conv.id)
+
+            # Add date prefix if requested
+            if date_prefix and conv.metadata.created_at:
+                date_str = conv.metadata.created_at.strftime("%Y-%m-%d")
+                bundle_name = f"{date_str}-{slug}"
+            else:
+                bundle_name = slug
 
-        # Create page bundle directory
-        bundle_dir = output_dir / bundle_name
-        bundle_dir.mkdir(parents=True, exist_ok=True)
+            bundle = _Bundle(conv_id=conv.id, bundle_dir=target_dir / bundle_name)
 
-        # Collect images from conversation
-        images = self._collect_images(conv)
+            # Collect images from conversation
+            images = self._collect_images(conv)
 
-        # Copy images to bundle
-        image_map = {}  # Maps original URL to new filename
-        if images and db_dir:
-            images_dir = bundle_dir / "images"
-            images_dir.mkdir(exist_ok=True)
-            image_map = self._copy_images(images, db_dir, images_dir)
+            # Plan image copies into the bundle
+            image_map: Dict[str, str] = {}  # Maps original URL to new filename
+            if images and db_dir:
+                bundle.images_dir = bundle.bundle_dir / "images"
+                image_map, bundle.image_copies = self._plan_images(
+                    images, db_dir, bundle.images_dir
+                )
+
+            # Generate frontmatter
+            frontmatter = self._generate_frontmatter(conv, include_draft)
+
+            # Generate markdown content
+            content = self._generate_content(conv, path_selection, image_map)
+
+            bundle.index = f"---\n{frontmatter}---\n\n{content}"
+            return bundle
+        except Exception as e:
+            return _Bundle(conv_id=conv.id, bundle_dir=output_dir, error=e)
 
-        # Generate frontmatter
-        frontmatter = self._generate_frontmatter(conv, include_draft)
+    def _write_bundle(self, bundle: "_Bundle", link: bool = False) -> List[Path]:
+        """Create the bundle directory, copy (or link) images and write index.md.
 
-        # Generate markdown content
-        content = self._generate_content(conv, path_selection, image_map)
+        Returns:
+            Paths of the files written
+        """
+        bundle.bundle_dir.mkdir(parents=True, exist_ok=True)
+        written = []
+
+        if bundle.images_dir is not None and bundle.image_copies:
+            bundle.images_dir.mkdir(exist_ok=True)
+            for src_path, dest_path in bundle.image_copies:
+                link_or_copy(src_path, dest_path, link=link)
+                written.append(dest_path)
 
         # Write index.md
-        index_path = bundle_dir / "index.md"
+        index_path = bundle.bundle_dir / "index.md"
         with open(index_path, "w", encoding="utf-8") as f:
-            f.write("---\n")
-            f.write(frontmatter)
-            f.write("---\n\n")
-            f.write(content)
+            f.write(bundle.index)
+        written.append(index_path)
+        return written
 
     def _generate_slug(self, title: str, conv_id: str) -> str:
         """Generate URL-safe slug from title."""
@@ -343,11 +414,12 @@ class HugoExporter(ExporterPlugin):
                         )
         return images
 
-    def _copy_images(
+    def _plan_images(
         self, images: List[Dict[str, Any]], db_dir: str, images_dir: Path
-    ) -> Dict[str, str]:
-        """Copy images to bundle and return mapping of old to new paths."""
+    ) -> Tuple[Dict[str, str], List[Tuple[Path, Path]]]:
+        """Map image URLs to bundle paths and list the (src, dest) copies."""
         image_map = {}
+        copies = []
         db_path = Path(db_dir)
 
         for img in images:
@@ -364,15 +436,12 @@ class HugoExporter(ExporterPlugin):
             if src_path.exists():
                 # Get filename
                 filename = src_path.name
-                dest_path = images_dir / filename
-
-                # Copy file
-                shutil.copy2(src_path, dest_path)
+                copies.append((src_path, images_dir / filename))
 
                 # Map original URL to Hugo-relative path
                 image_map[img_ref] = f"images/{filename}"
 
-        return image_map
+        return image_map, copies
 
     def _replace_image_urls(self, content: str, image_map: Dict[str, str]) -> str:
         """Replace image URLs in content with Hugo-relative paths."""
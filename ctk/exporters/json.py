@@ -2,9 +2,10 @@
 JSON exporter for CTK conversations
 """
 
+import io
 import json
 from datetime import datetime
-from typing import Any, Dict, List, Optional
+from typing import IO, Any, Callable, Dict, Iterable, List, Optional, Tuple
 
 from ctk.core.models import ConversationTree, Message, MessageRole
 from ctk.core.plugin import ExporterPlugin
@@ -16,6 +17,7 @@ class JSONExporter(ExporterPlugin):
     name = "json"
     description = "Export conversations to JSON format"
     version = "1.0.0"
+    streaming = True
 
     def validate(self, data: Any) -> bool:
         """Validate if this exporter can handle the data"""
@@ -47,25 +49,16 @@ class JSONExporter(ExporterPlugin):
             include_metadata: Include conversation metadata
             pretty_print: Pretty-print the JSON output
         """
-        data: Any
-        if format_style == "ctk":
-            data = self._export_ctk_format(conversations, include_metadata)
-        elif format_style == "openai":
-            data = self._export_openai_format(conversations, path_selection)
-        elif format_style == "anthropic":
-            data = self._export_anthropic_format(conversations, path_selection)
-        else:  # generic
-            data = self._export_generic_format(
-                conversations, path_selection, include_metadata
-            )
-
-        # Serialize to JSON
-        if pretty_print:
-            json_str = json.dumps(
-                data, indent=2, ensure_ascii=False, default=self._json_serial
-            )
-        else:
-            json_str = json.dumps(data, ensure_ascii=False, default=self._json_serial)
+        output = io.StringIO()
+        self.export_stream(
+            conversations,
+            output,
+            format_style=format_style,
+            path_selection=path_selection,
+            include_metadata=include_metadata,
+            pretty_print=pretty_print,
+        )
+        json_str = output.getvalue()
 
         # Write to file if specified
         if output_file:
@@ -74,156 +67,213 @@ class JSONExporter(ExporterPlugin):
 
         return json_str
 
-    def _export_ctk_format(
-        self, conversations: List[ConversationTree], include_metadata: bool
-    ) -> Dict[str, Any]:
-        """Export in native CTK format (preserves full tree structure)"""
-        data: Dict[str, Any] = {
-            "format": "ctk",
-            "version": "2.0.0",
-            "exported_at": datetime.now().isoformat(),
-            "conversations": [],
-        }
+    def export_stream(
+        self,
+        conversations: Iterable[ConversationTree],
+        fh: IO[str],
+        format_style: str = "ctk",
+        path_selection: str = "all",
+        include_metadata: bool = True,
+        pretty_print: bool = True,
+        **kwargs,
+    ) -> int:
+        """
+        Write conversations to fh as JSON, one conversation at a time.
+
+        Produces exactly what export_conversations returns: the envelope
+        (if the format has one) is written up front and the conversations
+        array is streamed item by item, so only one tree is held at a time.
+
+        Returns:
+            Number of conversations written
+        """
+        envelope, convert = self._format_plan(
+            format_style, path_selection, include_metadata
+        )
+        indent = 2 if pretty_print else None
 
+        if envelope is None:
+            prefix, suffix, depth = "", "", 0
+        else:
+            # The array is always the envelope's last key, so its "[]" is the
+            # last one in the serialized envelope
+            head = self._dumps({**envelope, "conversations": []}, indent)
+            prefix, suffix = head.rsplit("[]", 1)
+            depth = 1
+
+        fh.write(prefix)
+        count = 0
+        first = True
         for conv in conversations:
-            conv_data: Dict[str, Any] = {
-                "id": conv.id,
-                "title": conv.title,
-                "messages": {},
-                "root_message_ids": conv.root_message_ids,
+            count += 1
+            for item in convert(conv):
+                text = self._dumps(item, indent)
+                if indent is not None:
+                    pad = "\n" + " " * indent * (depth + 1)
+                    text = pad + text.replace("\n", pad)
+                fh.write(("[" if first else "," if indent else ", ") + text)
+                first = False
+        if first:
+            fh.write("[]")
+        elif indent is None:
+            fh.write("]")
+        else:
+            fh.write("\n" + " " * indent * depth + "]")
+        fh.write(suffix)
+        return count
+
+    def _format_plan(
+        self, format_style: str, path_selection: str, include_metadata: bool
+    ) -> Tuple[
+        Optional[Dict[str, Any]], Callable[[ConversationTree], List[Dict[str, Any]]]
+    ]:
+        """Return the envelope (None for a bare array) and per-tree converter"""
+        if format_style == "ctk":
+            envelope: Optional[Dict[str, Any]] = {
+                "format": "ctk",
+                "version": "2.0.0",
+                "exported_at": datetime.now().isoformat(),
             }
+            return envelope, lambda conv: [
+                self._ctk_conversation(conv, include_metadata)
+            ]
+        if format_style == "openai":
+            return None, lambda conv: self._openai_conversations(conv, path_selection)
+        if format_style == "anthropic":
+            return {}, lambda conv: self._anthropic_conversations(conv, path_selection)
+        # generic
+        return None, lambda conv: [
+            self._generic_conversation(conv, path_selection, include_metadata)
+        ]
+
+    def _dumps(self, data: Any, indent: Optional[int]) -> str:
+        return json.dumps(
+            data, indent=indent, ensure_ascii=False, default=self._json_serial
+        )
+
+    def _ctk_conversation(
+        self, conv: ConversationTree, include_metadata: bool
+    ) -> Dict[str, Any]:
+        """Native CTK format for one conversation (preserves full tree)"""
+        conv_data: Dict[str, Any] = {
+            "id": conv.id,
+            "title": conv.title,
+            "messages": {},
+            "root_message_ids": conv.root_message_ids,
+        }
 
-            if include_metadata:
-                conv_data["metadata"] = conv.metadata.to_dict()
-
-            # Export all messages with full tree structure
-            messages_map: Dict[str, Any] = conv_data["messages"]
-            for msg_id, msg in conv.message_map.items():
-                messages_map[msg_id] = {
-                    "id": msg.id,
-                    "role": msg.role.value,
-                    "content": msg.content.to_dict() if msg.content else {},
-                    "parent_id": msg.parent_id,
-                    "timestamp": msg.timestamp.isoformat() if msg.timestamp else None,
-                    "metadata": msg.metadata,
-                }
+        if include_metadata:
+            conv_data["metadata"] = conv.metadata.to_dict()
 
-            conversations_list: List[Any] = data["conversations"]
-            conversations_list.append(conv_data)
+        # Export all messages with full tree structure
+        messages_map: Dict[str, Any] = conv_data["messages"]
+        for msg_id, msg in conv.message_map.items():
+            messages_map[msg_id] = {
+                "id": msg.id,
+                "role": msg.role.value,
+                "content": msg.content.to_dict() if msg.content else {},
+                "parent_id": msg.parent_id,
+                "timestamp": msg.timestamp.isoformat() if msg.timestamp else None,
+                "metadata": msg.metadata,
+            }
 
-        return data
+        return conv_data
 
-    def _export_openai_format(
-        self, conversations: List[ConversationTree], path_selection: str
+    def _openai_conversations(
+        self, conv: ConversationTree, path_selection: str
     ) -> List[Dict[str, Any]]:
-        """Export in OpenAI format"""
-        exported_conversations = []
-
-        for conv in conversations:
-            if path_selection == "all":
-                # Export each path as a separate conversation
-                paths = conv.get_all_paths()
-                for i, path in enumerate(paths):
-                    conv_data = {
-                        "title": (
-                            f"{conv.title or 'Conversation'} - Path {i + 1}"
-                            if len(paths) > 1
-                            else conv.title
-                        ),
-                        "messages": self._messages_to_openai_format(path),
-                    }
-                    exported_conversations.append(conv_data)
-            else:
-                # Export selected path
-                path = self.select_path(conv, path_selection)
-                conv_data = {
-                    "title": conv.title,
+        """OpenAI format entries for one conversation (one per exported path)"""
+        if path_selection == "all":
+            # Export each path as a separate conversation
+            paths = conv.get_all_paths()
+            return [
+                {
+                    "title": (
+                        f"{conv.title or 'Conversation'} - Path {i + 1}"
+                        if len(paths) > 1
+                        else conv.title
+                    ),
                     "messages": self._messages_to_openai_format(path),
                 }
-                exported_conversations.append(conv_data)
-
-        return exported_conversations
-
-    def _export_anthropic_format(
-        self, conversations: List[ConversationTree], path_selection: str
-    ) -> Dict[str, Any]:
-        """Export in Anthropic format"""
-        data: Dict[str, Any] = {"conversations": []}
+                for i, path in enumerate(paths)
+            ]
 
-        for conv in conversations:
-            if path_selection == "all":
-                paths = conv.get_all_paths()
-                for i, path in enumerate(paths):
-                    conv_data = {
-                        "uuid": f"{conv.id}-{i}" if len(paths) > 1 else conv.id,
-                        "name": (
-                            f"{conv.title or 'Conversation'} - Path {i + 1}"
-                            if len(paths) > 1
-                            else conv.title
-                        ),
-                        "messages": self._messages_to_anthropic_format(path),
-                    }
-                    data["conversations"].append(conv_data)
-            else:
-                path = self.select_path(conv, path_selection)
-                conv_data = {
-                    "uuid": conv.id,
-                    "name": conv.title,
-                    "messages": self._messages_to_anthropic_format(path),
-                }
-                data["conversations"].append(conv_data)
-
-        return data
+        # Export selected path
+        path = self.select_path(conv, path_selection)
+        return [
+            {
+                "title": conv.title,
+                "messages": self._messages_to_openai_format(path),
+            }
+        ]
 
-    def _export_generic_format(
-        self,
-        conversations: List[ConversationTree],
-        path_selection: str,
-        include_metadata: bool,
+    def _anthropic_conversations(
+        self, conv: ConversationTree, path_selection: str
     ) -> List[Dict[str, Any]]:
-        """Export in generic format"""
-        exported_conversations = []
-
-        for conv in conversations:
-            base_data: Dict[str, Any] = {"id": conv.id, "title": conv.title}
-
-            if include_metadata:
-                base_data["metadata"] = {
-                    "source": conv.metadata.source,
-                    "model": conv.metadata.model,
-                    "created_at": (
-                        conv.metadata.created_at.isoformat()
-                        if conv.metadata.created_at
-                        else None
-                    ),
-                    "updated_at": (
-                        conv.metadata.updated_at.isoformat()
-                        if conv.metadata.updated_at
-                        else None
+        """Anthropic format entries for one conversation (one per exported path)"""
+        if path_selection == "all":
+            paths = conv.get_all_paths()
+            return [
+                {
+                    "uuid": f"{conv.id}-{i}" if len(paths) > 1 else conv.id,
+                    "name": (
+                        f"{conv.title or 'Conversation'} - Path {i + 1}"
+                        if len(paths) > 1
+                        else conv.title
                     ),
-                    "tags": conv.metadata.tags,
-                    "project": conv.metadata.project,
+                    "messages": self._messages_to_anthropic_format(path),
                 }
+                for i, path in enumerate(paths)
+            ]
+
+        path = self.select_path(conv, path_selection)
+        return [
+            {
+                "uuid": conv.id,
+                "name": conv.title,
+                "messages": self._messages_to_anthropic_format(path),
+            }
+        ]
 
-            if path_selection == "all":
-                # Include all paths
-                base_data["paths"] = []
-                paths = conv.get_all_paths()
-                path_list: List[Any] = base_data["paths"]
-                for i, path in enumerate(paths):
-                    path_data: Dict[str, Any] = {
-                        "path_id": f"path_{i}",
-                        "messages": self._messages_to_generic_format(path),
-                    }
-                    path_list.append(path_data)
-            else:
-                # Single path
-                path = self.select_path(conv, path_selection)
-                base_data["messages"] = self._messages_to_generic_format(path)
+    def _generic_conversation(
+        self, conv: ConversationTree, path_selection: str, include_metadata: bool
+    ) -> Dict[str, Any]:
+        """Generic format for one conversation"""
+        base_data: Dict[str, Any] = {"id": conv.id, "title": conv.title}
+
+        if include_metadata:
+            base_data["metadata"] = {
+                "source": conv.metadata.source,
+                "model": conv.metadata.model,
+                "created_at": (
+                    conv.metadata.created_at.isoformat()
+                    if conv.metadata.created_at
+                    else None
+                ),
+                "updated_at": (
+                    conv.metadata.updated_at.isoformat()
+                    if conv.metadata.updated_at
+                    else None
+                ),
+                "tags": conv.metadata.tags,
+                "project": conv.metadata.project,
+            }
 
-            exported_conversations.append(base_data)
+        if path_selection == "all":
+            # Include all paths
+            base_data["paths"] = [
+                {
+                    "path_id": f"path_{i}",
+                    "messages": self._messages_to_generic_format(path),
+                }
+                for i, path in enumerate(conv.get_all_paths())
+            ]
+        else:
+            # Single path
+            path = self.select_path(conv, path_selection)
+            base_data["messages"] = self._messages_to_generic_format(path)
 
-        return exported_conversations
+        return base_data
 
     def _messages_to_openai_format(
         self, messages: List[Message]
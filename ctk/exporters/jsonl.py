@@ -2,9 +2,12 @@
 JSONL format exporter (for local LLMs and fine-tuning)
 """
 
+import functools
+import io
 import json
-from typing import Any, Dict, List, Optional
+from typing import IO, Any, Dict, Iterable, List, Optional
 
+from ctk.core.export_pool import ordered_map
 from ctk.core.models import ConversationTree, Message
 from ctk.core.plugin import ExporterPlugin
 from ctk.core.sanitizer import Sanitizer
@@ -17,6 +20,7 @@ class JSONLExporter(ExporterPlugin):
     description = "Export to JSONL format for local LLMs and fine-tuning"
     version = "1.0.0"
     supported_formats = ["jsonl", "local", "training"]
+    streaming = True
 
     def validate(self, data: Any) -> bool:
         """Validate data can be exported"""
@@ -24,8 +28,14 @@ class JSONLExporter(ExporterPlugin):
 
     def export_data(self, conversations: List[ConversationTree], **kwargs) -> str:
         """Export conversations to JSONL format"""
-        output_lines = []
-
+        output = io.StringIO()
+        self.export_stream(conversations, output, **kwargs)
+        return output.getvalue()
+
+    def export_stream(
+        self, conversations: Iterable[ConversationTree], fh: IO[str], **kwargs
+    ) -> int:
+        """Write conversations to fh as JSONL, one tree at a time"""
         # Get options
         format_type = kwargs.get("format", "messages")  # messages, chat, instruction
         include_system = kwargs.get("include_system", True)
@@ -37,70 +47,102 @@ class JSONLExporter(ExporterPlugin):
         if kwargs.get("sanitize", True):
             sanitizer = Sanitizer(enabled=True)
 
-        for conv in conversations:
-            # Get the linear path based on selection
-            messages = self.select_path(conv, path_selection)
+        # Conversations are rendered on ``jobs`` worker processes (the
+        # sanitizer regexes dominate) and written here, in input order
+        render = functools.partial(
+            self._conversation_lines,
+            format_type=format_type,
+            include_system=include_system,
+            path_selection=path_selection,
+            include_metadata=include_metadata,
+            sanitizer=sanitizer,
+        )
+        count = 0
+        first = True
+        for lines in ordered_map(render, conversations, kwargs.get("jobs", 1)):
+            for line in lines:
+                # Newline-separated with no trailing newline, as export_data
+                # has always produced
+                if not first:
+                    fh.write("\n")
+                fh.write(line)
+                first = False
+            count += 1
+        return count
+
+    def _conversation_lines(
+        self,
+        conv: ConversationTree,
+        format_type: str,
+        include_system: bool,
+        path_selection: str,
+        include_metadata: bool,
+        sanitizer: Optional[Sanitizer],
+    ) -> List[str]:
+        """Build the JSONL lines for a single conversation"""
+        output_lines = []
 
-            if format_type == "messages":
-                # Standard messages format
-                conv_data: Dict[str, Any] = {
-                    "messages": self._format_messages(
-                        messages, include_system, sanitizer
-                    )
+        # Get the linear path based on selection
+        messages = self.select_path(conv, path_selection)
+
+        if format_type == "messages":
+            # Standard messages format
+            conv_data: Dict[str, Any] = {
+                "messages": self._format_messages(messages, include_system, sanitizer)
+            }
+
+            if include_metadata:
+                conv_data["metadata"] = {
+                    "id": conv.id,
+                    "title": conv.title,
+                    "model": conv.metadata.model,
+                    "source": conv.metadata.source,
                 }
 
-                if include_metadata:
-                    conv_data["metadata"] = {
-                        "id": conv.id,
-                        "title": conv.title,
-                        "model": conv.metadata.model,
-                        "source": conv.metadata.source,
-                    }
-
-                output_lines.append(json.dumps(conv_data, ensure_ascii=False))
-
-            elif format_type == "chat":
-                # Chat completion format (each turn is a separate line)
-                formatted_messages = self._format_messages(
-                    messages, include_system, sanitizer
-                )
-                for i in range(0, len(formatted_messages) - 1, 2):
-                    if i + 1 < len(formatted_messages):
-                        chat_pair = {
-                            "messages": (
-                                formatted_messages[max(0, i - 1) : i + 2]
-                                if include_system and i > 0
-                                else formatted_messages[i : i + 2]
-                            )
-                        }
-                        output_lines.append(json.dumps(chat_pair, ensure_ascii=False))
-
-            elif format_type == "instruction":
-                # Instruction-following format
-                system_msg = None
-                user_msgs = []
-                assistant_msgs = []
-
-                for msg in messages:
-                    if msg.role.value == "system":
-                        system_msg = msg.content.get_text()
-                    elif msg.role.value == "user":
-                        user_msgs.append(msg.content.get_text())
-                    elif msg.role.value == "assistant":
-                        assistant_msgs.append(msg.content.get_text())
-
-                # Create instruction-response pairs
-                for user_msg, assistant_msg in zip(user_msgs, assistant_msgs):
-                    inst_data = {
-                        "instruction": self._sanitize_text(user_msg, sanitizer),
-                        "response": self._sanitize_text(assistant_msg, sanitizer),
+            output_lines.append(json.dumps(conv_data, ensure_ascii=False))
+
+        elif format_type == "chat":
+            # Chat completion format (each turn is a separate line)
+            formatted_messages = self._format_messages(
+                messages, include_system, sanitizer
+            )
+            for i in range(0, len(formatted_messages) - 1, 2):
+                if i + 1 < len(formatted_messages):
+                    chat_pair = {
+                        "messages": (
+                            formatted_messages[max(0, i - 1) : i + 2]
+                            if include_system and i > 0
+                            else formatted_messages[i : i + 2]
+                        )
                     }
-                    if system_msg and include_system:
-                        inst_data["system"] = self._sanitize_text(system_msg, sanitizer)
+                    output_lines.append(json.dumps(chat_pair, ensure_ascii=False))
+
+        elif format_type == "instruction":
+            # Instruction-following format
+            system_msg = None
+            user_msgs = []
+            assistant_msgs = []
+
+            for msg in messages:
+                if msg.role.value == "system":
+                    system_msg = msg.content.get_text()
+                elif msg.role.value == "user":
+                    user_msgs.append(msg.content.get_text())
+                elif msg.role.value == "assistant":
+                    assistant_msgs.append(msg.content.get_text())
+
+            # Create instruction-response pairs
+            for user_msg, assistant_msg in zip(user_msgs, assistant_msgs):
+                inst_data = {
+                    "instruction": self._sanitize_text(user_msg, sanitizer),
+                    "response": self._sanitize_text(assistant_msg, sanitizer),
+                }
+                if system_msg and include_system:
+                    inst_data["system"] = self._sanitize_text(system_msg, sanitizer)
 
-                    output_lines.append(json.dumps(inst_data, ensure_ascii=False))
+                output_lines.append(json.dumps(inst_data, ensure_ascii=False))
 
-        return "\n".join(output_lines)
+        return output_lines
 
     def _format_messages(
         self,
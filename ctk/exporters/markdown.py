@@ -5,14 +5,17 @@ Security note: This exporter includes path traversal protection to ensure
 exported files stay within the specified output directory.
 """
 
+import functools
 import io
 import logging
 import os
 import re
 from datetime import datetime
 from pathlib import Path
-from typing import Any, Dict, List, Optional, TextIO
+from typing import IO, Any, Dict, Iterable, List, Optional, TextIO, Tuple
 
+from ctk.core.export_manifest import ExportManifest, ManifestStats
+from ctk.core.export_pool import ordered_map
 from ctk.core.models import ConversationTree, Message, MessageRole
 from ctk.core.plugin import ExporterPlugin
 
@@ -31,6 +34,7 @@ class MarkdownExporter(ExporterPlugin):
     name = "markdown"
     description = "Export conversations to Markdown format"
     version = "1.0.0"
+    streaming = True
 
     def validate(self, data: Any) -> bool:
         """Validate if this exporter can handle the data"""
@@ -42,12 +46,13 @@ class MarkdownExporter(ExporterPlugin):
         return self.export_conversations(conversations, **kwargs)
 
     def export_to_file(
-        self, conversations: List[ConversationTree], file_path: str, **kwargs
-    ) -> None:
+        self, conversations: Iterable[ConversationTree], file_path: str, **kwargs
+    ) -> Optional[ManifestStats]:
         """
         Export conversations to markdown file(s).
 
-        If file_path is a directory (or has no extension), exports one file per conversation.
+        If file_path is a directory (or has no extension), exports one file per conversation
+        and returns the incremental export counts.
         Otherwise exports all conversations to a single file.
         """
         path = Path(file_path)
@@ -62,44 +67,71 @@ class MarkdownExporter(ExporterPlugin):
         )
 
         if is_directory_mode:
-            self._export_to_directory(conversations, path, **kwargs)
-        else:
-            # Single file mode
-            content = self.export_conversations(conversations, **kwargs)
-            path.parent.mkdir(parents=True, exist_ok=True)
-            path.write_text(content, encoding="utf-8")
+            return self._export_to_directory(conversations, path, **kwargs)
+
+        # Single file mode
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with open(path, "w", encoding="utf-8") as fh:
+            self.export_stream(conversations, fh, **kwargs)
+        return None
 
     def _export_to_directory(
-        self, conversations: List[ConversationTree], output_dir: Path, **kwargs
-    ) -> None:
+        self, conversations: Iterable[ConversationTree], output_dir: Path, **kwargs
+    ) -> ManifestStats:
         """
         Export each conversation to its own markdown file.
 
         Includes path traversal protection to ensure files stay within output_dir.
+        Rendering runs on ``jobs`` worker processes; files are written here,
+        in input order. Unless ``incremental=False``, conversations unchanged
+        since the last export into output_dir are skipped (see ExportManifest).
         """
         output_dir.mkdir(parents=True, exist_ok=True)
         # Resolve to absolute path for security checks
         output_dir_resolved = output_dir.resolve()
 
-        for conv in conversations:
-            # Generate filename: YYYY-MM-DD-title-id.md
-            filename = self._generate_filename(conv)
+        jobs = kwargs.pop("jobs", 1)
+        manifest = ExportManifest(
+            output_dir,
+            self.name,
+            self.version,
+            {
+                "path_selection": kwargs.get("path_selection", "longest"),
+                "include_metadata": kwargs.get("include_metadata", True),
+                "include_timestamps": kwargs.get("include_timestamps", True),
+                "include_tree_structure": kwargs.get("include_tree_structure", False),
+            },
+            incremental=kwargs.pop("incremental", True),
+        )
+
+        render = functools.partial(self._render_file, **kwargs)
+        changed = manifest.changed(conversations)
+        for conv_id, filename, content in ordered_map(render, changed, jobs):
             file_path = output_dir / filename
 
             # Security: Validate that the resolved path stays within output directory
             file_path_resolved = file_path.resolve()
             if not self._is_safe_path(file_path_resolved, output_dir_resolved):
                 logger.error(
-                    f"Path traversal attempt detected for conversation {conv.id}: "
+                    f"Path traversal attempt detected for conversation {conv_id}: "
                     f"'{filename}' resolves outside output directory"
                 )
                 raise PathTraversalError(
                     f"Generated filename '{filename}' would escape output directory"
                 )
 
-            # Export single conversation
-            content = self.export_conversations([conv], **kwargs)
             file_path.write_text(content, encoding="utf-8")
+            manifest.record(conv_id, [file_path])
+
+        stats = manifest.finish()
+        logger.info(f"Incremental export: {stats}")
+        return stats
+
+    def _render_file(self, conv: ConversationTree, **kwargs) -> Tuple[str, str, str]:
+        """Render one conversation as (id, filename, markdown) for a worker"""
+        # Generate filename: YYYY-MM-DD-title-id.md
+        filename = self._generate_filename(conv)
+        return conv.id, filename, self.export_conversations([conv], **kwargs)
 
     def _is_safe_path(self, file_path: Path, base_dir: Path) -> bool:
         """
@@ -198,29 +230,14 @@ class MarkdownExporter(ExporterPlugin):
             include_tree_structure: Show tree structure for branching conversations
         """
         output = io.StringIO()
-
-        for i, conv in enumerate(conversations):
-            if i > 0:
-                output.write("\n---\n\n")
-
-            # Write conversation header
-            self._write_conversation_header(output, conv, include_metadata)
-
-            if include_tree_structure and self._has_branches(conv):
-                # Show tree structure
-                self._write_tree_structure(output, conv, include_timestamps)
-            else:
-                # Show linear conversation(s)
-                if path_selection == "all":
-                    paths = conv.get_all_paths()
-                    for j, path in enumerate(paths):
-                        if j > 0:
-                            output.write("\n#### Alternative Path\n\n")
-                        self._write_conversation_path(output, path, include_timestamps)
-                else:
-                    path = self.select_path(conv, path_selection)
-                    self._write_conversation_path(output, path, include_timestamps)
-
+        self.export_stream(
+            conversations,
+            output,
+            path_selection=path_selection,
+            include_metadata=include_metadata,
+            include_timestamps=include_timestamps,
+            include_tree_structure=include_tree_structure,
+        )
         content = output.getvalue()
 
         # Write to file if specified
@@ -230,6 +247,73 @@ class MarkdownExporter(ExporterPlugin):
 
         return content
 
+    def export_stream(
+        self,
+        conversations: Iterable[ConversationTree],
+        fh: IO[str],
+        path_selection: str = "longest",
+        include_metadata: bool = True,
+        include_timestamps: bool = True,
+        include_tree_structure: bool = False,
+        jobs: Optional[int] = 1,
+        **kwargs,
+    ) -> int:
+        """
+        Write conversations to fh as Markdown, one conversation at a time.
+
+        Takes the same options as export_conversations, plus ``jobs``:
+        worker processes used to render conversations (0 = one per CPU).
+
+        Returns:
+            Number of conversations written
+        """
+        render = functools.partial(
+            self._render_conversation,
+            path_selection=path_selection,
+            include_metadata=include_metadata,
+            include_timestamps=include_timestamps,
+            include_tree_structure=include_tree_structure,
+        )
+        count = 0
+        for text in ordered_map(render, conversations, jobs):
+            if count > 0:
+                fh.write("\n---\n\n")
+            fh.write(text)
+            count += 1
+
+        return count
+
+    def _render_conversation(
+        self,
+        conv: ConversationTree,
+        path_selection: str,
+        include_metadata: bool,
+        include_timestamps: bool,
+        include_tree_structure: bool,
+    ) -> str:
+        """Render a single conversation to Markdown"""
+        output = io.StringIO()
+
+        # Write conversation header
+        self._write_conversation_header(output, conv, include_metadata)
+
+        if include_tree_structure and self._has_branches(conv):
+            # Show tree structure
+            self._write_tree_structure(output, conv, include_timestamps)
+        else:
+            # Show linear conversation(s)
+            if path_selection == "all":
+                paths = conv.get_all_paths()
+                for j, path in enumerate(paths):
+                    if j > 0:
+                        output.write("\n#### Alternative Path\n\n")
+                    self._write_conversation_path(output, path, include_timestamps)
+            else:
+                path = self.select_path(conv, path_selection)
+                self._write_conversation_path(output, path, include_timestamps)
+
+        return output.getvalue()
+
     def _write_conversation_header(
         self, output: TextIO, conv: ConversationTree, include_metadata: bool
     ):
@@ -5,7 +5,7 @@ Anthropic/Claude conversation importer
 import json
 import uuid
 from datetime import datetime
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, Iterator, List, Optional
 
 from ctk.core.models import (
     ContentType,
@@ -33,6 +33,7 @@ class AnthropicImporter(ImporterPlugin):
     description = "Import Claude conversation exports"
     version = "1.0.0"
     supported_formats = ["claude", "anthropic"]
+    streaming = True
 
     def validate(self, data: Any) -> bool:
         """Check if data is Anthropic format"""
@@ -176,171 +177,164 @@ class AnthropicImporter(ImporterPlugin):
 
     def import_data(self, data: Any, **kwargs) -> List[ConversationTree]:
         """Import Anthropic conversation data"""
+        return list(self.iter_import(data, **kwargs))
+
+    def iter_import(self, data: Any, **kwargs) -> Iterator[ConversationTree]:
+        """Yield one ConversationTree per conversation in ``data``.
+
+        Accepts the same inputs as import_data plus any iterator of
+        conversation dicts, so large exports can be streamed.
+        """
         if isinstance(data, str):
             data = json.loads(data)
 
-        if not isinstance(data, list):
+        if isinstance(data, dict) or not hasattr(data, "__iter__"):
             data = [data]
 
-        conversations = []
-
         for conv_data in data:
-            # Extract basic info
-            conv_id = conv_data.get("uuid") or conv_data.get("id", str(uuid.uuid4()))
-            title = conv_data.get("name") or conv_data.get(
-                "title", "Untitled Conversation"
-            )
-
-            # Detect model
-            model = self._detect_model(conv_data)
-
-            # Create metadata
-            metadata = ConversationMetadata(
-                version="2.0.0",
-                format="anthropic",
-                source="Claude",
-                model=model,
-                created_at=parse_timestamp(conv_data.get("created_at"))
-                or datetime.now(),
-                updated_at=parse_timestamp(conv_data.get("updated_at"))
-                or datetime.now(),
-                tags=["anthropic", "claude"]
-                + (
-                    [model.lower().replace(" ", "-")]
-                    if model.lower() != "claude"
-                    else []
+            yield self._import_conversation(conv_data)
+
+    def _import_conversation(self, conv_data: Dict[str, Any]) -> ConversationTree:
+        """Build a ConversationTree from one exported conversation dict."""
+        # Extract basic info
+        conv_id = conv_data.get("uuid") or conv_data.get("id", str(uuid.uuid4()))
+        title = conv_data.get("name") or conv_data.get("title", "Untitled Conversation")
+
+        # Detect model
+        model = self._detect_model(conv_data)
+
+        # Create metadata
+        metadata = ConversationMetadata(
+            version="2.0.0",
+            format="anthropic",
+            source="Claude",
+            model=model,
+            created_at=parse_timestamp(conv_data.get("created_at")) or datetime.now(),
+            updated_at=parse_timestamp(conv_data.get("updated_at")) or datetime.now(),
+            tags=["anthropic", "claude"]
+            + ([model.lower().replace(" ", "-")] if model.lower() != "claude" else []),
+            custom_data={
+                "project_uuid": conv_data.get("project_uuid"),
+                "account_uuid": (
+                    conv_data.get("account", {}).get("uuid")
+                    if isinstance(conv_data.get("account"), dict)
+                    else conv_data.get("account_uuid")
                 ),
-                custom_data={
-                    "project_uuid": conv_data.get("project_uuid"),
-                    "account_uuid": (
-                        conv_data.get("account", {}).get("uuid")
-                        if isinstance(conv_data.get("account"), dict)
-                        else conv_data.get("account_uuid")
-                    ),
-                    "summary": conv_data.get("summary"),
-                },
-            )
-
-            # Create conversation tree
-            tree = ConversationTree(id=conv_id, title=title, metadata=metadata)
-
-            # Process messages - handle both 'messages' and 'chat_messages' fields
-            messages = conv_data.get("messages", conv_data.get("chat_messages", []))
-
-            # Tree reconstruction from parent_message_uuid (F1): the 2026+
-            # export carries it on every message; honor it. Older exports
-            # lack it; fall back to linear chaining by iteration order.
-            # Pre-derive ids and parents so cycle-breaking sees the whole
-            # list before any message is inserted.
-            msg_ids = [
-                (m.get("uuid") or m.get("id", f"msg_{i}"))
-                for i, m in enumerate(messages)
-            ]
-            known_ids = set(msg_ids)
-            proposed_parent: Dict[str, Optional[str]] = {}
-            linear_parent: Optional[str] = None
-            for mid, m in zip(msg_ids, messages):
-                if "parent_message_uuid" in m:
-                    p = m.get("parent_message_uuid")
-                    if (
-                        not p
-                        or p == ROOT_PARENT_SENTINEL
-                        or p not in known_ids
-                        or p == mid
-                    ):
-                        proposed_parent[mid] = None
-                    else:
-                        proposed_parent[mid] = p
+                "summary": conv_data.get("summary"),
+            },
+        )
+
+        # Create conversation tree
+        tree = ConversationTree(id=conv_id, title=title, metadata=metadata)
+
+        # Process messages - handle both 'messages' and 'chat_messages' fields
+        messages = conv_data.get("messages", conv_data.get("chat_messages", []))
+
+        # Tree reconstruction from parent_message_uuid (F1): the 2026+
+        # export carries it on every message; honor it. Older exports
+        # lack it; fall back to linear chaining by iteration order.
+        # Pre-derive ids and parents so cycle-breaking sees the whole
+        # list before any message is inserted.
+        msg_ids = [
+            (m.get("uuid") or m.get("id", f"msg_{i}")) for i, m in enumerate(messages)
+        ]
+        known_ids = set(msg_ids)
+        proposed_parent: Dict[str, Optional[str]] = {}
+        linear_parent: Optional[str] = None
+        for mid, m in zip(msg_ids, messages):
+            if "parent_message_uuid" in m:
+                p = m.get("parent_message_uuid")
+                if not p or p == ROOT_PARENT_SENTINEL or p not in known_ids or p == mid:
+                    proposed_parent[mid] = None
                 else:
-                    proposed_parent[mid] = linear_parent
-                linear_parent = mid
-
-            # Break any remaining cycles (malformed exports): walk each
-            # ancestor chain; null the edge that would close a loop. Nodes
-            # already proven acyclic are skipped via the safe set.
-            safe: set = set()
-            for mid in msg_ids:
-                seen = {mid}
-                cur = proposed_parent.get(mid)
-                while cur is not None and cur not in safe:
-                    if cur in seen:
-                        proposed_parent[mid] = None
-                        break
-                    seen.add(cur)
-                    cur = proposed_parent.get(cur)
-                safe.update(seen)
-
-            for idx, msg_data in enumerate(messages):
-                # Generate message ID
-                msg_id = msg_data.get("uuid") or msg_data.get("id", f"msg_{idx}")
-
-                parent_id = proposed_parent.get(msg_id)
-
-                # Extract role
-                sender = msg_data.get("sender", msg_data.get("role", "user"))
-                role = MessageRole.from_string(sender)
-
-                # Extract content
-                content = MessageContent()
-
-                # Structured pass over content blocks first (never skipped: F2).
-                block_text_parts: List[str] = []
-                raw_blocks = msg_data.get("content")
-                if isinstance(raw_blocks, list):
-                    block_text_parts = self._process_content_blocks(raw_blocks, content)
-                    content.parts = raw_blocks
-                elif isinstance(raw_blocks, str):
-                    block_text_parts = [raw_blocks]
-
-                # Top-level text is the export's own rendering and wins when present.
-                top_text = msg_data.get("text")
-                if top_text:
-                    content.text = top_text
-                elif block_text_parts:
-                    content.text = "\n".join(block_text_parts)
-
-                # Attachments (independent of which text source won).
-                if "attachments" in msg_data:
-                    for attachment in msg_data["attachments"]:
-                        if isinstance(attachment, dict):
-                            file_name = attachment.get("file_name", "")
-                            file_type = attachment.get("file_type", "")
-                            if any(
-                                ext in file_name.lower()
-                                for ext in [".png", ".jpg", ".jpeg", ".gif", ".webp"]
-                            ):
-                                content.add_image(path=file_name, mime_type=file_type)
-                            elif file_name:
-                                content.documents.append(
-                                    MediaContent(
-                                        type=ContentType.DOCUMENT,
-                                        path=file_name,
-                                        mime_type=file_type,
-                                    )
+                    proposed_parent[mid] = p
+            else:
+                proposed_parent[mid] = linear_parent
+            linear_parent = mid
+
+        # Break any remaining cycles (malformed exports): walk each
+        # ancestor chain; null the edge that would close a loop. Nodes
+        # already proven acyclic are skipped via the safe set.
+        safe: set = set()
+        for mid in msg_ids:
+            seen = {mid}
+            cur = proposed_parent.get(mid)
+            while cur is not None and cur not in safe:
+                if cur in seen:
+                    proposed_parent[mid] = None
+                    break
+                seen.add(cur)
+                cur = proposed_parent.get(cur)
+            safe.update(seen)
+
+        for idx, msg_data in enumerate(messages):
+            # Generate message ID
+            msg_id = msg_data.get("uuid") or msg_data.get("id", f"msg_{idx}")
+
+            parent_id = proposed_parent.get(msg_id)
+
+            # Extract role
+            sender = msg_data.get("sender", msg_data.get("role", "user"))
+            role = MessageRole.from_string(sender)
+
+            # Extract content
+            content = MessageContent()
+
+            # Structured pass over content blocks first (never skipped: F2).
+            block_text_parts: List[str] = []
+            raw_blocks = msg_data.get("content")
+            if isinstance(raw_blocks, list):
+                block_text_parts = self._process_content_blocks(raw_blocks, content)
+                content.parts = raw_blocks
+            elif isinstance(raw_blocks, str):
+                block_text_parts = [raw_blocks]
+
+            # Top-level text is the export's own rendering and wins when present.
+            top_text = msg_data.get("text")
+            if top_text:
+                content.text = top_text
+            elif block_text_parts:
+                content.text = "\n".join(block_text_parts)
+
+            # Attachments (independent of which text source won).
+            if "attachments" in msg_data:
+                for attachment in msg_data["attachments"]:
+                    if isinstance(attachment, dict):
+                        file_name = attachment.get("file_name", "")
+                        file_type = attachment.get("file_type", "")
+                        if any(
+                            ext in file_name.lower()
+                            for ext in [".png", ".jpg", ".jpeg", ".gif", ".webp"]
+                        ):
+                            content.add_image(path=file_name, mime_type=file_type)
+                        elif file_name:
+                            content.documents.append(
+                                MediaContent(
+                                    type=ContentType.DOCUMENT,
+                                    path=file_name,
+                                    mime_type=file_type,
                                 )
-                    if msg_data["attachments"]:
-                        attachment_text = "\n\nAttachments: " + ", ".join(
-                            a.get("file_name", "Unknown")
-                            for a in msg_data["attachments"]
-                        )
-                        content.text = (content.text or "") + attachment_text
-
-                # Create message
-                message = Message(
-                    id=msg_id,
-                    role=role,
-                    content=content,
-                    timestamp=parse_timestamp(msg_data.get("created_at")),
-                    parent_id=parent_id,
-                    metadata={
-                        "files": msg_data.get("files", []),
-                        "feedback": msg_data.get("feedback"),
-                    },
-                )
-
-                # Add to tree
-                tree.add_message(message)
+                            )
+                if msg_data["attachments"]:
+                    attachment_text = "\n\nAttachments: " + ", ".join(
+                        a.get("file_name", "Unknown") for a in msg_data["attachments"]
+                    )
+                    content.text = (content.text or "") + attachment_text
+
+            # Create message
+            message = Message(
+                id=msg_id,
+                role=role,
+                content=content,
+                timestamp=parse_timestamp(msg_data.get("created_at")),
+                parent_id=parent_id,
+                metadata={
+                    "files": msg_data.get("files", []),
+                    "feedback": msg_data.get("feedback"),
+                },
+            )
 
-            conversations.append(tree)
+            # Add to tree
+            tree.add_message(message)
 
-        return conversations
+        return tree
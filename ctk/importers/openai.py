@@ -9,8 +9,9 @@ import logging
 import os
 import re
 from datetime import datetime
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, Iterator, List, Optional
 
+from ctk.core.media_store import MediaStore
 from ctk.core.plugin import ImporterPlugin
 from ctk.core.utils import parse_timestamp
 
@@ -35,6 +36,7 @@ class OpenAIImporter(ImporterPlugin):
     description = "Import ChatGPT conversation exports"
     version = "1.0.0"
     supported_formats = ["chatgpt", "openai", "gpt"]
+    streaming = True
 
     def validate(self, data: Any) -> bool:
         """Check if data is OpenAI format"""
@@ -206,7 +208,7 @@ class OpenAIImporter(ImporterPlugin):
             file_service_url: URL like "file-service://file-ABC123", "sediment://file_123", etc.
 
         Returns:
-            Relative path like "media/uuid.png" or None if not found
+            Relative path like "media/<sha256>.png" or None if not found
         """
         if not self.source_dir or not self.media_dir:
             logger.debug(
@@ -221,8 +223,6 @@ class OpenAIImporter(ImporterPlugin):
             )
             return None
 
-        import shutil
-        import uuid
         from pathlib import Path
 
         # Extract file ID from URL
@@ -256,17 +256,11 @@ class OpenAIImporter(ImporterPlugin):
             logger.warning(f"Could not find image file for {file_service_url}")
             return None
 
-        # Generate new UUID for media file
-        new_uuid = str(uuid.uuid4())
-        ext = source_path.suffix
-        dest_filename = f"{new_uuid}{ext}"
-        dest_path = Path(self.media_dir) / dest_filename
-
-        # Copy file
+        # Content-addressed: an image already in the store is not copied again
         try:
-            shutil.copy2(source_path, dest_path)
-            logger.debug(f"Copied {source_path.name} -> {dest_filename}")
-            return f"media/{dest_filename}"
+            media_path = MediaStore(Path(self.media_dir)).put(source_path)
+            logger.debug(f"Stored {source_path.name} -> {media_path}")
+            return media_path
         except Exception as e:
             logger.error(f"Failed to copy image {source_path}: {e}")
             return None
@@ -280,157 +274,162 @@ class OpenAIImporter(ImporterPlugin):
                 - source_dir: Directory containing the export (for resolving image paths)
                 - media_dir: Target directory for copying images (from ConversationDB)
         """
+        return list(self.iter_import(data, **kwargs))
+
+    def iter_import(self, data: Any, **kwargs) -> Iterator[ConversationTree]:
+        """Yield one ConversationTree per conversation in ``data``.
+
+        Accepts the same inputs as import_data plus any iterator of
+        conversation dicts (e.g. ``iter_json_array`` over an export file),
+        so a multi-GB export never has to be held in memory at once.
+        """
         if isinstance(data, str):
             data = json.loads(data)
 
-        if not isinstance(data, list):
+        if isinstance(data, dict) or not hasattr(data, "__iter__"):
             data = [data]
 
         # Get source directory for images
         self.source_dir = kwargs.get("source_dir")
         self.media_dir = kwargs.get("media_dir")
 
-        conversations = []
-
         for conv_data in data:
-            # Skip invalid entries
-            if not conv_data or not isinstance(conv_data, dict):
-                logger.warning(f"Skipping invalid conversation data: {type(conv_data)}")
+            tree = self._import_conversation(conv_data)
+            if tree is not None:
+                yield tree
+
+    def _import_conversation(self, conv_data: Any) -> Optional[ConversationTree]:
+        """Build a ConversationTree from one exported conversation dict."""
+        # Skip invalid entries
+        if not conv_data or not isinstance(conv_data, dict):
+            logger.warning(f"Skipping invalid conversation data: {type(conv_data)}")
+            return None
+
+        # Extract basic info
+        conv_id = conv_data.get("conversation_id") or conv_data.get("id", "")
+        title = conv_data.get("title", "Untitled Conversation")
+
+        # Detect model
+        model = self._detect_model(conv_data)
+
+        # Create metadata
+        metadata = ConversationMetadata(
+            version="2.0.0",
+            format="openai",
+            source="ChatGPT",
+            model=model,
+            created_at=parse_timestamp(conv_data.get("create_time")) or datetime.now(),
+            updated_at=parse_timestamp(conv_data.get("update_time")) or datetime.now(),
+            tags=(["openai", model.lower().replace(" ", "-")] if model else ["openai"]),
+            custom_data=self._extract_metadata(conv_data),
+        )
+
+        # Create conversation tree
+        tree = ConversationTree(id=conv_id, title=title, metadata=metadata)
+
+        # Process mapping
+        mapping = conv_data.get("mapping", {})
+
+        # First pass: identify structural nodes (no message content)
+        # These are conversation root placeholders like "client-created-root"
+        # They're part of OpenAI's tree structure but aren't actual messages
+        structural_nodes = set()
+        for node_id, node_data in mapping.items():
+            if not node_data or not node_data.get("message"):
+                structural_nodes.add(node_id)
+
+        # Second pass: process actual messages
+        for msg_id, msg_data in mapping.items():
+            if not msg_data or "message" not in msg_data:
                 continue
 
-            # Extract basic info
-            conv_id = conv_data.get("conversation_id") or conv_data.get("id", "")
-            title = conv_data.get("title", "Untitled Conversation")
-
-            # Detect model
-            model = self._detect_model(conv_data)
-
-            # Create metadata
-            metadata = ConversationMetadata(
-                version="2.0.0",
-                format="openai",
-                source="ChatGPT",
-                model=model,
-                created_at=parse_timestamp(conv_data.get("create_time"))
-                or datetime.now(),
-                updated_at=parse_timestamp(conv_data.get("update_time"))
-                or datetime.now(),
-                tags=(
-                    ["openai", model.lower().replace(" ", "-")] if model else ["openai"]
-                ),
-                custom_data=self._extract_metadata(conv_data),
-            )
+            msg_info = msg_data["message"]
+            if not msg_info:
+                continue
 
-            # Create conversation tree
-            tree = ConversationTree(id=conv_id, title=title, metadata=metadata)
-
-            # Process mapping
-            mapping = conv_data.get("mapping", {})
-
-            # First pass: identify structural nodes (no message content)
-            # These are conversation root placeholders like "client-created-root"
-            # They're part of OpenAI's tree structure but aren't actual messages
-            structural_nodes = set()
-            for node_id, node_data in mapping.items():
-                if not node_data or not node_data.get("message"):
-                    structural_nodes.add(node_id)
-
-            # Second pass: process actual messages
-            for msg_id, msg_data in mapping.items():
-                if not msg_data or "message" not in msg_data:
-                    continue
-
-                msg_info = msg_data["message"]
-                if not msg_info:
-                    continue
-
-                # Extract role
-                author = msg_info.get("author", {})
-                if isinstance(author, dict):
-                    role_str = author.get("role", "user")
-                else:
-                    role_str = str(author) if author else "user"
-
-                role = MessageRole.from_string(role_str)
-
-                # Extract content
-                content_data = msg_info.get("content", {})
-                content = MessageContent()
-
-                if isinstance(content_data, dict):
-                    content.type = content_data.get("content_type", "text")
-                    # Reasoning content has no 'parts'; capture it structurally (F4).
-                    if content_data.get("content_type") == "thoughts":
-                        for thought in content_data.get("thoughts", []):
-                            if isinstance(thought, dict):
-                                content.reasoning.append(
-                                    ReasoningBlock(
-                                        text=thought.get("content", ""),
-                                        summary=thought.get("summary"),
-                                    )
-                                )
-                    elif content_data.get("content_type") == "reasoning_recap":
-                        recap = content_data.get("content", "")
-                        if recap and isinstance(recap, str):
-                            content.reasoning.append(ReasoningBlock(text=recap))
-                    parts = content_data.get("parts", [])
-
-                    # Handle different part types
-                    text_parts = []
-                    for part in parts:
-                        text = self._process_part(part)
-                        if text is not None:
-                            text_parts.append(text)
-                        elif isinstance(part, dict):
-                            if "asset_pointer" in part:
-                                self._process_asset_pointer(part, content)
-                            elif "image_url" in part:
-                                self._process_image_url(part, content)
-
-                            # Store original part content type in metadata
-                            if "content_type" in part:
-                                content.metadata["part_types"] = content.metadata.get(
-                                    "part_types", []
-                                )
-                                content.metadata["part_types"].append(
-                                    part["content_type"]
+            # Extract role
+            author = msg_info.get("author", {})
+            if isinstance(author, dict):
+                role_str = author.get("role", "user")
+            else:
+                role_str = str(author) if author else "user"
+
+            role = MessageRole.from_string(role_str)
+
+            # Extract content
+            content_data = msg_info.get("content", {})
+            content = MessageContent()
+
+            if isinstance(content_data, dict):
+                content.type = content_data.get("content_type", "text")
+                # Reasoning content has no 'parts'; capture it structurally (F4).
+                if content_data.get("content_type") == "thoughts":
+                    for thought in content_data.get("thoughts", []):
+                        if isinstance(thought, dict):
+                            content.reasoning.append(
+                                ReasoningBlock(
+                                    text=thought.get("content", ""),
+                                    summary=thought.get("summary"),
                                 )
+                            )
+                elif content_data.get("content_type") == "reasoning_recap":
+                    recap = content_data.get("content", "")
+                    if recap and isinstance(recap, str):
+                        content.reasoning.append(ReasoningBlock(text=recap))
+                parts = content_data.get("parts", [])
+
+                # Handle different part types
+                text_parts = []
+                for part in parts:
+                    text = self._process_part(part)
+                    if text is not None:
+                        text_parts.append(text)
+                    elif isinstance(part, dict):
+                        if "asset_pointer" in part:
+                            self._process_asset_pointer(part, content)
+                        elif "image_url" in part:
+                            self._process_image_url(part, content)
+
+                        # Store original part content type in metadata
+                        if "content_type" in part:
+                            content.metadata["part_types"] = content.metadata.get(
+                                "part_types", []
+                            )
+                            content.metadata["part_types"].append(part["content_type"])
+
+                content.text = "\n".join(text_parts) if text_parts else ""
+                content.parts = parts
+
+                # Handle tool/function calls
+                self._process_tool_calls(content_data, content)
+
+            elif isinstance(content_data, str):
+                content.text = content_data
+
+            # Determine parent_id
+            # If parent is a structural node (conversation root), set parent_id to None
+            # This correctly translates OpenAI's tree structure to our unified model
+            parent = msg_data.get("parent")
+            parent_id = (
+                None if (parent is None or parent in structural_nodes) else parent
+            )
 
-                    content.text = "\n".join(text_parts) if text_parts else ""
-                    content.parts = parts
-
-                    # Handle tool/function calls
-                    self._process_tool_calls(content_data, content)
-
-                elif isinstance(content_data, str):
-                    content.text = content_data
-
-                # Determine parent_id
-                # If parent is a structural node (conversation root), set parent_id to None
-                # This correctly translates OpenAI's tree structure to our unified model
-                parent = msg_data.get("parent")
-                parent_id = (
-                    None if (parent is None or parent in structural_nodes) else parent
-                )
-
-                # Create message
-                message = Message(
-                    id=msg_id,
-                    role=role,
-                    content=content,
-                    timestamp=parse_timestamp(msg_info.get("create_time")),
-                    parent_id=parent_id,
-                    metadata={
-                        "status": msg_info.get("status"),
-                        "end_turn": msg_info.get("end_turn"),
-                        "weight": msg_info.get("weight"),
-                        "recipient": msg_info.get("recipient"),
-                    },
-                )
-
-                # Add to tree
-                tree.add_message(message)
+            # Create message
+            message = Message(
+                id=msg_id,
+                role=role,
+                content=content,
+                timestamp=parse_timestamp(msg_info.get("create_time")),
+                parent_id=parent_id,
+                metadata={
+                    "status": msg_info.get("status"),
+                    "end_turn": msg_info.get("end_turn"),
+                    "weight": msg_info.get("weight"),
+                    "recipient": msg_info.get("recipient"),
+                },
+            )
 
-            conversations.append(tree)
+            # Add to tree
+            tree.add_message(message)
 
-        return conversations
+        return tree
@@ -33,10 +33,12 @@ from textual.containers import Horizontal
 from textual.message import Message as TextualMessage
 from textual.widgets import DataTable, Footer, Header, Input, Static
 
+from ctk.core.constants import LAZY_LOAD_MIN_MESSAGES
 from ctk.core.database import ConversationDB
 from ctk.core.models import (
     ConversationMetadata,
     ConversationTree,
+    LazyConversationTree,
     Message,
     MessageContent,
     MessageRole,
@@ -330,11 +332,16 @@ class CTKApp(App):
         # branch, system prompt, etc.) bypass this path and always rebuild.
         if self._current_tree is not None and conv_id == self._current_tree.id:
             return
-        tree = self.db.load_conversation(conv_id)
+        # Open from the tree skeleton; long conversations keep fetching
+        # message bodies page by page as the message view needs them
+        tree = self.db.load_conversation(conv_id, lazy=True)
         if tree is None:
             self.main.messages.show_empty("(conversation not found)")
             self._current_tree = None
             return
+        if isinstance(tree, LazyConversationTree):
+            if len(tree.message_map) < LAZY_LOAD_MIN_MESSAGES:
+                tree.load_all()
         self._current_tree = tree
         self.main.messages.show_conversation(tree)
         self.main.set_header(self._header_for(tree))
@@ -509,7 +516,10 @@ class CTKApp(App):
             MessageRole.SYSTEM: LLMMessageRole.SYSTEM,
         }
         history: List[LLMMessage] = []
-        for msg in tree.get_longest_path():
+        path = tree.get_longest_path()
+        if isinstance(tree, LazyConversationTree):
+            tree.load_bodies(m.id for m in path)
+        for msg in path:
             llm_role = role_map.get(msg.role)
             if llm_role is None:
                 continue  # skip tool/function/tool_result roles in MVP
@@ -910,9 +920,9 @@ class CTKApp(App):
         self._streaming_bubble.update(Markdown(text))
         self.main.messages.scroll_end(animate=False)
 
-    def _safe_save(self, tree: ConversationTree) -> None:
+    def _safe_save(self, *trees: ConversationTree) -> None:
         try:
-            self.db.save_conversation(tree)
+            self.db.save_conversations(trees)
         except Exception as exc:  # pragma: no cover
             self.notify(f"Failed to save: {exc}", severity="error")
 
@@ -975,6 +985,8 @@ class CTKApp(App):
         """Return the text of the first SYSTEM message in the path, if any."""
         for msg in tree.get_longest_path():
             if msg.role == MessageRole.SYSTEM:
+                if isinstance(tree, LazyConversationTree):
+                    tree.load_bodies([msg.id])
                 if hasattr(msg.content, "get_text"):
                     return msg.content.get_text()
                 return str(msg.content)
@@ -1032,6 +1044,9 @@ class CTKApp(App):
             if msg is not None and msg.role == MessageRole.SYSTEM:
                 existing = msg
                 break
+        if existing is not None and isinstance(tree, LazyConversationTree):
+            # Load before editing so a later fetch can't clobber the edit
+            tree.load_bodies([existing.id])
 
         if not text.strip():
             # Caller asked to clear. Remove the SYSTEM root and re-link
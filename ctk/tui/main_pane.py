@@ -3,15 +3,22 @@
 from __future__ import annotations
 
 import time
-from typing import List, Optional, Union
+from typing import List, Optional, Tuple, Union
 
 from rich.markdown import Markdown
 from rich.text import Text
 from textual.binding import Binding
 from textual.containers import Vertical, VerticalScroll
+from textual.widget import Widget
 from textual.widgets import Static, TextArea
 
-from ctk.core.models import ConversationTree, Message, MessageRole
+from ctk.core.constants import MESSAGE_PAGE_SIZE, TUI_MESSAGE_WINDOW
+from ctk.core.models import (
+    ConversationTree,
+    LazyConversationTree,
+    Message,
+    MessageRole,
+)
 
 
 def _role_label(role: MessageRole) -> Text:
@@ -149,12 +156,53 @@ class ThinkingBlock(Static):
             pass
 
 
+class MoreMessages(Static):
+    """Stand-in for path messages outside the mounted window.
+
+    ``direction`` is -1 for the earlier messages above the window and +1
+    for the later ones below it. Scrolling to the edge of the view pages
+    them in; so do a click or Enter while focused.
+    """
+
+    can_focus = True
+
+    BINDINGS = [Binding("enter", "load", "load more", show=False)]
+
+    def __init__(self, direction: int) -> None:
+        super().__init__("", classes="more-messages")
+        self.direction = direction
+
+    def set_count(self, count: int) -> None:
+        label = "earlier" if self.direction < 0 else "later"
+        arrow = "▲" if self.direction < 0 else "▼"
+        self.update(
+            Text(f"  {arrow} {count} {label} messages (scroll or Enter)", style="dim")
+        )
+        self.display = count > 0
+
+    def action_load(self) -> None:
+        self._page()
+
+    def on_click(self) -> None:
+        self._page()
+
+    def _page(self) -> None:
+        if isinstance(self.parent, MessageView):
+            self.parent.page(self.direction)
+
+
 class MessageView(VerticalScroll):
     """Scrollable message column.
 
     Tracks the **current path** as state rather than recomputing
     ``get_longest_path()`` each render, so sibling switching can
     rewrite the tail of the path without losing the prefix.
+
+    Only a window of at most ``TUI_MESSAGE_WINDOW`` path messages is
+    mounted; the rest are represented by two ``MoreMessages`` markers
+    and paged in ``MESSAGE_PAGE_SIZE`` at a time as the user scrolls.
+    For a ``LazyConversationTree`` message bodies are fetched only when
+    their page is mounted.
     """
 
     def __init__(self, *args, **kwargs) -> None:
@@ -162,6 +210,14 @@ class MessageView(VerticalScroll):
         # The conversation we're displaying and the linear path through it.
         self._tree: Optional[ConversationTree] = None
         self._path: List[Message] = []
+        # Mounted window: path indices [_start, _end), with the widgets
+        # of each mounted message in ``_blocks`` (one list per message).
+        self._start = 0
+        self._end = 0
+        self._blocks: List[List[Widget]] = []
+        self._earlier: Optional[MoreMessages] = None
+        self._later: Optional[MoreMessages] = None
+        self._paging = False
         # Directory used to resolve relative image URLs (e.g. the
         # ``media/`` folder ChatGPT exports place next to
         # ``conversations.json``). Set by the App after construction
@@ -180,9 +236,17 @@ class MessageView(VerticalScroll):
     def current_tree(self) -> Optional[ConversationTree]:
         return self._tree
 
+    @property
+    def window(self) -> Tuple[int, int]:
+        """Path indices ``(start, end)`` of the mounted messages."""
+        return self._start, self._end
+
     def clear(self) -> None:
         for child in list(self.children):
             child.remove()
+        self._start = self._end = 0
+        self._blocks = []
+        self._earlier = self._later = None
 
     def show_empty(self, hint: str = "Select a conversation from the sidebar.") -> None:
         self.clear()
@@ -198,7 +262,21 @@ class MessageView(VerticalScroll):
     def append_message(self, msg: Message) -> None:
         """Append a single message to the displayed path AND the state."""
         self._path.append(msg)
-        self._mount_message(msg, is_last_in_path=True)
+        index = len(self._path) - 1
+        if self._later is None or self._end < index:
+            # First message, or the user paged away from the tail: render
+            # the window at the tail from scratch
+            self._render_path()
+            return
+        block = self._message_widgets(index)
+        # Mount at the very end (after any live streaming widgets the app
+        # added) and keep the "later" marker below the newest message
+        self.mount(*block)
+        self.move_child(self._later, after=block[-1])
+        self._blocks.append(block)
+        self._end = index + 1
+        self._trim(from_end=False)
+        self._update_markers()
         self.scroll_end(animate=False)
 
     def switch_sibling(self, parent_id: str, direction: int) -> bool:
@@ -235,6 +313,66 @@ class MessageView(VerticalScroll):
         self._render_path()
         return True
 
+    def page(self, direction: int) -> int:
+        """Mount up to a page of messages above (-1) or below (+1) the window.
+
+        As many messages are unmounted from the opposite end once the
+        window exceeds ``TUI_MESSAGE_WINDOW``. Returns the number of
+        messages mounted.
+        """
+        if self._later is None:
+            return 0
+        if direction < 0:
+            lo, hi = max(0, self._start - MESSAGE_PAGE_SIZE), self._start
+        else:
+            lo, hi = self._end, min(len(self._path), self._end + MESSAGE_PAGE_SIZE)
+        if lo >= hi:
+            return 0
+
+        self._load_bodies(lo, hi)
+        blocks = [self._message_widgets(i) for i in range(lo, hi)]
+        widgets = [w for block in blocks for w in block]
+        if direction < 0:
+            # Keep the previously first message where the user left it
+            anchor: Widget = self._blocks[0][0] if self._blocks else self._later
+            self.mount(*widgets, before=anchor)
+            self._blocks[:0] = blocks
+            self._start = lo
+        else:
+            anchor = self._blocks[-1][-1] if self._blocks else self._later
+            self.mount(*widgets, before=self._later)
+            self._blocks.extend(blocks)
+            self._end = hi
+        self._trim(from_end=direction < 0)
+        self._update_markers()
+        self.call_after_refresh(
+            self.scroll_to_widget, anchor, animate=False, top=direction < 0
+        )
+        return hi - lo
+
+    def watch_scroll_y(self, old_value: float, new_value: float) -> None:
+        super().watch_scroll_y(old_value, new_value)
+        if self._paging or self._later is None:
+            return
+        if new_value < old_value and new_value <= 1 and self._start > 0:
+            direction = -1
+        elif (
+            new_value > old_value
+            and new_value >= self.max_scroll_y - 1
+            and self._end < len(self._path)
+        ):
+            direction = 1
+        else:
+            return
+        self._paging = True
+        self.call_after_refresh(self._page_from_scroll, direction)
+
+    def _page_from_scroll(self, direction: int) -> None:
+        try:
+            self.page(direction)
+        finally:
+            self._paging = False
+
     def _extend_path(self, start: Message) -> List[Message]:
         """Greedy descent from ``start``: pick the first child each step."""
         assert self._tree is not None
@@ -253,15 +391,56 @@ class MessageView(VerticalScroll):
         if not self._path:
             self.show_empty("(conversation is empty)")
             return
-        for i, msg in enumerate(self._path):
-            self._mount_message(msg, is_last_in_path=(i == len(self._path) - 1))
+        end = len(self._path)
+        start = max(0, end - TUI_MESSAGE_WINDOW)
+        self._load_bodies(start, end)
+        self._earlier = MoreMessages(-1)
+        self._later = MoreMessages(+1)
+        self._blocks = [self._message_widgets(i) for i in range(start, end)]
+        self._start, self._end = start, end
+        self.mount(
+            self._earlier,
+            *(w for block in self._blocks for w in block),
+            self._later,
+        )
+        self._update_markers()
         self.scroll_end(animate=False)
 
-    def _mount_message(self, msg: Message, is_last_in_path: bool = False) -> None:
-        role_line = Static(_role_label(msg.role), classes="message-role")
-        bubble = MessageBubble(msg)
-        self.mount(role_line)
-        self.mount(bubble)
+    def _load_bodies(self, start: int, end: int) -> None:
+        """Fetch the bodies of path[start:end] if the tree is lazy."""
+        if isinstance(self._tree, LazyConversationTree):
+            self._tree.load_bodies(m.id for m in self._path[start:end])
+
+    def _trim(self, from_end: bool) -> None:
+        """Unmount messages beyond ``TUI_MESSAGE_WINDOW`` from one end."""
+        excess = len(self._blocks) - TUI_MESSAGE_WINDOW
+        if excess <= 0:
+            return
+        if from_end:
+            dropped = self._blocks[-excess:]
+            del self._blocks[-excess:]
+            self._end -= excess
+        else:
+            dropped = self._blocks[:excess]
+            del self._blocks[:excess]
+            self._start += excess
+        for block in dropped:
+            for widget in block:
+                widget.remove()
+
+    def _update_markers(self) -> None:
+        if self._earlier is not None:
+            self._earlier.set_count(self._start)
+        if self._later is not None:
+            self._later.set_count(len(self._path) - self._end)
+
+    def _message_widgets(self, index: int) -> List[Widget]:
+        """Build the widgets shown for ``self._path[index]``."""
+        msg = self._path[index]
+        widgets: List[Widget] = [
+            Static(_role_label(msg.role), classes="message-role"),
+            MessageBubble(msg),
+        ]
         # Mount any image attachments below the bubble. Lazy-import so
         # the image stack stays out of the codepath for text-only
         # conversations (which is most of them) and so missing
@@ -272,8 +451,7 @@ class MessageView(VerticalScroll):
             try:
                 from ctk.tui.images import build_image_widgets
 
-                for widget in build_image_widgets(images, media_root=self._media_root):
-                    self.mount(widget)
+                widgets.extend(build_image_widgets(images, media_root=self._media_root))
             except ImportError:
                 # textual-image not installed; show a minimal fallback
                 # so the user at least knows attachments existed.
@@ -284,27 +462,24 @@ class MessageView(VerticalScroll):
                         or img.path
                         or f"(embedded {img.mime_type or 'image'})"
                     )
-                    self.mount(Static(f"[image] {label}", classes="message-system"))
+                    widgets.append(Static(f"[image] {label}", classes="message-system"))
         # Show a branch indicator under any message with siblings beyond
         # the one currently picked. We render it AFTER the bubble whose
         # *child* in the path has siblings — i.e., this is the parent of
         # a branching point. Skip on the last message because there's no
         # next-in-path child to indicate.
-        if is_last_in_path or self._tree is None:
-            return
+        if index + 1 >= len(self._path) or self._tree is None:
+            return widgets
         siblings = self._tree.get_children(msg.id)
         if len(siblings) < 2:
-            return
+            return widgets
         # Find which sibling is currently in the path.
-        next_in_path_id = None
-        path_ids = [m.id for m in self._path]
-        idx = path_ids.index(msg.id)
-        if idx + 1 < len(self._path):
-            next_in_path_id = self._path[idx + 1].id
+        next_in_path_id = self._path[index + 1].id
         position = next(
             (i for i, s in enumerate(siblings) if s.id == next_in_path_id), 0
         )
-        self.mount(BranchIndicator(msg.id, position=position, total=len(siblings)))
+        widgets.append(BranchIndicator(msg.id, position=position, total=len(siblings)))
+        return widgets
 
 
 class ChatInput(TextArea):
@@ -19,9 +19,11 @@ from __future__ import annotations
 
 from typing import Any, Dict, List, Optional, Tuple, cast
 
+from rich.text import Text
 from textual.containers import Vertical
 from textual.widgets import DataTable, Static, Tab, Tabs
 
+from ctk.core.constants import SEARCH_HIGHLIGHT_MARK
 from ctk.core.database import ConversationDB
 from ctk.core.models import PaginatedResult
 
@@ -42,6 +44,24 @@ def _title(conv) -> str:
     return title if len(title) <= 32 else title[:30] + "…"
 
 
+def _title_cell(conv) -> Tuple[Any, int]:
+    """Title, plus the search excerpt on a second line when there is one.
+
+    Matched terms arrive wrapped in ``SEARCH_HIGHLIGHT_MARK``; they are
+    shown bold instead. Returns (cell, row height).
+    """
+    snippet = getattr(conv, "snippet", None)
+    if not snippet:
+        return _title(conv), 1
+    cell = Text(_title(conv) + "\n")
+    width = 0
+    for i, part in enumerate(snippet.replace("\n", " ").split(SEARCH_HIGHLIGHT_MARK)):
+        part = part[: max(0, 40 - width)]
+        width += len(part)
+        cell.append(part, style="bold" if i % 2 else "dim")
+    return cell, 2
+
+
 # Tab id -> (label, filter_mode). Order is the strip order.
 _TAB_DEFS: List[Tuple[str, str]] = [
     ("all", "All"),
@@ -178,7 +198,7 @@ class ConversationList(Vertical):
             return cast(
                 PaginatedResult,
                 self._db.search_conversations(
-                    self._search, cursor=cursor, page_size=ps
+                    self._search, cursor=cursor, page_size=ps, order_by="relevance"
                 ),
             )
 
@@ -205,11 +225,13 @@ class ConversationList(Vertical):
         for conv in page.items:
             updated = getattr(conv, "updated_at", None)
             updated_str = updated.strftime("%Y-%m-%d") if updated else ""
+            title, height = _title_cell(conv)
             self._table.add_row(
                 _flags(conv),
-                _title(conv),
+                title,
                 updated_str,
                 key=str(getattr(conv, "id", "")),
+                height=height,
             )
             self._conversations.append(conv)
             added += 1
@@ -382,6 +382,10 @@ def cmd_export(app: "CTKApp", args: str) -> Optional[str]:
     exporter = registry.get_exporter(fmt)
     if exporter is None:
         return f"Unknown export format: {fmt}"
+    from ctk.core.models import LazyConversationTree
+
+    if isinstance(app._current_tree, LazyConversationTree):
+        app._current_tree.load_all()
     try:
         exporter.export_to_file([app._current_tree], path)
     except Exception as exc:
@@ -576,8 +580,7 @@ def cmd_detach(app: "CTKApp", args: str) -> Optional[str]:
         new_tree = tree.copy_subtree(target_id)
         new_tree.title = f"Detached from {tree.title or '(untitled)'}"
         tree.delete_subtree(target_id)
-        app._safe_save(new_tree)
-        app._safe_save(tree)
+        app._safe_save(new_tree, tree)
         if app.main is not None:
             app.main.messages.show_conversation(tree)
         if app.sidebar is not None:
@@ -146,6 +146,37 @@ def branching_conversation():
     return conv
 
 
+@pytest.fixture
+def make_conversation():
+    """Factory for linear conversations.
+
+    ``make_conversation(id, *texts, title=None, **metadata)`` builds one
+    message per text (``m0``, ``m1``, ...), alternating user and assistant,
+    each replying to the previous one. The title defaults to the id;
+    keyword arguments such as ``tags`` or ``source`` go to the metadata.
+    """
+
+    def make(conv_id, *texts, title=None, **metadata):
+        conv = ConversationTree(
+            id=conv_id,
+            title=conv_id if title is None else title,
+            metadata=ConversationMetadata(**metadata),
+        )
+        parent = None
+        for i, text in enumerate(texts):
+            msg = Message(
+                id=f"m{i}",
+                role=MessageRole.USER if i % 2 == 0 else MessageRole.ASSISTANT,
+                content=MessageContent(text=text),
+                parent_id=parent,
+            )
+            conv.add_message(msg)
+            parent = msg.id
+        return conv
+
+    return make
+
+
 @pytest.fixture
 def openai_export_data():
     """Sample OpenAI export data"""
@@ -0,0 +1,265 @@
+"""Tests for the approximate nearest-neighbour index subsystem."""
+
+from unittest.mock import patch
+
+import numpy as np
+import pytest
+
+from ctk.core.database import ConversationDB
+from ctk.core.embedding_matrix import EmbeddingMatrix
+from ctk.core.models import ConversationTree
+from ctk.embeddings.ann import (
+    IndexStore,
+    IVFIndex,
+    create_index,
+    load_index,
+    measure_recall,
+)
+
+pytestmark = pytest.mark.unit
+
+
+def _clustered(n, dims=32, clusters=20, seed=0):
+    rng = np.random.default_rng(seed)
+    centers = rng.normal(size=(clusters, dims))
+    labels = rng.integers(0, clusters, n)
+    return (centers[labels] + 0.5 * rng.normal(size=(n, dims))).astype(np.float32)
+
+
+def _exact(ids, vectors):
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    return EmbeddingMatrix(ids, vectors / norms)
+
+
+class TestIVFIndex:
+    def test_untrained_index_is_exact(self):
+        vectors = _clustered(200)
+        ids = [f"c{i}" for i in range(200)]
+        index = IVFIndex(32, min_train=1000)
+        index.add(ids, vectors)
+        assert not index.is_trained
+        exact = _exact(ids, vectors)
+        for q in vectors[:10]:
+            assert [c for c, _ in index.search(q, 5)] == [
+                c for c, _ in exact.top_k(q, 5)
+            ]
+
+    def test_trained_index_has_high_recall(self):
+        vectors = _clustered(3000)
+        ids = [f"c{i}" for i in range(3000)]
+        index = IVFIndex(32, min_train=500)
+        index.add(ids, vectors)
+        assert index.is_trained
+        report = measure_recall(index, _exact(ids, vectors), vectors[:50], k=10)
+        assert report["recall"] >= 0.9
+
+    def test_incremental_add_replace_and_remove(self):
+        vectors = _clustered(600)
+        ids = [f"c{i}" for i in range(600)]
+        index = IVFIndex(32, min_train=500)
+        index.add(ids[:550], vectors[:550])
+        index.add(ids[550:], vectors[550:])
+        assert len(index) == 600
+
+        # Replacing a vector moves the ID to the new position
+        index.add(["c0"], [vectors[599]])
+        assert index.search(vectors[599], 2, exclude=["c599"])[0][0] == "c0"
+        assert len(index) == 600
+
+        assert index.remove(["c0", "missing"]) == 1
+        assert "c0" not in index
+        assert all(c != "c0" for c, _ in index.search(vectors[599], 10))
+
+    def test_removing_most_rows_compacts(self):
+        vectors = _clustered(300)
+        ids = [f"c{i}" for i in range(300)]
+        index = IVFIndex(32, min_train=100)
+        index.add(ids, vectors)
+        index.remove(ids[:250])
+        assert index._count == 50
+        assert {c for c, _ in index.search(vectors[260], 50)} == set(ids[250:])
+
+    def test_exclude_and_min_score(self):
+        index = IVFIndex(2)
+        index.add(["a", "b", "c"], [[1, 0], [1, 0.2], [-1, 0]])
+        assert [c for c, _ in index.search([1, 0], 3, exclude=["a"])] == ["b", "c"]
+        assert [c for c, _ in index.search([1, 0], 3, min_score=0.5)] == ["a", "b"]
+        assert index.search([0, 0], 3) == []
+        assert index.search([1, 0, 0], 3) == []
+
+    def test_save_and_load_round_trip(self, tmp_path):
+        vectors = _clustered(700)
+        ids = [f"c{i}" for i in range(700)]
+        index = IVFIndex(32, min_train=500)
+        index.add(ids, vectors)
+        index.remove(["c1"])
+        index.metadata["fingerprint"] = [1, 2, 3.0]
+        index.save(tmp_path / "idx")
+
+        loaded = load_index(tmp_path / "idx")
+        assert isinstance(loaded, IVFIndex)
+        assert loaded.metadata == {"fingerprint": [1, 2, 3.0]}
+        assert len(loaded) == 699
+        for q in vectors[:5]:
+            assert loaded.search(q, 5) == index.search(q, 5)
+
+
+class TestFactory:
+    def test_unknown_backend(self):
+        with pytest.raises(ValueError):
+            create_index(8, "annoy")
+
+    def test_hnswlib_backend_requires_library(self):
+        try:
+            import hnswlib  # noqa: F401
+        except ImportError:
+            with pytest.raises(ImportError, match="hnswlib"):
+                create_index(8, "hnswlib")
+        else:
+            assert create_index(8, "hnswlib").backend == "hnswlib"
+
+    def test_store_ignores_corrupt_index(self, tmp_path):
+        store = IndexStore(tmp_path)
+        store.path(1).mkdir()
+        (store.path(1) / "index.json").write_text("{not json")
+        assert store.load(1) is None
+        assert store.load(2) is None
+
+
+@pytest.fixture
+def db_dir(tmp_path):
+    path = tmp_path / "db"
+    with ConversationDB(str(path)) as db:
+        for i in range(30):
+            db.save_conversation(ConversationTree(id=f"c{i}", title=f"t{i}"))
+        for i, vec in enumerate(_clustered(30, dims=8)):
+            db.save_embedding(f"c{i}", vec, model="m", provider="p")
+        db.save_embedding_session(
+            provider="p",
+            model="m",
+            chunking_strategy="message",
+            aggregation_strategy="weighted_mean",
+            num_conversations=30,
+        )
+    return path
+
+
+class TestDatabaseIndex:
+    def test_index_is_built_persisted_and_reused(self, db_dir):
+        with ConversationDB(str(db_dir)) as db:
+            index = db.get_ann_index(backend="ivf")
+            session_id = db.get_current_embedding_session()["id"]
+            assert len(index) == 30
+            assert db.get_ann_index() is index
+        assert (db_dir / ".ctk_indexes" / f"session-{session_id}").is_dir()
+
+        with ConversationDB(str(db_dir)) as db:
+            with patch("ctk.embeddings.ann.create_index") as create:
+                assert len(db.get_ann_index()) == 30
+            create.assert_not_called()
+
+    def test_save_embedding_updates_index_incrementally(self, db_dir):
+        with ConversationDB(str(db_dir)) as db:
+            index = db.get_ann_index(backend="ivf")
+            db.save_conversation(ConversationTree(id="new", title="new"))
+            db.save_embedding("new", [1.0] * 8, model="m", provider="p")
+            assert "new" in index
+            assert index.search([1.0] * 8, 1)[0][0] == "new"
+
+            db.delete_conversation("c3")
+            assert "c3" not in index
+
+        # Flushed on close and still fresh when reopened
+        with ConversationDB(str(db_dir)) as db:
+            with patch("ctk.embeddings.ann.create_index") as create:
+                reopened = db.get_ann_index()
+            create.assert_not_called()
+            assert "new" in reopened and "c3" not in reopened
+
+    def test_rolled_back_writes_leave_index_alone(self, db_dir):
+        from sqlalchemy.exc import OperationalError
+        from sqlalchemy.orm import Session
+
+        failing = OperationalError("COMMIT", {}, Exception("disk I/O error"))
+        with ConversationDB(str(db_dir)) as db:
+            index = db.get_ann_index(backend="ivf")
+            db.save_conversation(ConversationTree(id="new", title="new"))
+            with patch.object(Session, "commit", side_effect=failing):
+                with pytest.raises(OperationalError):
+                    db.save_embedding("new", [1.0] * 8, model="m", provider="p")
+                with pytest.raises(OperationalError):
+                    db.delete_embeddings(conversation_id="c3")
+            assert "new" not in index
+            assert "c3" in index
+
+    def test_stale_index_is_rebuilt(self, db_dir):
+        with ConversationDB(str(db_dir)) as db:
+            db.get_ann_index(backend="ivf")
+
+        # Written by a connection that never loaded the index
+        with ConversationDB(str(db_dir)) as db:
+            db.save_conversation(ConversationTree(id="late", title="late"))
+            db.save_embedding("late", [0.5] * 8, model="m", provider="p")
+
+        with ConversationDB(str(db_dir)) as db:
+            assert "late" in db.get_ann_index()
+
+    def test_no_session_means_no_index(self, tmp_path):
+        with ConversationDB(str(tmp_path / "empty")) as db:
+            assert db.get_ann_index() is None
+
+
+def test_build_graph_with_index_matches_exact():
+    from ctk.core.similarity import (
+        ConversationEmbedder,
+        ConversationEmbeddingConfig,
+        ConversationGraphBuilder,
+        SimilarityComputer,
+    )
+
+    vectors = _clustered(120, dims=16)
+    ids = [f"c{i}" for i in range(120)]
+    index = IVFIndex(16)
+    index.add(ids, vectors)
+
+    class _Lookup(SimilarityComputer):
+        def _get_embedding(self, source, use_cache):
+            return vectors[int(source[1:])], source
+
+    embedder = ConversationEmbedder(
+        ConversationEmbeddingConfig(provider="tfidf"), provider=object()
+    )
+    builder = ConversationGraphBuilder(_Lookup(embedder))
+    exact = builder.build_graph(ids, threshold=0.2, max_links_per_node=5)
+    approx = builder.build_graph(ids, threshold=0.2, max_links_per_node=5, index=index)
+
+    def edges(graph):
+        return {(link.source_id, link.target_id) for link in graph.links}
+
+    assert edges(approx) == edges(exact)
+    assert approx.metadata["index"] == "ivf"
+
+
+@pytest.mark.slow
+def test_ann_recall_vs_latency():
+    """Recall@10 and per-query latency of the IVF index vs exact search.
+
+    Run with ``pytest -m slow -s tests/unit/test_ann.py`` to see the numbers.
+    """
+    n = 100_000
+    vectors = _clustered(n, dims=128, clusters=300)
+    ids = [f"c{i}" for i in range(n)]
+    exact = _exact(ids, vectors)
+    index = IVFIndex(128)
+    index.add(ids, vectors)
+
+    queries = vectors[np.random.default_rng(1).choice(n, 200)]
+    print()
+    for nprobe in (4, 8, 16, 32):
+        index.nprobe = nprobe
+        report = measure_recall(index, exact, queries, k=10)
+        print(
+            f"nprobe={nprobe:<3} recall@10={report['recall']:.3f}  "
+            f"ivf={report['ann_ms']:.2f} ms  exact={report['exact_ms']:.2f} ms"
+        )
+    assert report["recall"] >= 0.95
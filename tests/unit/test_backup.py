@@ -0,0 +1,158 @@
+"""Tests for online backups and verified restores."""
+
+import gzip
+import json
+import sqlite3
+import threading
+
+import pytest
+
+from ctk.core.backup import (
+    BackupError,
+    create_backup,
+    resolve_compression,
+    restore_backup,
+)
+
+pytestmark = pytest.mark.unit
+
+
+@pytest.fixture
+def store(tmp_path):
+    """A WAL-mode database with a media directory beside it."""
+    db_dir = tmp_path / "db"
+    (db_dir / "media" / "img").mkdir(parents=True)
+    (db_dir / "media" / "img" / "a.png").write_bytes(b"png-a" * 100)
+    (db_dir / "media" / "b.txt").write_bytes(b"hello")
+    conn = sqlite3.connect(str(db_dir / "conversations.db"))
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("CREATE TABLE t (id INTEGER PRIMARY KEY, body TEXT)")
+    conn.executemany(
+        "INSERT INTO t (body) VALUES (?)", [(f"row {i}" * 20,) for i in range(2000)]
+    )
+    conn.commit()
+    conn.close()
+    return db_dir
+
+
+def _rows(db_file):
+    conn = sqlite3.connect(str(db_file))
+    try:
+        return conn.execute("SELECT COUNT(*) FROM t").fetchone()[0]
+    finally:
+        conn.close()
+
+
+class TestBackup:
+    @pytest.mark.parametrize("compression", ["none", "gzip"])
+    def test_round_trip(self, store, tmp_path, compression):
+        root = tmp_path / "backups"
+        result = create_backup(
+            store / "conversations.db", root, compression=compression, name="s1"
+        )
+        assert result.snapshot == root / "s1"
+        assert result.media_files == 2
+        assert result.media_copied == 2
+        if compression == "gzip":
+            assert result.stored_size < result.database_size
+
+        target = tmp_path / "restored" / "conversations.db"
+        restored = restore_backup(result.snapshot, target)
+        assert restored.media_files == 2
+        assert _rows(target) == 2000
+        media = target.parent / "media"
+        assert (media / "img" / "a.png").read_bytes() == b"png-a" * 100
+
+    def test_media_is_copied_incrementally(self, store, tmp_path):
+        root = tmp_path / "backups"
+        db_file = store / "conversations.db"
+        create_backup(db_file, root, name="s1")
+
+        (store / "media" / "c.txt").write_bytes(b"hello")  # same content as b.txt
+        (store / "media" / "d.txt").write_bytes(b"new")
+        second = create_backup(db_file, root, name="s2")
+
+        assert second.media_files == 4
+        assert second.media_copied == 1
+        objects = [p for p in (root / "objects").rglob("*") if p.is_file()]
+        assert len(objects) == 3
+
+    def test_backup_runs_alongside_writers(self, store, tmp_path):
+        db_file = store / "conversations.db"
+        stop = threading.Event()
+
+        def write():
+            conn = sqlite3.connect(str(db_file), timeout=10)
+            while not stop.is_set():
+                conn.execute("INSERT INTO t (body) VALUES ('live')")
+                conn.commit()
+            conn.close()
+
+        writer = threading.Thread(target=write)
+        writer.start()
+        try:
+            result = create_backup(
+                db_file, tmp_path / "backups", name="live", pages_per_step=4
+            )
+        finally:
+            stop.set()
+            writer.join()
+
+        target = tmp_path / "restored" / "conversations.db"
+        restore_backup(result.snapshot, target)
+        assert _rows(target) >= 2000
+
+    def test_progress_reports_pages(self, store, tmp_path):
+        seen = []
+        create_backup(
+            store / "conversations.db",
+            tmp_path / "backups",
+            pages_per_step=8,
+            progress=lambda done, total: seen.append((done, total)),
+        )
+        assert len(seen) > 1
+        assert seen[-1][0] == seen[-1][1]
+
+
+class TestRestore:
+    def test_detects_corruption(self, store, tmp_path):
+        result = create_backup(
+            store / "conversations.db", tmp_path / "backups", compression="gzip"
+        )
+        stored = result.snapshot / "conversations.db.gz"
+        data = bytearray(gzip.decompress(stored.read_bytes()))
+        data[5000] ^= 0xFF
+        stored.write_bytes(gzip.compress(bytes(data)))
+
+        target = tmp_path / "restored" / "conversations.db"
+        with pytest.raises(BackupError, match="Checksum mismatch"):
+            restore_backup(result.snapshot, target)
+        assert not target.exists()
+
+    def test_detects_bad_media_object(self, store, tmp_path):
+        result = create_backup(store / "conversations.db", tmp_path / "backups")
+        manifest = json.loads((result.snapshot / "manifest.json").read_text())
+        digest = manifest["media"]["b.txt"]["sha256"]
+        obj = tmp_path / "backups" / "objects" / digest[:2] / digest
+        obj.write_bytes(b"tampered")
+
+        with pytest.raises(BackupError, match="media"):
+            restore_backup(result.snapshot, tmp_path / "restored" / "conversations.db")
+
+    def test_refuses_to_overwrite_without_force(self, store, tmp_path):
+        db_file = store / "conversations.db"
+        result = create_backup(db_file, tmp_path / "backups")
+        with pytest.raises(BackupError, match="already exists"):
+            restore_backup(result.snapshot, db_file)
+        restore_backup(result.snapshot, db_file, force=True)
+        assert _rows(db_file) == 2000
+
+    def test_incomplete_snapshot_is_rejected(self, tmp_path):
+        (tmp_path / "partial").mkdir()
+        with pytest.raises(BackupError, match="manifest"):
+            restore_backup(tmp_path / "partial", tmp_path / "out" / "conversations.db")
+
+    def test_compression_choice(self):
+        assert resolve_compression("auto") in ("gzip", "zstd")
+        with pytest.raises(ValueError):
+            resolve_compression("bzip9")
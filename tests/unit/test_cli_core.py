@@ -212,8 +212,7 @@ class TestCLICommandBehaviors:
         db = MagicMock()
         db.__enter__.return_value = db
         db.__exit__.return_value = False
-        db.list_conversations.return_value = [MagicMock(id="conv-1")]
-        db.load_conversation.return_value = MagicMock()
+        db.iter_trees.return_value = iter([MagicMock(id="conv-1")])
         mock_db_class.return_value = db
 
         exporter = MagicMock()
@@ -222,7 +221,49 @@ class TestCLICommandBehaviors:
         result = cmd_export(args)
 
         assert result == 0
-        db.list_conversations.assert_called_once_with(limit=None)
+        assert db.iter_trees.call_args.kwargs["limit"] is None
+
+    @patch("ctk.cli.ConversationDB")
+    @patch("ctk.cli.registry")
+    def test_export_pushes_filters_into_sql_and_streams(
+        self, mock_registry, mock_db_class
+    ):
+        """Model/tag filters become WHERE clauses; the exporter gets an iterator."""
+        args = MagicMock()
+        args.db = "test-db"
+        args.output = "out.jsonl"
+        args.format = "jsonl"
+        args.ids = None
+        args.limit = 5
+        args.filter_source = None
+        args.filter_model = "gpt"
+        args.filter_tags = "work,python"
+        args.sanitize = False
+        args.path_selection = "longest"
+        args.include_metadata = False
+        args.starred = False
+        args.pinned = False
+
+        db = MagicMock()
+        db.__enter__.return_value = db
+        db.__exit__.return_value = False
+        db.iter_trees.return_value = iter([MagicMock(id="c1"), MagicMock(id="c2")])
+        mock_db_class.return_value = db
+
+        exporter = MagicMock()
+        exporter.streaming = True
+        mock_registry.get_exporter.return_value = exporter
+
+        result = cmd_export(args)
+
+        assert result == 0
+        kwargs = db.iter_trees.call_args.kwargs
+        assert kwargs["limit"] == 5
+        # One substring clause for the model, one EXISTS per required tag
+        assert len(kwargs["where"]) == 3
+        streamed = exporter.export_to_file.call_args.args[0]
+        assert not isinstance(streamed, list)
+        assert [conv.id for conv in streamed] == ["c1", "c2"]
 
 
 class TestCLIErrorHandling:
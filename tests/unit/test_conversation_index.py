@@ -268,3 +268,74 @@ class TestConversationIndexStats:
         assert stats["slug_count"] == 2
         assert stats["prefix_4_buckets"] == 2
         assert stats["prefix_8_buckets"] == 1
+
+
+def _save(db, conv_id, title):
+    from ctk.core.models import ConversationTree
+
+    db.save_conversation(ConversationTree(id=conv_id, title=title))
+
+
+class TestConversationIndexSnapshot:
+    """Tests for the memory-mapped snapshot and its journal"""
+
+    @pytest.fixture
+    def db(self, tmp_path):
+        from ctk.core.database import ConversationDB
+
+        db = ConversationDB(str(tmp_path))
+        _save(db, "aaaa1111-0000", "Python Tips")
+        _save(db, "bbbb2222-0000", "Rust Tips")
+        yield db
+        db.close()
+
+    def _fresh(self, db):
+        index = ConversationIndex(db, snapshot_path=db.conversation_index.snapshot_path)
+        assert index.ensure_current()
+        return index
+
+    @pytest.mark.unit
+    def test_snapshot_is_written_and_reused(self, db):
+        assert db.resolve_identifier("python-tips") == ("aaaa1111-0000", "python-tips")
+        assert db.conversation_index.snapshot_path.exists()
+
+        index = self._fresh(db)
+        # Answered from the mapped file; nothing materialized in memory
+        assert index.get_stats()["snapshot_entries"] == 2
+        assert index._id_to_entry == {}
+        assert index.resolve("bbbb") == ("bbbb2222-0000", "rust-tips")
+        assert index.resolve("rust") == ("bbbb2222-0000", "rust-tips")
+        assert index.get_entry("aaaa1111-0000").title == "Python Tips"
+
+    @pytest.mark.unit
+    def test_saves_and_deletes_are_journaled(self, db):
+        db.resolve_identifier("python-tips")
+        _save(db, "cccc3333-0000", "Go Tips")
+        db.delete_conversation("aaaa1111-0000")
+        assert db.conversation_index.journal_path.exists()
+
+        index = self._fresh(db)
+        assert index.get_stats()["snapshot_entries"] == 2
+        assert index.resolve("go-tips") == ("cccc3333-0000", "go-tips")
+        assert index.resolve("aaaa1111-0000") is None
+        assert index.entry_count == 2
+        # The writing process kept its own index current as well
+        assert db.resolve_identifier("cccc") == ("cccc3333-0000", "go-tips")
+
+    @pytest.mark.unit
+    def test_unjournaled_change_forces_rebuild(self, db):
+        db.resolve_identifier("python-tips")
+        db.update_conversation_metadata("bbbb2222-0000", title="Rust Tricks")
+
+        index = self._fresh(db)
+        assert index.get_entry("bbbb2222-0000").title == "Rust Tricks"
+        # The long-lived index notices the change on its next check
+        assert db.conversation_index.ensure_current()
+        assert db.conversation_index.get_entry("bbbb2222-0000").title == "Rust Tricks"
+
+    @pytest.mark.unit
+    def test_ambiguous_prefix(self, db):
+        _save(db, "aaaa9999-0000", "Python Tricks")
+        assert db.resolve_identifier("aaaa") is None
+        assert db.resolve_identifier("python") is None
+        assert db.resolve_identifier("python-tr") == ("aaaa9999-0000", "python-tricks")
@@ -512,6 +512,28 @@ class TestCursorPagination:
 
         assert ids_again == [item.id for item in result1.items]
 
+    def test_cursor_with_subsecond_timestamps(self):
+        """Rows within the same second are neither skipped nor repeated."""
+        db = ConversationDB(":memory:")
+        base = datetime(2024, 1, 1, 12, 0, 0)
+        for i in range(7):
+            ts = base + timedelta(microseconds=i * 1000)
+            conv = ConversationTree(
+                id=f"conv-{i}",
+                title=f"Conversation {i}",
+                metadata=ConversationMetadata(created_at=ts, updated_at=ts),
+            )
+            db.save_conversation(conv)
+
+        seen = []
+        cursor = ""
+        while cursor is not None:
+            page = db.list_conversations(cursor=cursor, page_size=3)
+            seen.extend(item.id for item in page.items)
+            cursor = page.next_cursor
+
+        assert seen == [f"conv-{i}" for i in reversed(range(7))]
+
 
 # =============================================================================
 # 4. TestSearchCursorPagination - Test cursor pagination in search_conversations()
@@ -4,12 +4,14 @@ import uuid
 from datetime import datetime
 
 import pytest
-from sqlalchemy import event
+from sqlalchemy import event, text
 
 from ctk.core.database import ConversationDB
+from ctk.core.db_models import ConversationModel
 from ctk.core.models import (
     ConversationMetadata,
     ConversationTree,
+    LazyConversationTree,
     Message,
     MessageContent,
     MessageRole,
@@ -55,9 +57,389 @@ def test_list_conversations_is_not_n_plus_1(tmp_path):
         results = db.list_conversations(limit=20)
         assert len(results) == 20
         # Bounded, not ~1 + 20 + 20. Allow a small constant for the page +
-        # one batched tag load + the message-count aggregate.
+        # one batched tag load.
         assert (
             counter["n"] <= 6
         ), f"list_conversations issued {counter['n']} SELECTs (N+1)"
     finally:
         db.close()
+
+
+def _tree(i, msgs_per=4, tags=(), title=None):
+    tree = ConversationTree(
+        id=f"conv-{i}",
+        title=title if title is not None else f"conv {i}",
+        metadata=ConversationMetadata(
+            created_at=datetime.now(), updated_at=datetime.now(), tags=list(tags)
+        ),
+    )
+    parent = None
+    for j in range(msgs_per):
+        m = Message(
+            id=f"m{j}",
+            role=MessageRole.USER if j % 2 == 0 else MessageRole.ASSISTANT,
+            content=MessageContent(text=f"conversation {i} message {j}"),
+            parent_id=parent,
+            timestamp=datetime.now(),
+        )
+        tree.add_message(m)
+        parent = m.id
+    return tree
+
+
+class TestSaveConversations:
+    def test_batch_matches_sequential_saves(self, tmp_path):
+        trees = [_tree(i, tags=["bulk", f"n:{i % 3}"]) for i in range(12)]
+        with ConversationDB(str(tmp_path / "a")) as a, ConversationDB(
+            str(tmp_path / "b")
+        ) as b:
+            for t in trees:
+                a.save_conversation(t)
+            ids = b.save_conversations(
+                (_tree(i, tags=["bulk", f"n:{i % 3}"]) for i in range(12)),
+                batch_size=5,
+            )
+            assert ids == [t.id for t in trees]
+            for t in trees:
+                x, y = a.load_conversation(t.id), b.load_conversation(t.id)
+                assert x.metadata.slug == y.metadata.slug
+                assert sorted(x.metadata.tags) == sorted(y.metadata.tags)
+                assert [m.content.text for m in x.get_longest_path()] == [
+                    m.content.text for m in y.get_longest_path()
+                ]
+            assert {t["name"] for t in b.get_all_tags()} == {
+                "bulk",
+                "n:0",
+                "n:1",
+                "n:2",
+            }
+
+    def test_slugs_unique_within_batch(self, tmp_path):
+        with ConversationDB(str(tmp_path)) as db:
+            db.save_conversation(_tree(0, title="Same Title"))
+            db.save_conversations([_tree(i, title="Same Title") for i in range(1, 4)])
+            slugs = [db.load_conversation(f"conv-{i}").metadata.slug for i in range(4)]
+            assert len(set(slugs)) == 4
+
+    def test_resave_replaces_messages_and_tags(self, tmp_path):
+        with ConversationDB(str(tmp_path)) as db:
+            db.save_conversations([_tree(0, msgs_per=5, tags=["old"])])
+            # Same ID twice in one batch: the later tree wins
+            db.save_conversations(
+                [_tree(0, msgs_per=9, tags=["x"]), _tree(0, msgs_per=2, tags=["new"])]
+            )
+            conv = db.load_conversation("conv-0")
+            assert len(conv.message_map) == 2
+            assert conv.metadata.tags == ["new"]
+
+    def test_statements_do_not_scale_with_messages(self, tmp_path):
+        with ConversationDB(str(tmp_path)) as db:
+            counter = {"n": 0}
+
+            @event.listens_for(db.engine, "before_cursor_execute")
+            def _count(conn, cursor, statement, params, context, executemany):
+                counter["n"] += 1
+
+            db.save_conversations(
+                [_tree(i, msgs_per=10, tags=["t"]) for i in range(50)], batch_size=50
+            )
+            # ~1 per conversation row plus a constant; not 10 per conversation
+            assert counter["n"] < 80, counter["n"]
+            assert db.count_conversations() == 50
+
+    def test_rejects_bad_batch_size(self, tmp_path):
+        with ConversationDB(str(tmp_path)) as db:
+            with pytest.raises(ValueError):
+                db.save_conversations([], batch_size=0)
+
+
+class TestLoadConversations:
+    def test_matches_single_loads(self, tmp_path):
+        with ConversationDB(str(tmp_path)) as db:
+            db.save_conversations(
+                [_tree(i, msgs_per=i % 5, tags=[f"t{i % 2}"]) for i in range(8)]
+            )
+            ids = [f"conv-{i}" for i in (5, 0, 3, 5, 7)] + ["missing"]
+            loaded = db.load_conversations(ids)
+
+            assert list(loaded) == ["conv-5", "conv-0", "conv-3", "conv-7"]
+            for cid, tree in loaded.items():
+                single = db.load_conversation(cid)
+                assert tree.title == single.title
+                assert sorted(tree.metadata.tags) == sorted(single.metadata.tags)
+                assert {
+                    mid: (m.parent_id, m.content.text)
+                    for mid, m in tree.message_map.items()
+                } == {
+                    mid: (m.parent_id, m.content.text)
+                    for mid, m in single.message_map.items()
+                }
+                assert tree.root_message_ids == single.root_message_ids
+
+    def test_header_mode_skips_messages(self, tmp_path):
+        with ConversationDB(str(tmp_path)) as db:
+            db.save_conversation(_tree(0, tags=["x"]))
+            tree = db.load_conversations(["conv-0"], fields="header")["conv-0"]
+            assert tree.title == "conv 0"
+            assert tree.metadata.tags == ["x"]
+            assert tree.message_map == {}
+            with pytest.raises(ValueError):
+                db.load_conversations(["conv-0"], fields="everything")
+
+    def test_query_count_is_independent_of_batch_size(self, tmp_path):
+        with ConversationDB(str(tmp_path)) as db:
+            db.save_conversations([_tree(i, tags=["a", "b"]) for i in range(30)])
+            counter = {"n": 0}
+
+            @event.listens_for(db.engine, "before_cursor_execute")
+            def _count(conn, cursor, statement, params, context, executemany):
+                if statement.lstrip().upper().startswith("SELECT"):
+                    counter["n"] += 1
+
+            loaded = db.load_conversations(f"conv-{i}" for i in range(30))
+            assert len(loaded) == 30
+            # conversations + tags (selectinload) + messages
+            assert counter["n"] <= 3, f"load_conversations issued {counter['n']}"
+
+
+class TestLazyLoad:
+    def test_skeleton_matches_full_load(self, tmp_path):
+        with ConversationDB(str(tmp_path)) as db:
+            db.save_conversation(_tree(0, msgs_per=6, tags=["x"]))
+            full = db.load_conversation("conv-0")
+            lazy = db.load_conversation("conv-0", lazy=True)
+
+            assert isinstance(lazy, LazyConversationTree)
+            assert lazy.metadata.tags == ["x"]
+            assert lazy.root_message_ids == full.root_message_ids
+            assert [m.id for m in lazy.get_longest_path()] == [
+                m.id for m in full.get_longest_path()
+            ]
+            assert all(m.content.text is None for m in lazy.message_map.values())
+            assert not lazy.fully_loaded
+            assert lazy.body_lengths["m0"] > 0
+
+            assert lazy.load_bodies(["m1", "m2", "m1"]) == 2
+            assert lazy.message_map["m2"].content.text == "conversation 0 message 2"
+            assert lazy.is_loaded("m1") and not lazy.is_loaded("m3")
+            assert lazy.load_bodies(["m1"]) == 0
+
+    def test_bodies_are_fetched_per_page(self, tmp_path):
+        with ConversationDB(str(tmp_path)) as db:
+            db.save_conversation(_tree(0, msgs_per=40))
+            lazy = db.load_conversation("conv-0", lazy=True)
+            statements = []
+
+            @event.listens_for(db.engine, "before_cursor_execute")
+            def _record(conn, cursor, statement, params, context, executemany):
+                statements.append(statement)
+
+            path = lazy.get_longest_path()
+            lazy.load_bodies(m.id for m in path[-10:])
+            assert len(statements) == 1
+            assert sum(lazy.is_loaded(m.id) for m in path) == 10
+
+    def test_save_never_writes_skeletons(self, tmp_path):
+        with ConversationDB(str(tmp_path)) as db:
+            db.save_conversation(_tree(0, msgs_per=4))
+            lazy = db.load_conversation("conv-0", lazy=True)
+            lazy.load_bodies(["m0"])
+            lazy.title = "renamed"
+            db.save_conversation(lazy)
+
+            reloaded = db.load_conversation("conv-0")
+            assert reloaded.title == "renamed"
+            assert reloaded.message_map["m3"].content.text == (
+                "conversation 0 message 3"
+            )
+
+    def test_copy_and_to_dict_load_everything(self, tmp_path):
+        with ConversationDB(str(tmp_path)) as db:
+            db.save_conversation(_tree(0, msgs_per=3))
+            lazy = db.load_conversation("conv-0", lazy=True)
+            clone = lazy.copy()
+            assert lazy.fully_loaded
+            assert clone.message_map["m2"].content.text == "conversation 0 message 2"
+
+            lazy = db.load_conversation("conv-0", lazy=True)
+            texts = [m["content"]["text"] for m in lazy.to_dict()["messages"]]
+            assert texts == [f"conversation 0 message {j}" for j in range(3)]
+
+
+class TestIterTrees:
+    def test_walks_every_conversation_once_in_bounded_batches(self, tmp_path):
+        with ConversationDB(str(tmp_path)) as db:
+            db.save_conversations([_tree(i) for i in range(23)])
+            batches = list(db.iter_tree_batches(batch_size=5))
+            assert [len(b) for b in batches] == [5, 5, 5, 5, 3]
+            ids = [t.id for b in batches for t in b]
+            assert ids == sorted(f"conv-{i}" for i in range(23))
+            assert all(len(t.message_map) == 4 for b in batches for t in b)
+            assert len(list(db.iter_trees(limit=7, batch_size=3))) == 7
+
+    def test_updated_order_matches_cursor_listing(self, tmp_path):
+        with ConversationDB(str(tmp_path)) as db:
+            db.save_conversations([_tree(i) for i in range(12)])
+            listed = [
+                s.id for s in db.list_conversations(cursor="", page_size=100).items
+            ]
+            walked = [t.id for t in db.iter_trees(order="updated", batch_size=5)]
+            assert walked == listed
+
+    def test_filters(self, tmp_path):
+        with ConversationDB(str(tmp_path)) as db:
+            db.save_conversations(
+                [_tree(i, tags=["even"] if i % 2 == 0 else ["odd"]) for i in range(10)]
+            )
+            evens = {t.id for t in db.iter_trees(tags=["even"], batch_size=2)}
+            assert evens == {f"conv-{i}" for i in range(0, 10, 2)}
+            where = [ConversationModel.title.in_(["conv 1", "conv 2"])]
+            assert [t.id for t in db.iter_trees(where=where)] == ["conv-1", "conv-2"]
+            headers = list(db.iter_trees(fields="header", limit=2))
+            assert all(t.message_map == {} for t in headers)
+
+    def test_stable_while_rows_are_rewritten(self, tmp_path):
+        with ConversationDB(str(tmp_path)) as db:
+            db.save_conversations([_tree(i) for i in range(10)])
+            seen = []
+            for tree in db.iter_trees(batch_size=3):
+                seen.append(tree.id)
+                # Touch a row that has not been visited yet
+                db.save_conversation(_tree(9, title="rewritten"))
+            assert sorted(seen) == sorted(f"conv-{i}" for i in range(10))
+            assert len(seen) == len(set(seen))
+
+
+def _branching_tree():
+    tree = ConversationTree(id="branchy", title="branchy")
+    tree.add_message(
+        Message(
+            id="r",
+            role=MessageRole.USER,
+            content=MessageContent(text="root"),
+            timestamp=datetime(2024, 1, 1),
+        )
+    )
+    for j in range(2):
+        tree.add_message(
+            Message(
+                id=f"a{j}",
+                role=MessageRole.ASSISTANT,
+                content=MessageContent(text="x" * 40),
+                parent_id="r",
+                timestamp=datetime(2024, 1, 1 + j),
+            )
+        )
+    return tree
+
+
+class TestConversationStats:
+    def _stats(self, db, conv_id):
+        with db.session_scope() as session:
+            conv = session.get(ConversationModel, conv_id)
+            return (
+                conv.message_count,
+                conv.char_count,
+                conv.token_count,
+                conv.last_message_at,
+                conv.branch_count,
+            )
+
+    def test_maintained_on_save_and_resave(self, tmp_path):
+        with ConversationDB(str(tmp_path)) as db:
+            db.save_conversation(_branching_tree())
+            assert self._stats(db, "branchy") == (3, 84, 21, datetime(2024, 1, 2), 1)
+            db.save_conversation(_tree(0, msgs_per=2))
+            db.save_conversation(_tree(0, msgs_per=6))
+            assert self._stats(db, "conv-0")[0] == 6
+            assert self._stats(db, "conv-0")[4] == 0
+
+    def test_migration_backfills_existing_rows(self, tmp_path):
+        with ConversationDB(str(tmp_path)) as db:
+            db.save_conversation(_branching_tree())
+            db.save_conversation(_tree(0, msgs_per=5))
+            expected = [self._stats(db, cid) for cid in ("branchy", "conv-0")]
+            with db.engine.begin() as conn:
+                conn.execute(
+                    text(
+                        "UPDATE conversations SET message_count = 0, char_count = 0,"
+                        " token_count = 0, last_message_at = NULL, branch_count = 0"
+                    )
+                )
+                conn.execute(text("PRAGMA user_version = 6"))
+        with ConversationDB(str(tmp_path)) as db:
+            assert [self._stats(db, cid) for cid in ("branchy", "conv-0")] == expected
+
+    def test_message_count_filters_and_order(self, tmp_path):
+        with ConversationDB(str(tmp_path)) as db:
+            db.save_conversations(
+                [_tree(i, msgs_per=i + 1, tags=["a", "b"]) for i in range(6)]
+            )
+            found = db.search_conversations(
+                min_messages=2, max_messages=4, tags=["a", "b"]
+            )
+            assert sorted(s.id for s in found) == ["conv-1", "conv-2", "conv-3"]
+            assert sorted(s.message_count for s in found) == [2, 3, 4]
+            ordered = db.search_conversations(order_by="message_count")
+            assert [s.message_count for s in ordered] == [6, 5, 4, 3, 2, 1]
+            db._has_fts = False  # exercise the LIKE path over message text
+            streamed = list(db.iter_search_results(query_text="message 4"))
+            assert {s.id for s in streamed} == {"conv-4", "conv-5"}
+
+    def test_list_query_has_no_group_by(self, tmp_path):
+        with ConversationDB(str(tmp_path)) as db:
+            db.save_conversations([_tree(i) for i in range(5)])
+            statements = []
+
+            @event.listens_for(db.engine, "before_cursor_execute")
+            def _capture(conn, cursor, statement, params, context, executemany):
+                statements.append(statement.upper())
+
+            db.list_conversations(limit=5)
+            db.search_conversations(min_messages=2)
+            assert statements
+            assert not any("GROUP BY" in s or "HAVING" in s for s in statements)
+
+    def test_min_messages_uses_index(self, tmp_path):
+        with ConversationDB(str(tmp_path)) as db:
+            with db.engine.connect() as conn:
+                plan = conn.execute(
+                    text(
+                        "EXPLAIN QUERY PLAN SELECT id FROM conversations"
+                        " WHERE message_count >= 10 ORDER BY message_count, id"
+                    )
+                ).fetchall()
+            assert "idx_conv_message_count" in " ".join(str(row) for row in plan)
+
+
+@pytest.mark.slow
+def test_bulk_save_throughput(tmp_path):
+    """Conversations/sec: one save_conversation per tree vs batched saves.
+
+    Run with ``pytest -m slow -s tests/unit/test_database_perf.py`` to see
+    the numbers.
+    """
+    import time
+
+    n = 400
+
+    with ConversationDB(str(tmp_path / "single")) as db:
+        trees = [_tree(i, msgs_per=20, tags=["bench"]) for i in range(n)]
+        start = time.perf_counter()
+        for tree in trees:
+            db.save_conversation(tree)
+        single = n / (time.perf_counter() - start)
+
+    with ConversationDB(str(tmp_path / "batched")) as db:
+        trees = [_tree(i, msgs_per=20, tags=["bench"]) for i in range(n)]
+        start = time.perf_counter()
+        db.save_conversations(trees)
+        batched = n / (time.perf_counter() - start)
+        assert db.count_conversations() == n
+
+    print(
+        f"\nsave_conversation: {single:,.0f} conv/s   "
+        f"save_conversations: {batched:,.0f} conv/s   "
+        f"({batched / single:.1f}x)"
+    )
+    assert batched > single
@@ -0,0 +1,178 @@
+"""Tests for the in-memory embedding matrix and its DB cache."""
+
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+from ctk.core.database import ConversationDB
+from ctk.core.embedding_matrix import EmbeddingMatrix
+from ctk.core.models import ConversationTree
+from ctk.core.similarity import (
+    ConversationEmbedder,
+    ConversationEmbeddingConfig,
+    SimilarityComputer,
+)
+from ctk.core.vectors import encode_vector
+from ctk.embeddings.base import EmbeddingProvider, EmbeddingResponse
+
+pytestmark = pytest.mark.unit
+
+
+def _row(conv_id, values, dtype="float32"):
+    enc = encode_vector(values, dtype)
+    return SimpleNamespace(
+        conversation_id=conv_id,
+        provider="p",
+        model="m",
+        vector=enc.blob,
+        dtype=enc.dtype,
+        scale=enc.scale,
+        dimensions=enc.dimensions,
+    )
+
+
+def _cosine(a, b):
+    return float(np.dot(a, b) / (np.linalg.norm(a) * np.linalg.norm(b)))
+
+
+class TestEmbeddingMatrix:
+    def test_top_k_matches_brute_force(self):
+        rng = np.random.default_rng(0)
+        vecs = rng.normal(size=(200, 16)).astype(np.float32)
+        matrix = EmbeddingMatrix.from_rows(_row(f"c{i}", v) for i, v in enumerate(vecs))
+        query = rng.normal(size=16)
+
+        expected = sorted(
+            ((f"c{i}", _cosine(query, v)) for i, v in enumerate(vecs)),
+            key=lambda x: x[1],
+            reverse=True,
+        )[:10]
+        got = matrix.top_k(query, 10)
+        assert [cid for cid, _ in got] == [cid for cid, _ in expected]
+        assert [s for _, s in got] == pytest.approx([s for _, s in expected], abs=1e-5)
+
+    def test_exclude_allowed_and_min_score(self):
+        matrix = EmbeddingMatrix.from_rows(
+            [
+                _row("a", [1.0, 0.0]),
+                _row("b", [1.0, 0.1]),
+                _row("c", [0.0, 1.0]),
+                _row("d", [-1.0, 0.0]),
+            ]
+        )
+        assert [c for c, _ in matrix.top_k([1, 0], 10, exclude=["a"])] == [
+            "b",
+            "c",
+            "d",
+        ]
+        assert [c for c, _ in matrix.top_k([1, 0], 10, min_score=0.5)] == ["a", "b"]
+        assert [c for c, _ in matrix.top_k([1, 0], 10, allowed=["c", "d", "x"])] == [
+            "c",
+            "d",
+        ]
+
+    def test_last_row_wins_and_other_dimensions_are_skipped(self):
+        matrix = EmbeddingMatrix.from_rows(
+            [
+                _row("a", [1.0, 0.0]),
+                _row("b", [0.0, 1.0, 0.0]),
+                _row("a", [0.0, 3.0]),
+            ]
+        )
+        assert len(matrix) == 1 and "b" not in matrix
+        np.testing.assert_allclose(matrix.vector("a"), [0.0, 1.0])
+
+    def test_zero_and_mismatched_queries_return_nothing(self):
+        matrix = EmbeddingMatrix.from_rows([_row("a", [1.0, 0.0])])
+        assert matrix.top_k([0.0, 0.0], 5) == []
+        assert matrix.top_k([1.0, 0.0, 0.0], 5) == []
+        assert EmbeddingMatrix.empty().top_k([1.0], 5) == []
+
+    def test_int8_rows_are_decoded(self):
+        matrix = EmbeddingMatrix.from_rows([_row("a", [0.5, -0.25], "int8")])
+        np.testing.assert_allclose(
+            matrix.vector("a"), np.array([0.5, -0.25]) / np.hypot(0.5, 0.25), atol=1e-2
+        )
+
+
+@pytest.fixture
+def db():
+    with ConversationDB(":memory:") as database:
+        for cid in ("a", "b", "c"):
+            database.save_conversation(ConversationTree(id=cid, title=cid))
+        yield database
+
+
+class TestDatabaseCache:
+    def test_matrix_is_cached_until_embeddings_change(self, db):
+        db.save_embedding("a", [1.0, 0.0], model="m", provider="p")
+        first = db.get_embedding_matrix()
+        assert db.get_embedding_matrix() is first
+
+        db.save_embedding("b", [0.0, 1.0], model="m", provider="p")
+        second = db.get_embedding_matrix()
+        assert second is not first
+        assert set(second.ids) == {"a", "b"}
+
+        db.delete_embeddings(conversation_id="a")
+        assert db.get_embedding_matrix().ids == ["b"]
+
+        db.delete_conversation("b")
+        assert len(db.get_embedding_matrix()) == 0
+
+    def test_filters_by_provider_and_model(self, db):
+        db.save_embedding("a", [1.0, 0.0], model="m1", provider="p")
+        db.save_embedding("b", [0.0, 1.0], model="m2", provider="p")
+        assert db.get_embedding_matrix(provider="p", model="m2").ids == ["b"]
+        assert db.get_embedding_matrix(provider="other").ids == []
+
+
+class _LetterProvider(EmbeddingProvider):
+    """Counts of a few letters; deterministic and cheap."""
+
+    def __init__(self):
+        super().__init__({"model": "letters"})
+
+    def embed(self, text, **kwargs):
+        vec = [float(text.lower().count(ch)) for ch in "aeiost"]
+        return EmbeddingResponse(embedding=vec, model="letters", dimensions=6)
+
+    def embed_batch(self, texts, **kwargs):
+        return [self.embed(t) for t in texts]
+
+    def get_models(self):
+        return []
+
+    def get_dimensions(self):
+        return 6
+
+
+class TestFindSimilar:
+    def test_matrix_path_matches_pairwise(self, make_conversation):
+        texts = {
+            "q": "a tale of seasons",
+            "x": "seasons of toast",
+            "y": "zzz",
+            "z": "a tale of oats",
+            "w": "items",
+        }
+        with ConversationDB(":memory:") as db:
+            for cid, text in texts.items():
+                db.save_conversation(make_conversation(cid, text))
+            embedder = ConversationEmbedder(
+                ConversationEmbeddingConfig(provider="letters"),
+                provider=_LetterProvider(),
+            )
+            sc = SimilarityComputer(embedder, db=db)
+
+            pairwise = sc.find_similar("q", candidates=list(texts), top_k=3)
+            fast = sc.find_similar("q", top_k=3)
+
+        assert [r.conversation2_id for r in fast] == [
+            r.conversation2_id for r in pairwise
+        ]
+        assert [r.similarity for r in fast] == pytest.approx(
+            [r.similarity for r in pairwise], abs=1e-5
+        )
+        assert all(r.conversation1_id == "q" for r in fast)
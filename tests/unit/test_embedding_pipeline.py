@@ -0,0 +1,303 @@
+"""Tests for the batched, concurrent embedding pipeline."""
+
+import threading
+import time
+
+import numpy as np
+import pytest
+
+from ctk.core.database import ConversationDB
+from ctk.core.embedding_pipeline import (
+    EmbeddingCheckpoint,
+    EmbeddingPipeline,
+    content_hash,
+    text_hash,
+)
+from ctk.core.models import ConversationTree
+from ctk.core.similarity import ConversationEmbedder, ConversationEmbeddingConfig
+from ctk.embeddings.base import EmbeddingProvider, EmbeddingResponse
+
+pytestmark = pytest.mark.unit
+
+
+class _LetterProvider(EmbeddingProvider):
+    """Counts of a few letters; records batch sizes and concurrency."""
+
+    def __init__(self, delay=0.0, fail_on=None):
+        super().__init__({"model": "letters"})
+        self.delay = delay
+        self.fail_on = fail_on
+        self.batches = []
+        self.active = 0
+        self.peak = 0
+        self._lock = threading.Lock()
+
+    def embed(self, text, **kwargs):
+        vec = [float(text.lower().count(ch)) for ch in "aeiost"]
+        return EmbeddingResponse(embedding=vec, model="letters", dimensions=6)
+
+    def embed_batch(self, texts, **kwargs):
+        with self._lock:
+            self.batches.append(len(texts))
+            self.active += 1
+            self.peak = max(self.peak, self.active)
+        try:
+            time.sleep(self.delay)
+            if self.fail_on and any(self.fail_on in t for t in texts):
+                raise RuntimeError("endpoint error")
+            return [self.embed(t) for t in texts]
+        finally:
+            with self._lock:
+                self.active -= 1
+
+    def get_models(self):
+        return []
+
+    def get_dimensions(self):
+        return 6
+
+
+def _embedder(provider):
+    return ConversationEmbedder(
+        ConversationEmbeddingConfig(provider="letters"), provider=provider
+    )
+
+
+@pytest.fixture
+def corpus(make_conversation):
+    return [
+        make_conversation(f"c{i}", f"message {i} about toast", "a reply", "more text")
+        for i in range(40)
+    ] + [ConversationTree(id="empty", title="")]
+
+
+@pytest.fixture
+def db(corpus):
+    with ConversationDB(":memory:") as db:
+        db.save_conversations(corpus)
+        yield db
+
+
+class TestEmbeddingPipeline:
+    def test_matches_embed_conversation_with_fewer_requests(self, db, corpus):
+        provider = _LetterProvider()
+        embedder = _embedder(provider)
+        stats = EmbeddingPipeline(embedder, db, batch_items=32).run(corpus)
+
+        assert stats.embedded == len(corpus)
+        assert not stats.failed
+        # 40 conversations x 4 chunks (title + 3 messages); the two replies
+        # shared by every conversation are only sent once
+        assert stats.chunks == 82
+        assert stats.cached_chunks == 78
+        assert stats.requests == 3
+        assert max(provider.batches) <= 32
+
+        for conv in corpus[:5]:
+            stored = db.get_embedding(conv.id, model="letters", provider="letters")
+            assert np.allclose(stored, embedder.embed_conversation(conv), atol=1e-5)
+        assert not db.get_embedding("empty", model="letters", provider="letters").any()
+
+    def test_token_budget_bounds_requests(self, db, corpus):
+        provider = _LetterProvider()
+        EmbeddingPipeline(_embedder(provider), db, batch_tokens=4).run(corpus)
+        # Every chunk is at least one token, so at most four per request
+        assert max(provider.batches) <= 4
+
+    def test_requests_run_concurrently(self, db, corpus):
+        provider = _LetterProvider(delay=0.02)
+        EmbeddingPipeline(_embedder(provider), db, batch_items=8, concurrency=4).run(
+            corpus
+        )
+        assert 1 < provider.peak <= 4
+
+    def test_failed_request_only_fails_its_conversations(self, db, corpus, tmp_path):
+        provider = _LetterProvider(fail_on="message 7 ")
+        checkpoint = EmbeddingCheckpoint(tmp_path / "ckpt", "key")
+        stats = EmbeddingPipeline(
+            _embedder(provider), db, batch_items=4, checkpoint=checkpoint
+        ).run(corpus)
+
+        assert "c7" in stats.failed
+        assert len(stats.failed) < 5
+        assert stats.embedded == len(corpus) - len(stats.failed)
+        assert db.get_embedding("c7", model="letters", provider="letters") is None
+        done = EmbeddingCheckpoint(tmp_path / "ckpt", "key").load()
+        assert done == {c.id for c in corpus} - set(stats.failed)
+
+    def test_skip_and_duplicates(self, db, corpus):
+        stats = EmbeddingPipeline(_embedder(_LetterProvider()), db).run(
+            corpus + corpus[:3], skip=["c0", "c1"]
+        )
+        assert stats.skipped == 2
+        assert stats.embedded == len(corpus) - 2
+        assert db.get_embedding("c0", model="letters", provider="letters") is None
+
+    def test_rejects_bad_sizes(self, db):
+        with pytest.raises(ValueError):
+            EmbeddingPipeline(_embedder(_LetterProvider()), db, concurrency=0)
+
+
+class TestIncrementalEmbedding:
+    def _run(self, db, provider, corpus, **kwargs):
+        pipeline = EmbeddingPipeline(_embedder(provider), db, **kwargs)
+        hashes = db.get_embedding_content_hashes(model="letters", provider="letters")
+        return pipeline.run(corpus, stored_hashes=hashes)
+
+    def test_unchanged_conversations_are_skipped(self, db, corpus):
+        first = self._run(db, _LetterProvider(), corpus)
+        assert first.embedded == len(corpus)
+
+        provider = _LetterProvider()
+        again = self._run(db, provider, corpus)
+        assert again.unchanged == len(corpus)
+        assert again.embedded == 0
+        assert provider.batches == []
+
+    def test_only_edited_messages_reach_the_provider(
+        self, db, corpus, make_conversation
+    ):
+        self._run(db, _LetterProvider(), corpus)
+
+        edited = make_conversation("c3", "message 3 about toast", "a reply", "new text")
+        db.save_conversation(edited)
+        provider = _LetterProvider()
+        stats = self._run(db, provider, [edited] + corpus[4:])
+
+        assert stats.embedded == 1
+        assert stats.unchanged == len(corpus) - 4
+        assert provider.batches == [1]
+        assert stats.cached_chunks == 3
+        stored = db.get_embedding("c3", model="letters", provider="letters")
+        expected = _embedder(_LetterProvider()).embed_conversation(edited)
+        assert np.allclose(stored, expected, atol=1e-5)
+
+    def test_chunk_cache_can_be_bypassed(self, db, corpus):
+        self._run(db, _LetterProvider(), corpus[:5])
+        provider = _LetterProvider()
+        stats = EmbeddingPipeline(_embedder(provider), db, use_chunk_cache=False).run(
+            corpus[:5]
+        )
+        assert stats.cached_chunks == 5 * 4 - stats.chunks
+        assert stats.chunks == 12
+
+    def test_uncacheable_provider_skips_chunk_cache(self, db, corpus):
+        provider = _LetterProvider()
+        provider.cacheable = False
+        EmbeddingPipeline(_embedder(provider), db).run(corpus[:5])
+        assert (
+            db.get_chunk_embeddings(
+                [text_hash("c0")],
+                provider="letters",
+                model="letters",
+                config_hash=ConversationEmbeddingConfig(
+                    provider="letters"
+                ).chunk_hash(),
+            )
+            == {}
+        )
+
+    def test_content_hash_tracks_config(self):
+        a = content_hash(["x", "y"], [1.0, 2.0], "cfg")
+        assert a == content_hash(["x", "y"], [1.0, 2.0], "cfg")
+        assert a != content_hash(["x", "y"], [1.0, 3.0], "cfg")
+        assert a != content_hash(["x", "y"], [1.0, 2.0], "other")
+
+        base = ConversationEmbeddingConfig(provider="openai")
+        reweighted = ConversationEmbeddingConfig(
+            provider="openai", role_weights={"user": 1.0}
+        )
+        assert base.to_hash() != reweighted.to_hash()
+        assert base.chunk_hash() == reweighted.chunk_hash()
+        other_model = ConversationEmbeddingConfig(
+            provider="openai", provider_config={"model": "other"}
+        )
+        assert base.chunk_hash() != other_model.chunk_hash()
+
+
+class TestEmbeddingCheckpoint:
+    def test_resume_round_trip(self, tmp_path):
+        path = tmp_path / "ckpt"
+        checkpoint = EmbeddingCheckpoint(path, "abc")
+        assert checkpoint.load() == set()
+        checkpoint.mark(["a", "b"])
+        checkpoint.mark(["c"])
+
+        resumed = EmbeddingCheckpoint(path, "abc")
+        assert resumed.load() == {"a", "b", "c"}
+        resumed.mark(["d"])
+        assert EmbeddingCheckpoint(path, "abc").load() == {"a", "b", "c", "d"}
+
+        resumed.clear()
+        assert not path.exists()
+
+    def test_other_configuration_is_ignored(self, tmp_path):
+        path = tmp_path / "ckpt"
+        EmbeddingCheckpoint(path, "old").mark(["a"])
+        fresh = EmbeddingCheckpoint(path, "new")
+        assert fresh.load() == set()
+        fresh.mark(["b"])
+        assert EmbeddingCheckpoint(path, "new").load() == {"b"}
+
+
+class TestSaveEmbeddings:
+    def test_bulk_insert_update_and_ids(self, db):
+        written = db.save_embeddings(
+            [("c0", [1.0, 0.0]), ("c1", [0.0, 1.0])], model="m", provider="p"
+        )
+        assert written == 2
+        db.save_embeddings([("c0", [0.5, 0.5])], model="m", provider="p", batch_size=1)
+
+        assert np.allclose(db.get_embedding("c0", model="m", provider="p"), [0.5, 0.5])
+        assert db.get_embedding_content_hashes(model="m", provider="p") == {
+            "c0": None,
+            "c1": None,
+        }
+        assert len(db.get_all_embeddings(model="m")) == 2
+
+    def test_content_hashes_are_stored(self, db):
+        db.save_embeddings(
+            [("c0", [1.0, 0.0]), ("c1", [0.0, 1.0])],
+            model="m",
+            provider="p",
+            config_hash="cfg",
+            content_hashes={"c0": "h0"},
+        )
+        assert db.get_embedding_content_hashes(model="m", provider="p") == {
+            "c0": "h0",
+            "c1": None,
+        }
+        db.save_embedding("c0", [1.0, 1.0], model="m", provider="p")
+        assert db.get_embedding_content_hashes(model="m", provider="p")["c0"] is None
+
+    def test_chunk_cache_round_trip(self, db):
+        added = db.save_chunk_embeddings(
+            [("h1", [1.0, 2.0]), ("h2", [3.0, 4.0])],
+            provider="p",
+            model="m",
+            config_hash="c",
+        )
+        assert added == 2
+        # Already cached hashes are left alone
+        assert (
+            db.save_chunk_embeddings(
+                [("h1", [9.0, 9.0])], provider="p", model="m", config_hash="c"
+            )
+            == 0
+        )
+        found = db.get_chunk_embeddings(
+            ["h1", "h2", "h3"], provider="p", model="m", config_hash="c"
+        )
+        assert set(found) == {"h1", "h2"}
+        assert np.allclose(found["h1"], [1.0, 2.0])
+        other = db.get_chunk_embeddings(
+            ["h1"], provider="p", model="m", config_hash="x"
+        )
+        assert other == {}
+
+    def test_missing_conversation_rolls_back_batch(self, db):
+        with pytest.raises(ValueError):
+            db.save_embeddings(
+                [("c0", [1.0, 0.0]), ("nope", [0.0, 1.0])], model="m", provider="p"
+            )
+        assert db.get_embedding_content_hashes(model="m", provider="p") == {}
@@ -0,0 +1,192 @@
+"""Tests for incremental directory exports (ctk.core.export_manifest)."""
+
+import json
+
+import pytest
+
+from ctk.core.constants import EXPORT_MANIFEST_FILE
+from ctk.core.export_manifest import ExportManifest, conversation_fingerprint
+from ctk.core.models import ConversationTree
+from ctk.exporters.echo import ECHOExporter
+from ctk.exporters.hugo import HugoExporter
+from ctk.exporters.markdown import MarkdownExporter
+
+pytestmark = pytest.mark.unit
+
+# Messages of every test conversation
+_EXCHANGE = ("Hi", "Hi there")
+
+
+def _run(output_dir, conversations, options=None, incremental=True):
+    """One manifest-driven export writing ``<id>/out.txt`` per conversation."""
+    manifest = ExportManifest(
+        output_dir, "test", "1.0", options, incremental=incremental
+    )
+    rendered = []
+    for conv in manifest.changed(conversations):
+        path = output_dir / conv.id / "out.txt"
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(conv.title)
+        manifest.record(conv.id, [path])
+        rendered.append(conv.id)
+    return rendered, manifest.finish()
+
+
+class TestFingerprint:
+    def test_stable_for_equal_trees(self, make_conversation):
+        a = make_conversation("c1", *_EXCHANGE)
+        b = ConversationTree.from_dict(a.to_dict())
+        assert conversation_fingerprint(a) == conversation_fingerprint(b)
+
+    def test_changes_with_content(self, make_conversation):
+        conv = make_conversation("c1", *_EXCHANGE)
+        before = conversation_fingerprint(conv)
+        conv.message_map["m1"].content.text = "Edited"
+        assert conversation_fingerprint(conv) != before
+
+
+class TestExportManifest:
+    def test_first_run_renders_everything(self, tmp_path, make_conversation):
+        rendered, stats = _run(
+            tmp_path,
+            [make_conversation("a", *_EXCHANGE), make_conversation("b", *_EXCHANGE)],
+        )
+        assert rendered == ["a", "b"]
+        assert (stats.added, stats.unchanged) == (2, 0)
+        saved = json.loads((tmp_path / EXPORT_MANIFEST_FILE).read_text())
+        assert saved["conversations"]["a"]["files"] == ["a/out.txt"]
+
+    def test_unchanged_conversations_skipped(self, tmp_path, make_conversation):
+        convs = [make_conversation("a", *_EXCHANGE), make_conversation("b", *_EXCHANGE)]
+        _run(tmp_path, convs)
+        rendered, stats = _run(tmp_path, convs)
+        assert rendered == []
+        assert (stats.added, stats.updated, stats.unchanged) == (0, 0, 2)
+        assert (tmp_path / "a" / "out.txt").exists()
+
+    def test_changed_conversation_rerendered(self, tmp_path, make_conversation):
+        convs = [make_conversation("a", *_EXCHANGE), make_conversation("b", *_EXCHANGE)]
+        _run(tmp_path, convs)
+        convs[1].title = "Retitled"
+        rendered, stats = _run(tmp_path, convs)
+        assert rendered == ["b"]
+        assert (stats.updated, stats.unchanged) == (1, 1)
+        assert (tmp_path / "b" / "out.txt").read_text() == "Retitled"
+
+    def test_removed_conversation_deleted_and_dir_pruned(
+        self, tmp_path, make_conversation
+    ):
+        convs = [make_conversation("a", *_EXCHANGE), make_conversation("b", *_EXCHANGE)]
+        _run(tmp_path, convs)
+        _, stats = _run(tmp_path, convs[:1])
+        assert stats.removed == 1
+        assert not (tmp_path / "b").exists()
+        assert (tmp_path / "a" / "out.txt").exists()
+
+    def test_options_change_rerenders(self, tmp_path, make_conversation):
+        convs = [make_conversation("a", *_EXCHANGE)]
+        _run(tmp_path, convs, {"draft": False})
+        rendered, _ = _run(tmp_path, convs, {"draft": True})
+        assert rendered == ["a"]
+
+    def test_full_export_ignores_manifest(self, tmp_path, make_conversation):
+        convs = [make_conversation("a", *_EXCHANGE)]
+        _run(tmp_path, convs)
+        rendered, stats = _run(tmp_path, convs, incremental=False)
+        assert rendered == ["a"]
+        assert stats.updated == 1
+
+    def test_missing_output_rerendered(self, tmp_path, make_conversation):
+        convs = [make_conversation("a", *_EXCHANGE)]
+        _run(tmp_path, convs)
+        (tmp_path / "a" / "out.txt").unlink()
+        rendered, _ = _run(tmp_path, convs)
+        assert rendered == ["a"]
+
+    def test_corrupt_manifest_ignored(self, tmp_path, make_conversation):
+        (tmp_path / EXPORT_MANIFEST_FILE).write_text("{not json")
+        rendered, stats = _run(tmp_path, [make_conversation("a", *_EXCHANGE)])
+        assert rendered == ["a"]
+        assert stats.added == 1
+
+    def test_failed_render_keeps_previous_output(self, tmp_path, make_conversation):
+        convs = [make_conversation("a", *_EXCHANGE)]
+        _run(tmp_path, convs)
+        convs[0].title = "Changed"
+
+        manifest = ExportManifest(tmp_path, "test", "1.0")
+        for conv in manifest.changed(convs):
+            manifest.keep(conv.id)
+        stats = manifest.finish()
+        assert stats.removed == 0
+        assert (tmp_path / "a" / "out.txt").read_text() == "a"
+
+        # No fingerprint was stored, so the next run tries again
+        rendered, _ = _run(tmp_path, convs)
+        assert rendered == ["a"]
+
+    def test_never_deletes_outside_output_dir(self, tmp_path):
+        outside = tmp_path / "keep.txt"
+        outside.write_text("x")
+        out = tmp_path / "out"
+        out.mkdir()
+        (out / EXPORT_MANIFEST_FILE).write_text(
+            json.dumps(
+                {
+                    "version": 1,
+                    "exporter": "test",
+                    "options": "",
+                    "conversations": {"gone": {"hash": "", "files": ["../keep.txt"]}},
+                }
+            )
+        )
+        _, stats = _run(out, [])
+        assert stats.removed == 1
+        assert outside.exists()
+
+
+class TestIncrementalExporters:
+    def test_markdown_directory(self, tmp_path, make_conversation):
+        exporter = MarkdownExporter()
+        convs = [
+            make_conversation("a", *_EXCHANGE, title="Alpha"),
+            make_conversation("b", *_EXCHANGE, title="Beta"),
+        ]
+        exporter.export_to_file(convs, str(tmp_path) + "/")
+        assert len(list(tmp_path.glob("*.md"))) == 2
+
+        stats = exporter.export_to_file(convs[:1], str(tmp_path) + "/")
+        assert str(stats) == "0 added, 0 updated, 1 unchanged, 1 removed"
+        assert [p.name for p in tmp_path.glob("*.md")] == [
+            f.name for f in tmp_path.glob("*alpha*.md")
+        ]
+
+    def test_echo_index_lists_unchanged_conversations(
+        self, tmp_path, make_conversation
+    ):
+        exporter = ECHOExporter()
+        convs = [make_conversation("a", *_EXCHANGE), make_conversation("b", *_EXCHANGE)]
+        exporter.export_to_directory(convs, str(tmp_path))
+        summary = exporter.export_to_directory(convs, str(tmp_path))
+
+        assert summary["unchanged"] == 2
+        index = json.loads((tmp_path / "index.json").read_text())
+        assert [c["id"] for c in index["conversations"]] == ["a", "b"]
+
+    def test_hugo_retitle_replaces_bundle(self, tmp_path, make_conversation):
+        exporter = HugoExporter()
+        conv = make_conversation("abcdef12", *_EXCHANGE, title="Old Title")
+        exporter.export_to_file(
+            [conv], str(tmp_path), date_prefix=False, hugo_organize="none"
+        )
+        assert [p.name for p in tmp_path.iterdir() if p.is_dir()] == [
+            "old-title-abcdef12"
+        ]
+
+        conv.title = "New Title"
+        exporter.export_to_file(
+            [conv], str(tmp_path), date_prefix=False, hugo_organize="none"
+        )
+        assert [p.name for p in tmp_path.iterdir() if p.is_dir()] == [
+            "new-title-abcdef12"
+        ]
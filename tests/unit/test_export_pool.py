@@ -0,0 +1,62 @@
+"""Tests for ordered process-pool rendering used by ``ctk export --jobs``."""
+
+import os
+
+import pytest
+
+from ctk.core.export_pool import ordered_map, resolve_jobs
+
+pytestmark = pytest.mark.unit
+
+
+class TestResolveJobs:
+    def test_default_and_one_run_inline(self):
+        assert resolve_jobs(None) == 1
+        assert resolve_jobs(1) == 1
+
+    def test_zero_means_every_cpu(self):
+        assert resolve_jobs(0) == (os.cpu_count() or 1)
+
+    def test_negative_rejected(self):
+        with pytest.raises(ValueError):
+            resolve_jobs(-2)
+
+
+class TestOrderedMap:
+    @pytest.mark.parametrize("jobs", [1, 3])
+    def test_results_follow_input_order(self, jobs):
+        values = list(range(-50, 50))
+        assert list(ordered_map(abs, values, jobs)) == [abs(v) for v in values]
+
+    def test_inline_runs_in_this_process(self):
+        pids = list(ordered_map(lambda _: os.getpid(), [1, 2], 1))
+        assert pids == [os.getpid()] * 2
+
+    def test_pool_runs_in_workers(self):
+        pids = set(ordered_map(_pid, range(8), 2))
+        assert os.getpid() not in pids
+
+    def test_in_flight_work_is_bounded(self):
+        pulled = []
+
+        def items():
+            for i in range(20):
+                pulled.append(i)
+                yield i
+
+        results = ordered_map(abs, items(), jobs=2, prefetch=1)
+        assert next(results) == 0
+        # Two submitted, plus the one that found the window full
+        assert len(pulled) == 3
+        results.close()
+
+    def test_worker_error_raised_at_its_position(self):
+        results = ordered_map(int, ["1", "2", "x", "4"], 2)
+        assert next(results) == 1
+        assert next(results) == 2
+        with pytest.raises(ValueError):
+            next(results)
+
+
+def _pid(_):
+    return os.getpid()
@@ -2,7 +2,9 @@
 Unit tests for exporters
 """
 
+import io
 import json
+import sqlite3
 import tempfile
 from pathlib import Path
 
@@ -10,6 +12,8 @@ import pytest
 
 from ctk.core.models import (ConversationMetadata, ConversationTree, Message,
                              MessageContent, MessageRole)
+from ctk.core.plugin import ExporterPlugin
+from ctk.exporters.csv_exporter import CSVExporter
 from ctk.exporters.echo import ECHOExporter
 from ctk.exporters.json import JSONExporter
 from ctk.exporters.jsonl import JSONLExporter
@@ -477,19 +481,31 @@ class TestECHOExporter:
     @pytest.mark.unit
     def test_export_with_include_db(self, echo_exporter, sample_conversation, temp_dir):
         """Test database copy when include_db=True."""
-        # Create a temporary database file
+        # A WAL database whose latest row has not been checkpointed yet
         db_file = temp_dir / "source.db"
-        db_file.write_text("dummy database content")
+        source = sqlite3.connect(str(db_file))
+        source.execute("PRAGMA journal_mode=WAL")
+        source.execute("PRAGMA wal_autocheckpoint=0")
+        source.execute("CREATE TABLE t (x)")
+        source.execute("INSERT INTO t VALUES (42)")
+        source.commit()
 
         output_dir = temp_dir / "output"
-        echo_exporter.export_to_directory(
-            [sample_conversation],
-            str(output_dir),
-            include_db=True,
-            db_path=str(db_file),
-        )
+        try:
+            echo_exporter.export_to_directory(
+                [sample_conversation],
+                str(output_dir),
+                include_db=True,
+                db_path=str(db_file),
+            )
+        finally:
+            source.close()
 
-        assert (output_dir / "conversations.db").exists()
+        copy = sqlite3.connect(str(output_dir / "conversations.db"))
+        try:
+            assert copy.execute("SELECT x FROM t").fetchall() == [(42,)]
+        finally:
+            copy.close()
 
     @pytest.mark.unit
     def test_export_with_include_site(
@@ -1255,3 +1271,175 @@ class TestExporterEdgeCases:
         data = json.loads(result)
         assert len(data) == 1
         assert len(data[0]["messages"]) == 2
+
+
+# ---------------------------------------------------------------------------
+# Streaming export
+# ---------------------------------------------------------------------------
+
+
+def _numbered_conversations(count):
+    """Build ``count`` small linear conversations with distinct ids."""
+    convs = []
+    for i in range(count):
+        conv = _make_conversation(
+            title=f"Conversation {i}",
+            messages=[
+                (f"c{i}-m1", MessageRole.USER, f"Question {i}", None),
+                (f"c{i}-m2", MessageRole.ASSISTANT, f"Answer {i}", f"c{i}-m1"),
+            ],
+        )
+        conv.id = f"conv-{i}"
+        convs.append(conv)
+    return convs
+
+
+class TestExportStream:
+    """export_stream writes the same output as export_data, one tree at a time."""
+
+    STREAMING = [
+        (JSONLExporter, {}),
+        (JSONLExporter, {"format": "chat"}),
+        (CSVExporter, {}),
+        (CSVExporter, {"mode": "messages", "delimiter": "\t"}),
+        (JSONExporter, {"format_style": "openai"}),
+        (JSONExporter, {"format_style": "generic", "pretty_print": False}),
+        (MarkdownExporter, {"path_selection": "all"}),
+    ]
+
+    @pytest.mark.unit
+    @pytest.mark.parametrize("exporter_cls,options", STREAMING)
+    def test_stream_matches_export_data(self, exporter_cls, options):
+        convs = _numbered_conversations(3)
+        exporter = exporter_cls()
+        assert exporter.streaming
+
+        fh = io.StringIO()
+        written = exporter.export_stream(iter(convs), fh, **options)
+
+        assert written == 3
+        assert fh.getvalue() == exporter.export_data(convs, **options)
+
+    @pytest.mark.unit
+    @pytest.mark.parametrize("exporter_cls,options", STREAMING)
+    def test_stream_empty_matches_export_data(self, exporter_cls, options):
+        exporter = exporter_cls()
+        fh = io.StringIO()
+
+        assert exporter.export_stream(iter([]), fh, **options) == 0
+        assert fh.getvalue() == exporter.export_data([], **options)
+
+    @pytest.mark.unit
+    @pytest.mark.parametrize("pretty_print", [True, False])
+    def test_json_ctk_envelope_streams_valid_json(self, pretty_print):
+        convs = _numbered_conversations(2)
+        exporter = JSONExporter()
+        fh = io.StringIO()
+
+        exporter.export_stream(iter(convs), fh, pretty_print=pretty_print)
+
+        streamed = json.loads(fh.getvalue())
+        expected = json.loads(
+            exporter.export_conversations(convs, pretty_print=pretty_print)
+        )
+        streamed.pop("exported_at")
+        expected.pop("exported_at")
+        assert streamed == expected
+        assert [c["id"] for c in streamed["conversations"]] == ["conv-0", "conv-1"]
+
+    @pytest.mark.unit
+    def test_stream_pulls_trees_lazily(self):
+        """Each tree is written before the next one is requested."""
+        convs = _numbered_conversations(3)
+        fh = io.StringIO()
+        seen_before_pull = []
+
+        def trees():
+            for conv in convs:
+                seen_before_pull.append(fh.getvalue().count("\n"))
+                yield conv
+
+        JSONLExporter().export_stream(trees(), fh)
+
+        assert seen_before_pull == [0, 0, 1]
+
+    @pytest.mark.unit
+    def test_export_to_file_accepts_generator(self, tmp_path):
+        convs = _numbered_conversations(4)
+        output = tmp_path / "out.jsonl"
+
+        JSONLExporter().export_to_file((c for c in convs), str(output))
+
+        lines = output.read_text(encoding="utf-8").split("\n")
+        assert len(lines) == 4
+        assert json.loads(lines[3])["messages"][0]["content"] == "Question 3"
+
+    @pytest.mark.unit
+    def test_default_export_stream_materializes(self):
+        """Exporters without their own export_stream fall back to export_data."""
+
+        class _IdsExporter(ExporterPlugin):
+            name = "ids"
+
+            def validate(self, data):
+                return True
+
+            def export_data(self, conversations, **kwargs):
+                return [conv.id for conv in conversations]
+
+        exporter = _IdsExporter()
+        assert not exporter.streaming
+
+        fh = io.StringIO()
+        written = exporter.export_stream(iter(_numbered_conversations(2)), fh)
+
+        assert written == 2
+        assert json.loads(fh.getvalue()) == ["conv-0", "conv-1"]
+
+
+class TestParallelExport:
+    """``jobs`` renders on worker processes without changing the output."""
+
+    @pytest.mark.unit
+    def test_jsonl_and_markdown_parallel_match_serial(self):
+        convs = _numbered_conversations(6)
+        for exporter in (JSONLExporter(), MarkdownExporter()):
+            serial, parallel = io.StringIO(), io.StringIO()
+            exporter.export_stream(iter(convs), serial)
+            assert exporter.export_stream(iter(convs), parallel, jobs=2) == 6
+            assert parallel.getvalue() == serial.getvalue()
+
+    @pytest.mark.unit
+    def test_markdown_directory_parallel_match_serial(self, tmp_path):
+        convs = _numbered_conversations(5)
+        MarkdownExporter().export_to_file(convs, str(tmp_path / "serial") + "/")
+        MarkdownExporter().export_to_file(
+            convs, str(tmp_path / "parallel") + "/", jobs=2
+        )
+
+        serial = {p.name: p.read_text() for p in (tmp_path / "serial").glob("*.md")}
+        parallel = {
+            p.name: p.read_text() for p in (tmp_path / "parallel").glob("*.md")
+        }
+        assert len(serial) == 5
+        assert parallel == serial
+
+    @pytest.mark.unit
+    def test_echo_parallel_keeps_index_order(self, tmp_path):
+        convs = _numbered_conversations(5)
+        ECHOExporter().export_to_directory(convs, str(tmp_path), jobs=2)
+
+        index = json.loads((tmp_path / "index.json").read_text())
+        assert [c["id"] for c in index["conversations"]] == [c.id for c in convs]
+        for conv in convs:
+            conv_dir = tmp_path / "conversations" / conv.id
+            assert json.loads((conv_dir / "metadata.json").read_text())
+            assert "Question" in (conv_dir / "conversation.md").read_text()
+
+    @pytest.mark.unit
+    def test_html_prepare_data_parallel_match_serial(self):
+        from ctk.exporters.html import HTMLExporter
+
+        convs = _numbered_conversations(5)
+        exporter = HTMLExporter()
+        assert exporter._prepare_data(convs, jobs=2) == exporter._prepare_data(convs)
@@ -4,6 +4,7 @@ import uuid
 from datetime import datetime
 
 import pytest
+from sqlalchemy import text
 
 from ctk.core.database import ConversationDB
 from ctk.core.models import (
@@ -12,6 +13,8 @@ from ctk.core.models import (
     Message,
     MessageContent,
     MessageRole,
+    ReasoningBlock,
+    ToolCall,
 )
 
 pytestmark = pytest.mark.unit
@@ -119,3 +122,173 @@ def test_empty_query_returns_all_not_filtered(tmp_path):
         assert cid2 in ids
     finally:
         db.close()
+
+
+def _save_many(db, cid, title, bodies):
+    tree = ConversationTree(id=cid, title=title)
+    for i, body in enumerate(bodies):
+        tree.add_message(
+            Message(
+                id=f"m{i}", role=MessageRole.USER, content=MessageContent(text=body)
+            )
+        )
+    db.save_conversation(tree)
+
+
+class TestRankedSearch:
+    def test_content_hits_are_ranked_and_titles_boosted(self, tmp_path):
+        with ConversationDB(str(tmp_path)) as db:
+            _save_many(db, "weak", "misc", ["python " + "filler " * 50])
+            _save_many(db, "strong", "misc", ["python python python"])
+            _save_many(db, "titled", "python notes", ["unrelated"])
+            results = db.search_conversations("python", order_by="relevance")
+            assert [r.id for r in results] == ["titled", "strong", "weak"]
+            assert results[0].score > results[1].score > results[2].score
+
+    def test_sum_aggregate_rewards_many_matching_messages(self, tmp_path):
+        with ConversationDB(str(tmp_path)) as db:
+            _save_many(db, "a-once", "x", ["python here", "other", "other"])
+            _save_many(db, "b-thrice", "x", ["python here"] * 3)
+            by_sum = db.search_conversations(
+                "python", order_by="relevance", rank_aggregate="sum"
+            )
+            assert [r.id for r in by_sum] == ["b-thrice", "a-once"]
+            with pytest.raises(ValueError):
+                db.search_conversations(
+                    "python", order_by="relevance", rank_aggregate="avg"
+                )
+
+    def test_cursor_pages_reach_every_hit(self, tmp_path):
+        with ConversationDB(str(tmp_path)) as db:
+            for i in range(260):
+                _save_many(db, f"c{i:03d}", "x", ["needle " * (1 + i % 5)])
+            everything = db.search_conversations(
+                "needle", order_by="relevance", limit=1000
+            )
+            assert len(everything) == 260
+
+            walked, cursor = [], ""
+            while cursor is not None:
+                page = db.search_conversations(
+                    "needle", order_by="relevance", cursor=cursor, page_size=40
+                )
+                walked.extend(r.id for r in page.items)
+                cursor = page.next_cursor
+            assert walked == [r.id for r in everything]
+
+            streamed = db.iter_search_results("needle", order_by="relevance")
+            assert [r.id for r in streamed] == walked
+
+    def test_results_carry_snippets(self, tmp_path):
+        with ConversationDB(str(tmp_path)) as db:
+            _save_many(db, "body", "misc", ["the quick brown fox jumps"])
+            _save_many(db, "title", "fox facts", ["nothing here"])
+            results = db.search_conversations("fox", order_by="relevance")
+            snippets = {r.id: r.snippet for r in results}
+            assert "**fox**" in snippets["body"]
+            assert snippets["title"] == "**fox** facts"
+            assert results[0].to_dict()["snippet"] == results[0].snippet
+
+    def test_content_only_and_title_only(self, tmp_path):
+        with ConversationDB(str(tmp_path)) as db:
+            _save_many(db, "body", "misc", ["python here"])
+            _save_many(db, "titled", "python notes", ["unrelated"])
+            content = db.search_conversations(
+                "python", content_only=True, order_by="relevance"
+            )
+            assert [r.id for r in content] == ["body"]
+            titles = db.search_conversations(
+                "python", title_only=True, order_by="relevance"
+            )
+            assert [r.id for r in titles] == ["titled"]
+
+    def test_non_relevance_order_still_filters_by_fts(self, tmp_path):
+        with ConversationDB(str(tmp_path)) as db:
+            _save_many(db, "hit", "misc", ["kangaroo"])
+            _save_many(db, "miss", "misc", ["wallaby"])
+            results = db.search_conversations("kangaroo")
+            assert [r.id for r in results] == ["hit"]
+
+
+def _save_with_extras(db, title, reasoning, tool_args):
+    tree = ConversationTree(id=str(uuid.uuid4()), title=title)
+    content = MessageContent(text="plain answer")
+    content.reasoning.append(ReasoningBlock(text=reasoning))
+    content.tool_calls.append(ToolCall(name="web_search", arguments=tool_args))
+    tree.add_message(
+        Message(id=str(uuid.uuid4()), role=MessageRole.ASSISTANT, content=content)
+    )
+    db.save_conversation(tree)
+    return tree.id
+
+
+class TestSearchIndex:
+    def test_reasoning_and_tool_calls_are_searchable(self, tmp_path):
+        db = ConversationDB(str(tmp_path))
+        try:
+            cid = _save_with_extras(
+                db, "extras", "considering the quasar hypothesis", {"q": "zeppelin"}
+            )
+            for term in ("quasar", "zeppelin", "web_search"):
+                results = db.search_conversations(query_text=term)
+                assert [r.id for r in results] == [cid], term
+        finally:
+            db.close()
+
+    def test_index_uses_external_content(self, tmp_path):
+        db = ConversationDB(str(tmp_path))
+        try:
+            with db.engine.connect() as conn:
+                sql = conn.execute(
+                    text("SELECT sql FROM sqlite_master WHERE name = 'messages_fts'")
+                ).scalar()
+            assert "content='messages_search'" in sql
+        finally:
+            db.close()
+
+    def test_batched_rebuild_reports_progress(self, tmp_path):
+        db = ConversationDB(str(tmp_path))
+        try:
+            for i in range(5):
+                _save(db, f"title {i}", f"needle body {i}")
+            seen = []
+            indexed = db.rebuild_search_index(
+                batch_size=2,
+                restart=True,
+                progress=lambda *step: seen.append(step),
+            )
+            assert indexed == {"conversations_fts": 5, "messages_fts": 5}
+            assert ("messages_fts", 2, 5) in seen
+            assert ("messages_fts", 5, 5) in seen
+            assert len(db.search_conversations(query_text="needle")) == 5
+        finally:
+            db.close()
+
+    def test_incomplete_index_falls_back_to_like(self, tmp_path):
+        db = ConversationDB(str(tmp_path))
+        try:
+            cid = _save(db, "pending", "marmalade body")
+            with db.engine.begin() as conn:
+                conn.execute(
+                    text(
+                        "INSERT INTO messages_fts (messages_fts)"
+                        " VALUES ('delete-all')"
+                    )
+                )
+                conn.execute(text("UPDATE search_index_state SET complete = 0"))
+            db._has_fts = db._compute_has_fts5()
+            assert not db._has_fts5()
+            results = db.search_conversations(query_text="marmalade")
+            assert [r.id for r in results] == [cid]
+            db.rebuild_search_index()
+            assert db._has_fts5()
+        finally:
+            db.close()
+
+    def test_rebuild_rejects_bad_batch_size(self, tmp_path):
+        db = ConversationDB(str(tmp_path))
+        try:
+            with pytest.raises(ValueError):
+                db.rebuild_search_index(batch_size=0)
+        finally:
+            db.close()
@@ -0,0 +1,122 @@
+"""Tests for the sharded, lazily loaded HTML archive (``--sharded``)."""
+
+import json
+
+import pytest
+
+from ctk.core.constants import HTML_INDEX_BUCKETS, HTML_INDEX_MAX_TERM
+from ctk.core.models import (
+    ConversationMetadata,
+    ConversationTree,
+    Message,
+    MessageContent,
+    MessageRole,
+)
+from ctk.exporters.html import HTMLExporter, _index_terms
+
+pytestmark = pytest.mark.unit
+
+
+def _conversations(n):
+    convs = []
+    for i in range(n):
+        conv = ConversationTree(
+            id=f"conv-{i}",
+            title=f"Topic {i} {'rust' if i % 2 else 'python'}",
+            metadata=ConversationMetadata(source="test", tags=[f"tag{i % 3}"]),
+        )
+        conv.add_message(
+            Message(
+                id="m1",
+                role=MessageRole.USER,
+                content=MessageContent(text=f"Question number{i} about café"),
+            )
+        )
+        convs.append(conv)
+    return convs
+
+
+def _load(path):
+    return json.loads(path.read_text(encoding="utf-8"))
+
+
+def _lookup(data_dir, term):
+    """Decode a term's postings into conversation IDs, like the browser does"""
+    bucket = _load(data_dir / "index" / f"{ord(term[0]) % HTML_INDEX_BUCKETS}.json")
+    summaries = _load(data_dir / "summaries.json")["conversations"]
+    position, ids = 0, []
+    for delta in bucket.get(term, []):
+        position += delta
+        ids.append(summaries[position]["id"])
+    return ids
+
+
+@pytest.fixture
+def archive(tmp_path):
+    HTMLExporter().export_to_file(
+        _conversations(7), str(tmp_path / "site"), sharded=True, shard_size=3
+    )
+    return tmp_path / "site"
+
+
+class TestIndexTerms:
+    def test_lowercases_and_dedupes(self):
+        conv = {
+            "title": "Rust rust",
+            "tags": ["Async"],
+            "messages": [{"content": "Café, CAFÉ! x"}],
+        }
+        assert _index_terms(conv) == ["async", "café", "rust"]
+
+    def test_skips_overlong_tokens(self):
+        conv = {"title": "a" * 200 + " ok", "tags": [], "messages": []}
+        assert _index_terms(conv) == ["ok"]
+
+
+class TestShardedExport:
+    def test_layout(self, archive):
+        assert (archive / "index.html").exists()
+        assert sorted(p.name for p in (archive / "data" / "shards").iterdir()) == [
+            "00000.json",
+            "00001.json",
+            "00002.json",
+        ]
+        assert len(list((archive / "data" / "index").iterdir())) == HTML_INDEX_BUCKETS
+
+    def test_summaries_carry_no_messages(self, archive):
+        data = _load(archive / "data" / "summaries.json")
+        assert data["shard_size"] == 3
+        assert data["index_max_term"] == HTML_INDEX_MAX_TERM
+        assert data["stats"]["total_conversations"] == 7
+        first = data["conversations"][0]
+        assert "messages" not in first
+        assert first["message_count"] == 1
+        assert [c["shard"] for c in data["conversations"]] == [0, 0, 0, 1, 1, 1, 2]
+
+    def test_shards_hold_bodies(self, archive):
+        shard = _load(archive / "data" / "shards" / "00001.json")
+        assert [body["id"] for body in shard] == ["conv-3", "conv-4", "conv-5"]
+        assert shard[0]["messages"][0]["content"] == "Question number3 about café"
+        assert shard[0]["root_message_ids"] == ["m1"]
+
+    def test_search_index_postings(self, archive):
+        data_dir = archive / "data"
+        assert _lookup(data_dir, "rust") == ["conv-1", "conv-3", "conv-5"]
+        assert _lookup(data_dir, "number4") == ["conv-4"]
+        assert _lookup(data_dir, "tag2") == ["conv-2", "conv-5"]
+        assert len(_lookup(data_dir, "café")) == 7
+
+    def test_html_loads_data_lazily(self, archive):
+        html = (archive / "index.html").read_text(encoding="utf-8")
+        assert "data/summaries.json" in html
+        assert "function searchIndex" in html
+        assert "number3" not in html
+
+    def test_parallel_matches_serial(self, tmp_path):
+        convs = _conversations(5)
+        exporter = HTMLExporter()
+        exporter.export_to_file(convs, str(tmp_path / "serial"), sharded=True)
+        exporter.export_to_file(convs, str(tmp_path / "parallel"), sharded=True, jobs=2)
+        for name in ("summaries.json", "shards/00000.json", "index/0.json"):
+            serial = (tmp_path / "serial" / "data" / name).read_text()
+            assert (tmp_path / "parallel" / "data" / name).read_text() == serial
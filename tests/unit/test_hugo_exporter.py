@@ -450,3 +450,37 @@ class TestExportToFile:
         assert tmp_path.exists()
         index_files = list(tmp_path.rglob("index.md"))
         assert len(index_files) == 0
+
+    @pytest.mark.unit
+    def test_parallel_jobs_match_serial(
+        self, exporter, sample_conversation, minimal_conversation, tmp_path
+    ):
+        """Rendering on worker processes writes the same bundles."""
+        convs = [sample_conversation, minimal_conversation]
+        exporter.export_to_file(convs, str(tmp_path / "serial"))
+        exporter.export_to_file(convs, str(tmp_path / "parallel"), jobs=2)
+
+        def bundles(root):
+            return {
+                str(p.relative_to(root)): p.read_text()
+                for p in root.rglob("index.md")
+            }
+
+        serial = bundles(tmp_path / "serial")
+        assert len(serial) == 2
+        assert bundles(tmp_path / "parallel") == serial
+
+    @pytest.mark.unit
+    def test_failed_conversation_skipped_with_warning(
+        self, exporter, sample_conversation, minimal_conversation, tmp_path, capsys
+    ):
+        """A conversation that fails to render does not abort the export."""
+        broken = ConversationTree(id="broken-id", title="Broken")
+        broken.metadata = None  # _get_target_dir dereferences metadata
+
+        exporter.export_to_file(
+            [sample_conversation, broken, minimal_conversation], str(tmp_path)
+        )
+
+        assert len(list(tmp_path.rglob("index.md"))) == 2
+        assert "broken-id" in capsys.readouterr().err
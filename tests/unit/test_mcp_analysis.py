@@ -10,8 +10,11 @@ execute_network_tool().
 import asyncio
 from unittest.mock import MagicMock
 
+import numpy as np
 import pytest
 
+from ctk.core.embedding_matrix import EmbeddingMatrix
+
 
 class TestAnalysisToolsViaProjection:
     """Verify analysis tools are exposed correctly through the projection."""
@@ -98,9 +101,10 @@ class TestFindSimilarViaExecuteNetworkTool:
         """Create a mock database."""
         db = MagicMock()
         db.get_all_embeddings.return_value = []
+        db.get_embedding_matrix.return_value = EmbeddingMatrix.empty()
         db.resolve_identifier.return_value = None
         db.get_similar_conversations.return_value = []
-        db.load_conversation.return_value = None
+        db.load_conversations.return_value = {}
         return db
 
     def test_invalid_id_returns_error(self, mock_db):
@@ -121,6 +125,7 @@ class TestFindSimilarViaExecuteNetworkTool:
 
         mock_db.resolve_identifier.return_value = ("full-id-123", "slug")
         mock_db.get_all_embeddings.return_value = []
+        mock_db.get_embedding_matrix.return_value = EmbeddingMatrix.empty()
 
         # _query_similarities returns [] because there are no rows
         from unittest.mock import patch
@@ -148,6 +153,9 @@ class TestFindSimilarViaExecuteNetworkTool:
                 "provider": "tfidf",
             }
         ]
+        mock_db.get_embedding_matrix.return_value = EmbeddingMatrix(
+            ["full-id-123"], np.array([[1.0, 0.0, 0.0]], dtype=np.float32)
+        )
 
         with patch(
             "ctk.core.network_tools._query_similarities", return_value=[]
@@ -170,7 +178,7 @@ class TestFindSimilarViaExecuteNetworkTool:
 
         mock_conv = MagicMock()
         mock_conv.title = "Test Conversation"
-        mock_db.load_conversation.return_value = mock_conv
+        mock_db.load_conversations.return_value = {"other-id-456": mock_conv}
 
         with patch(
             "ctk.core.network_tools._query_similarities",
@@ -203,6 +211,7 @@ class TestSemanticSearchViaExecuteNetworkTool:
         """Create a mock database."""
         db = MagicMock()
         db.get_all_embeddings.return_value = []
+        db.get_embedding_matrix.return_value = EmbeddingMatrix.empty()
         db.load_conversation.return_value = None
         return db
 
@@ -211,6 +220,7 @@ class TestSemanticSearchViaExecuteNetworkTool:
         from ctk.core.network_tools import execute_network_tool
 
         mock_db.get_all_embeddings.return_value = []
+        mock_db.get_embedding_matrix.return_value = EmbeddingMatrix.empty()
 
         result = execute_network_tool(
             mock_db, "semantic_search", {"query": "test query"}
@@ -218,6 +228,20 @@ class TestSemanticSearchViaExecuteNetworkTool:
 
         assert "No embeddings" in result or "embeddings" in result.lower()
 
+    def test_matrix_matches_the_session_index(self, mock_db):
+        """semantic_search ranks the embeddings the session's ANN index holds."""
+        from ctk.core.network_tools import execute_network_tool
+
+        mock_db.get_current_embedding_session.return_value = {
+            "provider": "ollama",
+            "model": None,
+        }
+        execute_network_tool(mock_db, "semantic_search", {"query": "test query"})
+
+        mock_db.get_embedding_matrix.assert_called_once_with(
+            provider="ollama", model="ollama"
+        )
+
     def test_missing_query_returns_error(self, mock_db):
         """semantic_search returns an error when query is empty."""
         from ctk.core.network_tools import execute_network_tool
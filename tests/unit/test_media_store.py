@@ -0,0 +1,133 @@
+"""Tests for the content-addressed media store (ctk.core.media_store)."""
+
+import hashlib
+import os
+import time
+
+import pytest
+
+from ctk.core.media_store import MediaStore, media_name, referenced_media
+from ctk.exporters.html import HTMLExporter
+from ctk.exporters.hugo import HugoExporter
+
+pytestmark = pytest.mark.unit
+
+
+def _with_images(conv, *image_urls):
+    """Attach images to a conversation's first message"""
+    for url in image_urls:
+        conv.message_map["m0"].content.add_image(url=url)
+    return conv
+
+
+@pytest.fixture
+def db_dir(tmp_path):
+    """A database directory whose media/ holds a used and an unused file"""
+    media = tmp_path / "db" / "media"
+    media.mkdir(parents=True)
+    (media / "used.png").write_bytes(b"used")
+    (media / "unused.png").write_bytes(b"unused")
+    return tmp_path / "db"
+
+
+class TestMediaNames:
+    def test_media_name(self):
+        assert media_name("media/abc.png") == "abc.png"
+        assert media_name("abc.png") == "abc.png"
+        assert media_name("https://example.com/a.png") is None
+        assert media_name("media/../db.sqlite") is None
+        assert media_name("media/.hidden") is None
+        assert media_name(None) is None
+
+    def test_referenced_media(self):
+        content = {
+            "text": "x",
+            "images": [{"url": "media/a.png"}, {"url": "data:image/png;base64,"}],
+            "documents": [{"path": "b.pdf"}],
+            "audio": None,
+        }
+        assert referenced_media(content) == {"a.png", "b.pdf"}
+
+
+class TestMediaStore:
+    def test_put_dedupes_identical_content(self, tmp_path):
+        (tmp_path / "one.PNG").write_bytes(b"pixels")
+        (tmp_path / "two.png").write_bytes(b"pixels")
+        store = MediaStore(tmp_path / "media")
+
+        ref = store.put(tmp_path / "one.PNG")
+        assert ref == f"media/{hashlib.sha256(b'pixels').hexdigest()}.png"
+        assert store.put(tmp_path / "two.png") == ref
+        assert [p.name for p in (tmp_path / "media").iterdir()] == [ref[6:]]
+
+    def test_put_dedupe_restarts_grace_period(self, tmp_path):
+        (tmp_path / "one.png").write_bytes(b"pixels")
+        store = MediaStore(tmp_path / "media")
+        blob = store.path(store.put(tmp_path / "one.png")[6:])
+        old = time.time() - 7200
+        os.utime(blob, (old, old))
+        assert store.unreferenced(set()) == [blob]
+
+        store.put(tmp_path / "one.png")
+        assert store.unreferenced(set()) == []
+
+    def test_export_only_named_files(self, db_dir, tmp_path):
+        out = tmp_path / "out"
+        store = MediaStore(db_dir / "media")
+        assert store.export(["used.png", "missing.png"], out) == 1
+        assert [p.name for p in out.iterdir()] == ["used.png"]
+
+    def test_export_hardlinks(self, db_dir, tmp_path):
+        out = tmp_path / "out"
+        MediaStore(db_dir / "media").export(["used.png"], out, link=True)
+        source = db_dir / "media" / "used.png"
+        assert (out / "used.png").stat().st_ino == source.stat().st_ino
+
+    def test_unreferenced_respects_grace_period(self, db_dir):
+        store = MediaStore(db_dir / "media")
+        assert store.unreferenced({"used.png"}) == []
+
+        old = time.time() - 7200
+        os.utime(db_dir / "media" / "unused.png", (old, old))
+        assert store.unreferenced({"used.png"}) == [db_dir / "media" / "unused.png"]
+        assert store.unreferenced({"used.png", "unused.png"}, grace_seconds=0) == []
+
+
+class TestExportsCopyReferencedMedia:
+    def test_html_no_embed(self, db_dir, tmp_path, make_conversation):
+        out = tmp_path / "site"
+        HTMLExporter().export_to_file(
+            [_with_images(make_conversation("c1", "Look"), "media/used.png")],
+            str(out),
+            embed=False,
+            db_dir=str(db_dir),
+        )
+        assert [p.name for p in (out / "media").iterdir()] == ["used.png"]
+
+    def test_html_link_media(self, db_dir, tmp_path, make_conversation):
+        out = tmp_path / "site"
+        HTMLExporter().export_to_file(
+            [_with_images(make_conversation("c1", "Look"), "used.png")],
+            str(out / "index.html"),
+            media_dir="media",
+            db_dir=str(db_dir),
+            link_media=True,
+        )
+        source = db_dir / "media" / "used.png"
+        assert (out / "media" / "used.png").stat().st_ino == source.stat().st_ino
+        assert not (out / "media" / "unused.png").exists()
+
+    def test_hugo_link_media(self, db_dir, tmp_path, make_conversation):
+        out = tmp_path / "content"
+        HugoExporter().export_to_file(
+            [_with_images(make_conversation("abcdef12", "Look"), "media/used.png")],
+            str(out),
+            db_dir=str(db_dir),
+            date_prefix=False,
+            hugo_organize="none",
+            link_media=True,
+        )
+        copies = list(out.glob("*/images/used.png"))
+        assert len(copies) == 1
+        source = db_dir / "media" / "used.png"
+        assert copies[0].stat().st_ino == source.stat().st_ino
@@ -0,0 +1,181 @@
+"""Tests for the parallel, SQL-level database merge."""
+
+import os
+import time
+
+import pytest
+from sqlalchemy import text
+
+from ctk.core.database import ConversationDB
+from ctk.core.db_operations import DatabaseOperations, DuplicateStrategy, MergeStrategy
+from ctk.core.media_store import MediaStore
+from ctk.core.merge_engine import MergePlan, parallel_merge, scan_database
+
+pytestmark = pytest.mark.unit
+
+
+def _database(path, *conversations):
+    with ConversationDB(str(path)) as db:
+        db.save_conversations(list(conversations))
+    return str(path)
+
+
+def _fts_hits(db, word):
+    with db.engine.connect() as conn:
+        return conn.execute(
+            text("SELECT COUNT(*) FROM messages_fts WHERE messages_fts MATCH :q"),
+            {"q": word},
+        ).scalar()
+
+
+class TestParallelMerge:
+    def test_copies_messages_tags_and_search_index(self, tmp_path, make_conversation):
+        a = _database(
+            tmp_path / "a", make_conversation("c1", "hello zebra", tags=["x"])
+        )
+        b = _database(
+            tmp_path / "b",
+            make_conversation("c2", "hello giraffe", "ok", tags=["x", "y"]),
+        )
+        out = str(tmp_path / "out")
+
+        stats = parallel_merge([a, b], out, workers=2)
+
+        assert stats["total_input"] == 2
+        assert stats["total_output"] == 2
+        with ConversationDB(out) as db:
+            c2 = db.load_conversation("c2")
+            assert len(c2.message_map) == 2
+            assert sorted(c2.metadata.tags) == ["x", "y"]
+            assert {t["name"] for t in db.get_all_tags()} == {"x", "y"}
+            assert _fts_hits(db, "zebra") == 1
+            assert _fts_hits(db, "giraffe") == 1
+
+    def test_replaced_conversation_leaves_no_stale_rows(
+        self, tmp_path, make_conversation
+    ):
+        a = _database(tmp_path / "a", make_conversation("c1", "first draft", "reply"))
+        b = _database(tmp_path / "b", make_conversation("c1", "rewritten", "x", "y"))
+        out = str(tmp_path / "out")
+
+        stats = parallel_merge([a, b], out, strategy=MergeStrategy.LONGEST)
+
+        assert stats["duplicates_found"] == 1
+        assert stats["conflicts_resolved"] == 1
+        assert stats["total_output"] == 1
+        with ConversationDB(out) as db:
+            conv = db.load_conversation("c1")
+            assert len(conv.message_map) == 3
+            assert _fts_hits(db, "draft") == 0
+            assert _fts_hits(db, "rewritten") == 1
+
+    def test_media_references_survive_merge_and_gc(self, tmp_path, make_conversation):
+        old = make_conversation("c1", "look")
+        old.message_map["m0"].content.add_image(url="media/old.png")
+        new = make_conversation("c1", "look", "again")
+        new.message_map["m0"].content.add_image(url="media/abc.png")
+        a = _database(tmp_path / "a", old)
+        b = _database(tmp_path / "b", new)
+        out = tmp_path / "out"
+        (out / "media").mkdir(parents=True)
+        hour_ago = time.time() - 3600
+        for name in ("abc.png", "old.png"):
+            (out / "media" / name).write_bytes(b"x")
+            os.utime(out / "media" / name, (hour_ago, hour_ago))
+
+        parallel_merge([a, b], str(out), strategy=MergeStrategy.LONGEST)
+
+        with ConversationDB(str(out)) as db:
+            referenced = db.get_referenced_media()
+        assert referenced == {"abc.png"}
+        garbage = MediaStore(out / "media").unreferenced(referenced, grace_seconds=60)
+        assert [p.name for p in garbage] == ["old.png"]
+
+    def test_matches_tree_merge(self, tmp_path, make_conversation):
+        inputs = [
+            _database(
+                tmp_path / f"in{n}",
+                *[
+                    make_conversation(f"c{n + i}", f"text {i}", "more")
+                    for i in range(5)
+                ],
+            )
+            for n in range(3)
+        ]
+        for dedupe in (DuplicateStrategy.EXACT, DuplicateStrategy.SMART):
+            fast_out = str(tmp_path / f"fast-{dedupe.value}")
+            slow_out = str(tmp_path / f"slow-{dedupe.value}")
+            fast = parallel_merge(
+                inputs, fast_out, strategy=MergeStrategy.SKIP, dedupe=dedupe
+            )
+            slow = DatabaseOperations()._merge_trees(
+                inputs, slow_out, MergeStrategy.SKIP, dedupe, None
+            )
+            assert fast["total_input"] == slow["total_input"] == 15
+            assert fast["duplicates_found"] == slow["duplicates_found"]
+            with ConversationDB(fast_out) as db:
+                assert len(db.list_conversations()) == fast["total_output"]
+
+    def test_hash_dedupe_skips_copies_under_new_ids(self, tmp_path, make_conversation):
+        a = _database(tmp_path / "a", make_conversation("c1", "same words", "reply"))
+        b = _database(tmp_path / "b", make_conversation("c9", "same words", "reply"))
+
+        stats = parallel_merge(
+            [a, b], str(tmp_path / "out"), dedupe=DuplicateStrategy.HASH
+        )
+
+        assert stats["duplicates_found"] == 1
+        assert [d["copied"] for d in stats["databases"]] == [1, 1]
+        assert stats["total_output"] == 2
+
+    def test_reports_throughput_per_database(self, tmp_path, make_conversation):
+        a = _database(tmp_path / "a", make_conversation("c1", "hi"))
+        b = _database(
+            tmp_path / "b", make_conversation("c1", "hi"), make_conversation("c2", "yo")
+        )
+        seen = []
+
+        stats = parallel_merge(
+            [a, b],
+            str(tmp_path / "out"),
+            strategy=MergeStrategy.SKIP,
+            workers=1,
+            progress_callback=lambda s: seen.append(len(s["databases"])),
+        )
+
+        assert seen == [1, 2]
+        assert [d["path"] for d in stats["databases"]] == [a, b]
+        assert [d["conversations"] for d in stats["databases"]] == [1, 2]
+        assert [d["copied"] for d in stats["databases"]] == [1, 1]
+        assert all(d["conversations_per_second"] > 0 for d in stats["databases"])
+
+    def test_scan_digests(self, tmp_path, make_conversation):
+        path = _database(tmp_path / "a", make_conversation("c1", "a", "b"))
+        scan = scan_database(path, with_hashes=True)
+        assert [(d.id, d.message_count) for d in scan.digests] == [("c1", 2)]
+        assert scan.digests[0].content_hash
+        assert scan.db_file.endswith("conversations.db")
+
+        plan = MergePlan(MergeStrategy.NEWEST, DuplicateStrategy.HASH)
+        stats = {"total_input": 0, "duplicates_found": 0, "conflicts_resolved": 0}
+        assert plan.admit(scan, stats) == ["c1"]
+        assert plan.admit(scan, stats) == []
+        assert stats["duplicates_found"] == 1
+
+    @pytest.mark.slow
+    def test_merge_throughput_benchmark(self, tmp_path, make_conversation):
+        inputs = [
+            _database(
+                tmp_path / f"in{n}",
+                *[
+                    make_conversation(f"c{n}-{i}", *(f"message {j}" for j in range(10)))
+                    for i in range(500)
+                ],
+            )
+            for n in range(4)
+        ]
+        start = time.perf_counter()
+        stats = parallel_merge(inputs, str(tmp_path / "out"))
+        elapsed = time.perf_counter() - start
+        print(f"\nmerged {stats['total_input']} conversations in {elapsed:.2f}s")
+        assert stats["total_output"] == 2000
@@ -195,3 +195,118 @@ def test_failed_migration_raises_and_does_not_advance_version(tmp_path, monkeypa
     uv = conn.execute("PRAGMA user_version").fetchone()[0]
     conn.close()
     assert uv < 999
+
+
+# conversation_embeddings as shipped before migration 5 (JSON float lists).
+V4_EMBEDDINGS_DDL = """
+CREATE TABLE conversation_embeddings (
+    id INTEGER NOT NULL PRIMARY KEY,
+    conversation_id VARCHAR NOT NULL,
+    provider VARCHAR NOT NULL,
+    model VARCHAR NOT NULL,
+    chunking_strategy VARCHAR NOT NULL,
+    aggregation_strategy VARCHAR NOT NULL,
+    aggregation_weights JSON,
+    embedding_json JSON NOT NULL,
+    dimensions INTEGER NOT NULL,
+    created_at DATETIME NOT NULL,
+    CONSTRAINT uq_conversation_embedding UNIQUE
+        (conversation_id, provider, model, chunking_strategy, aggregation_strategy)
+);
+CREATE INDEX idx_emb_conversation ON conversation_embeddings (conversation_id);
+CREATE INDEX idx_emb_provider ON conversation_embeddings (provider);
+CREATE INDEX idx_emb_model ON conversation_embeddings (model);
+"""
+
+
+def test_migration_5_converts_json_embeddings_to_blobs(tmp_path):
+    import json
+
+    import numpy as np
+
+    from ctk.core.db_models import EmbeddingModel
+
+    dbfile = _make_legacy_db(tmp_path)
+    conn = sqlite3.connect(str(dbfile))
+    conn.executescript(V4_EMBEDDINGS_DDL)
+    conn.execute(
+        "INSERT INTO conversations (id, title) VALUES ('c1', 'one'), ('c2', 'two')"
+    )
+    rows = [
+        (1, "c1", json.dumps([0.5, -1.25, 3.0]), 3),
+        (2, "c2", "not json", 3),
+    ]
+    for row_id, conv_id, payload, dims in rows:
+        conn.execute(
+            "INSERT INTO conversation_embeddings VALUES "
+            "(?, ?, 'tfidf', 'tfidf', 'message', 'mean', NULL, ?, ?, "
+            "'2024-01-01 00:00:00')",
+            (row_id, conv_id, payload, dims),
+        )
+    conn.commit()
+    conn.close()
+
+    db = ConversationDB(str(tmp_path))
+    try:
+        with db.engine.connect() as c:
+            cols = {
+                r[1]
+                for r in c.execute(
+                    text("PRAGMA table_info(conversation_embeddings)")
+                ).fetchall()
+            }
+            indexes = {
+                r[0]
+                for r in c.execute(
+                    text(
+                        "SELECT name FROM sqlite_master WHERE type='index' "
+                        "AND tbl_name='conversation_embeddings'"
+                    )
+                ).fetchall()
+            }
+        assert cols == {c.name for c in EmbeddingModel.__table__.columns}
+        assert {"idx_emb_conversation", "idx_emb_provider", "idx_emb_model"} <= indexes
+
+        vec = db.get_embedding(
+            "c1", model="tfidf", provider="tfidf", aggregation_strategy="mean"
+        )
+        assert vec.dtype == np.float32
+        np.testing.assert_allclose(vec, [0.5, -1.25, 3.0])
+        # The unreadable row is dropped rather than failing the upgrade
+        assert [e["conversation_id"] for e in db.get_all_embeddings()] == ["c1"]
+    finally:
+        db.close()
+
+
+def test_migration_6_adds_embedding_hash_columns(tmp_path):
+    from ctk.core.db_models import EmbeddingModel
+    from ctk.core.migrations import _EMBEDDINGS_V5_DDL
+
+    dbfile = _make_legacy_db(tmp_path)
+    conn = sqlite3.connect(str(dbfile))
+    conn.executescript(_EMBEDDINGS_V5_DDL)
+    conn.execute("INSERT INTO conversations (id, title) VALUES ('c1', 'one')")
+    conn.execute(
+        "INSERT INTO conversation_embeddings (id, conversation_id, provider, model, "
+        "chunking_strategy, aggregation_strategy, vector, dtype, dimensions, "
+        "created_at) VALUES (1, 'c1', 'p', 'm', 'message', 'weighted_mean', "
+        "x'0000803f', 'float32', 1, '2024-01-01 00:00:00')"
+    )
+    conn.execute("PRAGMA user_version = 5")
+    conn.commit()
+    conn.close()
+
+    db = ConversationDB(str(tmp_path))
+    try:
+        with db.engine.connect() as c:
+            cols = {
+                r[1]
+                for r in c.execute(
+                    text("PRAGMA table_info(conversation_embeddings)")
+                ).fetchall()
+            }
+        assert cols == {c.name for c in EmbeddingModel.__table__.columns}
+        # Rows embedded before hashes existed have none
+        assert db.get_embedding_content_hashes(model="m", provider="p") == {"c1": None}
+    finally:
+        db.close()
@@ -0,0 +1,144 @@
+"""Tests for MinHash/LSH near-duplicate detection."""
+
+import time
+
+import numpy as np
+import pytest
+
+from ctk.core.database import ConversationDB
+from ctk.core.db_operations import (
+    ConversationComparator,
+    DatabaseOperations,
+    DuplicateStrategy,
+)
+from ctk.core.minhash import LSHIndex, MinHasher, estimate_jaccard, optimal_bands
+
+pytestmark = pytest.mark.unit
+
+
+def _words(n, offset=0):
+    return " ".join(f"w{i}" for i in range(offset, offset + n))
+
+
+class TestMinHash:
+    def test_estimate_tracks_jaccard(self):
+        hasher = MinHasher(num_perm=256)
+        a = set(_words(100).split())
+        b = set(_words(100, offset=20).split())  # Jaccard 80/120
+        estimate = estimate_jaccard(hasher.signature(a), hasher.signature(b))
+        assert abs(estimate - 80 / 120) < 0.1
+        assert estimate_jaccard(hasher.signature(a), hasher.signature(a)) == 1.0
+
+    def test_signatures_round_trip_and_are_deterministic(self):
+        sig = MinHasher(seed=3).signature(["a", "b"])
+        assert sig.dtype == np.uint32
+        hasher = MinHasher(seed=3)
+        assert np.array_equal(hasher.from_bytes(hasher.to_bytes(sig)), sig)
+        assert np.array_equal(hasher.signature(["b", "a"]), sig)
+        assert MinHasher(seed=4).config_hash != hasher.config_hash
+
+    def test_bands_fit_signature(self):
+        for threshold in (0.5, 0.8, 0.95):
+            bands, rows = optimal_bands(threshold, 128)
+            assert bands * rows <= 128
+        # Higher thresholds need longer (stricter) bands
+        assert optimal_bands(0.95, 128)[1] > optimal_bands(0.5, 128)[1]
+
+    def test_lsh_candidates(self):
+        hasher = MinHasher()
+        index = LSHIndex(*optimal_bands(0.9, hasher.num_perm))
+        near = hasher.signature(_words(200).split())
+        index.add("near", near)
+        index.add("far", hasher.signature(_words(200, offset=500).split()))
+        probe = hasher.signature(_words(199).split())
+        assert index.candidates(probe) == {"near"}
+
+
+class TestFindSimilarGroups:
+    @pytest.fixture
+    def db_path(self, tmp_path, make_conversation):
+        path = str(tmp_path / "db")
+        with ConversationDB(path) as db:
+            db.save_conversations(
+                [
+                    make_conversation("a", _words(200)),
+                    make_conversation("b", _words(199)),
+                    make_conversation("c", _words(200, offset=1000)),
+                    make_conversation("d", _words(200) + " extra"),
+                    make_conversation("e", ""),
+                    make_conversation("f", ""),
+                ]
+            )
+        return path
+
+    def test_groups_near_duplicates(self, db_path):
+        groups = ConversationComparator().find_similar_groups(db_path, threshold=0.9)
+        assert groups == [["a", "b", "d"]]
+
+    def test_dedupe_similarity_strategy(self, db_path):
+        stats = DatabaseOperations().dedupe(
+            db_path,
+            strategy=DuplicateStrategy.SIMILARITY,
+            similarity_threshold=0.9,
+            dry_run=True,
+        )
+        assert stats["groups_found"] == 1
+        assert stats["duplicates_found"] == 2
+
+    def test_signatures_are_reused_until_conversation_changes(
+        self, db_path, monkeypatch, make_conversation
+    ):
+        comparator = ConversationComparator()
+        comparator.find_similar_groups(db_path, threshold=0.9)
+
+        loaded = []
+        original = ConversationDB.load_conversations
+
+        def counting(self, ids, **kwargs):
+            # Header-only loads are how the database is walked; only full
+            # trees (signature recomputation) count
+            ids = list(ids)
+            if kwargs.get("fields", "full") == "full":
+                loaded.extend(ids)
+            return original(self, ids, **kwargs)
+
+        monkeypatch.setattr(ConversationDB, "load_conversations", counting)
+        assert comparator.find_similar_groups(db_path, threshold=0.9) == [
+            ["a", "b", "d"]
+        ]
+        assert loaded == []
+
+        with ConversationDB(db_path) as db:
+            db.save_conversation(make_conversation("c", _words(199)))
+        assert comparator.find_similar_groups(db_path, threshold=0.9) == [
+            ["a", "b", "c", "d"]
+        ]
+        assert loaded == ["c"]
+
+    def test_without_persistence_nothing_is_cached(self, db_path):
+        ConversationComparator().find_similar_groups(db_path, persist=False)
+        with ConversationDB(db_path) as db:
+            assert db.get_minhash_signatures(MinHasher().config_hash) == {}
+
+    @pytest.mark.slow
+    def test_dedupe_benchmark(self, tmp_path, make_conversation):
+        path = str(tmp_path / "db")
+        rng = np.random.RandomState(0)
+        with ConversationDB(path) as db:
+            convs = []
+            for i in range(5000):
+                base = rng.randint(0, 2000)
+                convs.append(
+                    make_conversation(f"c{i:05d}", _words(150, offset=base * 50))
+                )
+            db.save_conversations(convs)
+
+        comparator = ConversationComparator()
+        start = time.perf_counter()
+        groups = comparator.find_similar_groups(path, threshold=0.9)
+        cold = time.perf_counter() - start
+        start = time.perf_counter()
+        assert comparator.find_similar_groups(path, threshold=0.9) == groups
+        warm = time.perf_counter() - start
+        print(f"\n5000 conversations: cold {cold:.2f}s, cached {warm:.2f}s")
+        assert groups
@@ -526,11 +526,11 @@ class TestConversationTreeOperations:
         assert conv._paths_cache is None
         paths1 = conv.get_all_paths()
         assert conv._paths_cache is not None
-        cache_hash1 = conv._paths_cache_hash
+        cache_key1 = conv._paths_cache_key
 
         # Second call - cache hit
         paths2 = conv.get_all_paths()
-        assert conv._paths_cache_hash == cache_hash1
+        assert conv._paths_cache_key == cache_key1
         assert paths1 == paths2
 
     @pytest.mark.unit
@@ -549,7 +549,7 @@ class TestConversationTreeOperations:
         # First call - populate cache
         paths1 = conv.get_all_paths()
         assert len(paths1) == 1
-        cache_hash1 = conv._paths_cache_hash
+        cache_key1 = conv._paths_cache_key
 
         # Add a message - cache should be invalidated
         msg2 = Message(
@@ -565,7 +565,7 @@ class TestConversationTreeOperations:
         paths2 = conv.get_all_paths()
         assert len(paths2) == 1
         assert len(paths2[0]) == 2  # Now has 2 messages
-        assert conv._paths_cache_hash != cache_hash1
+        assert conv._paths_cache_key != cache_key1
 
     @pytest.mark.unit
     def test_get_all_paths_cache_not_in_to_dict(self):
@@ -589,7 +589,7 @@ class TestConversationTreeOperations:
 
         # Cache fields should not be present
         assert "_paths_cache" not in data
-        assert "_paths_cache_hash" not in data
+        assert "_paths_cache_key" not in data
 
     @pytest.mark.unit
     def test_get_longest_path(self):
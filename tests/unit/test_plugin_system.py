@@ -461,6 +461,7 @@ class TestExporterPluginBase:
     def test_export_to_file_with_string_data(self, temp_plugin_dir):
         """Given string export data, should write as text"""
         exporter = Mock(spec=ExporterPlugin)
+        exporter.streaming = False
         exporter.export_data = Mock(return_value="test data")
 
         # Call actual export_to_file method
@@ -473,6 +474,7 @@ class TestExporterPluginBase:
     def test_export_to_file_with_bytes_data(self, temp_plugin_dir):
         """Given bytes export data, should write as binary"""
         exporter = Mock(spec=ExporterPlugin)
+        exporter.streaming = False
         exporter.export_data = Mock(return_value=b"binary data")
 
         output_file = temp_plugin_dir / "output.bin"
@@ -484,6 +486,7 @@ class TestExporterPluginBase:
     def test_export_to_file_with_dict_data(self, temp_plugin_dir):
         """Given dict export data, should JSON serialize it"""
         exporter = Mock(spec=ExporterPlugin)
+        exporter.streaming = False
         exporter.export_data = Mock(return_value={"key": "value"})
 
         output_file = temp_plugin_dir / "output.json"
@@ -493,6 +496,44 @@ class TestExporterPluginBase:
         content = json.loads(output_file.read_text())
         assert content == {"key": "value"}
 
+    def test_non_streaming_export_takes_a_lazy_iterable(
+        self, temp_plugin_dir, mock_conversation
+    ):
+        """Given a non-streaming exporter, should collect the trees first"""
+        output_file = temp_plugin_dir / "output.json"
+        MockExporter().export_to_file(iter([mock_conversation]), str(output_file))
+
+        content = json.loads(output_file.read_text())
+        assert content["conversations"] == [
+            {"id": "test-conv-123", "title": "Test Conversation"}
+        ]
+
+    def test_default_export_stream_falls_back_to_export_data(
+        self, temp_plugin_dir, mock_conversation
+    ):
+        """Given the default export_stream, should write export_data's result"""
+        output_file = temp_plugin_dir / "output.json"
+        with open(output_file, "w", encoding="utf-8") as fh:
+            written = MockExporter().export_stream(iter([mock_conversation]), fh)
+
+        assert written == 1
+        content = json.loads(output_file.read_text())
+        assert content["conversations"][0]["id"] == "test-conv-123"
+
+    def test_streaming_exporter_writes_through_export_stream(self, temp_plugin_dir):
+        """Given streaming = True, should hand export_stream an open file"""
+
+        class StreamingExporter(MockExporter):
+            streaming = True
+
+            def export_stream(self, conversations, fh, **kwargs):
+                fh.write("streamed")
+                return 0
+
+        output_file = temp_plugin_dir / "output.txt"
+        StreamingExporter().export_to_file([], str(output_file))
+        assert output_file.read_text() == "streamed"
+
 
 # ==================== Importer Plugin Base Tests ====================
 
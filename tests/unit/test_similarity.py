@@ -1010,6 +1010,87 @@ class TestConversationGraphBuilder:
         assert G.number_of_edges() == 2
 
 
+@pytest.mark.unit
+class TestBlockedNeighbors:
+    """compute_top_neighbors must agree with the dense pairwise computation."""
+
+    @pytest.fixture
+    def vectors(self):
+        rng = np.random.default_rng(7)
+        return list(rng.normal(size=(37, 8)))
+
+    @pytest.mark.parametrize("metric", list(SimilarityMetric))
+    @pytest.mark.parametrize("block_size", [1, 5, 64])
+    def test_matches_pairwise_scores(self, embedder, vectors, metric, block_size):
+        sc = SimilarityComputer(embedder=embedder, metric=metric)
+        neighbors = sc.compute_top_neighbors(
+            vectors, k=4, threshold=None, block_size=block_size
+        )
+        for i, row in enumerate(neighbors):
+            expected = sorted(
+                (
+                    (j, sc._compute_metric(vectors[i], vectors[j]))
+                    for j in range(len(vectors))
+                    if j != i
+                ),
+                key=lambda x: x[1],
+                reverse=True,
+            )[:4]
+            assert [j for j, _ in row] == [j for j, _ in expected]
+            assert [s for _, s in row] == pytest.approx(
+                [s for _, s in expected], abs=1e-4
+            )
+
+    def test_threshold_and_unlimited_k(self, embedder, vectors):
+        sc = SimilarityComputer(embedder=embedder)
+        neighbors = sc.compute_top_neighbors(vectors, k=None, threshold=0.2)
+        dense = sc.compute_similarity_matrix(vectors)
+        for i, row in enumerate(neighbors):
+            expected = {j for j in range(len(vectors)) if j != i and dense[i, j] >= 0.2}
+            assert {j for j, _ in row} == expected
+
+    def test_dot_product_scores_stay_bounded(self, embedder):
+        vectors = [np.array([1.0, 0.0]), np.array([3.0, 0.3]), np.array([0.5, 0.0])]
+        dot = SimilarityComputer(embedder=embedder, metric=SimilarityMetric.DOT_PRODUCT)
+        [(j, score)] = dot.compute_top_neighbors(vectors, k=1)[0]
+        assert j == 2
+        assert score == pytest.approx(1.0, abs=1e-5)
+
+    def test_reports_throughput(self, embedder, vectors):
+        sc = SimilarityComputer(embedder=embedder)
+        stats = {}
+        sc.compute_top_neighbors(vectors, k=3, stats=stats)
+        assert stats["pairs"] == 37 * 37
+        assert stats["pairs_per_sec"] > 0
+
+    def test_rejects_bad_block_size(self, embedder, vectors):
+        sc = SimilarityComputer(embedder=embedder)
+        with pytest.raises(ValueError):
+            sc.compute_top_neighbors(vectors, k=3, block_size=0)
+
+    def test_graph_matches_dense_construction(self, embedder, vectors):
+        """Same edges as sorting each row of the full matrix."""
+        sc = SimilarityComputer(embedder=embedder)
+        ids = [f"c{i}" for i in range(len(vectors))]
+        dense = sc.compute_similarity_matrix(vectors)
+        expected = set()
+        for i in range(len(ids)):
+            row = sorted(
+                ((j, dense[i, j]) for j in range(len(ids)) if j != i),
+                key=lambda x: x[1],
+                reverse=True,
+            )
+            for j, sim in [p for p in row if p[1] >= 0.1][:3]:
+                if i < j:
+                    expected.add((ids[i], ids[j]))
+
+        neighbors = sc.compute_top_neighbors(vectors, k=3, threshold=0.1, block_size=8)
+        got = {
+            (ids[i], ids[j]) for i, row in enumerate(neighbors) for j, _ in row if i < j
+        }
+        assert got == expected
+
+
 # ==================== Integration-style tests ====================
 
 
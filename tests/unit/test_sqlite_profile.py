@@ -0,0 +1,87 @@
+"""Tests for the SQLite connection tuning profiles."""
+
+import json
+from argparse import Namespace
+from unittest.mock import patch
+
+import pytest
+
+from ctk.core.database import ConversationDB
+from ctk.core.models import ConversationTree
+from ctk.core.sqlite_profile import PROFILES, resolve_profile
+
+pytestmark = pytest.mark.unit
+
+
+class TestResolveProfile:
+    def test_overrides_replace_profile_values(self):
+        name, pragmas = resolve_profile("performance", {"mmap_size": 0})
+        assert name == "performance"
+        assert pragmas["mmap_size"] == "0"
+        assert pragmas["journal_mode"] == "WAL"
+        assert list(pragmas)[0] == "journal_mode"
+
+    def test_default_profile_applies_nothing(self):
+        assert resolve_profile("default") == ("default", {})
+
+    @pytest.mark.parametrize(
+        "name,overrides",
+        [
+            ("turbo", None),
+            ("performance", {"journal_mode": "wal; DROP TABLE x"}),
+            ("performance", {"cache_size": "lots"}),
+            ("performance", {"foreign_keys": 1}),
+        ],
+    )
+    def test_invalid_configuration_raises(self, name, overrides):
+        with pytest.raises(ValueError):
+            resolve_profile(name, overrides)
+
+    def test_reads_config_when_no_name_given(self):
+        with patch("ctk.core.config.get_config") as get_config:
+            get_config.return_value.get.side_effect = lambda key: {
+                "database.profile": "safe",
+                "database.pragmas": {"busy_timeout": 100},
+            }[key]
+            name, pragmas = resolve_profile()
+        assert name == "safe"
+        assert pragmas == {
+            "journal_mode": "WAL",
+            "synchronous": "FULL",
+            "busy_timeout": "100",
+        }
+
+
+class TestConnectionHook:
+    def test_performance_profile_is_applied_on_connect(self, tmp_path):
+        with ConversationDB(str(tmp_path), profile="performance") as db:
+            settings = db.get_connection_settings()
+        assert settings["profile"] == "performance"
+        pragmas = settings["pragmas"]
+        assert pragmas["journal_mode"] == "WAL"
+        assert pragmas["synchronous"] == "NORMAL"
+        assert pragmas["temp_store"] == "MEMORY"
+        assert pragmas["busy_timeout"] == PROFILES["performance"]["busy_timeout"]
+        assert pragmas["cache_size"] == PROFILES["performance"]["cache_size"]
+
+    def test_default_profile_keeps_rollback_journal(self, tmp_path):
+        with ConversationDB(str(tmp_path), profile="default") as db:
+            db.save_conversation(ConversationTree(id="c1", title="t"))
+            assert db.get_connection_settings()["pragmas"]["journal_mode"] == "DELETE"
+
+    def test_in_memory_database_skips_file_pragmas(self):
+        with ConversationDB(":memory:", profile="performance") as db:
+            pragmas = db.get_connection_settings()["pragmas"]
+        assert pragmas["journal_mode"] == "MEMORY"
+        assert pragmas["synchronous"] == "NORMAL"
+
+    def test_db_info_reports_profile(self, tmp_path, capsys):
+        from ctk.cli_db import cmd_info
+
+        with ConversationDB(str(tmp_path), profile="performance"):
+            pass
+        rc = cmd_info(Namespace(path=str(tmp_path), json=True))
+        assert rc == 0
+        info = json.loads(capsys.readouterr().out)
+        assert info["profile"]
+        assert set(info["pragmas"]) >= {"journal_mode", "synchronous", "mmap_size"}
@@ -0,0 +1,150 @@
+"""Tests for the incremental (``ctk import --stream``) import path."""
+
+import io
+import json
+import zipfile
+from unittest.mock import patch
+
+import pytest
+
+from ctk.core.utils import iter_json_array
+from ctk.importers.anthropic import AnthropicImporter
+from ctk.importers.openai import OpenAIImporter
+
+
+def _openai_conv(i: int) -> dict:
+    return {
+        "id": f"oai-{i}",
+        "title": f"Conversation {i}",
+        "create_time": 1704067200 + i,
+        "update_time": 1704067200 + i,
+        "mapping": {
+            "root": {"id": "root", "message": None, "parent": None},
+            "m1": {
+                "id": "m1",
+                "parent": "root",
+                "message": {
+                    "author": {"role": "user"},
+                    "content": {"content_type": "text", "parts": [f"hello {i}"]},
+                    "create_time": 1704067200 + i,
+                },
+            },
+        },
+    }
+
+
+class TestIterJsonArray:
+    def test_yields_elements_across_chunk_boundaries(self):
+        data = [{"i": i, "pad": "x" * i} for i in range(50)] + [12345, "s", None]
+        text = json.dumps(data)
+        for chunk_size in (1, 5, 64, 1 << 16):
+            assert list(iter_json_array(io.StringIO(text), chunk_size)) == data
+
+    def test_top_level_object_is_single_element(self):
+        assert list(iter_json_array(io.StringIO('{"a": 1}'))) == [{"a": 1}]
+
+    def test_empty_array(self):
+        assert list(iter_json_array(io.StringIO(" [ ] "))) == []
+
+    @pytest.mark.parametrize(
+        "bad", ["[1, 2", "[1 2]", "nope", '[{"a": }]', "[1, ]", "[1,\n]"]
+    )
+    def test_malformed_input_raises_value_error(self, bad):
+        with pytest.raises(ValueError):
+            list(iter_json_array(io.StringIO(bad), chunk_size=2))
+
+    def test_is_lazy(self):
+        text = json.dumps([{"i": 0}])[:-1] + ", broken"
+        it = iter_json_array(io.StringIO(text), chunk_size=4)
+        assert next(it) == {"i": 0}
+        with pytest.raises(ValueError):
+            next(it)
+
+
+class TestIterImport:
+    def test_openai_iter_import_matches_import_data(self):
+        convs = [_openai_conv(i) for i in range(3)]
+        importer = OpenAIImporter()
+        streamed = list(importer.iter_import(iter(convs)))
+        buffered = importer.import_data(convs)
+        assert [t.id for t in streamed] == [t.id for t in buffered]
+        assert streamed[0].message_map["m1"].content.text == "hello 0"
+
+    def test_openai_iter_import_is_lazy(self):
+        def source():
+            yield _openai_conv(0)
+            raise RuntimeError("should not be reached before first tree")
+
+        trees = OpenAIImporter().iter_import(source())
+        assert next(trees).id == "oai-0"
+
+    def test_anthropic_iter_import_accepts_iterator(self):
+        convs = [
+            {
+                "uuid": f"c{i}",
+                "name": f"Claude {i}",
+                "chat_messages": [{"uuid": "m1", "sender": "human", "text": "hi"}],
+            }
+            for i in range(2)
+        ]
+        trees = list(AnthropicImporter().iter_import(iter(convs)))
+        assert [t.id for t in trees] == ["c0", "c1"]
+
+
+class TestStreamCommand:
+    def _run(self, argv):
+        from ctk.cli import main
+
+        with patch("sys.argv", ["ctk", *argv]):
+            return main()
+
+    def test_stream_import_from_zip(self, tmp_path):
+        zp = tmp_path / "export.zip"
+        with zipfile.ZipFile(zp, "w") as zf:
+            zf.writestr(
+                "conversations.json", json.dumps([_openai_conv(i) for i in range(5)])
+            )
+        db_dir = tmp_path / "db"
+
+        rc = self._run(["import", str(zp), "--db", str(db_dir), "--stream"])
+        assert rc == 0
+
+        from ctk.core.database import ConversationDB
+
+        with ConversationDB(str(db_dir)) as db:
+            ids = {c.id for c in db.list_conversations()}
+        assert ids == {f"oai-{i}" for i in range(5)}
+
+    def test_stream_import_from_file_with_tags(self, tmp_path):
+        src = tmp_path / "conversations.json"
+        src.write_text(json.dumps([_openai_conv(1)]))
+        db_dir = tmp_path / "db"
+
+        rc = self._run(
+            ["import", str(src), "--db", str(db_dir), "--stream", "--tags", "bulk"]
+        )
+        assert rc == 0
+
+        from ctk.core.database import ConversationDB
+
+        with ConversationDB(str(db_dir)) as db:
+            conv = db.load_conversation("oai-1")
+        assert "bulk" in conv.metadata.tags
+
+    def test_stream_requires_db(self, tmp_path):
+        src = tmp_path / "conversations.json"
+        src.write_text(json.dumps([_openai_conv(1)]))
+        assert self._run(["import", str(src), "--stream"]) == 1
+
+    def test_failed_batch_is_not_reported_saved(self, tmp_path, capsys):
+        src = tmp_path / "conversations.json"
+        src.write_text(json.dumps([_openai_conv(1)]))
+        db_dir = tmp_path / "db"
+
+        with patch(
+            "ctk.core.database.ConversationDB.save_conversations",
+            side_effect=RuntimeError("disk full"),
+        ):
+            rc = self._run(["import", str(src), "--db", str(db_dir), "--stream"])
+        assert rc == 1
+        assert "Saved:" not in capsys.readouterr().out
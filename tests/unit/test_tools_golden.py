@@ -31,7 +31,7 @@ pytestmark = pytest.mark.unit
 #   "
 # and update _EXPECTED_DIGEST below.
 # ---------------------------------------------------------------------------
-_EXPECTED_DIGEST = "0209efe1ad9b569feb1c32273964abcb5a8f9ad0fb1e106776b8363f34ad3fa2"
+_EXPECTED_DIGEST = "ab9c382ec585878b051b20d1ced81092b9ae06dde7a7adf1b3679f76452cc362"
 
 _EXPECTED_NAMES = [
     "archive_conversation",
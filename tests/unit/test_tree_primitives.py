@@ -335,3 +335,124 @@ class TestDerivedOps:
         tree.prune_to("d")
         # Only the c-d ancestor chain remains
         assert set(tree.message_map) == {"a", "b", "c", "d"}
+
+
+# ---------------------------------------------------------------------------
+# Child index
+# ---------------------------------------------------------------------------
+
+
+def _scan_children(tree: ConversationTree, mid: str) -> list[str]:
+    """Reference child lookup: full scan of the message map."""
+    return sorted(m.id for m in tree.message_map.values() if m.parent_id == mid)
+
+
+def _assert_index_consistent(tree: ConversationTree) -> None:
+    for mid in tree.message_map:
+        assert sorted(c.id for c in tree.get_children(mid)) == _scan_children(tree, mid)
+
+
+class TestChildIndex:
+    @pytest.mark.unit
+    def test_index_follows_primitives(self):
+        tree = _branching()
+        _assert_index_consistent(tree)
+        assert tree.count_branches() == 1
+
+        tree.graft("d", _linear(["x", "y"]))
+        _assert_index_consistent(tree)
+        tree.delete_subtree("c")
+        _assert_index_consistent(tree)
+        assert [c.id for c in tree.get_children("b")] == ["e"]
+        tree.prune_to("f")
+        _assert_index_consistent(tree)
+        assert tree.count_branches() == 0
+
+    @pytest.mark.unit
+    def test_readding_message_moves_it(self):
+        tree = _branching()
+        tree.add_message(_msg("f", parent="c"))
+        assert [c.id for c in tree.get_children("e")] == []
+        assert {c.id for c in tree.get_children("c")} == {"d", "f"}
+
+    @pytest.mark.unit
+    def test_direct_map_changes_are_picked_up(self):
+        tree = _branching()
+        tree.get_all_paths()
+        # Inserting straight into the map (as the CTK importer does)
+        tree.message_map["g"] = _msg("g", parent="a")
+        assert {c.id for c in tree.get_children("a")} == {"b", "g"}
+        assert len(tree.get_all_paths()) == 3
+        # Wholesale reassignment
+        tree.message_map = {"a": tree.message_map["a"]}
+        assert tree.get_children("a") == []
+        assert len(tree.get_all_paths()) == 1
+
+    @pytest.mark.unit
+    def test_relinking_then_invalidating(self):
+        tree = _branching()
+        tree.get_all_paths()
+        tree.message_map["e"].parent_id = "a"
+        tree._invalidate_paths_cache()
+        assert {c.id for c in tree.get_children("a")} == {"b", "e"}
+        assert tree.count_branches() == 1
+
+    @pytest.mark.unit
+    def test_paths_cache_hit_keeps_key(self):
+        tree = _branching()
+        paths = tree.get_all_paths()
+        key = tree._paths_cache_key
+        assert tree.get_all_paths() is paths
+        assert tree._paths_cache_key == key
+        tree.root_message_ids.append("missing")
+        assert tree.get_all_paths() is not paths
+
+    @pytest.mark.unit
+    def test_deep_chain_paths_do_not_recurse(self):
+        tree = _linear([f"m{i}" for i in range(5000)])
+        paths = tree.get_all_paths()
+        assert len(paths) == 1
+        assert len(paths[0]) == 5000
+        assert paths[0][-1].id == "m4999"
+
+
+@pytest.mark.slow
+def test_child_lookup_benchmark():
+    """Path enumeration and child lookups on a 10k-message tree.
+
+    Run with ``pytest -m slow -s tests/unit/test_tree_primitives.py`` to
+    see the numbers.
+    """
+    import time
+
+    tree = ConversationTree()
+    tree.add_message(_msg("m0"))
+    for i in range(1, 10_000):
+        # A long spine with a short side branch every 10 messages
+        parent = f"m{i - 1}" if i % 10 else f"m{i - 2}"
+        tree.add_message(_msg(f"m{i}", parent=parent))
+
+    start = time.perf_counter()
+    paths = tree.get_all_paths()
+    enumerate_ms = (time.perf_counter() - start) * 1000
+
+    start = time.perf_counter()
+    tree.get_all_paths()
+    cached_ms = (time.perf_counter() - start) * 1000
+
+    start = time.perf_counter()
+    for mid in tree.message_map:
+        tree.get_children(mid)
+    children_ms = (time.perf_counter() - start) * 1000
+
+    start = time.perf_counter()
+    branches = tree.count_branches()
+    branches_ms = (time.perf_counter() - start) * 1000
+
+    print()
+    print(
+        f"10k messages: get_all_paths={enumerate_ms:.1f} ms  cached={cached_ms:.3f} ms"
+        f"  get_children x10k={children_ms:.1f} ms  count_branches={branches_ms:.1f} ms"
+    )
+    assert len(paths) == branches + 1
+    assert children_ms < 1000
@@ -0,0 +1,69 @@
+"""Tests for binary embedding storage (ctk.core.vectors)."""
+
+import json
+
+import numpy as np
+import pytest
+
+from ctk.core.database import ConversationDB
+from ctk.core.models import ConversationTree
+from ctk.core.vectors import as_array, decode_vector, encode_vector
+
+pytestmark = pytest.mark.unit
+
+
+class TestCodec:
+    def test_float32_round_trip_is_zero_copy(self):
+        values = np.random.default_rng(0).standard_normal(64).astype(np.float32)
+        enc = encode_vector(values)
+        assert enc.dtype == "float32" and enc.dimensions == 64
+        assert len(enc.blob) == 64 * 4
+        assert enc.norm == pytest.approx(float(np.linalg.norm(values)), rel=1e-6)
+
+        out = decode_vector(enc.blob, enc.dtype)
+        np.testing.assert_array_equal(out, values)
+        assert not out.flags.owndata and not out.flags.writeable
+
+    def test_float16_and_int8_are_smaller_and_close(self):
+        values = np.random.default_rng(1).standard_normal(256)
+        for dtype, width, tol in (("float16", 2, 1e-2), ("int8", 1, 5e-2)):
+            enc = encode_vector(values, dtype)
+            assert len(enc.blob) == 256 * width
+            out = decode_vector(enc.blob, enc.dtype, enc.scale)
+            assert out.dtype == np.float32
+            np.testing.assert_allclose(out, values, atol=tol * np.abs(values).max())
+
+    def test_int8_raw_codes_preserve_direction(self):
+        values = np.array([0.2, -0.4, 0.8])
+        enc = encode_vector(values, "int8")
+        raw = as_array(enc.blob, "int8")
+        assert raw.tolist() == [32, -64, 127]
+
+    def test_binary_is_much_smaller_than_json(self):
+        values = np.random.default_rng(2).standard_normal(1536)
+        json_size = len(json.dumps(values.tolist()))
+        assert json_size / len(encode_vector(values).blob) > 4
+
+    @pytest.mark.parametrize("bad", [dict(dtype="float64"), dict(values=[[1.0]])])
+    def test_rejects_bad_input(self, bad):
+        kwargs = {"values": [1.0, 2.0], **bad}
+        with pytest.raises(ValueError):
+            encode_vector(kwargs.pop("values"), **kwargs)
+
+
+def test_database_round_trip_and_dtype_override(tmp_path):
+    with ConversationDB(str(tmp_path)) as db:
+        db.save_conversation(ConversationTree(id="c1", title="t"))
+        db.save_embedding("c1", [3.0, 4.0], model="m", provider="p")
+        vec = db.get_embedding("c1", model="m", provider="p")
+        assert isinstance(vec, np.ndarray)
+        assert vec.tolist() == [3.0, 4.0]
+
+        db.save_embedding(
+            "c1", np.array([1.0, 0.0, 0.5]), model="m", provider="p", dtype="float16"
+        )
+        [record] = db.get_all_embeddings()
+        assert record["dtype"] == "float16"
+        assert record["dimensions"] == 3
+        assert record["norm"] == pytest.approx(np.sqrt(1.25))
+        np.testing.assert_allclose(record["embedding"], [1.0, 0.0, 0.5])